@@ -0,0 +1,152 @@
+"""发布分析基准：10 万篇文章的列式存储写入、各项聚合查询耗时、推荐时段是否命中真实高峰"""
+import math
+import random
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+from benchmarks.harness import BenchContext, benchmark, summarize
+from src.core.analytics import ArticleAnalytics, ingest_accounts
+from src.core.article_fetcher import ArticleFetcher
+from src.core.async_runtime import run_sync
+from src.core.session_manager import get_session_manager
+
+_CATEGORIES = "科技 财经 体育 娱乐 汽车 房产 教育 健康 旅游 美食".split()
+_TAGS = "新能源 人工智能 高考 房价 医保 芯片 足球 电影 自驾 减肥 基金 考研 手机 旅游 宠物".split()
+_PLATFORMS = "weibo zhihu baidu toutiao douyin".split()
+# 模拟的高峰时段：(星期, 小时) -> 对数阅读量加成
+_PEAKS = {(0, 8): 0.8, (2, 12): 0.7, (4, 20): 0.9, (6, 21): 0.6}
+SNAPSHOT_SHIFTS = (168, 72, 24, 6, 0)
+
+
+def _expected(weekday: int, hour: int, category: int) -> float:
+    score = 6.0 + _PEAKS.get((weekday, hour), 0.0)
+    score += 0.3 if 7 <= hour <= 9 or 18 <= hour <= 22 else (-0.6 if hour < 6 else 0.0)
+    return score + category * 0.05
+
+
+def _articles(count: int, now: float, seed: int = 12):
+    """count 篇文章分布在 20 个账号，发布时间在过去一年内"""
+    rng = random.Random(seed)
+    offset = time.localtime(now).tm_gmtoff
+    rows = []
+    for i in range(count):
+        published = now - rng.uniform(3600, 365 * 86400)
+        local_hours = int(published + offset) // 3600
+        weekday, hour = (local_hours // 24 + 3) % 7, local_hours % 24
+        category = rng.randrange(len(_CATEGORIES))
+        final = math.expm1(_expected(weekday, hour, category) + rng.gauss(0, 0.5))
+        rows.append({
+            "account": f"account-{i % 20}",
+            "article_id": str(7100000000000000000 + i),
+            "publish_time": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(published)),
+            "published": published,
+            "final": final,
+            "category": _CATEGORIES[category],
+            "tags": rng.sample(_TAGS, rng.randint(1, 3)),
+            "platform": rng.choice(_PLATFORMS),
+        })
+    return rows
+
+
+def _reads_at(row, age_hours: float) -> int:
+    """阅读量随发布时长增长：一天约 60%，一周后基本稳定"""
+    return int(row["final"] * (1 - math.exp(-age_hours / 26)))
+
+
+def _build(rows, now: float):
+    analytics = ArticleAnalytics(path=None)
+    by_account = {}
+    for row in rows:
+        by_account.setdefault(row["account"], []).append(row)
+    start = time.perf_counter()
+    for account, items in by_account.items():
+        for item in items:
+            analytics.record_publish(account, item["article_id"], item, item["published"])
+    # 模拟五次拉取：文章列表分别在 7 天、3 天、1 天、6 小时前和现在被抓取
+    for shift in SNAPSHOT_SHIFTS:
+        fetched_at = now - shift * 3600
+        for account, items in by_account.items():
+            analytics.ingest(account, [
+                {"article_id": item["article_id"], "publish_time": item["publish_time"],
+                 "read_count": _reads_at(item, (fetched_at - item["published"]) / 3600)}
+                for item in items if item["published"] < fetched_at
+            ], fetched_at=fetched_at)
+    return analytics, time.perf_counter() - start
+
+
+@benchmark("analytics")
+def bench_analytics(ctx: BenchContext):
+    """10 万篇文章、5 次快照：写入耗时、聚合查询延迟、存取耗时与推荐时段命中"""
+    now = time.time()
+    rows = _articles(100000, now)
+    analytics, build_seconds = _build(rows, now)
+
+    queries = {
+        "by_hour_of_week": lambda: analytics.by_hour_of_week(),
+        "by_hour_of_week_account": lambda: analytics.by_hour_of_week(account="account-3"),
+        "by_category": lambda: analytics.by_category(),
+        "by_tag": lambda: analytics.by_tag(),
+        "by_platform": lambda: analytics.by_platform(),
+        "decay_curve": lambda: analytics.decay_curve(),
+        "recommend_windows": lambda: analytics.recommend_windows(4),
+        "next_publish_time": lambda: analytics.next_publish_time(),
+    }
+    latencies = {}
+    for name, query in queries.items():
+        samples = []
+        for _ in range(ctx.iterations):
+            start = time.perf_counter()
+            query()
+            samples.append(time.perf_counter() - start)
+        latencies[name] = summarize(samples)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "articles.bin"
+        start = time.perf_counter()
+        analytics.save(path)
+        save_seconds = time.perf_counter() - start
+        size = path.stat().st_size
+        start = time.perf_counter()
+        ArticleAnalytics(path=path)
+        load_seconds = time.perf_counter() - start
+
+    windows = analytics.recommend_windows(4)
+    found = {(w["weekday"], w["hour"]) for w in windows}
+    return {
+        "articles": len(analytics),
+        "snapshots": analytics.snap_row.size,
+        "build_seconds": build_seconds,
+        "queries": latencies,
+        "save_seconds": save_seconds,
+        "load_seconds": load_seconds,
+        "file_bytes": size,
+        "recommended": [f"{w['weekday']}-{w['hour']:02d}" for w in windows],
+        "peak_hits": len(found & set(_PEAKS)),
+        "peaks": len(_PEAKS),
+        "decay_curve": [(c["hours"], round(c["fraction"], 3)) for c in analytics.decay_curve()],
+    }
+
+
+@benchmark("analytics_ingest")
+def bench_analytics_ingest(ctx: BenchContext):
+    """通过 ArticleFetcher 翻页拉取多个账号的文章写入统计库（每个账号 500 篇）"""
+    sessions = get_session_manager()
+    sessions.base_url = ctx.server.base_url
+    sessions.domain = ctx.server.server_address[0]
+    accounts = [{"name": f"bench-{i}", "token": f"analytics-token-{i}", "cookies": {}} for i in range(4)]
+
+    class StubFetcher(ArticleFetcher):
+        def __init__(self, account_data):
+            super().__init__(account_data)
+            self.base_url = ctx.server.base_url
+
+    samples = []
+    with mock.patch("src.core.article_fetcher.ArticleFetcher", StubFetcher):
+        for _ in range(max(2, ctx.iterations // 10)):
+            analytics = ArticleAnalytics(path=None)
+            start = time.perf_counter()
+            counts = run_sync(ingest_accounts(accounts, analytics, page_size=50))
+            samples.append(time.perf_counter() - start)
+    return {"accounts": len(accounts), "articles": sum(counts.values()), "latency": summarize(samples)}
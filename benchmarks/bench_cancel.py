@@ -0,0 +1,76 @@
+"""取消延迟基准：慢接口上的请求被取消后多久真正停止"""
+import threading
+import time
+
+from benchmarks.harness import BenchContext, benchmark, summarize
+from src.core.async_runtime import runtime
+from src.core.cancel import Cancelled, CancelToken
+from src.core.hot_api import HotAPI
+
+SLOW_ROUTE = "/api/hotlist"
+SLOW_MS = 3000.0
+CANCEL_AFTER_S = 0.05
+
+
+def _api(ctx: BenchContext) -> HotAPI:
+    api = HotAPI()
+    api.source_urls.update({"vvhan": ctx.url(SLOW_ROUTE)})
+    return api
+
+
+def _cancel_run_sync(api: HotAPI) -> float:
+    """run_sync 在取消后多久返回（秒）"""
+    token = CancelToken()
+    timer = threading.Timer(CANCEL_AFTER_S, token.cancel)
+    timer.start()
+    start = time.perf_counter()
+    try:
+        runtime.run_sync(api.get_hot_list("微博", "vvhan"), token=token)
+    except Cancelled:
+        pass
+    return time.perf_counter() - start - CANCEL_AFTER_S
+
+
+def _cancel_worker(api: HotAPI):
+    """HotWorker：stop() 在调用线程阻塞的时间，以及线程退出的时间（秒）"""
+    from src.ui.tabs.hot_tab import HotWorker
+
+    worker = HotWorker(api, "微博", "vvhan")
+    worker.start()
+    time.sleep(CANCEL_AFTER_S)
+    start = time.perf_counter()
+    worker.stop()
+    blocked = time.perf_counter() - start
+    while worker.isRunning():
+        time.sleep(0.001)
+    exited = time.perf_counter() - start
+    worker.wait()
+    return blocked, exited
+
+
+@benchmark("cancel_latency")
+def bench_cancel_latency(ctx: BenchContext):
+    """接口延迟 3 秒时，在请求发出 50ms 后取消"""
+    latencies = ctx.server.config.route_latency_ms
+    latencies[SLOW_ROUTE] = SLOW_MS
+    api = _api(ctx)
+    count = max(3, ctx.iterations // 4)
+    try:
+        run_sync = [_cancel_run_sync(api) for _ in range(count)]
+        try:
+            workers = [_cancel_worker(api) for _ in range(count)]
+        except ImportError:
+            workers = []
+        # 对照：不取消时请求需要完整的接口延迟才返回，即原先只设置标志位时界面 wait() 的时间
+        start = time.perf_counter()
+        runtime.run_sync(api.get_hot_list("微博", "vvhan"))
+        uncancelled = time.perf_counter() - start
+    finally:
+        latencies.pop(SLOW_ROUTE, None)
+
+    return {
+        "run_sync_cancel": summarize(run_sync),
+        "worker_stop_blocking": summarize([b for b, _ in workers]),
+        "worker_exit_after_cancel": summarize([e for _, e in workers]),
+        "uncancelled_request_ms": uncancelled * 1000,
+    }
@@ -0,0 +1,78 @@
+"""录制/回放基准：录制一轮真实流水线（热榜 -> AI 改写与标题 -> 发布），再按原始/加速/不等待的节奏回放"""
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.harness import BenchContext, benchmark, summarize
+from src.core.ai_api import AIAPI
+from src.core.cassette import RECORD, REPLAY, use_cassette
+from src.core.hot_api import HotAPI
+from src.core.publisher import Publisher
+
+# 模拟上游各接口的耗时（毫秒）
+_LATENCY = {"/hot-event/hot-board/": 80, "/v1/chat/completions": 120, "/mp/agw/article/publish": 60}
+
+
+async def _pipeline(ctx: BenchContext) -> list:
+    hot = HotAPI()
+    hot.toutiao_hot_url = ctx.url("/hot-event/hot-board/")
+    ai = AIAPI()
+    ai.api_base = ctx.url("/v1")
+    publisher = Publisher()
+    publisher.base_url = ctx.url("/mp/agw/article/publish")
+
+    items = await hot.get_toutiao_hot()
+    text = "".join(f"{item['title']}。相关话题持续引发关注，各方观点不一。" for item in items[:20]) * 4
+    content, title = await asyncio.gather(
+        ai.process(text, "文章改写", keep_keywords=False),
+        ai.process(text[:500], "标题优化", keep_keywords=False),
+    )
+    result = await publisher.publish_toutiao("cassette-token", {"title": title, "content": content, "tags": ["热点"]})
+    return [len(items), content, title, result["article_id"]]
+
+
+@benchmark("cassette_replay")
+def bench_cassette_replay(ctx: BenchContext):
+    """同一条流水线：在线访问、录制，之后按 1 倍、10 倍速和不等待回放，比较耗时、上游请求数与结果是否一致"""
+    config = ctx.server.config
+    original_latency = dict(config.route_latency_ms)
+    config.route_latency_ms.update(_LATENCY)
+    runs = max(3, ctx.iterations // 5)
+    results = {}
+    try:
+        live = []
+        for _ in range(runs):
+            begin = time.perf_counter()
+            asyncio.run(_pipeline(ctx))
+            live.append(time.perf_counter() - begin)
+        results["live"] = {"latency": summarize(live)}
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "pipeline.cas"
+            start = time.perf_counter()
+            with use_cassette(path, RECORD) as cassette:
+                recorded = asyncio.run(_pipeline(ctx))
+            results["record"] = {
+                "wall_ms": (time.perf_counter() - start) * 1000,
+                "interactions": len(cassette.interactions),
+                "cassette_bytes": path.stat().st_size,
+                "response_bytes": sum(len(i["body"]) for i in cassette.interactions),
+            }
+            for name, speed in (("replay_original", 1.0), ("replay_10x", 10.0), ("replay_instant", 0.0)):
+                samples = []
+                hits = sum(ctx.server.hits.values())
+                identical = True
+                for _ in range(runs):
+                    with use_cassette(path, REPLAY, speed):
+                        begin = time.perf_counter()
+                        replayed = asyncio.run(_pipeline(ctx))
+                        samples.append(time.perf_counter() - begin)
+                    identical = identical and replayed == recorded
+                results[name] = {
+                    "latency": summarize(samples),
+                    "upstream_requests": sum(ctx.server.hits.values()) - hits,
+                    "identical_output": identical,
+                }
+    finally:
+        config.route_latency_ms = original_latency
+    return results
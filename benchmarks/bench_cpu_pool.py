@@ -0,0 +1,85 @@
+"""进程池基准：批量提取长文章（解析、清理、关键词、相似度哈希），比较吞吐与界面线程的卡顿"""
+import threading
+import time
+
+from benchmarks.harness import BenchContext, benchmark, summarize
+from src.core.article import ArticleProcessor, extract_document
+from src.core.async_runtime import run_sync
+from src.core.cpu_pool import CpuPool, available_cores
+from src.core.keywords import hamming
+
+_TICK = 0.005
+
+
+def _with_heartbeat(work) -> dict:
+    """在工作线程中执行 work，同时在当前线程每 5ms 醒来一次，统计醒来的延迟（模拟界面事件循环）"""
+    done = threading.Event()
+    result = {}
+
+    def target():
+        try:
+            result["value"] = work()
+        finally:
+            done.set()
+
+    lateness = []
+    begin = time.perf_counter()
+    thread = threading.Thread(target=target)
+    thread.start()
+    while not done.is_set():
+        expected = time.perf_counter() + _TICK
+        time.sleep(_TICK)
+        lateness.append(max(0.0, time.perf_counter() - expected))
+    thread.join()
+    wall = time.perf_counter() - begin
+    return {"value": result.get("value"), "wall": wall, "lateness": lateness}
+
+
+@benchmark("cpu_batch_extraction")
+def bench_cpu_batch_extraction(ctx: BenchContext):
+    """约 60KB 的长文章页批量提取：在工作线程内直接处理，与交给进程池（pickle / 共享内存）处理对比"""
+    count = max(8, ctx.iterations)
+    urls = [ctx.url(f"/longform/{i}") for i in range(1, count + 1)]
+    processor = ArticleProcessor()
+    pages = run_sync(processor._download_pages(urls, 8))
+    total_bytes = sum(len(page.encode("utf-8")) for page in pages)
+    results = {"documents": count, "input_mb": total_bytes / 1e6, "cores": available_cores()}
+
+    pool = CpuPool()
+    begin = time.perf_counter()
+    pool.call(extract_document, pages[0], urls[0])
+    results["pool_workers"] = pool.workers
+    results["pool_start_ms"] = (time.perf_counter() - begin) * 1000
+
+    runs = {
+        "in_thread": lambda: [extract_document(page, url) for page, url in zip(pages, urls)],
+        "pool_pickle": lambda: pool.map(extract_document, pages, extras=urls),
+        "pool_shared_memory": lambda: pool.map_texts(extract_document, pages, extras=urls),
+    }
+    outputs = {}
+    try:
+        for name, work in runs.items():
+            run = _with_heartbeat(work)
+            outputs[name] = run["value"]
+            stall = summarize(run["lateness"])
+            results[name] = {
+                "wall_ms": run["wall"] * 1000,
+                "docs_per_s": count / run["wall"],
+                "mb_per_s": total_bytes / 1e6 / run["wall"],
+                "ui_tick_late_p50_ms": stall["p50_ms"],
+                "ui_tick_late_p99_ms": stall["p99_ms"],
+                "ui_tick_late_max_ms": stall["max_ms"],
+            }
+    finally:
+        pool.shutdown()
+
+    documents = outputs["pool_shared_memory"]
+    results["identical_output"] = documents == outputs["in_thread"] == outputs["pool_pickle"]
+    results["images_per_doc"] = sum(len(d["images"]) for d in documents) / count
+    # 相似度哈希找出的转载对（桩页面中 id 为 5 的倍数的文章转载自前一篇）
+    pairs = [(a["url"], b["url"]) for i, a in enumerate(documents) for b in documents[i + 1:]
+             if hamming(a["simhash"], b["simhash"]) <= 3]
+    expected = [(urls[i - 1], urls[i]) for i in range(1, count) if (i + 1) % 5 == 0]
+    results["near_duplicates"] = {"found": len(pairs), "expected": len(expected),
+                                  "correct": sorted(pairs) == sorted(expected)}
+    return results
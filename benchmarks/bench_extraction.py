@@ -0,0 +1,38 @@
+"""文章提取吞吐基准（需要 playwright 浏览器）"""
+import time
+
+from benchmarks.harness import BenchContext, benchmark, summarize
+from src.core.article import ArticleProcessor
+
+
+@benchmark("extraction_throughput")
+def bench_extraction(ctx: BenchContext):
+    """逐篇提取本地文章页面"""
+    processor = ArticleProcessor()
+    count = max(1, ctx.iterations // 4)
+    samples = []
+    chars = 0
+    failures = 0
+
+    wall_start = time.perf_counter()
+    for i in range(count):
+        start = time.perf_counter()
+        article = processor.extract_article(ctx.url(f"/article/{i + 1}"))
+        samples.append(time.perf_counter() - start)
+        if article and article.get("content"):
+            chars += len(article["content"])
+        else:
+            failures += 1
+    wall = time.perf_counter() - wall_start
+
+    if failures == count:
+        raise RuntimeError("所有页面提取失败，请确认已执行 playwright install chromium")
+
+    result = summarize(samples)
+    result.update({
+        "errors": failures,
+        "wall_s": wall,
+        "throughput_per_s": count / wall if wall > 0 else 0.0,
+        "chars_per_s": chars / wall if wall > 0 else 0.0,
+    })
+    return result
@@ -0,0 +1,56 @@
+"""页面加载配置基准（需要 playwright 浏览器）：原始加载方式与精简配置的流量、耗时对比"""
+from benchmarks.harness import BenchContext, benchmark, summarize
+from src.core.fetch_profiles import load_page, profile_for
+
+# 静态资源的额外延迟，模拟图片/字体/第三方脚本来自较慢的 CDN
+STATIC_LATENCY_MS = 150.0
+
+
+def _load(browser, url: str, profile: str):
+    context = browser.new_context()
+    try:
+        page = context.new_page()
+        _, stats = load_page(context, page, url, profile_for(url, profile))
+        text = page.evaluate("() => (document.querySelector('article') || document.body).innerText")
+        return stats, len(text)
+    finally:
+        context.close()
+
+
+@benchmark("fetch_profiles")
+def bench_fetch_profiles(ctx: BenchContext):
+    """逐页加载 /heavy/<id>：full（不拦截 + networkidle）对比按域名选择的精简配置"""
+    try:
+        from playwright.sync_api import sync_playwright
+    except ImportError as e:
+        raise RuntimeError(f"需要 playwright: {e}")
+
+    latencies = ctx.server.config.route_latency_ms
+    latencies["/static/"] = STATIC_LATENCY_MS
+    count = max(1, ctx.iterations // 4)
+    results = {}
+    try:
+        with sync_playwright() as p:
+            browser = p.chromium.launch(headless=True)
+            for profile in ("full", None):
+                runs = [_load(browser, ctx.url(f"/heavy/{i + 1}"), profile) for i in range(count)]
+                stats = [s for s, _ in runs]
+                results[profile or "lean"] = {
+                    "profile": stats[0].profile,
+                    "site": stats[0].site,
+                    "requests": stats[0].requests,
+                    "blocked": stats[0].blocked,
+                    "bytes_per_page": sum(s.bytes for s in stats) / len(stats),
+                    "text_chars": runs[0][1],
+                    "ready": all(s.ready for s in stats),
+                    "load": summarize([s.load_ms / 1000 for s in stats]),
+                }
+            browser.close()
+    finally:
+        latencies.pop("/static/", None)
+
+    full, lean = results["full"], results["lean"]
+    results["bytes_saved_ratio"] = 1 - lean["bytes_per_page"] / full["bytes_per_page"] if full["bytes_per_page"] else 0.0
+    results["load_speedup"] = full["load"]["mean_ms"] / lean["load"]["mean_ms"] if lean["load"]["mean_ms"] else 0.0
+    results["same_text"] = full["text_chars"] == lean["text_chars"]
+    return results
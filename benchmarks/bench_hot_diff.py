@@ -0,0 +1,43 @@
+"""热榜快照增量基准"""
+import random
+
+from benchmarks.harness import BenchContext, benchmark, measure, summarize
+from src.core.hot_api import HotAPI
+
+
+def _snapshots(size: int, churn: float, seed: int = 11):
+    """生成前后两次快照：少量条目被替换，少量相邻条目交换排名"""
+    rng = random.Random(seed)
+    old = [{"title": f"话题{i}", "url": f"https://example.com/{i}", "hot": f"{size - i}万",
+            "rank": i + 1} for i in range(size)]
+    titles = [item["title"] for item in old]
+    changes = max(1, int(size * churn))
+    for n in range(changes):
+        titles[rng.randrange(size)] = f"新话题{n}"
+    for _ in range(changes):
+        i = rng.randrange(size - 1)
+        titles[i], titles[i + 1] = titles[i + 1], titles[i]
+    new = []
+    for rank, title in enumerate(titles, start=1):
+        index = title[2:] if title.startswith("话题") else title
+        new.append({"title": title, "url": f"https://example.com/{index}", "hot": f"{size - rank + 1}万",
+                    "rank": rank})
+    return old, new
+
+
+@benchmark("hot_snapshot_diff")
+def bench_hot_snapshot_diff(ctx: BenchContext):
+    """5% 条目变化时计算增量的耗时，以及界面需要改动的行数占比"""
+    results = {}
+    for size in (50, 5000):
+        old, new = _snapshots(size, 0.05)
+        delta = HotAPI.diff_hot_lists(old, new)
+        touched = len(delta["inserted"]) + len(delta["removed"]) + len(delta["moved"]) + len(delta["updated"])
+        results[f"n{size}"] = {
+            "diff": summarize(measure(lambda: HotAPI.diff_hot_lists(old, new), ctx.iterations)),
+            "inserted": len(delta["inserted"]),
+            "removed": len(delta["removed"]),
+            "moved": len(delta["moved"]),
+            "rows_touched_ratio": touched / size,
+        }
+    return results
@@ -0,0 +1,88 @@
+"""热榜数据源解析基准：基于样例数据校验各解析规则，并测量解析吞吐"""
+import asyncio
+import json
+import time
+from pathlib import Path
+
+from benchmarks.harness import BenchContext, benchmark, measure, summarize
+from src.core.hot_api import HotAPI
+from src.core.hot_sources import HOT_SOURCES, PLATFORM_CACHE_NAMES, StreamParser, parse_bytes
+
+FIXTURE_DIR = Path(__file__).resolve().parent / "fixtures" / "hot_sources"
+
+
+def _check(parsed, expected) -> list:
+    """与样例期望结果比对，返回差异描述"""
+    problems = []
+    if len(parsed) != expected["count"]:
+        problems.append(f"条目数 {len(parsed)} != {expected['count']}")
+    for got, want in zip(parsed, expected["first"]):
+        for key, value in want.items():
+            if got.get(key) != value:
+                problems.append(f"{key}: {got.get(key)!r} != {value!r}")
+    return problems
+
+
+def _stream(spec, data: bytes, chunk_size: int = 4096):
+    parser = StreamParser(spec)
+    for start in range(0, len(data), chunk_size):
+        parser.feed(data[start:start + chunk_size])
+    return parser.close()
+
+
+@benchmark("hot_source_parsers")
+def bench_hot_source_parsers(ctx: BenchContext):
+    """逐个数据源解析样例响应：校验结果，并比较整体解析与分块流式解析的吞吐"""
+    with open(FIXTURE_DIR / "expected.json", "r", encoding="utf-8") as f:
+        expected = json.load(f)
+
+    results = {}
+    failures = 0
+    for platform, specs in HOT_SOURCES.items():
+        for spec in specs:
+            name = f"{PLATFORM_CACHE_NAMES[platform]}_{spec['name']}"
+            data = (FIXTURE_DIR / f"{name}.json").read_bytes()
+            problems = _check(parse_bytes(spec, data), expected[f"{name}.json"])
+            problems += _check(_stream(spec, data), expected[f"{name}.json"])
+            failures += bool(problems)
+
+            count = expected[f"{name}.json"]["count"]
+            whole = summarize(measure(lambda: parse_bytes(spec, data), ctx.iterations))
+            streamed = summarize(measure(lambda: _stream(spec, data), ctx.iterations))
+            results[name] = {
+                "ok": not problems,
+                "problems": problems[:5],
+                "bytes": len(data),
+                "whole": whole,
+                "streamed": streamed,
+                "items_per_s": count / (whole["mean_ms"] / 1000) if whole["mean_ms"] else 0.0,
+            }
+    results["failures"] = failures
+    return results
+
+
+@benchmark("hot_platform_fetch")
+def bench_hot_platform_fetch(ctx: BenchContext):
+    """通过桩服务并发获取全部平台热榜"""
+    api = HotAPI()
+    api.source_urls.update({
+        "toutiao": ctx.url("/hot-event/hot-board/"),
+        "vvhan": ctx.url("/api/hotlist"),
+        "oioweb": ctx.url("/api/common/HotList"),
+        "zhihu": ctx.url("/api/v3/feed/topstory/hot-lists/total"),
+        "bilibili": ctx.url("/x/web-interface/popular"),
+    })
+    platforms = ["头条", "微博", "知乎", "B站"]
+
+    async def run():
+        start = time.perf_counter()
+        boards = await asyncio.gather(*(api.get_hot_list(p) for p in platforms))
+        return boards, time.perf_counter() - start
+
+    samples = []
+    counts = {}
+    for _ in range(ctx.iterations):
+        boards, wall = asyncio.run(run())
+        samples.append(wall)
+        counts = {p: len(b) for p, b in zip(platforms, boards)}
+    return {"counts": counts, "wall": summarize(samples)}
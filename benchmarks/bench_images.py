@@ -0,0 +1,118 @@
+"""文章图片基准：逐张下载、转码、上传，与并发下载 + 去重 + 进程池转码 + 上传缓存对比"""
+import asyncio
+import time
+from pathlib import Path
+
+from benchmarks.harness import BenchContext, benchmark, summarize
+from src.core.http_client import create_client
+from src.core.image_pipeline import ImagePipeline, get_image_pipeline, place_images, process_image
+from src.core.publisher import Publisher
+
+UPLOAD = "/mp/agw/article_material/photo/upload_picture"
+_LATENCY = {"/images/": 40, UPLOAD: 80}
+
+
+def _articles(ctx: BenchContext) -> list:
+    """三篇文章：第一篇含重复地址、同图不同尺寸、统计像素和超大图；第二篇与第一篇部分重叠；第三篇与第一篇相同"""
+    url = ctx.url
+    first = [url(f"/images/{seed}-2400x1600.jpg") for seed in range(1, 7)] + [
+        url("/images/1-2400x1600.jpg"),
+        url("/images/2-1200x800.jpg?q=70"),
+        url("/images/7-800x600.png"),
+        url("/images/9-1x1.png"),
+        url("/images/huge.jpg"),
+    ]
+    second = [url(f"/images/{seed}-2400x1600.jpg") for seed in range(4, 9)] + [
+        url("/images/10-1600x1200.jpg"), url("/images/11-1600x1200.png"),
+    ]
+    return [first, second, list(first)]
+
+
+async def _warm_up(articles: list):
+    """先请求一遍所有图片，桩服务生成图片的耗时不计入任何一方"""
+    async with create_client() as client:
+        for url in dict.fromkeys(u for urls in articles for u in urls):
+            await client.get(url)
+
+
+async def _naive(ctx: BenchContext, urls: list) -> int:
+    """改动前的做法：逐张下载、在当前线程转码、每张都上传"""
+    uploaded = 0
+    async with create_client(follow_redirects=True) as client:
+        for url in urls:
+            response = await client.get(url)
+            if response.status_code != 200:
+                continue
+            try:
+                processed = process_image(response.content)
+            except Exception:
+                continue
+            await client.post(ctx.url(UPLOAD), files={"upfile": ("image.jpg", processed["data"], processed["mime"])})
+            uploaded += 1
+    return uploaded
+
+
+@benchmark("image_pipeline")
+def bench_image_pipeline(ctx: BenchContext):
+    """11/7/11 张图片的三篇文章；比较耗时与上传次数，并检查重启后缓存仍然有效"""
+    server = ctx.server
+    config = server.config
+    original_latency = dict(config.route_latency_ms)
+    config.route_latency_ms.update(_LATENCY)
+    articles = _articles(ctx)
+    results = {}
+    try:
+        process_image(b"")  # 预先导入 PIL，不计入耗时
+    except Exception:
+        pass
+    asyncio.run(_warm_up(articles))
+    try:
+        uploads = len(server.uploads)
+        samples = []
+        for urls in articles:
+            begin = time.perf_counter()
+            asyncio.run(_naive(ctx, urls))
+            samples.append(time.perf_counter() - begin)
+        results["naive"] = {"latency": summarize(samples), "uploads": len(server.uploads) - uploads}
+
+        cache = Path("image_uploads.bin")
+        pipeline = ImagePipeline(cache_path=cache, upload_url=ctx.url(UPLOAD))
+        for index, urls in enumerate(articles, 1):
+            uploads = len(server.uploads)
+            begin = time.perf_counter()
+            images = asyncio.run(pipeline.prepare("image-token", urls))
+            results[f"pipeline_article_{index}"] = {
+                "wall_ms": (time.perf_counter() - begin) * 1000,
+                "images": len(images),
+                "uploads": len(server.uploads) - uploads,
+            }
+        results["pipeline_stats"] = dict(pipeline.stats)
+        pipeline.close()
+
+        # 重启后从缓存文件恢复：已上传过的图片不再上传
+        restarted = ImagePipeline(cache_path=cache, upload_url=ctx.url(UPLOAD))
+        uploads = len(server.uploads)
+        begin = time.perf_counter()
+        images = asyncio.run(restarted.prepare("image-token", articles[1]))
+        results["after_restart"] = {"wall_ms": (time.perf_counter() - begin) * 1000, "images": len(images),
+                                    "uploads": len(server.uploads) - uploads}
+        restarted.close()
+
+        # 端到端：带图片地址发布，正文中插入上传后的图片
+        shared = get_image_pipeline()
+        shared.upload_url = ctx.url(UPLOAD)
+        publisher = Publisher()
+        publisher.base_url = ctx.url("/mp/agw/article/publish")
+        publisher.autoflush_analytics = False
+        content = "\n".join(f"第{i}段正文。" for i in range(12))
+        begin = time.perf_counter()
+        asyncio.run(publisher.publish_toutiao("image-token", {"title": "带图文章", "content": content,
+                                                              "images": articles[0]}))
+        results["publish_with_images_ms"] = (time.perf_counter() - begin) * 1000
+        placed = place_images(content, [{"url": f"https://img/{i}", "width": 1, "height": 1} for i in range(4)])
+        results["placement_ok"] = placed.count("<img") == 4 and placed.count("<p>") == 16
+    finally:
+        config.route_latency_ms = original_latency
+    pipeline_ms = sum(results[f"pipeline_article_{i}"]["wall_ms"] for i in range(1, len(articles) + 1))
+    results["speedup"] = results["naive"]["latency"]["mean_ms"] * len(articles) / max(pipeline_ms, 1e-9)
+    return results
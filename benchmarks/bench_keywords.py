@@ -0,0 +1,157 @@
+"""关键词基准：本地提取吞吐，以及改写后按块校验关键词、只重写缺词块的请求开销"""
+import asyncio
+import random
+import time
+
+from benchmarks.harness import BenchContext, benchmark, summarize
+from src.core.ai_api import AIAPI, split_chunks
+from src.core import keywords as keyword_module
+from src.core.keywords import IdfTable, KeywordExtractor, get_keyword_extractor, missing_keywords
+from src.utils.metrics import metrics
+
+_COMMON = ("记者 获悉 相关 部门 表示 目前 已经 近日 同时 此外 随着 进一步 持续 推动 发展 市场 用户 平台 "
+           "数据 显示 专家 认为 影响 提升 工作 情况 问题 方面 服务 企业 政策 城市 今年 去年 增长 明显 "
+           "开展 加强 推进 实现 重要 主要 整体 方式 需求 规模 关注 建设 项目 活动 社会 经济 行业 公司").split()
+_TOPIC_HEADS = "量子 碳 锂 氢 稀土 光伏 芯片 机器人 卫星 疫苗 基因 航母 高铁 电池 大模型 无人机 元宇宙 算力 储能 海上风电".split()
+_TOPIC_TAILS = "计算 中和 矿 能源 材料 组件 封装 关节 互联网 研发 编辑 下水 提速 回收 训练 配送 平台 中心 电站 并网".split()
+
+
+def _topics(rng: random.Random, count: int):
+    words = sorted({h + t for h in _TOPIC_HEADS for t in _TOPIC_TAILS})
+    return rng.sample(words, count)
+
+
+def _sentence(rng: random.Random, topic: str = "") -> str:
+    words = rng.choices(_COMMON, k=rng.randint(4, 9))
+    if topic:
+        words.insert(rng.randrange(len(words) + 1), topic)
+    return "".join(words) + rng.choice("。，。！")
+
+
+def _documents(count: int, seed: int = 21):
+    """模拟新闻语料：常用词构成的句子中穿插每篇各自的几个主题词"""
+    rng = random.Random(seed)
+    docs = []
+    for _ in range(count):
+        topics = _topics(rng, 5)
+        sentences = []
+        length = rng.randint(500, 3000)
+        while sum(map(len, sentences)) < length:
+            sentences.append(_sentence(rng, rng.choice(topics) if rng.random() < 0.4 else ""))
+        docs.append({"topics": topics, "text": "".join(sentences)})
+    return docs
+
+
+def _bench_extraction():
+    corpus = _documents(3000)
+    start = time.perf_counter()
+    table = IdfTable.fit(d["text"] for d in corpus[:1000])
+    fit_seconds = time.perf_counter() - start
+
+    extractor = KeywordExtractor(table)
+    docs = corpus[1000:]
+    samples = []
+    hits = 0
+    start = time.perf_counter()
+    for doc in docs:
+        begin = time.perf_counter()
+        keywords = extractor.keywords(doc["text"], 8)
+        samples.append(time.perf_counter() - begin)
+        hits += sum(any(t in k or k in t for k in keywords) for t in doc["topics"])
+    total = time.perf_counter() - start
+    chars = sum(len(d["text"]) for d in docs)
+    return {
+        "idf_fit_docs": table.docs,
+        "idf_terms": len(table.df),
+        "idf_fit_seconds": fit_seconds,
+        "documents": len(docs),
+        "docs_per_second": len(docs) / total,
+        "chars_per_second": chars / total,
+        "per_document": summarize(samples),
+        "topic_recall": hits / (len(docs) * 5),
+    }
+
+
+def _article(paragraphs: int = 12, seed: int = 4) -> str:
+    """约 5000 字，每个主题词集中出现在相邻的两段中"""
+    rng = random.Random(seed)
+    topics = _topics(rng, paragraphs // 2)
+    parts = []
+    for index in range(paragraphs):
+        topic = topics[index // 2]
+        parts.append("".join(_sentence(rng, topic if rng.random() < 0.2 else "") for _ in range(30)))
+    return "\n".join(parts)
+
+
+async def _whole_article_retry(api: AIAPI, text: str, keywords, retries: int):
+    """对照：整篇一次改写，缺关键词时整篇重来"""
+    requests = 0
+    sent = 0
+    async with api._client() as session:
+        system = "你是一个专业的文本处理助手。请在处理时保留原文中的关键词和重要概念。"
+        result = ""
+        for attempt in range(retries + 1):
+            prompt = system if attempt == 0 else system + "上一次的结果遗漏了关键词，请重新处理。"
+            result = await api._chat(session, prompt, f"保持原意，改写以下文本：\n\n原文：{text}", 0.7)
+            requests += 1
+            sent += len(text)
+            if not missing_keywords(keywords, result):
+                break
+    return requests, sent, missing_keywords(keywords, result)
+
+
+@benchmark("keyword_extraction")
+def bench_keyword_extraction(ctx: BenchContext):
+    """2000 篇 500~3000 字文档的关键词提取吞吐（先用 1000 篇统计 IDF）"""
+    return _bench_extraction()
+
+
+@benchmark("keyword_verified_rewrite")
+def bench_keyword_verified_rewrite(ctx: BenchContext):
+    """改写接口按长度概率漏掉结尾内容时：按块校验只重写缺词块 vs 整篇重写，比较请求数、发送字数与剩余缺词"""
+    config = ctx.server.config
+    config.chat_drop_rate = 0.2
+    api = AIAPI()
+    api.api_base = ctx.url("/v1")
+    text = _article()
+    chunks = split_chunks(text)
+    # 使用按语料统计的 IDF，常用词权重低，选出的是各段的主题词
+    original = keyword_module._extractor
+    keyword_module._extractor = KeywordExtractor(IdfTable.fit(d["text"] for d in _documents(500)))
+    keywords = get_keyword_extractor().keywords(text, 8)
+    runs = max(3, ctx.iterations // 2)
+    chunked, whole = [], []
+    try:
+        for _ in range(runs):
+            metrics.reset()
+            hits_before = ctx.server.hits.get("/v1/chat/completions", 0)
+            start = time.perf_counter()
+            result = asyncio.run(api.process(text, "文章改写"))
+            elapsed = time.perf_counter() - start
+            requests = ctx.server.hits.get("/v1/chat/completions", 0) - hits_before
+            retried = metrics.get("ai.keyword_retry") or 0
+            sent = len(text) + retried * len(text) / len(chunks)
+            chunked.append((requests, sent, len(missing_keywords(keywords, result)), elapsed))
+
+            start = time.perf_counter()
+            requests, sent, missing = asyncio.run(_whole_article_retry(api, text, keywords, 3))
+            whole.append((requests, sent, len(missing), time.perf_counter() - start))
+    finally:
+        config.chat_drop_rate = 0.0
+        keyword_module._extractor = original
+
+    def report(rows):
+        return {
+            "requests_mean": sum(r[0] for r in rows) / len(rows),
+            "chars_sent_mean": sum(r[1] for r in rows) / len(rows),
+            "missing_keywords_mean": sum(r[2] for r in rows) / len(rows),
+            "latency": summarize([r[3] for r in rows]),
+        }
+
+    return {
+        "article_chars": len(text),
+        "chunks": len(chunks),
+        "keywords": keywords,
+        "chunk_verified": report(chunked),
+        "whole_article_retry": report(whole),
+    }
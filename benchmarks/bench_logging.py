@@ -0,0 +1,120 @@
+"""日志开销基准：每次发布请求在调用方线程上花在日志上的时间与写出的字节数"""
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from loguru import logger
+
+from benchmarks.harness import BenchContext, benchmark, summarize
+from src.core.publisher import Publisher
+from src.utils import log_setup
+from src.utils.log_setup import log_http
+
+PUBLISH = "/mp/agw/article/publish"
+
+
+def _payload() -> dict:
+    paragraph = "近日，多地出台新政策支持新能源汽车消费，业内人士认为这将进一步释放市场潜力。"
+    return {"title": "新能源汽车消费新政解读", "content": "<p>" + paragraph * 500 + "</p>",
+            "category": "汽车", "tags": ["新能源", "政策", "消费"], "article_type": 0,
+            "save_status": 1, "timer_status": 0}
+
+
+def _response() -> str:
+    items = [{"article_id": str(7000000000 + i), "title": f"文章标题 {i}", "abstract": "摘要内容" * 20,
+              "read_count": i * 13, "publish_time": "2024-05-01 08:00:00"} for i in range(150)]
+    return json.dumps({"message": "success", "data": {"articles": items}}, ensure_ascii=False)
+
+
+def _legacy(data: dict, status: int, text: str):
+    # 改动前 Publisher 的写法：同步 sink，参数在调用前就已格式化
+    logger.debug(f"Publishing article with data: {json.dumps(data, ensure_ascii=False)}")
+    logger.debug(f"Response status: {status}")
+    logger.debug(f"Response text: {text}")
+
+
+def _structured(data: dict, status: int, text: str):
+    log_http("发布文章请求", body=data, url=PUBLISH)
+    log_http("发布接口响应", status=status, body=text)
+
+
+def _log_bytes(log_dir: Path) -> int:
+    return sum(p.stat().st_size for p in log_dir.glob("*") if p.is_file())
+
+
+@benchmark("logging_overhead")
+def bench_logging_overhead(ctx: BenchContext):
+    """约 20KB 的发布数据和 50KB 的响应：旧写法（同步 DEBUG）与结构化日志在 INFO / DEBUG 级别下调用方的耗时"""
+    data, status, text = _payload(), 200, _response()
+    iterations = max(200, ctx.iterations * 50)
+    scenarios = {
+        "no_logging": (None, None, lambda *args: None),
+        "legacy_sync_debug": ("legacy", "DEBUG", _legacy),
+        "structured_info": ("structured", "INFO", _structured),
+        "structured_debug": ("structured", "DEBUG", _structured),
+        "structured_debug_loguru_enqueue": ("enqueue", "DEBUG", _structured),
+    }
+    results = {}
+    try:
+        for name, (style, level, func) in scenarios.items():
+            with tempfile.TemporaryDirectory() as tmp:
+                log_dir = Path(tmp)
+                logger.remove()
+                if style == "legacy":
+                    # loguru 默认配置是同步写 stderr；写文件以免刷屏，开销同为调用方线程上的格式化与写入
+                    logger.add(log_dir / "legacy.log", level=level, encoding="utf-8")
+                elif style == "enqueue":
+                    # 对照：loguru 自带的 enqueue（multiprocessing 队列）
+                    logger.add(log_dir / "toutiao.log", level=level, format=log_setup._json_record, enqueue=True,
+                               encoding="utf-8")
+                elif style == "structured":
+                    log_setup.setup_logging(log_dir, level="WARNING", file_level=level)
+                samples = []
+                for _ in range(iterations):
+                    begin = time.perf_counter()
+                    func(data, status, text)
+                    samples.append(time.perf_counter() - begin)
+                begin = time.perf_counter()
+                log_setup.shutdown()
+                drain_ms = (time.perf_counter() - begin) * 1000
+                logger.remove()
+                stats = summarize(samples)
+                results[name] = {
+                    "per_request_us": stats["mean_ms"] * 1000,
+                    "p99_us": stats["p99_ms"] * 1000,
+                    "drain_ms": drain_ms,
+                    "bytes_per_request": _log_bytes(log_dir) / iterations,
+                }
+
+        # 端到端：对桩服务器发布，比较结构化日志在 INFO 与 DEBUG 下的请求延迟
+        publisher = Publisher()
+        publisher.base_url = ctx.url(PUBLISH)
+        publisher.autoflush_analytics = False
+        for level in ("INFO", "DEBUG"):
+            with tempfile.TemporaryDirectory() as tmp:
+                log_setup.setup_logging(Path(tmp), level="WARNING", file_level=level)
+
+                async def run():
+                    samples = []
+                    for _ in range(ctx.iterations):
+                        begin = time.perf_counter()
+                        await publisher.publish_toutiao("logging-token", dict(data))
+                        samples.append(time.perf_counter() - begin)
+                    return samples
+
+                samples = asyncio.run(run())
+                log_setup.shutdown()
+                logger.remove()
+                results[f"publish_{level.lower()}"] = {"latency": summarize(samples),
+                                                       "log_bytes": _log_bytes(Path(tmp))}
+    finally:
+        # 恢复为运行器的默认输出
+        logger.remove()
+        logger.add(sys.stderr, level="WARNING")
+    legacy = results["legacy_sync_debug"]["per_request_us"]
+    results["speedup_info"] = legacy / max(results["structured_info"]["per_request_us"], 1e-9)
+    results["speedup_debug"] = legacy / max(results["structured_debug"]["per_request_us"], 1e-9)
+    return results
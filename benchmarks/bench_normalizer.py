@@ -0,0 +1,107 @@
+"""正文规范化基准：逐字符/逐条规则的写法与预编译规则、批量接口的吞吐（字符/秒）对比"""
+import random
+import re
+import time
+
+from benchmarks.harness import BenchContext, benchmark, summarize
+from src.core.text_normalizer import BOILERPLATE_PHRASES, BOILERPLATE_PREFIXES, TextNormalizer
+
+_WORDS = ("记者 获悉 相关 部门 表示 目前 已经 近日 同时 此外 随着 进一步 推动 发展 市场 用户 平台 数据 显示 "
+          "专家 认为 影响 提升 企业 政策 城市 今年 增长 明显 新能源 芯片 算力 储能").split()
+_ASCII = "iPhone 5G AI GDP 2024 CPU 100%".split()
+_NOISE = ["\u200b", "\u3000", "\u00a0", "\ufeff", " ", "  ", "\t"]
+_PUNCT = ["，", "。", ",", "!", "!!!", "?", "...", "。。。", "！！", "；"]
+
+
+def _full_width(word: str) -> str:
+    return "".join(chr(ord(c) + 0xFEE0) if "!" <= c <= "~" else c for c in word)
+
+
+def _paragraph(rng: random.Random) -> str:
+    parts = []
+    for _ in range(rng.randint(3, 8)):
+        for word in rng.choices(_WORDS, k=rng.randint(3, 8)):
+            parts.append(word)
+            if rng.random() < 0.15:
+                parts.append(rng.choice(_NOISE))
+        if rng.random() < 0.3:
+            word = rng.choice(_ASCII)
+            parts.append(_full_width(word) if rng.random() < 0.5 else word)
+        parts.append(rng.choice(_PUNCT))
+    return "".join(parts)
+
+
+def _article(rng: random.Random, paragraphs: int) -> str:
+    lines = [f"{rng.choice(BOILERPLATE_PREFIXES)}：{rng.choice(_WORDS)}"]
+    for _ in range(paragraphs):
+        lines.append(_paragraph(rng))
+        lines.append(rng.choice(["", "", "<br>", "<br/>", "\r", "  "]))
+    lines.append(f"{rng.choice(BOILERPLATE_PHRASES)}，{rng.choice(_WORDS)}")
+    return "\n".join(lines)
+
+
+def _corpus(seed: int = 50):
+    """标题、评论一类的短文本，以及 2~10KB 的长文章"""
+    rng = random.Random(seed)
+    short = [_paragraph(rng)[:40] for _ in range(3000)]
+    long = [_article(rng, rng.randint(20, 80)) for _ in range(150)]
+    return short, long
+
+
+class _NaiveNormalizer:
+    """对照组：逐字符查表折叠，每篇对每条规则按模式字符串调用 re.sub（改动前逐篇临时清理的写法）"""
+
+    def __init__(self, reference: TextNormalizer):
+        self.reference = reference
+
+    def normalize(self, text: str) -> str:
+        ref = self.reference
+        text = "\n" + text.replace("\r\n", "\n") + "\n"
+        text = "".join(ref.table.get(char, char) for char in text)
+        text = re.sub(ref._br.pattern, "\n", text, flags=re.IGNORECASE)
+        text = re.sub(ref._spaces.pattern, " ", text)
+        text = re.sub(r" *\n *", "\n", text)
+        text = re.sub(ref._boilerplate.pattern, "", text)
+        for pattern, full in ref._half_punct + ref._repeated:
+            text = re.sub(pattern.pattern, full, text)
+        text = re.sub(ref._ellipsis.pattern, "……", text)
+        text = re.sub(ref._cjk_space.pattern, "", text)
+        return re.sub(ref._blank_lines.pattern, "\n\n", text).strip()
+
+
+def _throughput(func, texts, repeat: int) -> dict:
+    chars = sum(map(len, texts))
+    samples = []
+    output = None
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        output = func(texts)
+        samples.append(time.perf_counter() - begin)
+    best = min(samples)
+    return {"output": output, "stats": {"chars": chars, "best_ms": best * 1000,
+                                        "mean_ms": summarize(samples)["mean_ms"],
+                                        "mchars_per_s": chars / best / 1e6}}
+
+
+@benchmark("text_normalization")
+def bench_text_normalization(ctx: BenchContext):
+    """3000 条短文本与 150 篇长文章：逐篇对照写法、预编译规则逐篇调用、批量接口"""
+    repeat = max(3, min(ctx.iterations, 10))
+    normalizer = TextNormalizer()
+    naive = _NaiveNormalizer(normalizer)
+    results = {}
+    for name, texts in zip(("short", "long"), _corpus()):
+        runs = {
+            "naive": _throughput(lambda items: [naive.normalize(t) for t in items], texts, repeat),
+            "per_doc": _throughput(lambda items: [normalizer.normalize(t) for t in items], texts, repeat),
+            "batch": _throughput(normalizer.normalize_many, texts, repeat),
+        }
+        outputs = {key: run["output"] for key, run in runs.items()}
+        results[name] = {key: run["stats"] for key, run in runs.items()}
+        results[name]["identical_output"] = outputs["naive"] == outputs["per_doc"] == outputs["batch"]
+        results[name]["batch_speedup_vs_naive"] = (results[name]["naive"]["best_ms"]
+                                                   / max(results[name]["batch"]["best_ms"], 1e-9))
+
+    sample = normalizer.normalize("原标题：测试\n全角ＡＢＣ１２３\u3000空格\u200b零宽,标点!!!省略...\n\n\n\n点击关注，获取更多")
+    results["sample_ok"] = sample == "全角ABC123 空格零宽，标点！省略……"
+    return results
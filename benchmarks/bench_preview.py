@@ -0,0 +1,57 @@
+"""文章预览渲染基准：超长正文的转义/分页耗时、缓存命中耗时，以及界面线程 setHtml 的耗时"""
+import os
+import random
+
+from benchmarks.harness import BenchContext, benchmark, measure, summarize
+from src.core.preview_renderer import PreviewRenderer, render_pages
+
+
+def _article(paragraphs: int, seed: int = 3) -> str:
+    rng = random.Random(seed)
+    words = ["热点", "新闻", "<script>alert(1)</script>", "A&B", "数据显示", "记者", "\"引号\"", "发布"]
+    return "\n\n".join(
+        "".join(rng.choice(words) for _ in range(rng.randint(20, 80))) for _ in range(paragraphs)
+    )
+
+
+def _set_html_cost(html: str, iterations: int):
+    """QTextDocument.setHtml 的耗时（即原先在界面线程执行的部分）；没有 PyQt5 时返回 None"""
+    try:
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        from PyQt5.QtGui import QGuiApplication, QTextDocument
+    except ImportError:
+        return None
+    app = QGuiApplication.instance() or QGuiApplication([])  # noqa: F841  字体等资源需要应用对象
+    document = QTextDocument()
+    result = summarize(measure(lambda: document.setHtml(html), iterations))
+    return result
+
+
+@benchmark("preview_render")
+def bench_preview_render(ctx: BenchContext):
+    """1 万段（约 2MB）正文：整篇插入 HTML vs 转义分页后只显示一页"""
+    content = _article(10000)
+    url = "https://example.com/article/1"
+    iterations = max(3, ctx.iterations // 4)
+
+    renderer = PreviewRenderer()
+    render = summarize(measure(lambda: (renderer.clear(), renderer.render(url, "标题", content)), iterations))
+    pages = renderer.render(url, "标题", content)
+    cached = summarize(measure(lambda: renderer.cached(url), ctx.iterations))
+    rerender_same = summarize(measure(lambda: renderer.render(url, "标题", content), ctx.iterations))
+
+    # 原实现：整篇正文未转义直接拼进 HTML 交给界面线程
+    whole_html = f"<h2>标题</h2><hr><div>{content.replace(chr(10), '<br>')}</div>"
+    escaped_ok = "<script>" not in "".join(render_pages("<b>标题</b>", content[:2000]))
+
+    return {
+        "content_chars": len(content),
+        "pages": len(pages),
+        "max_page_chars": max(len(p) for p in pages),
+        "escaped": escaped_ok,
+        "render_worker_thread": render,
+        "cache_lookup": cached,
+        "render_cache_hit": rerender_same,
+        "gui_set_html_whole": _set_html_cost(whole_html, 3),
+        "gui_set_html_page": _set_html_cost(pages[0], ctx.iterations),
+    }
@@ -0,0 +1,36 @@
+"""多账号发布扇出基准"""
+import asyncio
+import time
+
+from benchmarks.harness import BenchContext, benchmark, summarize
+from src.core.publisher import Publisher
+
+
+@benchmark("publish_fanout")
+def bench_publish_fanout(ctx: BenchContext):
+    """同一篇文章并发发布到多个账号"""
+    publisher = Publisher()
+    publisher.base_url = ctx.url("/mp/agw/article/publish")
+    article = {"title": "基准测试文章", "content": "正文内容" * 200, "tags": ["测试"]}
+    tokens = [f"token-{i:03d}" for i in range(ctx.iterations)]
+
+    async def publish(token):
+        start = time.perf_counter()
+        await publisher.publish_toutiao(token, article)
+        return time.perf_counter() - start
+
+    async def run():
+        wall_start = time.perf_counter()
+        outcomes = await asyncio.gather(*(publish(t) for t in tokens), return_exceptions=True)
+        wall = time.perf_counter() - wall_start
+        samples = [o for o in outcomes if isinstance(o, float)]
+        result = summarize(samples)
+        result.update({
+            "accounts": len(tokens),
+            "errors": len(outcomes) - len(samples),
+            "wall_s": wall,
+            "throughput_per_s": len(tokens) / wall if wall > 0 else 0.0,
+        })
+        return result
+
+    return asyncio.run(run())
@@ -0,0 +1,65 @@
+"""跨平台热度排序基准"""
+import math
+import random
+import time
+
+from benchmarks.harness import BenchContext, benchmark, measure, summarize
+from src.core.hot_rank import HotBoard, normalize_hot_list, parse_heat, rank_cross_platform
+
+
+def _boards(platforms: int, size: int, seed: int = 7):
+    rng = random.Random(seed)
+    boards = {}
+    for p in range(platforms):
+        items = []
+        for i in range(size):
+            value = rng.lognormvariate(10 + p, 1.5)
+            if i % 3 == 0:
+                hot = f"{value / 1e4:.1f}万"
+            elif i % 3 == 1:
+                hot = f"{int(value):,}"
+            else:
+                hot = int(value)
+            items.append({"title": f"平台{p}话题{i}", "hot": hot, "url": f"https://example.com/{p}/{i}"})
+        boards[f"平台{p}"] = items
+    return boards
+
+
+def _rank_python(boards):
+    """逐条计算的对照实现"""
+    scored = []
+    for platform, items in boards.items():
+        values = [math.log1p(max(parse_heat(item["hot"]), 0.0)) for item in items]
+        mean = sum(values) / len(values)
+        std = math.sqrt(max(sum(v * v for v in values) / len(values) - mean * mean, 0.0)) or 1.0
+        scored.extend(((v - mean) / std, item) for v, item in zip(values, items))
+    scored.sort(key=lambda pair: pair[0], reverse=True)
+    return [item for _, item in scored]
+
+
+@benchmark("cross_platform_ranking")
+def bench_cross_platform_ranking(ctx: BenchContext):
+    """合并 5 个平台各 2000 条热榜并排序"""
+    boards = _boards(5, 2000)
+    entries = sum(len(v) for v in boards.values())
+
+    start = time.perf_counter()
+    for items in boards.values():
+        normalize_hot_list(items)
+    parse_ms = (time.perf_counter() - start) * 1000
+
+    board = HotBoard()
+    for platform, items in boards.items():
+        board.add(platform, items)
+
+    reorder = summarize(measure(board.order, ctx.iterations))
+    merge = summarize(measure(lambda: rank_cross_platform(boards), ctx.iterations))
+    python = summarize(measure(lambda: _rank_python(boards), ctx.iterations))
+    return {
+        "entries": entries,
+        "parse_ms": parse_ms,
+        "reorder": reorder,
+        "merge": merge,
+        "python": python,
+        "items_per_s": entries / (reorder["mean_ms"] / 1000) if reorder["mean_ms"] else 0.0,
+    }
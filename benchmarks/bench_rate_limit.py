@@ -0,0 +1,64 @@
+"""自适应限速基准：服务端按真实速率限流时的成功率与吞吐"""
+import asyncio
+import time
+
+from benchmarks.harness import BenchContext, benchmark
+from src.core.hot_api import HotAPI
+from src.core.rate_limiter import get_rate_limiter
+from src.utils.metrics import metrics
+
+
+@benchmark("adaptive_rate_limit")
+def bench_adaptive_rate_limit(ctx: BenchContext):
+    """并发请求一个配额为 20 次/秒的接口，对比关闭与开启限速"""
+    limiter = get_rate_limiter()
+    host = limiter.host_of(ctx.server.base_url)
+    previous = limiter.host_limits.get(host)
+    limiter.host_limits[host] = {"rate": 10.0, "burst": 5}
+    url = ctx.url("/api/limited/hotlist")
+    total = ctx.iterations * 5
+
+    async def run(max_attempts: int):
+        api = HotAPI()
+        semaphore = asyncio.Semaphore(ctx.concurrency)
+
+        async def one():
+            async with semaphore:
+                return await api._request(url, max_attempts=max_attempts)
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(one() for _ in range(total)))
+        wall = time.perf_counter() - start
+        ok = sum(1 for r in results if r)
+        return {
+            "requests": total,
+            "succeeded": ok,
+            "success_rate": ok / total,
+            "wall_s": wall,
+            "throughput_per_s": ok / wall if wall > 0 else 0.0,
+        }
+
+    def phase(enabled: bool, max_attempts: int):
+        limiter.enabled = enabled
+        limiter.reset()
+        metrics.reset()
+        ctx.server.hits.clear()
+        time.sleep(1.0)  # 等待服务端配额恢复
+        result = asyncio.run(run(max_attempts))
+        result["server_requests"] = ctx.server.hits.get("/api/limited/hotlist", 0)
+        result["throttled_429"] = metrics.get("http.throttled", host=host) or 0
+        result["final_rate"] = limiter.rates().get(host)
+        return result
+
+    try:
+        unlimited = phase(False, 1)
+        adaptive = phase(True, 3)
+    finally:
+        limiter.enabled = True
+        if previous is None:
+            limiter.host_limits.pop(host, None)
+        else:
+            limiter.host_limits[host] = previous
+        limiter.reset()
+
+    return {"unlimited": unlimited, "adaptive": adaptive}
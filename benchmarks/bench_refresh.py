@@ -0,0 +1,27 @@
+"""热榜刷新延迟基准"""
+import asyncio
+
+from benchmarks.harness import BenchContext, benchmark, measure_async
+from src.core.hot_api import HotAPI
+
+
+@benchmark("refresh_latency")
+def bench_refresh_latency(ctx: BenchContext):
+    """串行刷新头条热榜，并测量备用源原始请求延迟"""
+    api = HotAPI()
+    api.toutiao_hot_url = ctx.url("/hot-event/hot-board/")
+
+    async def run():
+        return {
+            "toutiao": await measure_async(api.get_toutiao_hot, ctx.iterations),
+            "vvhan": await measure_async(
+                lambda: api._request(ctx.url("/api/hotlist"), params={"type": "wbhot"}),
+                ctx.iterations
+            ),
+            "oioweb": await measure_async(
+                lambda: api._request(ctx.url("/api/common/HotList"), params={"type": "weibo"}),
+                ctx.iterations
+            ),
+        }
+
+    return asyncio.run(run())
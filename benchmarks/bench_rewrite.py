@@ -0,0 +1,23 @@
+"""AI 改写队列吞吐基准"""
+import asyncio
+
+from benchmarks.harness import BenchContext, benchmark, measure_async
+from src.core.ai_api import AIAPI
+
+SAMPLE_TEXT = "今天的热点新闻讲述了城市交通的新变化，" * 20
+
+
+@benchmark("rewrite_queue_throughput")
+def bench_rewrite_queue(ctx: BenchContext):
+    """以固定并发度消费改写任务队列"""
+    api = AIAPI()
+    api.api_base = ctx.url("/v1")
+
+    async def run():
+        return await measure_async(
+            lambda: api.process(SAMPLE_TEXT, "文章改写", style="新闻报道"),
+            ctx.iterations * 2,
+            ctx.concurrency
+        )
+
+    return asyncio.run(run())
@@ -0,0 +1,80 @@
+"""定时发布基准：一次性提交多个账号一天的排期，服务端到点发布后对账"""
+import time
+from datetime import datetime, timedelta
+from unittest import mock
+
+from benchmarks.harness import BenchContext, benchmark
+from src.core.article_fetcher import ArticleFetcher
+from src.core.async_runtime import run_sync
+from src.core.scheduler import FAILED, LIVE, MISSING, PublishScheduler
+from src.core.publisher import Publisher
+from src.core.session_manager import get_session_manager
+
+PUBLISH = "/mp/agw/article/publish"
+LIST = "/api/article/article_list"
+
+
+@benchmark("scheduled_publish")
+def bench_scheduled_publish(ctx: BenchContext):
+    """4 个账号各 12 篇、未来 12 小时内每小时一篇；10% 到点未上线。比较各阶段的请求数与对账结果"""
+    server = ctx.server
+    sessions = get_session_manager()
+    sessions.base_url = server.base_url
+    sessions.domain = server.server_address[0]
+    publisher = Publisher()
+    publisher.base_url = ctx.url(PUBLISH)
+    accounts = [{"name": f"sched-{i}", "token": f"sched-token-{i}"} for i in range(4)]
+
+    class StubFetcher(ArticleFetcher):
+        def __init__(self, account_data):
+            super().__init__(account_data)
+            self.base_url = server.base_url
+
+    start_at = datetime.now().replace(second=0, microsecond=0) + timedelta(hours=1)
+    times = [start_at + timedelta(hours=h) for h in range(12)]
+    server.config.schedule_drop_rate = 0.1
+    scheduler = PublishScheduler(publisher, path=None)
+    result = {}
+    try:
+        with mock.patch("src.core.article_fetcher.ArticleFetcher", StubFetcher):
+            hits = dict(server.hits)
+            begin = time.perf_counter()
+            for account in accounts:
+                articles = [{"title": f"{account['name']} 排期文章 {h}", "content": "正文" * 300,
+                             "category": "科技", "tags": ["测试"]} for h in range(12)]
+                run_sync(scheduler.submit(account["token"], articles, times, account["name"]))
+            result["submit"] = {
+                "articles": len(scheduler.entries),
+                "wall_ms": (time.perf_counter() - begin) * 1000,
+                "publish_requests": server.hits.get(PUBLISH, 0) - hits.get(PUBLISH, 0),
+                "next_check_in_minutes": (scheduler.next_check_at() - time.time()) / 60,
+            }
+
+            def reconcile(hours: float):
+                # 服务端时钟与对账时间同时前进
+                server.clock_shift = hours * 3600
+                before = server.hits.get(LIST, 0)
+                begin = time.perf_counter()
+                summary = run_sync(scheduler.reconcile(accounts, now=time.time() + hours * 3600))
+                summary.update({
+                    "list_requests": server.hits.get(LIST, 0) - before,
+                    "wall_ms": (time.perf_counter() - begin) * 1000,
+                    "status": scheduler.status(),
+                })
+                return summary
+
+            result["reconcile_before_due"] = reconcile(0)
+            result["reconcile_after_6h"] = reconcile(6.2)
+            result["reconcile_after_13h"] = reconcile(13)
+            result["reconcile_after_37h"] = reconcile(37)
+    finally:
+        server.config.schedule_drop_rate = 0.0
+        server.clock_shift = 0.0
+
+    dropped = sum(1 for e in server.scheduled.values()
+                  if e["dropped"] and e["user"].startswith("sched-token-"))
+    status = scheduler.status()
+    result["truth"] = {"dropped_by_server": dropped}
+    result["correct"] = status.get(LIVE, 0) == 48 - dropped and status.get(FAILED, 0) == dropped \
+        and not status.get(MISSING)
+    return result
@@ -0,0 +1,89 @@
+"""缓存文件格式基准：各编码与原先 indent=2 JSON 的文件大小和读写耗时"""
+import random
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.harness import BenchContext, benchmark, summarize
+from src.utils import serialization
+
+_WORDS = "热点 话题 发布 数据 显示 记者 获悉 相关 部门 表示 市场 用户 平台 技术 发展 影响 专家 认为".split()
+
+
+def _text(rng: random.Random, length: int) -> str:
+    parts = []
+    while sum(map(len, parts)) < length:
+        parts.append("".join(rng.choice(_WORDS) for _ in range(rng.randint(6, 18))) + "。")
+    return "".join(parts)
+
+
+def _datasets(seed: int = 3):
+    """与程序实际写入的文件结构相同的数据：热榜缓存、临时文章、账号快照"""
+    rng = random.Random(seed)
+    hot = {
+        "timestamp": int(time.time()),
+        "data": [
+            {"title": _text(rng, 20), "url": f"https://www.toutiao.com/article/{7300000000000000000 + i}/",
+             "hot": rng.randint(10000, 50000000), "rank": i + 1, "platform": "头条",
+             "score": rng.random(), "sources": ["vvhan", "toutiao"]}
+            for i in range(50)
+        ],
+    }
+    article = {
+        "title": _text(rng, 24),
+        "content": _text(rng, 5000),
+        "platform": "头条",
+        "original_url": "https://www.toutiao.com/article/7300000000000000001/",
+        "created_at": "2024-05-01T12:00:00",
+        "status": "raw",
+    }
+    accounts = [
+        {"name": f"账号{i}", "token": f"{rng.getrandbits(128):032x}", "username": f"user{i}",
+         "status": "有效", "cookies": {"sessionid": f"{rng.getrandbits(128):032x}",
+                                      "passport_csrf_token": f"{rng.getrandbits(64):016x}"},
+         "last_login": "2024-05-01 12:00:00"}
+        for i in range(200)
+    ]
+    return {"hot_cache": hot, "temp_article": article, "account_snapshot": accounts}
+
+
+def _run(directory: Path, name: str, data, codec: str, iterations: int):
+    path = directory / f"{name}.{codec}"
+    writes, reads = [], []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        serialization.write_file(path, data, codec)
+        writes.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        loaded = serialization.read_file(path)
+        reads.append(time.perf_counter() - start)
+    size = path.stat().st_size
+    return {
+        "bytes": size,
+        "roundtrip_ok": loaded == data,
+        "write": summarize(writes),
+        "read": summarize(reads),
+        "write_mb_s": size / summarize(writes)["mean_ms"] / 1000,
+        "read_mb_s": size / summarize(reads)["mean_ms"] / 1000,
+    }
+
+
+@benchmark("serialization")
+def bench_serialization(ctx: BenchContext):
+    """每种数据分别用 indent=2 JSON（原格式）和各可用编码写入、读取（含原子替换与 fsync）"""
+    directory = Path(tempfile.mkdtemp(prefix="serialization_"))
+    try:
+        results = {}
+        for name, data in _datasets().items():
+            per_codec = {codec: _run(directory, name, data, codec, ctx.iterations)
+                         for codec in ["json"] + [c for c in serialization.available_codecs() if c != "json"]}
+            baseline = per_codec["json"]
+            for stats in per_codec.values():
+                stats["size_vs_json"] = stats["bytes"] / baseline["bytes"]
+                stats["read_speedup_vs_json"] = baseline["read"]["mean_ms"] / stats["read"]["mean_ms"]
+            results[name] = per_codec
+        results["default_codec"] = serialization.default_codec()
+        return results
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
@@ -0,0 +1,59 @@
+"""会话复用基准：重复登录与文章列表加载"""
+import time
+
+import httpx
+
+from benchmarks.harness import BenchContext, benchmark, summarize
+from src.core.account_api import AccountAPI
+from src.core.article_fetcher import ArticleFetcher
+from src.core.async_runtime import run_sync
+from src.core.session_manager import get_session_manager
+
+
+@benchmark("session_reuse")
+def bench_session_reuse(ctx: BenchContext):
+    """首次登录后再次登录应直接复用会话；文章列表复用账号连接池，与每次新建客户端对比"""
+    sessions = get_session_manager()
+    sessions.base_url = ctx.server.base_url
+    sessions.domain = ctx.server.server_address[0]
+
+    api = AccountAPI()
+    api.base_url = ctx.server.base_url
+
+    start = time.perf_counter()
+    account = run_sync(api.login("bench", "secret"))
+    cold_login_ms = (time.perf_counter() - start) * 1000
+
+    warm_samples = []
+    for _ in range(ctx.iterations):
+        start = time.perf_counter()
+        run_sync(api.login("bench", "secret"))
+        warm_samples.append(time.perf_counter() - start)
+
+    fetcher = ArticleFetcher(account)
+    fetcher.base_url = ctx.server.base_url
+    pooled = []
+    for page in range(1, ctx.iterations + 1):
+        start = time.perf_counter()
+        run_sync(fetcher.fetch_articles(page))
+        pooled.append(time.perf_counter() - start)
+
+    async def fetch_with_new_client(page):
+        async with httpx.AsyncClient(headers=fetcher.headers, cookies=account.get("cookies")) as client:
+            response = await client.get(ctx.url("/api/article/article_list"),
+                                        params={"page": page, "page_size": 20})
+            return response.json()
+
+    fresh = []
+    for page in range(1, ctx.iterations + 1):
+        start = time.perf_counter()
+        run_sync(fetch_with_new_client(page))
+        fresh.append(time.perf_counter() - start)
+
+    return {
+        "cold_login_ms": cold_login_ms,
+        "warm_login": summarize(warm_samples),
+        "login_requests": ctx.server.hits.get("/api/login/v2", 0),
+        "article_list_pooled": summarize(pooled),
+        "article_list_new_client": summarize(fresh),
+    }
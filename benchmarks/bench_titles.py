@@ -0,0 +1,125 @@
+"""标题候选基准：本地打分模型的训练/打分耗时与排序质量，以及一次请求生成多个候选与逐个请求的对比"""
+import asyncio
+import math
+import random
+import time
+
+from benchmarks.harness import BenchContext, benchmark, summarize
+from src.core.ai_api import AIAPI
+from src.core.title_scorer import TitleScorer
+
+_SUBJECTS = "新能源汽车 高考志愿 房价 医保 人工智能 国产手机 高铁 退休金 中超 天气 芯片 外卖骑手 考研 旅游景区 短视频".split()
+_VERBS = "迎来 宣布 出现 公布 曝光 回应 调整 突破 引发 刷新".split()
+_OBJECTS = "新变化 重大调整 最新数据 官方回应 新规 涨价潮 行业洗牌 关键转折 热议 新纪录".split()
+_HOOKS = {"揭秘": 0.6, "曝光": 0.5, "终于": 0.4, "刚刚": 0.7, "重磅": 0.5, "网友": 0.3}
+
+
+def _title(rng: random.Random) -> str:
+    parts = [rng.choice(_SUBJECTS), rng.choice(_VERBS), rng.choice(_OBJECTS)]
+    if rng.random() < 0.3:
+        parts.insert(0, rng.choice(list(_HOOKS)))
+    if rng.random() < 0.3:
+        parts.append(f"，{rng.randint(2, 10)}个细节")
+    if rng.random() < 0.2:
+        parts.append(rng.choice(["？", "！"]))
+    return "".join(parts)
+
+
+def _expected(title: str) -> float:
+    """模拟的期望 log 阅读量：钩子词、数字、问句和主题影响点击，过长扣分"""
+    score = 7.0 + sum(w for hook, w in _HOOKS.items() if hook in title)
+    score += 0.5 if any(ch.isdigit() for ch in title) else 0.0
+    score += 0.3 if "？" in title else 0.0
+    score += 0.4 if title.startswith(("人工智能", "房价", "高考")) else 0.0
+    score -= 0.04 * max(0, len(title) - 20)
+    return score
+
+
+def _reads(title: str, rng: random.Random) -> float:
+    """实际阅读量在期望上有较大的随机波动"""
+    return math.expm1(_expected(title) + rng.gauss(0, 0.6))
+
+
+def _spearman(a, b) -> float:
+    import numpy as np
+
+    ra = np.argsort(np.argsort(a))
+    rb = np.argsort(np.argsort(b))
+    return float(np.corrcoef(ra, rb)[0, 1])
+
+
+@benchmark("title_scorer")
+def bench_title_scorer(ctx: BenchContext):
+    """5000 篇历史文章训练，1000 篇留出集上的排序相关性，以及 5 选 1 时选中最佳标题的比例"""
+    rng = random.Random(17)
+    titles = [_title(rng) for _ in range(6000)]
+    reads = [_reads(t, rng) for t in titles]
+
+    start = time.perf_counter()
+    scorer = TitleScorer().fit(titles[:5000], reads[:5000])
+    fit_seconds = time.perf_counter() - start
+
+    held_titles, held_reads = titles[5000:], reads[5000:]
+    predicted = scorer.score(held_titles)
+
+    # 同一篇文章的 5 个候选：比较模型选出的与真实期望阅读量最高的是否一致
+    hits = 0
+    groups = 200
+    for _ in range(groups):
+        candidates = [_title(rng) for _ in range(5)]
+        best = max(range(5), key=lambda i: _expected(candidates[i]))
+        hits += scorer.rank(candidates)[0][0] == candidates[best]
+
+    batch = [_title(rng) for _ in range(10000)]
+    score_samples = []
+    for _ in range(max(3, ctx.iterations // 5)):
+        start = time.perf_counter()
+        scorer.score(batch)
+        score_samples.append(time.perf_counter() - start)
+    rank_samples = []
+    for _ in range(ctx.iterations):
+        candidates = [_title(rng) for _ in range(5)]
+        start = time.perf_counter()
+        scorer.rank(candidates)
+        rank_samples.append(time.perf_counter() - start)
+    return {
+        "train_titles": 5000,
+        "fit_seconds": fit_seconds,
+        "heldout_spearman": _spearman(predicted, held_reads),
+        "pick_best_of_5": hits / groups,
+        "pick_best_of_5_random": 0.2,
+        "score_10k_titles": summarize(score_samples),
+        "rank_5_candidates": summarize(rank_samples),
+    }
+
+
+@benchmark("title_candidates")
+def bench_title_candidates(ctx: BenchContext):
+    """生成 5 个候选标题：一次请求返回列表并本地排序 vs 逐个请求 5 次"""
+    api = AIAPI()
+    api.api_base = ctx.url("/v1")
+    text = "今天的热点新闻讲述了城市交通的新变化，地铁新线开通后通勤时间明显缩短。" * 10
+    count = 5
+    route = "/v1/chat/completions"
+
+    async def one_call():
+        return await api.generate_titles(text, count)
+
+    async def sequential():
+        return [await api.process(text, "标题优化", keep_keywords=False) for _ in range(count)]
+
+    rows = {}
+    for name, factory in (("single_request_ranked", one_call), ("sequential_requests", sequential)):
+        samples = []
+        before = ctx.server.hits.get(route, 0)
+        for _ in range(max(3, ctx.iterations // 4)):
+            start = time.perf_counter()
+            result = asyncio.run(factory())
+            samples.append(time.perf_counter() - start)
+        runs = len(samples)
+        rows[name] = {
+            "requests_per_run": (ctx.server.hits.get(route, 0) - before) / runs,
+            "titles": len(result),
+            "latency": summarize(samples),
+        }
+    return rows
@@ -0,0 +1,39 @@
+"""批量 Token 校验基准"""
+import asyncio
+import time
+
+from benchmarks.harness import BenchContext, benchmark
+from src.core.publisher import Publisher
+from src.core.token_validator import TokenValidator
+
+
+@benchmark("token_validation")
+def bench_token_validation(ctx: BenchContext):
+    """并发校验一批账号，再测量发布前的本地失效判断开销"""
+    accounts = [
+        {"name": f"账号{i}", "token": f"{'invalid' if i % 5 == 0 else 'token'}-{i:04d}"}
+        for i in range(ctx.iterations * 5)
+    ]
+    validator = TokenValidator(concurrency=ctx.concurrency)
+    validator.base_url = ctx.server.base_url
+
+    start = time.perf_counter()
+    results = asyncio.run(validator.validate_all(accounts, force=True))
+    wall = time.perf_counter() - start
+
+    publisher = Publisher()
+    tokens = [a["token"] for a in accounts]
+    check_start = time.perf_counter()
+    skipped = sum(1 for t in tokens if publisher.token_validator.is_known_invalid(t))
+    check_wall = time.perf_counter() - check_start
+
+    return {
+        "accounts": len(accounts),
+        "concurrency": ctx.concurrency,
+        "valid": sum(1 for r in results.values() if r.get("valid") is True),
+        "invalid": sum(1 for r in results.values() if r.get("valid") is False),
+        "wall_s": wall,
+        "throughput_per_s": len(accounts) / wall if wall > 0 else 0.0,
+        "skip_check_us_per_account": check_wall / len(tokens) * 1e6,
+        "skipped": skipped,
+    }
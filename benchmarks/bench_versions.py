@@ -0,0 +1,83 @@
+"""文章版本库基准：反复改写时的存储增长与任意版本的还原耗时"""
+import random
+import shutil
+import tempfile
+import time
+import zlib
+
+from benchmarks.harness import BenchContext, benchmark, measure, summarize
+from src.core.article_versions import PUBLISHED, RAW, REWRITTEN, VersionStore
+
+_WORDS = "热点 话题 发布 数据 显示 记者 获悉 相关 部门 表示 市场 用户 平台 技术 发展 影响 专家 认为".split()
+
+
+def _sentence(rng: random.Random) -> str:
+    return "".join(rng.choice(_WORDS) for _ in range(rng.randint(6, 18))) + rng.choice("。。。！？")
+
+
+def _revisions(count: int, sentences: int = 150, churn: float = 0.05, seed: int = 5):
+    """生成一篇约 5000 字的文章及其 count 次改写，每次改写约 churn 比例的句子，偶尔增删句子"""
+    rng = random.Random(seed)
+    parts = [_sentence(rng) for _ in range(sentences)]
+    texts = ["".join(parts)]
+    for _ in range(count - 1):
+        for _ in range(max(1, int(len(parts) * churn))):
+            parts[rng.randrange(len(parts))] = _sentence(rng)
+        if rng.random() < 0.3:
+            parts.insert(rng.randrange(len(parts)), _sentence(rng))
+        if rng.random() < 0.2 and len(parts) > 10:
+            parts.pop(rng.randrange(len(parts)))
+        texts.append("".join(parts))
+    return texts
+
+
+@benchmark("article_versions")
+def bench_article_versions(ctx: BenchContext):
+    """200 个版本（原文 + 改写 + 发布稿）：存储大小对比全文副本，及冷/热缓存下还原随机版本的耗时"""
+    texts = _revisions(200)
+    kinds = [RAW] + [REWRITTEN] * (len(texts) - 2) + [PUBLISHED]
+    root = tempfile.mkdtemp(prefix="versions_")
+    try:
+        store = VersionStore(root)
+        start = time.perf_counter()
+        for text, kind in zip(texts, kinds):
+            store.add("article", text, kind)
+        add_total = time.perf_counter() - start
+
+        # 新实例（冷缓存）还原全部版本，校验内容
+        cold = VersionStore(root)
+        mismatches = sum(cold.get("article", rev) != text for rev, text in enumerate(texts, start=1))
+
+        rng = random.Random(1)
+        revs = [rng.randint(1, len(texts)) for _ in range(ctx.iterations * 5)]
+        cold_samples = []
+        for rev in revs:
+            fresh = VersionStore(root)
+            start = time.perf_counter()
+            fresh.get("article", rev)
+            cold_samples.append(time.perf_counter() - start)
+
+        stats = store.stats("article")
+        full_copies = sum(len(t.encode("utf-8")) for t in texts)
+        zlib_copies = sum(len(zlib.compress(t.encode("utf-8"), 9)) for t in texts)
+        growth = []
+        for n in (10, 50, 100, 200):
+            subset = store.history("article")[:n]
+            growth.append({"versions": n, "stored_bytes": sum(v["length"] for v in subset),
+                           "full_bytes": sum(v["size"] for v in subset)})
+        return {
+            "versions": stats["versions"],
+            "keyframes": stats["keyframes"],
+            "mismatches": mismatches,
+            "stored_bytes": stats["stored_bytes"],
+            "full_copy_bytes": full_copies,
+            "zlib_copy_bytes": zlib_copies,
+            "ratio_vs_full": stats["stored_bytes"] / full_copies,
+            "ratio_vs_zlib": stats["stored_bytes"] / zlib_copies,
+            "growth": growth,
+            "add_per_version_ms": add_total / len(texts) * 1000,
+            "get_cold": summarize(cold_samples),
+            "get_latest_warm": summarize(measure(lambda: store.get("article"), ctx.iterations)),
+        }
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
@@ -0,0 +1,104 @@
+"""关注词匹配基准：1 万个关注词下的匹配开销与通知延迟"""
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.harness import BenchContext, benchmark, measure, summarize
+from src.core.watchlist import Watchlist
+
+_CJK = "人工智能汽车新能源手机芯片发布会股市房价教育医疗旅游足球篮球电影音乐明星天气地震高考考研就业直播游戏航天火箭"
+_ASCII = "abcdefghijklmnopqrstuvwxyz"
+
+
+def _rules(term_count: int, seed: int = 7):
+    """生成约 term_count 个关键词：每条规则 5 个关键词，部分规则带排除词和正则"""
+    rng = random.Random(seed)
+    rules = []
+    terms = 0
+    while terms < term_count:
+        index = len(rules)
+        keywords = []
+        for _ in range(5):
+            if rng.random() < 0.7:
+                keywords.append("".join(rng.choice(_CJK) for _ in range(rng.randint(2, 4))))
+            else:
+                keywords.append("".join(rng.choice(_ASCII) for _ in range(rng.randint(4, 8))))
+        rule = {"name": f"规则{index}", "keywords": keywords}
+        if index % 10 == 0:
+            rule["exclude"] = ["广告"]
+        if index % 100 == 0:
+            rule["patterns"] = [rf"v{index}\.\d+"]
+        rules.append(rule)
+        terms += len(keywords)
+    return rules
+
+
+def _titles(count: int, seed: int = 13):
+    rng = random.Random(seed)
+    return [
+        {"title": "".join(rng.choice(_CJK) for _ in range(rng.randint(12, 30))) + rng.choice(["", " GPT", " v100.2"]),
+         "url": f"https://example.com/{i}"}
+        for i in range(count)
+    ]
+
+
+def _naive_match(rules, text: str):
+    """逐条规则、逐个关键词做子串查找的对照实现"""
+    import re
+
+    text = text.lower()
+    matched = []
+    for rule in rules:
+        if any(word.lower() in text for word in rule.get("exclude", [])):
+            continue
+        if (any(word.lower() in text for word in rule["keywords"])
+                or any(re.search(p, text, re.IGNORECASE) for p in rule.get("patterns", []))):
+            matched.append(rule)
+    return matched
+
+
+@benchmark("watchlist_match")
+def bench_watchlist_match(ctx: BenchContext):
+    """1 万关注词：自动机构建耗时、每次快照（50 条）的匹配耗时，对照逐词查找；并测 webhook 送达延迟"""
+    rules = _rules(10000)
+    entries = _titles(50)
+
+    watchlist = Watchlist(config_file=Path(tempfile.gettempdir()) / "bench_watchlist.json")
+    build = summarize(measure(lambda: watchlist.set_rules(rules), max(3, ctx.iterations // 4)))
+
+    mismatches = sum(
+        [r["name"] for r in watchlist.match(e["title"])] != [r["name"] for r in _naive_match(rules, e["title"])]
+        for e in entries
+    )
+    automaton = summarize(measure(lambda: watchlist.match_entries(entries), ctx.iterations))
+    naive = summarize(measure(lambda: [_naive_match(rules, e["title"]) for e in entries], ctx.iterations))
+
+    # 新条目到达 -> 匹配 -> webhook 送达
+    watchlist.webhook_url = ctx.url("/webhook")
+    ctx.server.webhooks.clear()
+    latencies = []
+    for _ in range(ctx.iterations):
+        sent = len(ctx.server.webhooks)
+        start = time.monotonic()
+        watchlist.on_new_entries("头条", [dict(entry) for entry in entries])
+        deadline = start + 5.0
+        while len(ctx.server.webhooks) == sent and time.monotonic() < deadline:
+            time.sleep(0.001)
+        if len(ctx.server.webhooks) > sent:
+            latencies.append(ctx.server.webhooks[-1][0] - start)
+    hits = watchlist.match_entries(entries)
+
+    return {
+        "rules": len(rules),
+        "terms": sum(len(r["keywords"]) + len(r.get("exclude", [])) for r in rules),
+        "automaton_nodes": len(watchlist._automaton),
+        "mismatches": mismatches,
+        "hit_entries": len(hits),
+        "build": build,
+        "match_snapshot": automaton,
+        "naive_snapshot": naive,
+        "speedup": naive["mean_ms"] / automaton["mean_ms"] if automaton["mean_ms"] else 0.0,
+        "webhook_delivered": len(latencies),
+        "webhook_latency": summarize(latencies),
+    }
@@ -0,0 +1,182 @@
+"""基准测试框架：注册、计时、统计与结果输出"""
+import asyncio
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from benchmarks.stubs import StubServer
+
+# 已注册的基准: 名称 -> 函数(ctx) -> Dict
+BENCHMARKS: Dict[str, Callable[["BenchContext"], Dict]] = {}
+
+
+def benchmark(name: str):
+    """注册基准测试函数"""
+    def decorator(func):
+        BENCHMARKS[name] = func
+        return func
+    return decorator
+
+
+class BenchContext:
+    """传给每个基准函数的运行上下文"""
+
+    def __init__(self, server: StubServer, iterations: int = 20, concurrency: int = 8):
+        self.server = server
+        self.iterations = iterations
+        self.concurrency = concurrency
+
+    def url(self, path: str) -> str:
+        return self.server.url(path)
+
+
+def summarize(samples: List[float]) -> Dict:
+    """将耗时样本（秒）汇总为毫秒统计"""
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def pct(p: float) -> float:
+        index = min(len(ordered) - 1, max(0, int(round(p * (len(ordered) - 1)))))
+        return ordered[index] * 1000
+
+    return {
+        "count": len(ordered),
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "min_ms": ordered[0] * 1000,
+        "p50_ms": pct(0.50),
+        "p90_ms": pct(0.90),
+        "p99_ms": pct(0.99),
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+def measure(func: Callable[[], object], iterations: int) -> List[float]:
+    """串行执行 func 并记录每次耗时"""
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def measure_async(factory: Callable[[], Awaitable], iterations: int,
+                        concurrency: int = 1) -> Dict:
+    """以给定并发度执行协程，返回延迟统计与吞吐"""
+    semaphore = asyncio.Semaphore(concurrency)
+    samples: List[float] = []
+    errors = 0
+
+    async def one():
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await factory()
+            except Exception:
+                errors += 1
+            samples.append(time.perf_counter() - start)
+
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(iterations)))
+    wall = time.perf_counter() - wall_start
+
+    result = summarize(samples)
+    result.update({
+        "concurrency": concurrency,
+        "errors": errors,
+        "wall_s": wall,
+        "throughput_per_s": iterations / wall if wall > 0 else 0.0,
+    })
+    return result
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).resolve().parent, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+def build_report(results: Dict[str, Dict], options: Dict) -> Dict:
+    """组装可比较的 JSON 报告"""
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "git": _git_revision(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "options": options,
+        },
+        "results": results,
+    }
+
+
+def write_report(report: Dict, output: Path) -> Path:
+    """写出报告；output 为目录时按时间戳命名"""
+    if output.suffix != ".json":
+        output.mkdir(parents=True, exist_ok=True)
+        output = output / f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    else:
+        output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    return output
+
+
+# 对比时关注的指标及其方向（True 表示越大越好）
+COMPARE_KEYS = {
+    "mean_ms": False,
+    "p50_ms": False,
+    "p90_ms": False,
+    "p99_ms": False,
+    "throughput_per_s": True,
+    "items_per_s": True,
+    "chars_per_s": True,
+}
+
+
+def _flatten(results: Dict, prefix: str = "") -> Dict[str, Dict]:
+    """将嵌套的子基准展开为 "父/子" 形式的扁平字典"""
+    flat = {}
+    for name, value in results.items():
+        if not isinstance(value, dict):
+            continue
+        key = f"{prefix}{name}"
+        if any(metric in value for metric in COMPARE_KEYS):
+            flat[key] = value
+        flat.update(_flatten(value, f"{key}/"))
+    return flat
+
+
+def compare_reports(baseline: Dict, current: Dict) -> List[Dict]:
+    """逐项对比两份报告，返回变化百分比（正数表示变好）"""
+    rows = []
+    base_results = _flatten(baseline.get("results", {}))
+    for name, result in _flatten(current.get("results", {})).items():
+        base = base_results.get(name)
+        if not base:
+            continue
+        for key, higher_is_better in COMPARE_KEYS.items():
+            old, new = base.get(key), result.get(key)
+            if not isinstance(old, (int, float)) or not isinstance(new, (int, float)) or old == 0:
+                continue
+            change = (new - old) / old * 100
+            rows.append({
+                "benchmark": name,
+                "metric": key,
+                "baseline": old,
+                "current": new,
+                "improvement_pct": change if higher_is_better else -change,
+            })
+    return rows
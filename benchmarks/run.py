@@ -0,0 +1,147 @@
+"""基准测试入口
+
+用法:
+    python -m benchmarks.run                      # 运行全部基准
+    python -m benchmarks.run -k refresh -n 50     # 只运行名称包含 refresh 的基准
+    python -m benchmarks.run --latency-ms 80 --error-rate 0.05
+    python -m benchmarks.run compare a.json b.json
+"""
+import argparse
+import importlib
+import json
+import os
+import sys
+import tempfile
+import time
+import traceback
+from pathlib import Path
+
+from loguru import logger
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from benchmarks.harness import (BENCHMARKS, BenchContext, build_report,  # noqa: E402
+                                compare_reports, write_report)
+from benchmarks.stubs import StubConfig, StubServer  # noqa: E402
+from src.core.rate_limiter import get_rate_limiter  # noqa: E402
+
+UNTHROTTLED = {"rate": 10000.0, "burst": 10000, "max_rate": 10000.0}
+
+
+def load_benchmarks():
+    """导入 benchmarks/bench_*.py 以完成注册"""
+    for path in sorted(Path(__file__).parent.glob("bench_*.py")):
+        module = f"benchmarks.{path.stem}"
+        try:
+            importlib.import_module(module)
+        except ImportError as e:
+            print(f"跳过 {module}: {e}")
+
+
+def run(args) -> int:
+    logger.remove()
+    logger.add(sys.stderr, level=args.log_level)
+    load_benchmarks()
+    selected = {name: func for name, func in BENCHMARKS.items()
+                if not args.keyword or any(k in name for k in args.keyword)}
+    if not selected:
+        print("没有匹配的基准")
+        return 1
+
+    config = StubConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        seed=args.seed
+    )
+    output = Path(args.output).resolve()
+
+    # 在临时目录中运行，避免污染 data/ 下的缓存与账号文件
+    workdir = Path(args.workdir or tempfile.mkdtemp(prefix="toutiao_bench_"))
+    workdir.mkdir(parents=True, exist_ok=True)
+    previous_cwd = os.getcwd()
+    os.chdir(workdir)
+
+    results = {}
+    try:
+        with StubServer(config) as server:
+            # 其他基准测量的是客户端本身，放开桩服务的限速；adaptive_rate_limit 会临时覆盖
+            limiter = get_rate_limiter()
+            limiter.host_limits[limiter.host_of(server.base_url)] = UNTHROTTLED
+            ctx = BenchContext(server, iterations=args.iterations, concurrency=args.concurrency)
+            for name, func in selected.items():
+                print(f"运行 {name} ...", flush=True)
+                start = time.perf_counter()
+                try:
+                    results[name] = func(ctx)
+                except Exception as e:
+                    results[name] = {"error": str(e)}
+                    if args.verbose:
+                        traceback.print_exc()
+                print(f"  完成，用时 {time.perf_counter() - start:.2f}s", flush=True)
+            stub_hits = dict(server.hits)
+    finally:
+        os.chdir(previous_cwd)
+
+    options = {
+        "iterations": args.iterations,
+        "concurrency": args.concurrency,
+        "stub": config.to_dict(),
+        "stub_hits": stub_hits,
+        "workdir": str(workdir),
+    }
+    path = write_report(build_report(results, options), output)
+    print(f"结果已写入 {path}")
+    return 0
+
+
+def compare(args) -> int:
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.current, "r", encoding="utf-8") as f:
+        current = json.load(f)
+
+    rows = compare_reports(baseline, current)
+    if not rows:
+        print("两份报告没有可比较的指标")
+        return 1
+    for row in rows:
+        print(f"{row['benchmark']:<40} {row['metric']:<18} "
+              f"{row['baseline']:>12.2f} -> {row['current']:>12.2f}  "
+              f"{row['improvement_pct']:+.1f}%")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="头条助手基准测试")
+    sub = parser.add_subparsers(dest="command")
+
+    cmp_parser = sub.add_parser("compare", help="对比两份基准报告")
+    cmp_parser.add_argument("baseline")
+    cmp_parser.add_argument("current")
+
+    parser.add_argument("-k", "--keyword", action="append", help="按名称筛选基准，可重复")
+    parser.add_argument("-n", "--iterations", type=int, default=20)
+    parser.add_argument("-c", "--concurrency", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="桩服务固定延迟")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="桩服务随机抖动上限")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="返回 500 的概率")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="返回 429 的概率")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("-o", "--output", default=str(ROOT_DIR / "benchmarks" / "results"),
+                        help="结果目录或 .json 文件路径")
+    parser.add_argument("--workdir", help="运行目录（默认临时目录）")
+    parser.add_argument("--log-level", default="WARNING", help="基准运行期间的日志级别")
+    parser.add_argument("-v", "--verbose", action="store_true")
+
+    args = parser.parse_args(argv)
+    if args.command == "compare":
+        return compare(args)
+    return run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
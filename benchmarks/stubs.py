@@ -0,0 +1,654 @@
+"""本地桩服务：模拟头条热榜、vvhan/oioweb、Moonshot、头条号后台等上游接口"""
+import hashlib
+import io
+import json
+import random
+import re
+import threading
+import time
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+
+class StubConfig:
+    """桩服务配置：延迟与错误注入"""
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0,
+                 error_rate: float = 0.0, throttle_rate: float = 0.0,
+                 seed: int = 42, route_latency_ms: Dict[str, float] = None,
+                 chat_drop_rate: float = 0.0, chat_batch_miss_rate: float = 0.0,
+                 schedule_drop_rate: float = 0.0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate          # 返回 500 的概率
+        self.throttle_rate = throttle_rate    # 返回 429 + Retry-After 的概率
+        self.seed = seed
+        self.route_latency_ms = route_latency_ms or {}
+        self.chat_drop_rate = chat_drop_rate  # 改写接口每千字漏掉结尾内容的概率（模拟长文被压缩、遗漏关键词）
+        self.chat_batch_miss_rate = chat_batch_miss_rate  # 合批请求中单个任务结果缺失的概率
+        self.schedule_drop_rate = schedule_drop_rate  # 定时发布的文章到点后未上线（如审核不通过）的概率
+
+    def to_dict(self) -> Dict:
+        return {
+            "latency_ms": self.latency_ms,
+            "jitter_ms": self.jitter_ms,
+            "error_rate": self.error_rate,
+            "throttle_rate": self.throttle_rate,
+            "seed": self.seed,
+            "route_latency_ms": self.route_latency_ms,
+            "chat_drop_rate": self.chat_drop_rate,
+            "chat_batch_miss_rate": self.chat_batch_miss_rate,
+            "schedule_drop_rate": self.schedule_drop_rate,
+        }
+
+
+# 路由处理函数: (handler, query, body) -> (status, content_type, payload[, headers])
+Route = Callable[["StubHandler", Dict, bytes], Tuple[int, str, object]]
+
+
+def _hot_titles(count: int, prefix: str):
+    return [f"{prefix}热点话题{i:03d}" for i in range(1, count + 1)]
+
+
+def toutiao_hot_board(handler, query, body):
+    """头条热榜 /hot-event/hot-board/"""
+    items = []
+    for i, title in enumerate(_hot_titles(50, "头条")):
+        items.append({
+            "Title": title,
+            "Url": f"{handler.server.base_url}/article/{i + 1}",
+            "HotValue": str(10000000 - i * 137531),
+            "Label": "hot" if i % 5 == 0 else "",
+            "ClusterIdStr": str(7000000000000000000 + i),
+        })
+    return 200, "application/json", {"data": items, "status": "success"}
+
+
+def vvhan_hot_list(handler, query, body):
+    """vvhan 热榜 /api/hotlist?type=wbhot|zhihuHot|bili"""
+    prefix = {"zhihuHot": "知乎", "bili": "B站"}.get(query.get("type", ["wbhot"])[0], "微博")
+    items = []
+    for i, title in enumerate(_hot_titles(50, prefix)):
+        items.append({
+            "index": i + 1,
+            "title": title,
+            "desc": "",
+            "hot": f"{round(500 - i * 7.3, 1)}万",
+            "url": f"{handler.server.base_url}/article/{i + 1}",
+            "mobilUrl": f"{handler.server.base_url}/article/{i + 1}",
+        })
+    return 200, "application/json", {
+        "success": True,
+        "title": prefix,
+        "subtitle": "热榜",
+        "update_time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "data": items,
+    }
+
+
+def oioweb_hot_list(handler, query, body):
+    """oioweb 热榜 /api/common/HotList?type=weibo|zhihu|bilibili"""
+    prefix = {"zhihu": "知乎", "bilibili": "B站"}.get(query.get("type", ["weibo"])[0], "微博")
+    items = []
+    for i, title in enumerate(_hot_titles(50, prefix)):
+        items.append({
+            "index": i + 1,
+            "title": title,
+            "href": f"{handler.server.base_url}/article/{i + 1}",
+            "hot": str(5000000 - i * 73000),
+        })
+    return 200, "application/json", {"code": 200, "result": items, "msg": "success"}
+
+
+def zhihu_hot_list(handler, query, body):
+    """知乎热榜 /api/v3/feed/topstory/hot-lists/total"""
+    limit = int(query.get("limit", ["50"])[0])
+    items = []
+    for i, title in enumerate(_hot_titles(limit, "知乎")):
+        question_id = 600000000 + i
+        items.append({
+            "type": "hot_list_feed",
+            "style_type": "1",
+            "id": f"0_{1700000000 + i}",
+            "card_id": f"Q_{question_id}",
+            "target": {
+                "id": question_id,
+                "title": title,
+                "url": f"https://api.zhihu.com/questions/{question_id}",
+                "type": "question",
+                "created": 1700000000 + i,
+                "answer_count": 100 + i,
+                "follower_count": 1000 + i,
+                "excerpt": "这是一段问题摘要，" * 5,
+            },
+            "detail_text": f"{1500 - i * 23} 万热度",
+            "trend": 0,
+            "debut": False,
+        })
+    return 200, "application/json", {"data": items, "paging": {"is_end": True}, "fresh_text": "热榜已更新"}
+
+
+def bilibili_popular(handler, query, body):
+    """B站热门 /x/web-interface/popular"""
+    size = int(query.get("ps", ["50"])[0])
+    videos = []
+    for i, title in enumerate(_hot_titles(size, "B站")):
+        bvid = f"BV1stub{i:05d}"
+        videos.append({
+            "aid": 1000000 + i,
+            "bvid": bvid,
+            "title": title,
+            "tname": "知识" if i % 2 else "生活",
+            "pic": f"{handler.server.base_url}/static/{bvid}.jpg",
+            "desc": "视频简介" * 10,
+            "owner": {"mid": 10000 + i, "name": f"UP主{i}", "face": ""},
+            "stat": {"view": 3000000 - i * 41000, "danmaku": 5000 - i, "reply": 800, "favorite": 20000,
+                     "coin": 10000, "share": 900, "like": 150000 - i * 999},
+            "short_link_v2": f"https://b23.tv/{bvid}",
+            "rcmd_reason": {"content": "百万播放", "corner_mark": 0},
+        })
+    return 200, "application/json", {"code": 0, "message": "0", "ttl": 1,
+                                      "data": {"list": videos, "no_more": False}}
+
+
+def _batch_reply(handler, user: str) -> str:
+    """合批请求：按编号返回 JSON 对象，按配置的概率漏掉部分编号"""
+    results = {}
+    for index, original in re.findall(r"任务 (\d+)：[^\n]*\n原文：(.*?)(?=\n\n任务 \d+：|\Z)", user, re.S):
+        if handler.server.roll() >= handler.server.config.chat_batch_miss_rate:
+            results[index] = f"结果：{original[:20]}"
+    return json.dumps(results, ensure_ascii=False)
+
+
+def _chat_reply(handler, messages) -> str:
+    user = messages[-1]["content"] if messages else ""
+    if messages and "键为任务编号" in messages[0]["content"]:
+        return _batch_reply(handler, user)
+    original = user.split("原文：", 1)[-1]
+    drop_rate = handler.server.config.chat_drop_rate
+    system = messages[0]["content"] if messages else ""
+    # 要求输出候选标题数组时，按原文开头生成若干变体
+    wanted = re.search(r"包含 (\d+) 个互不相同的候选标题", system)
+    if wanted:
+        head = original.strip()[:16]
+        suffixes = ["", "！", "？", "，真相来了", "：3个细节", "《深度》", "，网友热议", "最新进展"]
+        count = int(wanted.group(1))
+        return json.dumps([f"{head}{suffixes[i % len(suffixes)]}{i // len(suffixes) or ''}"
+                           for i in range(count)], ensure_ascii=False)
+    # 原文越长越可能漏掉结尾约三成的句子；提示中指出了遗漏的关键词时按原文返回
+    if drop_rate and "遗漏" not in system and handler.server.roll() < drop_rate * len(original) / 1000:
+        sentences = [s for s in re.findall(r"[^。！？\n]*[。！？\n]?", original) if s]
+        original = "".join(sentences[:int(len(sentences) * 0.7)])
+    return f"改写：{original}"
+
+
+def chat_completions(handler, query, body):
+    """Moonshot /v1/chat/completions，支持 stream=true 的 SSE 输出"""
+    try:
+        request = json.loads(body or b"{}")
+    except json.JSONDecodeError:
+        return 400, "application/json", {"error": {"message": "invalid json"}}
+
+    content = _chat_reply(handler, request.get("messages", []))
+    created = int(time.time())
+    model = request.get("model", "moonshot-v1-auto")
+
+    if request.get("stream"):
+        events = []
+        for start in range(0, len(content), 8):
+            chunk = {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": content[start:start + 8]},
+                             "finish_reason": None}],
+            }
+            events.append(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n")
+        events.append("data: [DONE]\n\n")
+        return 200, "text/event-stream", events
+
+    return 200, "application/json", {
+        "id": "chatcmpl-stub",
+        "object": "chat.completion",
+        "created": created,
+        "model": model,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                     "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": len(body or b""), "completion_tokens": len(content),
+                  "total_tokens": len(body or b"") + len(content)},
+    }
+
+
+def _sso_user(handler) -> str:
+    match = re.search(r"toutiao_sso_user=([^;]+)", handler.headers.get("Cookie", ""))
+    return match.group(1) if match else ""
+
+
+def article_list(handler, query, body):
+    """头条号后台 /api/article/article_list，已到定时时间的文章排在最前（新的在前）"""
+    page = int(query.get("page", ["1"])[0])
+    page_size = int(query.get("page_size", ["20"])[0])
+    live = handler.server.live_scheduled(_sso_user(handler))
+    total = 500 + len(live)
+    start = (page - 1) * page_size
+    articles = [{
+        "article_id": entry["article_id"],
+        "title": entry["title"],
+        "publish_time": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(entry["timer"])),
+        "read_count": 0,
+        "article_url": f"{handler.server.base_url}/article/{entry['article_id']}",
+    } for entry in live[start:start + page_size]]
+    for i in range(max(start - len(live), 0), min(start + page_size - len(live), 500)):
+        articles.append({
+            "article_id": str(7100000000000000000 + i),
+            "title": f"历史文章{i:04d}",
+            "publish_time": time.strftime("%Y-%m-%d %H:%M:%S",
+                                          time.localtime(1700000000 + i * 3600)),
+            "read_count": (i * 7919) % 100000,
+            "article_url": f"{handler.server.base_url}/article/{i + 1}",
+        })
+    return 200, "application/json", {
+        "message": "success",
+        "data": {"articles": articles, "total": total, "has_more": start + page_size < total},
+    }
+
+
+def article_publish(handler, query, body):
+    """头条号后台 /mp/agw/article/publish 与 /mp/agw/article/update"""
+    request = json.loads(body or b"{}")
+    article_id = request.get("article_id") or str(7200000000000000000 + handler.server.next_id())
+    if request.get("timer_status") == 1:
+        timer = time.mktime(time.strptime(request["timer_time"], "%Y-%m-%d %H:%M"))
+        handler.server.schedule(_sso_user(handler), article_id, request.get("title", ""), timer)
+    return 200, "application/json", {"message": "success", "data": {"article_id": article_id}}
+
+
+def media_info(handler, query, body):
+    """Token 校验探测 /mp/agw/media/get_media_info，以 invalid 开头的 Token 视为失效"""
+    cookie = handler.headers.get("Cookie", "")
+    token = handler.headers.get("X-CSRFToken", "")
+    if token.startswith("invalid") or "toutiao_sso_user=invalid" in cookie:
+        return 401, "application/json", {"message": "unauthorized"}
+    return 200, "application/json", {"message": "success", "data": {"media_id": 1, "name": "测试账号"}}
+
+
+def profile_index(handler, query, body):
+    """头条号后台首页 /profile_v4/index，下发（续期）会话 Cookie"""
+    cookie = f"sessionid=s{handler.server.next_id()}; Path=/; Max-Age=86400"
+    return 200, "text/html; charset=utf-8", "<html><body>profile</body></html>", {"Set-Cookie": cookie}
+
+
+def login(handler, query, body):
+    """账号密码登录 /api/login/v2，成功后通过 Set-Cookie 下发 tt_token"""
+    request = json.loads(body or b"{}")
+    username = request.get("username", "")
+    if not username or request.get("password") == "wrong":
+        return 200, "application/json", {"message": "error", "data": {}}
+    return 200, "application/json", {"message": "success", "data": {"name": f"账号{username}"}}, {
+        "Set-Cookie": f"tt_token=tk-{username}; Path=/; Max-Age=86400"
+    }
+
+
+def rate_limited_hot_list(handler, query, body):
+    """按真实请求速率限流的热榜 /api/limited/hotlist：超过服务端配额时返回 429"""
+    if not handler.server.take_quota():
+        return 429, "application/json", {"message": "too many requests"}, {"Retry-After": "1"}
+    return vvhan_hot_list(handler, query, body)
+
+
+def heavy_page(handler, query, body):
+    """带大量图片、字体和第三方脚本的文章页 /heavy/<id>，供页面加载配置基准使用"""
+    article_id = handler.path.rstrip("/").rsplit("/", 1)[-1].split("?", 1)[0]
+    port = handler.server.server_address[1]
+    third_party = f"http://localhost:{port}"  # 主机名不同，视为第三方
+    images = "".join(f'<img src="/static/{article_id}_{i}.jpg">' for i in range(12))
+    paragraphs = "".join(f"<p>第{i}段：用于页面加载基准的正文内容。</p>" for i in range(1, 41))
+    html = f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>重型页面{article_id}</title>
+<style>@font-face {{ font-family: Body; src: url("/static/body.woff2"); }} body {{ font-family: Body; }}</style>
+<script src="{third_party}/static/analytics.js"></script>
+</head>
+<body>
+<h1 class="article-title">重型页面{article_id}</h1>
+<article class="article-content">{paragraphs}{images}<video src="/static/clip.mp4" preload="auto"></video></article>
+</body></html>"""
+    return 200, "text/html; charset=utf-8", html
+
+
+_STATIC_TYPES = {
+    ".jpg": ("image/jpeg", 120 * 1024),
+    ".woff2": ("font/woff2", 60 * 1024),
+    ".mp4": ("video/mp4", 400 * 1024),
+    ".js": ("application/javascript", 80 * 1024),
+}
+
+
+def static_asset(handler, query, body):
+    """静态资源 /static/<name>：按扩展名返回固定大小的内容"""
+    name = handler.path.split("?", 1)[0]
+    for suffix, (content_type, size) in _STATIC_TYPES.items():
+        if name.endswith(suffix):
+            if suffix == ".js":
+                return 200, content_type, ("/*" + "x" * (size - 4) + "*/").encode("ascii")
+            return 200, content_type, bytes(size)
+    return 404, "application/json", {"message": "not found"}
+
+
+@lru_cache(maxsize=256)
+def _render_image(seed: int, width: int, height: int, ext: str, quality: int) -> bytes:
+    """按种子生成的图片：同一种子不同尺寸/质量得到看起来相同、字节不同的图"""
+    import numpy as np
+    from PIL import Image
+
+    rng = np.random.default_rng(seed)
+    fx, fy, phase = rng.uniform(1, 6, 3)
+    y, x = np.mgrid[0:height, 0:width]
+    u, v = x / max(width, 1), y / max(height, 1)
+    channels = [np.sin(u * fx * (k + 1) + v * fy + phase * k) * np.cos(v * fy * (k + 2) - u * fx) for k in range(3)]
+    noise = rng.normal(0, 0.08, (height, width, 3))
+    pixels = ((np.stack(channels, axis=-1) + noise + 1.5) * 85).clip(0, 255).astype(np.uint8)
+    out = io.BytesIO()
+    if ext == "png":
+        Image.fromarray(pixels).save(out, "PNG")
+    else:
+        Image.fromarray(pixels).save(out, "JPEG", quality=quality)
+    return out.getvalue()
+
+
+def stub_image(handler, query, body):
+    """图片 /images/<种子>-<宽>x<高>.<jpg|png>?q=<质量>；/images/huge.jpg 为超过大小上限的图片"""
+    name = handler.path.split("?", 1)[0].rsplit("/", 1)[-1]
+    if name == "huge.jpg":
+        return 200, "image/jpeg", bytes(12 * 1024 * 1024)
+    match = re.fullmatch(r"(\d+)-(\d+)x(\d+)\.(jpg|png)", name)
+    if not match:
+        return 404, "application/json", {"message": "not found"}
+    seed, width, height, ext = int(match[1]), int(match[2]), int(match[3]), match[4]
+    quality = int(query.get("q", ["85"])[0])
+    return 200, f"image/{'png' if ext == 'png' else 'jpeg'}", _render_image(seed, width, height, ext, quality)
+
+
+def upload_picture(handler, query, body):
+    """头条号图片上传 /mp/agw/article_material/photo/upload_picture：记录上传内容的哈希"""
+    digest = hashlib.sha1(body).hexdigest()
+    with handler.server._lock:
+        handler.server.uploads.append(digest)
+    uri = f"tos-cn-i-stub/{digest[:16]}"
+    return 200, "application/json", {"state": "SUCCESS", "web_uri": uri,
+                                     "url": f"https://p3-stub.toutiaoimg.com/{uri}~tplv-obj.image"}
+
+
+def webhook(handler, query, body):
+    """通知 webhook /webhook：记录收到的请求体"""
+    payload = json.loads(body or b"{}")
+    with handler.server._lock:
+        handler.server.webhooks.append((time.monotonic(), payload))
+    return 200, "application/json", {"message": "success"}
+
+
+def article_page(handler, query, body):
+    """文章详情页 /article/<id>，供提取基准使用"""
+    article_id = handler.path.rstrip("/").rsplit("/", 1)[-1].split("?", 1)[0]
+    paragraphs = "".join(
+        f"<p>第{i}段：这是用于提取基准测试的正文内容，包含一些常见的中文标点，以及 ASCII text。</p>"
+        for i in range(1, 41)
+    )
+    html = f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>测试文章{article_id}</title></head>
+<body>
+<header>导航栏</header>
+<h1 class="article-title">测试文章{article_id}</h1>
+<article class="article-content">{paragraphs}<img src="/static/{article_id}.png"></article>
+<footer>版权所有</footer>
+</body></html>"""
+    return 200, "text/html; charset=utf-8", html
+
+
+_LONGFORM_SUBJECTS = ["新能源汽车", "人工智能", "房地产市场", "跨境电商", "半导体产业", "乡村旅游", "职业教育", "医疗保险"]
+_LONGFORM_PHRASES = ["多地出台支持政策", "业内人士认为", "市场反应积极", "相关企业加快布局", "数据显示同比增长",
+                     "专家建议理性看待", "消费者关注度持续上升", "产业链上下游协同发展", "监管部门表示将加强引导"]
+
+
+def longform_page(handler, query, body):
+    """长文章页 /longform/<id>：约 60KB，带导航、脚本和图片；id 为 5 的倍数的页面转载自前一篇（只改了少量字）"""
+    article_id = int(handler.path.rstrip("/").rsplit("/", 1)[-1].split("?", 1)[0] or 0)
+    source = article_id - 1 if article_id % 5 == 0 and article_id > 0 else article_id
+    rng = random.Random(source)
+    subject = _LONGFORM_SUBJECTS[source % len(_LONGFORM_SUBJECTS)]
+    # 每篇文章有自己的一组词，不同文章的内容差别明显
+    vocabulary = ["".join(chr(rng.randint(0x4e00, 0x9fa5)) for _ in range(rng.randint(2, 4))) for _ in range(40)]
+    paragraphs = []
+    for i in range(160):
+        words = "，".join(rng.choice(_LONGFORM_PHRASES) + "".join(rng.sample(vocabulary, 3)) for _ in range(4))
+        paragraphs.append(f"<p>{subject}第{i + 1}部分：{words}，{subject}相关话题引发讨论。</p>")
+    if source != article_id:
+        paragraphs[3] = f"<p>转载说明：本文转自第{source}篇。</p>"
+    images = "".join(f'<img data-src="/images/{source * 10 + i}-1600x1200.jpg" src="/static/placeholder.png">'
+                     for i in range(4))
+    html = f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{subject}观察 {article_id}</title>
+<script>{"var t = 1;" * 400}</script><style>{"p { margin: 0; }" * 200}</style></head>
+<body><nav>{"<a href='/'>首页</a>" * 40}</nav>
+<h1>{subject}观察 {article_id}</h1>
+<div class="article-content">{"".join(paragraphs)}{images}</div>
+<footer>{"版权所有 " * 50}</footer></body></html>"""
+    return 200, "text/html; charset=utf-8", html
+
+
+DEFAULT_ROUTES: Dict[Tuple[str, str], Route] = {
+    ("GET", "/hot-event/hot-board/"): toutiao_hot_board,
+    ("GET", "/api/hotlist"): vvhan_hot_list,
+    ("GET", "/api/common/HotList"): oioweb_hot_list,
+    ("GET", "/api/v3/feed/topstory/hot-lists/total"): zhihu_hot_list,
+    ("GET", "/x/web-interface/popular"): bilibili_popular,
+    ("POST", "/v1/chat/completions"): chat_completions,
+    ("GET", "/api/article/article_list"): article_list,
+    ("POST", "/mp/agw/article/publish"): article_publish,
+    ("POST", "/mp/agw/article/update"): article_publish,
+    ("GET", "/mp/agw/media/get_media_info"): media_info,
+    ("GET", "/article/"): article_page,
+    ("GET", "/profile_v4/index"): profile_index,
+    ("POST", "/api/login/v2"): login,
+    ("GET", "/api/limited/hotlist"): rate_limited_hot_list,
+    ("POST", "/webhook"): webhook,
+    ("GET", "/heavy/"): heavy_page,
+    ("GET", "/longform/"): longform_page,
+    ("GET", "/static/"): static_asset,
+    ("GET", "/images/"): stub_image,
+    ("POST", "/mp/agw/article_material/photo/upload_picture"): upload_picture,
+}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """按路由表分发请求，并注入延迟与错误"""
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # 头和正文分两次写出，避免 Nagle + 延迟确认带来的 40ms 停顿
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _dispatch(self, method: str):
+        parsed = urlparse(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+
+        route_path, route = self.server.match(method, parsed.path)
+        self.server.count(route_path or parsed.path)
+        if route is None:
+            self._send(404, "application/json", {"message": "not found"})
+            return
+
+        config = self.server.config
+        self.server.sleep(route_path)
+
+        roll = self.server.roll()
+        if roll < config.error_rate:
+            self._send(500, "application/json", {"message": "injected error"})
+            return
+        if roll < config.error_rate + config.throttle_rate:
+            self._send(429, "application/json", {"message": "too many requests"},
+                       extra_headers={"Retry-After": "1"})
+            return
+
+        # 路由可以额外返回第四项作为响应头
+        result = route(self, parse_qs(parsed.query), body)
+        status, content_type, payload = result[:3]
+        self._send(status, content_type, payload, extra_headers=result[3] if len(result) > 3 else None)
+
+    def _send(self, status: int, content_type: str, payload, extra_headers: Dict = None):
+        if content_type == "text/event-stream":
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            for event in payload:
+                self.wfile.write(event.encode("utf-8"))
+                self.wfile.flush()
+            self.close_connection = True
+            return
+
+        if isinstance(payload, (dict, list)):
+            data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        elif isinstance(payload, str):
+            data = payload.encode("utf-8")
+        else:
+            data = payload
+
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (extra_headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class StubServer(ThreadingHTTPServer):
+    """在后台线程运行的本地桩服务"""
+    daemon_threads = True
+
+    def __init__(self, config: StubConfig = None, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), StubHandler)
+        self.config = config or StubConfig()
+        self.routes: Dict[Tuple[str, str], Route] = dict(DEFAULT_ROUTES)
+        self.hits: Dict[str, int] = {}
+        self.webhooks: List[Tuple[float, Dict]] = []  # (到达时间, 请求体)
+        self.uploads: List[str] = []                   # 上传图片内容的 sha1
+        self._random = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._id = 0
+        self._thread: Optional[threading.Thread] = None
+        # 服务端配额（令牌桶），供限流路由使用
+        self.quota_rate = 20.0
+        self.quota_burst = 5
+        self.quota_tokens = float(self.quota_burst)
+        self._quota_last = time.monotonic()
+        # 定时发布：文章ID -> {账号, 标题, 定时时间, 是否被丢弃}；clock_shift 让服务端时钟前进以模拟到点
+        self.scheduled: Dict[str, Dict] = {}
+        self.clock_shift = 0.0
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url(self, path: str) -> str:
+        return f"{self.base_url}{path}"
+
+    def add_route(self, method: str, path: str, route: Route):
+        """注册额外路由；以 / 结尾的路径按前缀匹配"""
+        self.routes[(method.upper(), path)] = route
+
+    def match(self, method: str, path: str):
+        route = self.routes.get((method, path))
+        if route:
+            return path, route
+        for (route_method, route_path), candidate in self.routes.items():
+            if route_method == method and route_path.endswith("/") and path.startswith(route_path):
+                return route_path, candidate
+        return None, None
+
+    def count(self, path: str):
+        with self._lock:
+            self.hits[path] = self.hits.get(path, 0) + 1
+
+    def roll(self) -> float:
+        with self._lock:
+            return self._random.random()
+
+    def take_quota(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self.quota_tokens = min(float(self.quota_burst),
+                                    self.quota_tokens + (now - self._quota_last) * self.quota_rate)
+            self._quota_last = now
+            if self.quota_tokens >= 1:
+                self.quota_tokens -= 1
+                return True
+            return False
+
+    def now(self) -> float:
+        return time.time() + self.clock_shift
+
+    def schedule(self, user: str, article_id: str, title: str, timer: float):
+        dropped = self.roll() < self.config.schedule_drop_rate
+        with self._lock:
+            self.scheduled[article_id] = {"user": user, "article_id": article_id, "title": title,
+                                          "timer": timer, "dropped": dropped}
+
+    def live_scheduled(self, user: str) -> List[Dict]:
+        """该账号已到定时时间且未被丢弃的文章，按定时时间从新到旧"""
+        now = self.now()
+        with self._lock:
+            live = [e for e in self.scheduled.values()
+                    if e["user"] == user and e["timer"] <= now and not e["dropped"]]
+        return sorted(live, key=lambda e: -e["timer"])
+
+    def handle_error(self, request, client_address):
+        """客户端中途断开（请求被取消）时不打印堆栈"""
+        import sys
+
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return
+        super().handle_error(request, client_address)
+
+    def next_id(self) -> int:
+        with self._lock:
+            self._id += 1
+            return self._id
+
+    def sleep(self, route_path: Optional[str]):
+        config = self.config
+        latency = config.route_latency_ms.get(route_path, config.latency_ms)
+        if config.jitter_ms:
+            with self._lock:
+                latency += self._random.uniform(0, config.jitter_ms)
+        if latency > 0:
+            time.sleep(latency / 1000.0)
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
@@ -6,21 +6,35 @@ root_dir = Path(__file__).parent
 sys.path.append(str(root_dir))
 sys.path.append(str(root_dir / "src"))
 
-from PyQt5.QtWidgets import QApplication
-from PyQt5.QtCore import Qt
-from src.ui.main_window import MainWindow
-
-# Windows高DPI支持
-if hasattr(Qt, 'AA_EnableHighDpiScaling'):
-    QApplication.setAttribute(Qt.AA_EnableHighDpiScaling, True)
-if hasattr(Qt, 'AA_UseHighDpiPixmaps'):
-    QApplication.setAttribute(Qt.AA_UseHighDpiPixmaps, True)
+# 以下副作用都放在 main() 中：spawn 方式启动的子进程（Windows）会以 __mp_main__ 重新导入本文件，
+# 模块顶层只保留路径设置，子进程不会启用启动分析，也不会导入 PyQt 和主窗口
 
 def main():
-    app = QApplication(sys.argv)
-    window = MainWindow()
+    # 启动分析需在导入 PyQt 之前启用，才能统计全部模块的导入耗时
+    from src.utils.startup_profiler import profiler
+    argv = profiler.configure(sys.argv)
+
+    from PyQt5.QtWidgets import QApplication
+    from PyQt5.QtCore import Qt
+    from src.ui.main_window import MainWindow
+    from src.utils import log_setup
+
+    # Windows高DPI支持
+    if hasattr(Qt, 'AA_EnableHighDpiScaling'):
+        QApplication.setAttribute(Qt.AA_EnableHighDpiScaling, True)
+    if hasattr(Qt, 'AA_UseHighDpiPixmaps'):
+        QApplication.setAttribute(Qt.AA_UseHighDpiPixmaps, True)
+
+    log_setup.setup_logging()
+    with profiler.section("QApplication"):
+        app = QApplication(argv)
+    with profiler.section("MainWindow"):
+        window = MainWindow()
+    profiler.watch_first_paint(window, app)
     window.show()
-    sys.exit(app.exec_())
+    code = app.exec_()
+    log_setup.shutdown()
+    sys.exit(code)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
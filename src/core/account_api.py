@@ -1,8 +1,9 @@
-import httpx
 from loguru import logger
-import json
-from pathlib import Path
 from typing import Dict, Optional
+from src.core.account_store import get_account_store
+from src.core.http_client import create_client
+from src.core.session_manager import get_session_manager
+from src.utils.log_setup import log_http
 
 class AccountAPI:
     def __init__(self):
@@ -17,14 +18,22 @@ class AccountAPI:
         }
         
     async def login(self, username: str, password: str) -> Dict:
-        """登录头条号"""
+        """登录头条号（本地有未过期的会话时直接复用，不再请求登录接口）"""
         try:
-            # 第一步：获取登录所需的参数
-            async with httpx.AsyncClient(headers=self.headers) as client:
+            sessions = get_session_manager()
+            session = sessions.find_by_username(username)
+            if session:
+                account_data = self._account_for_session(session)
+                if account_data:
+                    logger.info(f"复用已保存的会话: {username}")
+                    get_account_store().set_current(account_data)
+                    return account_data
+
+            async with create_client(headers=self.headers) as client:
                 # 访问登录页面获取必要的cookie
                 await client.get(f"{self.base_url}/profile_v4/index")
                 
-                # 登录请求
+                # 登录请求（客户端会自动携带上一步获得的cookie）
                 login_url = f"{self.base_url}/api/login/v2"
                 login_data = {
                     "username": username,
@@ -33,16 +42,9 @@ class AccountAPI:
                     "remember": True
                 }
                 
-                response = await client.post(
-                    login_url, 
-                    json=login_data,
-                    headers={
-                        **self.headers,
-                        "Cookie": "; ".join([f"{k}={v}" for k, v in client.cookies.items()])
-                    }
-                )
+                response = await client.post(login_url, json=login_data)
                 
-                logger.debug(f"Login response: {response.text}")
+                log_http("登录响应", status=response.status_code, body=lambda: response.text, username=username)
                 
                 if response.status_code == 200:
                     result = response.json()
@@ -51,10 +53,12 @@ class AccountAPI:
                         account_data = {
                             "token": response.cookies.get("tt_token", ""),  # 从cookie中获取token
                             "name": result["data"].get("name", username),
+                            "username": username,
                             "status": "已登录",
                             "valid": True,
-                            "cookies": dict(response.cookies)  # 保存所有cookie
+                            "cookies": {c.name: c.value for c in client.cookies.jar}  # 保存所有cookie
                         }
+                        sessions.remember(account_data, client.cookies.jar, username)
                         self._save_account(account_data)
                         return account_data
                     else:
@@ -66,14 +70,19 @@ class AccountAPI:
             logger.error(f"登录失败: {str(e)}")
             raise
 
+    def _account_for_session(self, session) -> Optional[Dict]:
+        """根据会话找到对应的账号"""
+        store = get_account_store()
+        if session.key.startswith("name:"):
+            return store.get_by_name(session.key[len("name:"):])
+        return store.get(session.key)
+
     def _save_account(self, account_data: Dict):
-        """保存账号信息"""
+        """保存账号信息并设为当前账号"""
         try:
-            data_dir = Path("data")
-            data_dir.mkdir(exist_ok=True)
-            
-            with open(data_dir / "last_account.json", "w", encoding="utf-8") as f:
-                json.dump(account_data, f, ensure_ascii=False, indent=2)
+            store = get_account_store()
+            store.upsert(account_data)
+            store.set_current(account_data)
                 
         except Exception as e:
             logger.error(f"保存账号信息失败: {str(e)}")
@@ -81,11 +90,7 @@ class AccountAPI:
     def load_last_account(self) -> Optional[Dict]:
         """加载上次登录的账号"""
         try:
-            account_file = Path("data/last_account.json")
-            if account_file.exists():
-                with open(account_file, "r", encoding="utf-8") as f:
-                    return json.load(f)
-            return None
+            return get_account_store().current()
             
         except Exception as e:
             logger.error(f"加载账号信息失败: {str(e)}")
@@ -0,0 +1,412 @@
+from loguru import logger
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from src.utils import serialization
+
+class FileLock:
+    """跨进程文件锁（GUI 与无界面进程共用账号文件时使用）"""
+
+    def __init__(self, path: Path, timeout: float = 10.0):
+        self.path = path
+        self.timeout = timeout
+        self._fd = None
+
+    def acquire(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fd = os.open(str(self.path), os.O_RDWR | os.O_CREAT)
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                if os.name == "nt":
+                    import msvcrt
+                    os.lseek(self._fd, 0, os.SEEK_SET)
+                    msvcrt.locking(self._fd, msvcrt.LK_NBLCK, 1)
+                else:
+                    import fcntl
+                    fcntl.flock(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return
+            except OSError:
+                if time.monotonic() > deadline:
+                    os.close(self._fd)
+                    self._fd = None
+                    raise TimeoutError(f"获取文件锁超时: {self.path}")
+                time.sleep(0.01)
+
+    def release(self):
+        if self._fd is None:
+            return
+        try:
+            if os.name == "nt":
+                import msvcrt
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+class AccountStore:
+    """账号仓库
+
+    - 内存中按 Token 和名称建立索引，查询为 O(1)
+    - 每次修改只向预写日志 accounts.wal 追加一行，达到阈值后再压缩为 accounts.bin 快照（二进制格式，见 src.utils.serialization）
+    - 所有读写都在跨进程文件锁内进行，并在操作前回放其他进程追加的日志
+    - 通过 subscribe 注册的回调会收到变更通知: callback(event, account)
+      event 取值: add / update / remove / current / reload
+    """
+
+    def __init__(self, data_dir: Path = Path("data"), compact_threshold: int = 200):
+        self.data_dir = Path(data_dir)
+        self.snapshot_file = self.data_dir / "accounts.bin"
+        self.wal_file = self.data_dir / "accounts.wal"
+        self.current_file = self.data_dir / "last_account.bin"
+        self.file_lock = FileLock(self.data_dir / "accounts.lock")
+        self.compact_threshold = compact_threshold
+
+        self._accounts: Dict[str, Dict] = {}  # key -> 账号（保持插入顺序）
+        self._by_name: Dict[str, str] = {}    # 名称 -> key
+        self._current: Optional[Dict] = None
+        self._snapshot_mtime = None
+        self._current_mtime = None
+        self._wal_offset = 0
+        self._wal_lines = 0
+        self._external_change = False
+        self._listeners: List[Callable[[str, Optional[Dict]], None]] = []
+        self._lock = threading.RLock()
+
+        with self._lock:
+            with self.file_lock:
+                self._migrate_legacy()
+        with self._locked():
+            self._external_change = False
+
+    @staticmethod
+    def key_of(account: Dict) -> str:
+        """账号主键：优先使用 Token"""
+        return account.get("token") or f"name:{account.get('name', '')}"
+
+    # ---------- 变更通知 ----------
+
+    def subscribe(self, callback: Callable[[str, Optional[Dict]], None]):
+        """注册变更回调（在修改发生的线程中调用）"""
+        with self._lock:
+            self._listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def _notify(self, event: str, account: Optional[Dict]):
+        for callback in list(self._listeners):
+            try:
+                callback(event, dict(account) if account else None)
+            except Exception as e:
+                logger.error(f"账号变更通知处理失败: {str(e)}")
+
+    # ---------- 加载与同步 ----------
+
+    @contextmanager
+    def _locked(self):
+        """线程锁 + 文件锁，并在进入时同步其他进程的修改"""
+        with self._lock:
+            with self.file_lock:
+                changed = self._sync()
+                yield changed
+
+    @staticmethod
+    def _mtime(path: Path):
+        try:
+            return path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _sync(self) -> bool:
+        """与磁盘状态同步，返回是否有其他进程的改动"""
+        changed = False
+        wal_size = self.wal_file.stat().st_size if self.wal_file.exists() else 0
+
+        if self._mtime(self.snapshot_file) != self._snapshot_mtime or wal_size < self._wal_offset:
+            self._load_snapshot()
+            self._wal_offset = 0
+            self._wal_lines = 0
+            changed = True
+
+        if wal_size > self._wal_offset:
+            self._replay_wal()
+            changed = True
+
+        current_mtime = self._mtime(self.current_file)
+        if current_mtime != self._current_mtime:
+            self._load_current()
+            changed = True
+
+        if changed:
+            self._external_change = True
+        return changed
+
+    def _migrate_legacy(self):
+        """旧版本的 accounts.json / last_account.json 转换为二进制格式"""
+        for path in (self.snapshot_file, self.current_file):
+            legacy = path.with_suffix(".json")
+            if path.exists() or not legacy.exists():
+                continue
+            try:
+                serialization.load_migrating(path, legacy)
+            except Exception as e:
+                logger.error(f"迁移账号文件失败: {str(e)}")
+
+    def _load_snapshot(self):
+        self._accounts.clear()
+        self._by_name.clear()
+        self._snapshot_mtime = self._mtime(self.snapshot_file)
+        if not self.snapshot_file.exists():
+            return
+        try:
+            accounts = serialization.read_file(self.snapshot_file, [])
+            for account in accounts:
+                self._apply({"op": "upsert", "account": account})
+        except Exception as e:
+            logger.error(f"加载账号快照失败: {str(e)}")
+
+    def _replay_wal(self):
+        with open(self.wal_file, "rb") as f:
+            f.seek(self._wal_offset)
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    # 其他进程写到一半的行，下次再读
+                    break
+                self._wal_offset += len(raw)
+                self._wal_lines += 1
+                try:
+                    self._apply(json.loads(raw.decode("utf-8")))
+                except Exception as e:
+                    logger.error(f"回放账号日志失败: {str(e)}")
+
+    def _load_current(self):
+        self._current_mtime = self._mtime(self.current_file)
+        self._current = None
+        if not self.current_file.exists():
+            return
+        try:
+            self._current = serialization.read_file(self.current_file)
+        except Exception as e:
+            logger.error(f"加载当前账号失败: {str(e)}")
+
+    def _apply(self, entry: Dict) -> Optional[Dict]:
+        """在内存中应用一条日志，返回受影响的账号"""
+        op = entry.get("op")
+        if op == "upsert":
+            account = entry["account"]
+            key = self.key_of(account)
+            old = self._accounts.get(key)
+            if old and old.get("name") != account.get("name"):
+                self._by_name.pop(old.get("name"), None)
+            self._accounts[key] = account
+            self._by_name[account.get("name", "")] = key
+            return account
+        if op == "update":
+            account = self._accounts.get(entry["key"])
+            if account is not None:
+                if "name" in entry["fields"]:
+                    self._by_name.pop(account.get("name"), None)
+                account.update(entry["fields"])
+                key = self.key_of(account)
+                if key != entry["key"]:
+                    # Token 变了：按新主键重新索引
+                    self._accounts[key] = self._accounts.pop(entry["key"])
+                self._by_name[account.get("name", "")] = key
+            return account
+        if op == "remove":
+            account = self._accounts.pop(entry["key"], None)
+            if account is not None:
+                self._by_name.pop(account.get("name"), None)
+            return account
+        return None
+
+    # ---------- 持久化 ----------
+
+    def _append(self, entry: Dict):
+        """追加一条日志并立即落盘"""
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+        with open(self.wal_file, "ab") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        self._wal_offset += len(line)
+        self._wal_lines += 1
+
+    def _maybe_compact(self):
+        if self._wal_lines >= self.compact_threshold:
+            self._compact()
+
+    def _compact(self):
+        """把内存状态写成快照并清空日志"""
+        serialization.write_file(self.snapshot_file, list(self._accounts.values()))
+        with open(self.wal_file, "wb"):
+            pass
+        self._snapshot_mtime = self._mtime(self.snapshot_file)
+        self._wal_offset = 0
+        self._wal_lines = 0
+
+    def _write_current(self):
+        if self._current is None:
+            if self.current_file.exists():
+                self.current_file.unlink()
+        else:
+            serialization.write_file(self.current_file, self._current)
+        self._current_mtime = self._mtime(self.current_file)
+
+    def _update(self, token: str, fields: Dict) -> tuple:
+        """更新一个账号，返回 (更新后的账号, 要发送的通知)；Token 改变时按删除旧账号 + 新增账号处理"""
+        account = {**self._accounts[token], **fields}
+        new_key = self.key_of(account)
+        if new_key == token:
+            saved = self._commit({"op": "update", "key": token, "fields": fields}, "update")
+            return saved, [("update", saved)]
+        was_current = self._current is not None and self.key_of(self._current) == token
+        events = [("remove", self._commit({"op": "remove", "key": token}, "remove"))]
+        if new_key in self._accounts:
+            events.append(("remove", self._commit({"op": "remove", "key": new_key}, "remove")))
+        saved = self._commit({"op": "upsert", "account": account}, "add")
+        events.append(("add", saved))
+        if was_current:
+            self._current = dict(saved)
+            self._write_current()
+            events.append(("current", self._current))
+        return saved, events
+
+    def _commit(self, entry: Dict, event: str):
+        self._append(entry)
+        account = self._apply(entry)
+
+        # 当前账号的信息同步更新
+        if self._current is not None and account is not None \
+                and self.key_of(self._current) == self.key_of(account):
+            if event == "remove":
+                self._current = None
+            else:
+                self._current = {**self._current, **account}
+            self._write_current()
+
+        self._maybe_compact()
+        return account
+
+    # ---------- 公共接口 ----------
+
+    def all(self) -> List[Dict]:
+        """全部账号（副本）"""
+        with self._locked():
+            return [dict(a) for a in self._accounts.values()]
+
+    def count(self) -> int:
+        with self._locked():
+            return len(self._accounts)
+
+    def get(self, token: str) -> Optional[Dict]:
+        """按 Token 查询"""
+        with self._locked():
+            account = self._accounts.get(token)
+            return dict(account) if account else None
+
+    def get_by_name(self, name: str) -> Optional[Dict]:
+        """按名称查询"""
+        with self._locked():
+            key = self._by_name.get(name)
+            return dict(self._accounts[key]) if key in self._accounts else None
+
+    def upsert(self, account: Dict) -> Dict:
+        """新增或整体替换账号"""
+        with self._locked():
+            event = "update" if self.key_of(account) in self._accounts else "add"
+            saved = self._commit({"op": "upsert", "account": dict(account)}, event)
+        self._notify(event, saved)
+        return dict(saved)
+
+    def update(self, token: str, **fields) -> Optional[Dict]:
+        """更新账号的部分字段"""
+        with self._locked():
+            if token not in self._accounts:
+                return None
+            saved, events = self._update(token, fields)
+        for event, account in events:
+            self._notify(event, account)
+        return dict(saved)
+
+    def update_many(self, changes: Dict[str, Dict]) -> int:
+        """批量更新 {token: 字段}，只获取一次锁"""
+        events, updated = [], 0
+        with self._locked():
+            for token, fields in changes.items():
+                if token in self._accounts:
+                    events += self._update(token, fields)[1]
+                    updated += 1
+        for event, account in events:
+            self._notify(event, account)
+        return updated
+
+    def remove(self, token: str) -> bool:
+        """删除账号"""
+        with self._locked():
+            if token not in self._accounts:
+                return False
+            removed = self._commit({"op": "remove", "key": token}, "remove")
+        self._notify("remove", removed)
+        return True
+
+    def current(self) -> Optional[Dict]:
+        """当前使用的账号"""
+        with self._locked():
+            return dict(self._current) if self._current else None
+
+    def set_current(self, account: Optional[Dict]):
+        """设置当前账号，传入 None 表示清除"""
+        with self._locked():
+            if account is None:
+                self._current = None
+            else:
+                stored = self._accounts.get(self.key_of(account))
+                self._current = {**account, **stored} if stored else dict(account)
+            self._write_current()
+            current = self._current
+        self._notify("current", current)
+
+    def poll(self) -> bool:
+        """检查其他进程的修改，有变化时发送 reload 通知"""
+        with self._locked():
+            changed = self._external_change
+            self._external_change = False
+        if changed:
+            self._notify("reload", None)
+        return changed
+
+    def compact(self):
+        """立即压缩日志"""
+        with self._locked():
+            self._compact()
+
+_store: Optional[AccountStore] = None
+_store_lock = threading.Lock()
+
+def get_account_store() -> AccountStore:
+    """进程内共享的账号仓库"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = AccountStore()
+        return _store
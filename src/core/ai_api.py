@@ -1,9 +1,66 @@
 # src/core/ai_api.py
-import aiohttp
 import asyncio
 from loguru import logger
-from typing import Dict, Any
+from typing import List, Tuple
 import json
+import re
+from src.core.article_versions import RAW, REWRITTEN, get_version_store, split_sentences
+from src.core.http_client import create_client
+from src.core.cpu_pool import get_cpu_pool
+from src.core.keywords import extract_keywords, missing_keywords
+from src.core.title_scorer import get_title_scorer
+from src.utils.metrics import metrics
+
+
+_TITLE_PREFIX_RE = re.compile(r"^\s*(?:\d+[.、)）]|[-*•])\s*")
+
+
+def split_chunks(text: str, max_chars: int = 1500) -> list:
+    """按段落把文本分成不超过 max_chars 字的块；单个段落过长时按句子再分
+
+    返回 [(分隔符, 块)]，分隔符是该块与上一块之间原有的 "\n"（段落中间切开时为空），
+    按顺序拼接 分隔符 + 块 即得到原文。
+    """
+    chunks, current, joiner = [], None, ""
+    for index, paragraph in enumerate(text.split("\n")):
+        pieces = [paragraph]
+        if len(paragraph) > max_chars:
+            pieces, piece = [], ""
+            for sentence in split_sentences(paragraph):
+                if piece and len(piece) + len(sentence) > max_chars:
+                    pieces.append(piece)
+                    piece = ""
+                piece += sentence
+            pieces.append(piece)
+        for position, piece in enumerate(pieces):
+            separator = "\n" if index and not position else ""
+            if current is not None and len(current) + len(separator) + len(piece) > max_chars:
+                chunks.append((joiner, current))
+                current, joiner = piece, separator
+            else:
+                current = piece if current is None else current + separator + piece
+    chunks.append((joiner, current or ""))
+    return chunks
+
+
+def parse_titles(reply: str) -> List[str]:
+    """解析候选标题：优先按 JSON 数组解析，否则按行解析并去掉序号和引号"""
+    titles = []
+    match = re.search(r"\[.*\]", reply or "", re.S)
+    if match:
+        try:
+            titles = [str(t) for t in json.loads(match.group(0)) if isinstance(t, (str, int, float))]
+        except ValueError:
+            titles = []
+    if not titles:
+        titles = [_TITLE_PREFIX_RE.sub("", line) for line in (reply or "").splitlines()]
+    result = []
+    for title in titles:
+        title = title.strip().strip('"“”「」《》').strip()
+        if title and title not in result:
+            result.append(title)
+    return result
+
 
 class AIAPI:
     """AI文本处理API"""
@@ -31,8 +88,13 @@ class AIAPI:
             '标题优化': '优化以下标题，使其更吸引人：',
             '扩写内容': '扩展以下内容���使其更详细：',
             '生成摘要': '为以下文章生成摘要：',
-            '润色优化': '润色和优化以下文本：'
+            '润色优化': '润色和优化以下文本：',
+            '标签建议': '为以下文章推荐5个标签，用逗号分隔：'
         }
+        
+        # 结果与原文逐段对应的任务，长文按段落分块处理并校验关键词
+        self.chunked_tasks = {'文章改写', '风格转换', '扩写内容', '润色优化'}
+        self.chunk_concurrency = 4
     
     async def process(self, text: str, task: str, **options) -> str:
         """
@@ -40,14 +102,28 @@ class AIAPI:
         text: 原文本
         task: 任务类型
         options: 其他选项（temperature, style, keep_keywords等）
+                 version_key: 指定时把原文和结果保存到文章版本库
+                 chunk_chars: 改写类任务按段落分块，每块的最大字数
+                 keep_keywords: 是否保留原文关键词，默认仅改写类任务保留
+                 keyword_count: 保留关键词时从原文提取的关键词数量
+                 keyword_retries: 分块改写后缺少关键词时，只重新改写该块的最多次数
+                 title_candidates: 标题优化时一次请求生成的候选数，大于 1 时按本地模型排序后逐行返回
         """
+        import httpx
+        
         try:
             # 构建提示语
             task_prompt = self.task_prompts.get(task, '处理以下文本：')
             style = options.get('style', '')
             style_prompt = self.style_prompts.get(style, '') if style else ''
             temperature = options.get('temperature', 0.7)
-            keep_keywords = options.get('keep_keywords', True)
+            # 默认只有改写类任务保留关键词，摘要、标题等任务不提取也不校验
+            keep_keywords = options.get('keep_keywords', task in self.chunked_tasks)
+            
+            # 本地提取原文关键词，改写后逐块校验
+            keywords = []
+            if keep_keywords:
+                keywords = await get_cpu_pool().run(extract_keywords, text, options.get('keyword_count', 8))
             
             # 构建完整的提示语
             system_prompt = "你是一个专业的文本处理助手。"
@@ -57,40 +133,36 @@ class AIAPI:
             user_prompt = f"{task_prompt}\n"
             if style_prompt:
                 user_prompt += f"要求使用{style_prompt}。\n"
-            user_prompt += f"\n原文：{text}"
             
-            # 构建API请求
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {self.api_key}"
-            }
+            candidates = options.get('title_candidates', 1)
+            if task == '标题优化' and candidates > 1:
+                ranked = await self.generate_titles(text, candidates, style=style, temperature=temperature,
+                                                    system_prompt=system_prompt)
+                return "\n".join(title for title, _ in ranked)
             
-            data = {
-                "model": self.model,
-                "messages": [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                "temperature": temperature
-            }
+            # 改写类任务逐块处理，结果与原文逐段对应；摘要、标题等任务整篇处理
+            if task in self.chunked_tasks:
+                chunks = split_chunks(text, options.get('chunk_chars', 1500))
+            else:
+                chunks = [("", text)]
+            retries = options.get('keyword_retries', 1) if task in self.chunked_tasks else 0
             
-            # 发送请求
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{self.api_base}/chat/completions",
-                    headers=headers,
-                    json=data,
-                    timeout=30
-                ) as response:
-                    result = await response.json()
-                    
-                    if response.status != 200:
-                        error_msg = result.get('error', {}).get('message', '未知错误')
-                        raise Exception(f"API请求失败: {error_msg}")
+            semaphore = asyncio.Semaphore(self.chunk_concurrency)
+            async with self._client() as session:
+                results = await asyncio.gather(*(
+                    self._process_chunk(session, semaphore, chunk, system_prompt, user_prompt, temperature,
+                                        [k for k in keywords if k.lower() in chunk.lower()], retries)
+                    for _, chunk in chunks
+                ))
+            content = "".join(joiner + result.strip("\n") for (joiner, _), result in zip(chunks, results))
                     
-                    return result['choices'][0]['message']['content']
+            version_key = options.get('version_key')
+            if version_key:
+                self.save_versions(version_key, text, content, task=task, style=style,
+                                   temperature=temperature, keywords=keywords)
+            return content
                     
-        except asyncio.TimeoutError:
+        except (asyncio.TimeoutError, httpx.TimeoutException):
             logger.error("AI API请求超时")
             raise Exception("处理超时，请稍后重试")
             
@@ -98,6 +170,91 @@ class AIAPI:
             logger.error(f"AI处理失败: {str(e)}")
             raise Exception(f"AI处理失败: {str(e)}")
             
+    async def _process_chunk(self, session, semaphore, chunk: str, system_prompt: str, user_prompt: str,
+                             temperature: float, keywords: list, retries: int) -> str:
+        """处理一块文本；缺少关键词时带着缺失的关键词重新处理这一块"""
+        if keywords:
+            system_prompt += f"以下关键词必须原样保留：{'、'.join(keywords)}。"
+        async with semaphore:
+            result = await self._chat(session, system_prompt, f"{user_prompt}\n原文：{chunk}", temperature)
+        missing = missing_keywords(keywords, result)
+        for _ in range(retries):
+            if not missing:
+                break
+            metrics.inc("ai.keyword_retry")
+            repair_prompt = system_prompt + f"上一次的结果遗漏了关键词：{'、'.join(missing)}，请重新处理并确保包含这些关键词。"
+            async with semaphore:
+                retry = await self._chat(session, repair_prompt, f"{user_prompt}\n原文：{chunk}", temperature)
+            retry_missing = missing_keywords(keywords, retry)
+            if len(retry_missing) <= len(missing):
+                result, missing = retry, retry_missing
+        if missing:
+            metrics.inc("ai.keyword_missing", len(missing))
+            logger.warning(f"改写结果缺少关键词: {'、'.join(missing)}")
+        return result
+        
+    async def generate_titles(self, text: str, count: int = 5, style: str = '', temperature: float = 0.9,
+                              system_prompt: str = "你是一个专业的文本处理助手。") -> List[Tuple[str, float]]:
+        """一次请求生成 count 个候选标题，用本地打分模型排序，返回 [(标题, 预估阅读量)]"""
+        style_prompt = self.style_prompts.get(style, '') if style else ''
+        system_prompt += f"请只输出一个 JSON 数组，包含 {count} 个互不相同的候选标题，不要输出其他内容。"
+        user_prompt = f"{self.task_prompts['标题优化']}\n"
+        if style_prompt:
+            user_prompt += f"要求使用{style_prompt}。\n"
+        user_prompt += f"\n原文：{text}"
+        
+        async with self._client() as session:
+            reply = await self._chat(session, system_prompt, user_prompt, temperature)
+        titles = parse_titles(reply)[:count]
+        if not titles:
+            raise Exception("未能解析候选标题")
+        return get_title_scorer().rank(titles)
+        
+    def _client(self):
+        """对话接口的 httpx 客户端（经过 create_client，可录制/回放）；接口有自己的配额，不做站点限速"""
+        return create_client(timeout=30.0, rate_limited=False)
+        
+    async def _chat(self, session, system_prompt: str, user_prompt: str, temperature: float) -> str:
+        """调用对话接口，返回回复内容；session 为 _client() 创建的客户端"""
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.api_key}"
+        }
+        
+        data = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            "temperature": temperature
+        }
+        
+        response = await session.post(
+            f"{self.api_base}/chat/completions",
+            headers=headers,
+            json=data
+        )
+        result = response.json()
+        
+        if response.status_code != 200:
+            error_msg = result.get('error', {}).get('message', '未知错误')
+            raise Exception(f"API请求失败: {error_msg}")
+        
+        return result['choices'][0]['message']['content']
+            
+    async def chat(self, system_prompt: str, user_prompt: str, temperature: float = 0.7) -> str:
+        """单独发送一次对话请求，返回回复内容（不分块、不校验关键词）"""
+        async with self._client() as session:
+            return await self._chat(session, system_prompt, user_prompt, temperature)
+            
+    def save_versions(self, key: str, source: str, result: str, **meta):
+        """保存改写前后的版本：原文已在版本库中（重新改写或继续改写上一稿）时只保存结果"""
+        store = get_version_store()
+        if store.find(key, source) is None:
+            store.add(key, source, RAW)
+        store.add(key, result, REWRITTEN, **meta)
+        
     def get_available_styles(self) -> list:
         """获取可用的风格列表"""
         return list(self.style_prompts.keys())
@@ -0,0 +1,175 @@
+"""短任务合批：把标题、摘要、标签等短文本任务打包进一次 AI 请求
+
+调用方 await submit(...)，批处理器在短时间窗口内（默认 15ms）收集任务，
+窗口到期、累计字数达到预算或任务数达到上限时，把它们编号写进同一个提示，
+要求模型输出以编号为键的 JSON 对象，再按编号把结果分发给各个调用方。
+某个编号缺失或无法解析时，只对该任务单独调用 AIAPI.process 补做。
+
+批处理器绑定在第一次使用它的事件循环上（通常是共享的后台事件循环 runtime.loop），
+在其他事件循环中调用时不合批，直接单独请求。
+"""
+import asyncio
+import json
+import re
+import threading
+from typing import Dict, List, Optional
+
+from loguru import logger
+
+from src.core.ai_api import AIAPI
+from src.utils.metrics import metrics
+
+BATCH_SYSTEM_PROMPT = (
+    "你是一个专业的文本处理助手。下面有多个编号的任务，请逐个完成。"
+    "只输出一个 JSON 对象，键为任务编号（字符串），值为该任务的结果文本，不要输出其他内容。"
+)
+
+# 结果中 "编号: 内容" 形式的行，JSON 解析失败时使用
+_LINE_RE = re.compile(r"^\s*(?:任务\s*)?[\"“]?(\d+)[\"”]?\s*[:：.、)）]\s*(.+?)\s*,?\s*$")
+
+
+class _Item:
+    __slots__ = ("text", "task", "style", "future")
+
+    def __init__(self, text: str, task: str, style: str, future: asyncio.Future):
+        self.text = text
+        self.task = task
+        self.style = style
+        self.future = future
+
+
+def parse_batch_reply(reply: str, count: int) -> Dict[int, str]:
+    """解析合批结果，返回 {编号(从 1 开始): 结果}；只保留 1..count 范围内的非空结果"""
+    results: Dict[int, str] = {}
+    reply = reply or ""
+    match = re.search(r"\{.*\}", reply, re.S)
+    if match:
+        try:
+            data = json.loads(match.group(0))
+            for key, value in data.items():
+                if str(key).strip().isdigit() and isinstance(value, (str, int, float)):
+                    results[int(str(key).strip())] = str(value).strip()
+        except ValueError:
+            results = {}
+    if not results:
+        match = re.search(r"\[.*\]", reply, re.S)
+        try:
+            data = json.loads(match.group(0)) if match else []
+            for entry in data if isinstance(data, list) else []:
+                if isinstance(entry, dict) and str(entry.get("id", "")).isdigit():
+                    results[int(entry["id"])] = str(entry.get("result", "")).strip()
+        except ValueError:
+            results = {}
+    if not results:
+        for line in reply.splitlines():
+            line_match = _LINE_RE.match(line)
+            if line_match:
+                results[int(line_match.group(1))] = line_match.group(2).strip().strip('"“”')
+    return {k: v for k, v in results.items() if 1 <= k <= count and v}
+
+
+class AIBatcher:
+    """按温度分组的微批处理器"""
+
+    def __init__(self, api: Optional[AIAPI] = None, window_ms: float = 15.0, max_chars: int = 6000,
+                 max_items: int = 16, max_item_chars: int = 1000):
+        self.api = api or AIAPI()
+        self.window = window_ms / 1000
+        self.max_chars = max_chars            # 每批原文总字数上限（近似 token 预算）
+        self.max_items = max_items
+        self.max_item_chars = max_item_chars  # 超过此长度的任务不合批
+        self.short_tasks = {'标题优化', '生成摘要', '标签建议'}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: Dict[float, List[_Item]] = {}
+        self._timers: Dict[float, asyncio.TimerHandle] = {}
+
+    def accepts(self, text: str, task: str) -> bool:
+        return task in self.short_tasks and len(text or "") <= self.max_item_chars
+
+    async def submit(self, text: str, task: str, style: str = '', temperature: float = 0.7) -> str:
+        """提交一个短任务，返回处理结果"""
+        loop = asyncio.get_running_loop()
+        if self._loop is None:
+            self._loop = loop
+        if loop is not self._loop or not self.accepts(text, task):
+            return await self._single(text, task, style, temperature)
+
+        future = loop.create_future()
+        pending = self._pending.setdefault(temperature, [])
+        pending.append(_Item(text, task, style, future))
+        size = sum(len(item.text) for item in pending)
+        if len(pending) >= self.max_items or size >= self.max_chars:
+            self._flush(temperature)
+        elif temperature not in self._timers:
+            self._timers[temperature] = loop.call_later(self.window, self._flush, temperature)
+        return await future
+
+    def _flush(self, temperature: float):
+        timer = self._timers.pop(temperature, None)
+        if timer is not None:
+            timer.cancel()
+        items = self._pending.pop(temperature, [])
+        if items:
+            self._loop.create_task(self._run_batch(items, temperature))
+
+    async def _single(self, text: str, task: str, style: str, temperature: float) -> str:
+        # 与不合批时的调用一致，关键词保留按 AIAPI.process 的默认（短任务不保留）
+        return await self.api.process(text, task, style=style, temperature=temperature)
+
+    async def _run_batch(self, items: List[_Item], temperature: float):
+        metrics.inc("ai.batch.items", len(items))
+        if len(items) == 1:
+            await self._settle(items[0], temperature)
+            return
+        metrics.inc("ai.batch.requests")
+        results: Dict[int, str] = {}
+        try:
+            reply = await self.api.chat(BATCH_SYSTEM_PROMPT, self._prompt(items), temperature)
+            results = parse_batch_reply(reply, len(items))
+        except Exception as e:
+            logger.error(f"合批请求失败: {str(e)}")
+
+        fallbacks = []
+        for index, item in enumerate(items, start=1):
+            if item.future.done():
+                continue
+            if index in results:
+                item.future.set_result(results[index])
+            else:
+                fallbacks.append(item)
+        if fallbacks:
+            metrics.inc("ai.batch.fallbacks", len(fallbacks))
+            await asyncio.gather(*(self._settle(item, temperature) for item in fallbacks))
+
+    async def _settle(self, item: _Item, temperature: float):
+        """单独处理一个任务，把结果或异常交给调用方"""
+        try:
+            result = await self._single(item.text, item.task, item.style, temperature)
+            if not item.future.done():
+                item.future.set_result(result)
+        except Exception as e:
+            if not item.future.done():
+                item.future.set_exception(e)
+
+    def _prompt(self, items: List[_Item]) -> str:
+        parts = []
+        for index, item in enumerate(items, start=1):
+            instruction = self.api.task_prompts.get(item.task, '处理以下文本：')
+            style_prompt = self.api.style_prompts.get(item.style, '') if item.style else ''
+            if style_prompt:
+                instruction += f"（要求使用{style_prompt}）"
+            parts.append(f"任务 {index}：{instruction}\n原文：{item.text}")
+        return "\n\n".join(parts)
+
+
+_batcher: Optional[AIBatcher] = None
+_batcher_lock = threading.Lock()
+
+
+def get_ai_batcher() -> AIBatcher:
+    """进程内共享的批处理器，应在共享事件循环上使用（run_sync / runtime.submit）"""
+    global _batcher
+    with _batcher_lock:
+        if _batcher is None:
+            _batcher = AIBatcher()
+        return _batcher
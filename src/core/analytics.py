@@ -0,0 +1,457 @@
+"""发布效果分析：账号历史文章的列式存储与向量化聚合
+
+每篇文章一行，各字段按列保存在 numpy 数组中（账号、发布时间、阅读量、分类、来源平台），
+标签为 (行号, 标签) 的两列对照表，字符串字段统一编码为整数。
+每次拉取文章列表时记录一条阅读量快照（同一篇文章至少间隔 snapshot_interval 秒），
+用于计算阅读量随发布时长增长的衰减曲线。
+
+聚合都是对整列的 bincount / 排序，10 万篇文章的查询在几十毫秒内完成：
+    by_hour_of_week()   一周 7×24 个发布时段的篇数与平均阅读量
+    by_category() / by_tag() / by_platform()
+    decay_curve()       发布后各时长达到的阅读量占比
+    recommend_windows() 推荐发布时段，next_publish_time() 给出下一次定时发布的时间
+
+数据保存在 data/analytics/articles.bin。
+"""
+import asyncio
+import math
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from loguru import logger
+
+from src.utils import serialization
+
+STORE_FILE = Path("data/analytics/articles.bin")
+
+UNKNOWN = "未知"
+HOURS_PER_WEEK = 168
+# 衰减曲线的时长分段（小时）
+DECAY_EDGES = (1, 2, 4, 8, 12, 24, 48, 72, 120, 168, 336, 720)
+
+
+def _utc_offset() -> int:
+    return int(datetime.now().astimezone().utcoffset().total_seconds())
+
+
+def parse_time(value) -> Optional[float]:
+    """文章列表中的发布时间（时间戳或 "%Y-%m-%d %H:%M:%S" 字符串）-> 时间戳"""
+    if value in (None, ""):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.timestamp()
+    text = str(value).strip()
+    if text.isdigit():
+        return float(text)
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M"):
+        try:
+            return datetime.strptime(text, fmt).timestamp()
+        except ValueError:
+            continue
+    return None
+
+
+class _Column:
+    """按倍数扩容的 numpy 列，追加均摊 O(1)，view() 不复制"""
+
+    def __init__(self, dtype, values=None):
+        import numpy as np
+
+        data = np.asarray(values if values is not None else [], dtype=dtype)
+        self._data = np.empty(max(1024, len(data)), dtype=dtype)
+        self._data[:len(data)] = data
+        self.size = len(data)
+
+    def append(self, value):
+        if self.size == len(self._data):
+            self._grow(self.size + 1)
+        self._data[self.size] = value
+        self.size += 1
+
+    def extend(self, values):
+        count = len(values)
+        if self.size + count > len(self._data):
+            self._grow(self.size + count)
+        self._data[self.size:self.size + count] = values
+        self.size += count
+
+    def _grow(self, needed: int):
+        import numpy as np
+
+        data = np.empty(max(needed, len(self._data) * 2), dtype=self._data.dtype)
+        data[:self.size] = self._data[:self.size]
+        self._data = data
+
+    def view(self):
+        return self._data[:self.size]
+
+
+class _Vocab:
+    """字符串 <-> 整数编码"""
+
+    def __init__(self, names: Optional[List[str]] = None):
+        self.names: List[str] = list(names or [])
+        self.codes: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+
+    def code(self, name: str) -> int:
+        name = name or UNKNOWN
+        code = self.codes.get(name)
+        if code is None:
+            code = self.codes[name] = len(self.names)
+            self.names.append(name)
+        return code
+
+    def __len__(self):
+        return len(self.names)
+
+
+class ArticleAnalytics:
+    """文章表现的列式存储"""
+
+    def __init__(self, path: Optional[Path] = STORE_FILE, snapshot_interval: float = 1800.0):
+        self.path = path
+        self.snapshot_interval = snapshot_interval
+        self._lock = threading.RLock()
+        self._offset = _utc_offset()
+        self._reset()
+        if path is not None and serialization.binary_path(path).exists():
+            self.load()
+
+    def _reset(self):
+        import numpy as np
+
+        self.accounts = _Vocab()
+        self.categories = _Vocab([UNKNOWN])
+        self.platforms = _Vocab([UNKNOWN])
+        self.tags = _Vocab()
+        self._rows: Dict[tuple, int] = {}     # (账号编码, 文章ID) -> 行号
+        self.article_ids: List[str] = []
+        self.account = _Column(np.int32)
+        self.published = _Column(np.int64)    # 发布时间戳（秒）
+        self.reads = _Column(np.int64)        # 最新阅读量
+        self.category = _Column(np.int32)
+        self.platform = _Column(np.int32)
+        self.last_snapshot = _Column(np.int64)
+        self.tag_row = _Column(np.int32)
+        self.tag_code = _Column(np.int32)
+        self.snap_row = _Column(np.int32)
+        self.snap_age = _Column(np.float32)   # 快照时距发布的小时数
+        self.snap_reads = _Column(np.int64)
+        self._tagged = set()
+        self.dirty = False
+
+    def __len__(self):
+        return self.account.size
+
+    # ---------- 写入 ----------
+
+    def _row(self, account: str, article_id: str, published: Optional[float]) -> int:
+        key = (self.accounts.code(account), str(article_id))
+        row = self._rows.get(key)
+        if row is None:
+            row = self._rows[key] = self.account.size
+            self.article_ids.append(key[1])
+            self.account.append(key[0])
+            self.published.append(int(published or time.time()))
+            self.reads.append(0)
+            self.category.append(0)
+            self.platform.append(0)
+            self.last_snapshot.append(0)
+        elif published:
+            self.published.view()[row] = int(published)
+        return row
+
+    def _set_meta(self, row: int, category: str = None, tags: Iterable[str] = None, platform: str = None):
+        if category:
+            self.category.view()[row] = self.categories.code(category)
+        if platform:
+            self.platform.view()[row] = self.platforms.code(platform)
+        if isinstance(tags, str):
+            tags = tags.replace("，", ",").split(",")
+        if tags and row not in self._tagged:
+            # 标签只在第一次得知时记录，已发布文章的标签不会变化
+            codes = sorted({self.tags.code(str(tag).strip()) for tag in tags if str(tag).strip()})
+            if codes:
+                self._tagged.add(row)
+                self.tag_row.extend([row] * len(codes))
+                self.tag_code.extend(codes)
+
+    def ingest(self, account: str, articles: Iterable[Dict], fetched_at: Optional[float] = None) -> int:
+        """写入 ArticleFetcher 返回的文章（阅读量、发布时间，以及接口带回的分类/标签/来源），返回条数"""
+        fetched_at = fetched_at or time.time()
+        count = 0
+        with self._lock:
+            for article in articles:
+                article_id = article.get("article_id")
+                if not article_id:
+                    continue
+                row = self._row(account, article_id, parse_time(article.get("publish_time")))
+                reads = int(article.get("read_count") or 0)
+                self.reads.view()[row] = reads
+                self._set_meta(row, article.get("category"), article.get("tags"),
+                               article.get("platform") or article.get("source_platform"))
+                if fetched_at - self.last_snapshot.view()[row] >= self.snapshot_interval:
+                    self.last_snapshot.view()[row] = int(fetched_at)
+                    self.snap_row.append(row)
+                    self.snap_age.append(max(0.0, (fetched_at - self.published.view()[row]) / 3600))
+                    self.snap_reads.append(reads)
+                count += 1
+            self.dirty = self.dirty or count > 0
+        return count
+
+    def record_publish(self, account: str, article_id: str, article_data: Dict, published: Optional[float] = None):
+        """发布成功时记录文章的分类、标签和来源平台（文章列表接口不返回这些字段）"""
+        if not article_id:
+            return
+        with self._lock:
+            row = self._row(account, article_id, published)
+            self._set_meta(row, article_data.get("category"), article_data.get("tags"),
+                           article_data.get("platform"))
+            self.dirty = True
+
+    # ---------- 查询 ----------
+
+    def _mask(self, account: Optional[str] = None, category: Optional[str] = None,
+              mature_hours: float = 0, now: Optional[float] = None):
+        """行过滤条件；mature_hours 排除发布不久、阅读量还在增长的文章"""
+        import numpy as np
+
+        mask = np.ones(len(self), dtype=bool)
+        if account is not None:
+            mask &= self.account.view() == self.accounts.codes.get(account, -1)
+        if category is not None:
+            mask &= self.category.view() == self.categories.codes.get(category, -1)
+        if mature_hours:
+            mask &= self.published.view() <= (now or time.time()) - mature_hours * 3600
+        return mask
+
+    def hour_of_week(self):
+        """每篇文章的发布时段编号：0 为周一 0 点，167 为周日 23 点（本地时间）"""
+        hours = (self.published.view() + self._offset) // 3600
+        # 1970-01-01 是星期四，加 72 小时使周一 0 点对齐到 0
+        return (hours + 72) % HOURS_PER_WEEK
+
+    @staticmethod
+    def _groups(codes, mask, size: int, reads) -> Dict:
+        import numpy as np
+
+        codes = codes[mask]
+        values = reads[mask].astype(np.float64)
+        count = np.bincount(codes, minlength=size)
+        total = np.bincount(codes, weights=values, minlength=size)
+        log_total = np.bincount(codes, weights=np.log1p(values), minlength=size)
+        safe = np.maximum(count, 1)
+        return {"count": count, "reads": total, "mean": total / safe, "mean_log": log_total / safe}
+
+    def _named(self, vocab: _Vocab, groups: Dict, min_count: int) -> List[Dict]:
+        rows = [{"name": vocab.names[i], "count": int(groups["count"][i]), "reads": int(groups["reads"][i]),
+                 "mean": float(groups["mean"][i]), "typical": math.expm1(float(groups["mean_log"][i]))}
+                for i in range(len(vocab)) if groups["count"][i] >= max(min_count, 1)]
+        return sorted(rows, key=lambda r: -r["typical"])
+
+    def by_hour_of_week(self, account: Optional[str] = None, category: Optional[str] = None,
+                        mature_hours: float = 72) -> Dict:
+        """按发布时段统计，返回 7×24 数组：count、mean（平均阅读量）、mean_log（对数阅读量均值）"""
+        with self._lock:
+            groups = self._groups(self.hour_of_week(), self._mask(account, category, mature_hours),
+                                  HOURS_PER_WEEK, self.reads.view())
+        return {name: values.reshape(7, 24) for name, values in groups.items()}
+
+    def by_category(self, account: Optional[str] = None, mature_hours: float = 72, min_count: int = 1) -> List[Dict]:
+        """按分类统计，按典型阅读量（对数均值）从高到低排序"""
+        with self._lock:
+            groups = self._groups(self.category.view(), self._mask(account, None, mature_hours),
+                                  len(self.categories), self.reads.view())
+            return self._named(self.categories, groups, min_count)
+
+    def by_platform(self, account: Optional[str] = None, mature_hours: float = 72, min_count: int = 1) -> List[Dict]:
+        """按素材来源平台统计"""
+        with self._lock:
+            groups = self._groups(self.platform.view(), self._mask(account, None, mature_hours),
+                                  len(self.platforms), self.reads.view())
+            return self._named(self.platforms, groups, min_count)
+
+    def by_tag(self, account: Optional[str] = None, mature_hours: float = 72, min_count: int = 1) -> List[Dict]:
+        """按标签统计（一篇文章计入它的每个标签）"""
+        with self._lock:
+            rows = self.tag_row.view()
+            keep = self._mask(account, None, mature_hours)[rows]
+            groups = self._groups(self.tag_code.view(), keep, len(self.tags), self.reads.view()[rows])
+            return self._named(self.tags, groups, min_count)
+
+    def decay_curve(self, account: Optional[str] = None, horizon_hours: float = 168,
+                    edges=DECAY_EDGES) -> List[Dict]:
+        """发布后各时长的阅读量占比（相对该文章最近一次快照）
+
+        只使用最近一次快照时已发布超过 horizon_hours 的文章；每个时长取快照落在该分段的文章占比中位数。
+        返回 [{"hours": 分段上界, "fraction": 占比, "samples": 快照数}]
+        """
+        import numpy as np
+
+        with self._lock:
+            rows = self.snap_row.view()
+            ages = self.snap_age.view()
+            reads = self.snap_reads.view().astype(np.float64)
+            if not len(rows):
+                return []
+            # 每篇文章最近一次快照的时长与阅读量（快照按时间追加，同一行后出现的更新）
+            latest_age = np.zeros(len(self), dtype=np.float32)
+            latest_reads = np.zeros(len(self))
+            latest_age[rows] = ages
+            latest_reads[rows] = reads
+            keep = (latest_age[rows] >= horizon_hours) & (latest_reads[rows] > 0)
+            if account is not None:
+                keep &= self._mask(account)[rows]
+            fraction = np.minimum(reads[keep] / latest_reads[rows[keep]], 1.0)
+            buckets = np.searchsorted(np.asarray(edges, dtype=np.float32), ages[keep], side="right")
+        curve = []
+        order = np.argsort(buckets, kind="stable")
+        buckets, fraction = buckets[order], fraction[order]
+        bounds = np.searchsorted(buckets, np.arange(len(edges) + 1))
+        for index in range(len(edges)):
+            part = fraction[bounds[index]:bounds[index + 1]]
+            if len(part):
+                curve.append({"hours": edges[index], "fraction": float(np.median(part)), "samples": int(len(part))})
+        return curve
+
+    def recommend_windows(self, top: int = 3, account: Optional[str] = None, category: Optional[str] = None,
+                          prior: float = 5.0, min_articles: int = 20, mature_hours: float = 72) -> List[Dict]:
+        """推荐发布时段
+
+        每个时段的得分是对数阅读量均值，样本少的时段向同一小时（不分星期）的均值收缩：
+            score = (Σlog(1+reads) + prior·hour_mean) / (count + prior)
+        有效文章少于 min_articles 时返回空列表。
+        """
+        import numpy as np
+
+        stats = self.by_hour_of_week(account, category, mature_hours)
+        count = stats["count"].astype(np.float64)
+        if count.sum() < min_articles:
+            return []
+        log_total = stats["mean_log"] * count
+        overall = log_total.sum() / count.sum()
+        hour_count = count.sum(axis=0)
+        hour_mean = np.where(hour_count > 0, log_total.sum(axis=0) / np.maximum(hour_count, 1), overall)
+        hour_mean = (hour_mean * hour_count + overall * prior) / (hour_count + prior)
+        score = (log_total + prior * hour_mean[None, :]) / (count + prior)
+        order = np.argsort(-score, axis=None, kind="stable")[:top]
+        return [{"weekday": int(i // 24), "hour": int(i % 24), "score": float(score.flat[i]),
+                 "expected_reads": math.expm1(float(score.flat[i])), "count": int(count.flat[i])}
+                for i in order]
+
+    def next_publish_time(self, after: Optional[datetime] = None, account: Optional[str] = None,
+                          category: Optional[str] = None, top: int = 3,
+                          min_lead_minutes: int = 30) -> Optional[datetime]:
+        """推荐时段中最早的一个（至少在 min_lead_minutes 分钟之后）；数据不足时返回 None"""
+        windows = self.recommend_windows(top, account, category)
+        if not windows:
+            return None
+        earliest = (after or datetime.now()) + timedelta(minutes=min_lead_minutes)
+        start = earliest.replace(minute=0, second=0, microsecond=0)
+        if start < earliest:
+            start += timedelta(hours=1)
+        candidates = []
+        for window in windows:
+            days = (window["weekday"] - start.weekday()) % 7
+            slot = start.replace(hour=window["hour"]) + timedelta(days=days)
+            if slot < start:
+                slot += timedelta(days=7)
+            candidates.append(slot)
+        return min(candidates)
+
+    # ---------- 持久化 ----------
+
+    def save(self, path: Optional[Path] = None):
+        path = path or self.path
+        with self._lock:
+            data = {
+                "accounts": self.accounts.names,
+                "categories": self.categories.names,
+                "platforms": self.platforms.names,
+                "tags": self.tags.names,
+                "article_ids": self.article_ids,
+                "columns": {name: getattr(self, name).view().tolist() for name in self._COLUMNS},
+            }
+            self.dirty = False
+        serialization.write_file(path, data)
+
+    _COLUMNS = ("account", "published", "reads", "category", "platform", "last_snapshot",
+                "tag_row", "tag_code", "snap_row", "snap_age", "snap_reads")
+
+    def load(self, path: Optional[Path] = None):
+        import numpy as np
+
+        data = serialization.read_file(path or self.path)
+        with self._lock:
+            self._reset()
+            if not data:
+                return
+            self.accounts = _Vocab(data["accounts"])
+            self.categories = _Vocab(data["categories"])
+            self.platforms = _Vocab(data["platforms"])
+            self.tags = _Vocab(data["tags"])
+            self.article_ids = list(data["article_ids"])
+            for name in self._COLUMNS:
+                column = getattr(self, name)
+                setattr(self, name, _Column(column.view().dtype, data["columns"].get(name, [])))
+            self._rows = {(int(a), i): row for row, (a, i) in
+                          enumerate(zip(self.account.view().tolist(), self.article_ids))}
+            self._tagged = set(np.unique(self.tag_row.view()).tolist())
+
+    def flush(self):
+        """有改动时写回磁盘"""
+        if self.path is not None and self.dirty:
+            try:
+                self.save()
+            except Exception as e:
+                logger.error(f"保存文章统计失败: {str(e)}")
+
+
+async def ingest_accounts(accounts: Optional[List[Dict]] = None, analytics: Optional[ArticleAnalytics] = None,
+                          max_pages: int = 50, page_size: int = 20, concurrency: int = 4) -> Dict[str, int]:
+    """拉取多个账号（默认账号仓库中的全部账号）的历史文章写入统计库，返回 {账号名: 文章数}"""
+    from src.core.account_store import AccountStore, get_account_store
+    from src.core.article_fetcher import ArticleFetcher
+
+    accounts = accounts if accounts is not None else get_account_store().all()
+    analytics = analytics or get_analytics()
+    semaphore = asyncio.Semaphore(concurrency)
+    results: Dict[str, int] = {}
+
+    async def one(account: Dict):
+        name = account.get("name") or AccountStore.key_of(account)
+        async with semaphore:
+            try:
+                articles = await ArticleFetcher(account).fetch_history(max_pages, page_size)
+                results[name] = analytics.ingest(AccountStore.key_of(account), articles)
+            except Exception as e:
+                logger.error(f"拉取账号 {name} 的文章统计失败: {str(e)}")
+                results[name] = 0
+
+    await asyncio.gather(*(one(account) for account in accounts))
+    analytics.flush()
+    return results
+
+
+_analytics: Optional[ArticleAnalytics] = None
+_analytics_lock = threading.Lock()
+
+
+def get_analytics() -> ArticleAnalytics:
+    """进程内共享的文章统计库，首次使用时从磁盘加载"""
+    global _analytics
+    with _analytics_lock:
+        if _analytics is None:
+            try:
+                _analytics = ArticleAnalytics(STORE_FILE)
+            except Exception as e:
+                logger.error(f"加载文章统计失败: {str(e)}")
+                # 先把读不出的文件移开再从空库开始，否则第一次写回就会覆盖全部历史；移不开时只在内存中统计
+                safe = serialization.set_aside(serialization.binary_path(STORE_FILE))
+                _analytics = ArticleAnalytics(path=STORE_FILE if safe else None)
+        return _analytics
@@ -1,24 +1,174 @@
-import os
-import json
 import hashlib
 from datetime import datetime
+from html.parser import HTMLParser
 from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urljoin
 from loguru import logger
 import re
-from playwright.sync_api import sync_playwright
+from src.core.fetch_profiles import load_page, profile_for
+from src.core.rate_limiter import get_rate_limiter
+from src.core.text_normalizer import get_text_normalizer
+from src.utils import serialization
+
+# 收集正文容器中的图片地址（懒加载图片的真实地址在 data-src / data-original 中），须在移除 img 之前执行
+COLLECT_IMAGES = '''(selector) => {
+    const root = selector.split(",").map(s => document.querySelector(s.trim())).find(el => el) || document.body;
+    const urls = [];
+    root.querySelectorAll("img").forEach(img => {
+        const src = img.dataset.src || img.dataset.original || img.dataset.actualsrc || img.currentSrc || img.getAttribute("src");
+        if (!src || src.startsWith("data:")) return;
+        try { urls.push(new URL(src, location.href).href); } catch (e) {}
+    });
+    return urls;
+}'''
+
+_SPACES_RE = re.compile(r"\s+")
+# 正文容器的 class/id
+_MAIN_RE = re.compile(r"article-content|js_content|RichText|post-content|entry-content|article-body|^content$")
+_SKIP_TAGS = {"script", "style", "noscript", "nav", "header", "footer", "aside", "iframe", "svg", "form", "button"}
+_BLOCK_TAGS = {"p", "div", "section", "li", "h1", "h2", "h3", "h4", "h5", "h6", "blockquote", "pre", "br", "tr"}
+_VOID_TAGS = {"br", "img", "meta", "link", "input", "hr", "source", "wbr", "area", "base", "col", "embed"}
+
+
+def clean_content(content: str) -> str:
+    """清理正文：全角/半角折叠、去除零宽字符和套话行、统一标点、合并多余空行"""
+    try:
+        return get_text_normalizer().normalize(content)
+    except Exception as e:
+        logger.error(f"清理内容失败: {str(e)}")
+        return content
+
+
+class _TextExtractor(HTMLParser):
+    """从静态 HTML 中取标题、正文文本和图片地址；页面有正文容器时只取容器内的内容"""
+
+    def __init__(self, url: str = ""):
+        super().__init__(convert_charrefs=True)
+        self.url = url
+        self.title = ""
+        self._stack: List[tuple] = []   # (标签, 是否跳过, 是否正文容器)
+        self._skip = 0
+        self._main = 0
+        self._in_title = False
+        self._h1 = None
+        self.blocks: List[List[str]] = [[], []]   # [全部文本, 容器内文本]
+        self.images: List[List[str]] = [[], []]
+
+    def _newline(self):
+        for blocks in self.blocks:
+            if blocks and blocks[-1] != "\n":
+                blocks.append("\n")
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "img":
+            if not self._skip:
+                src = attrs.get("data-src") or attrs.get("data-original") or attrs.get("data-actualsrc") or attrs.get("src")
+                if src and not src.startswith("data:"):
+                    src = urljoin(self.url, src)
+                    self.images[0].append(src)
+                    if self._main:
+                        self.images[1].append(src)
+            return
+        if tag in _VOID_TAGS:
+            if tag == "br":
+                self._newline()
+            return
+        skip = tag in _SKIP_TAGS
+        main = tag == "article" or bool(_MAIN_RE.search(f"{attrs.get('class') or ''} {attrs.get('id') or ''}"))
+        self._stack.append((tag, skip, main))
+        self._skip += skip
+        self._main += main
+        if tag == "title":
+            self._in_title = True
+        elif tag == "h1" and self._h1 is None:
+            self._h1 = []
+        if tag in _BLOCK_TAGS:
+            self._newline()
+
+    def handle_endtag(self, tag):
+        if tag in _VOID_TAGS:
+            return
+        # 容错：跳过未闭合的标签
+        for index in range(len(self._stack) - 1, -1, -1):
+            if self._stack[index][0] == tag:
+                for _, skip, main in self._stack[index:]:
+                    self._skip -= skip
+                    self._main -= main
+                del self._stack[index:]
+                break
+        if tag == "title":
+            self._in_title = False
+        elif tag == "h1" and isinstance(self._h1, list):
+            self._h1 = "".join(self._h1).strip()
+        if tag in _BLOCK_TAGS:
+            self._newline()
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+            return
+        if self._skip:
+            return
+        if isinstance(self._h1, list):
+            self._h1.append(data)
+        text = _SPACES_RE.sub(" ", data)
+        if not text.strip():
+            text = " "
+        self.blocks[0].append(text)
+        if self._main:
+            self.blocks[1].append(text)
+
+    def result(self) -> Dict:
+        main = 1 if any(b.strip() for b in self.blocks[1]) else 0
+        lines = "".join(self.blocks[main]).split("\n")
+        content = "\n\n".join(line.strip() for line in lines if line.strip())
+        title = (self._h1 if isinstance(self._h1, str) and self._h1 else self.title).strip()
+        return {"title": title, "content": content, "images": list(dict.fromkeys(self.images[main]))}
+
+
+def extract_html(html: str, url: str = "") -> Dict:
+    """解析静态 HTML，返回 {"title", "content", "images"}"""
+    parser = _TextExtractor(url)
+    parser.feed(html or "")
+    parser.close()
+    return parser.result()
+
+
+def extract_document(html: str, url: str = "") -> Dict:
+    """批量提取的单篇处理：解析、清理，并提取关键词和相似度哈希（在进程池中执行）"""
+    from src.core.keywords import extract_keywords, simhash
+
+    article = extract_html(html, url)
+    article["content"] = clean_content(article["content"])
+    article["url"] = url
+    article["keywords"] = extract_keywords(article["content"]) if article["content"] else []
+    article["simhash"] = simhash(article["content"])
+    return article
+
 
 class ArticleProcessor:
-    def __init__(self):
+    def __init__(self, fetch_profile: str = None):
         self.temp_dir = Path("data/temp")
+        # 指定页面加载配置名称（如 "full"），默认按域名选择
+        self.fetch_profile = fetch_profile
         self.temp_dir.mkdir(parents=True, exist_ok=True)
         
     def extract_article(self, url):
         """提取文章内容"""
         try:
+            from playwright.sync_api import sync_playwright
+            
             with sync_playwright() as p:
                 browser = p.chromium.launch(headless=True)
-                page = browser.new_page()
-                page.goto(url, wait_until="networkidle")
+                context = browser.new_context()
+                page = context.new_page()
+                limiter = get_rate_limiter()
+                limiter.acquire_sync(url)
+                response, _ = load_page(context, page, url, profile_for(url, self.fetch_profile))
+                if response is not None:
+                    limiter.feedback(url, response.status, response.headers.get("retry-after"))
                 
                 # 根据不同平台使用不同的提取规则
                 if "toutiao.com" in url:
@@ -33,42 +183,103 @@ class ArticleProcessor:
                     content = self._extract_general(page)
                     
                 browser.close()
+                if content:
+                    content["content"] = clean_content(content["content"])
                 return content
                 
         except Exception as e:
             logger.error(f"提取文章失败: {str(e)}")
             return None
             
-    def save_temp_article(self, title, content, platform, original_url):
+    def extract_batch(self, urls: List[str], concurrency: int = 8) -> List[Optional[Dict]]:
+        """批量提取服务端渲染的页面：并发下载 HTML，在进程池中解析、清理、提取关键词和相似度哈希
+
+        没有提取到正文的页面（需要执行脚本才能渲染的站点）逐个退回浏览器提取；下载失败的返回 None。
+        """
+        from src.core.async_runtime import run_sync
+        from src.core.cpu_pool import get_cpu_pool
+
+        pages = run_sync(self._download_pages(urls, concurrency))
+        fetched = [(url, html) for url, html in zip(urls, pages) if html]
+        documents = get_cpu_pool().map_texts(extract_document, [html for _, html in fetched],
+                                             extras=[url for url, _ in fetched])
+        by_url = dict(zip([url for url, _ in fetched], documents))
+        results = []
+        for url in urls:
+            article = by_url.get(url)
+            if article is not None and not article["content"]:
+                article = self.extract_article(url)
+            results.append(article)
+        return results
+
+    async def _download_pages(self, urls: List[str], concurrency: int) -> List[Optional[str]]:
+        import asyncio
+        from src.core.http_client import create_client
+
+        semaphore = asyncio.Semaphore(concurrency)
+        headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
+
+        async with create_client(headers=headers, timeout=20.0, follow_redirects=True) as client:
+            async def one(url: str) -> Optional[str]:
+                async with semaphore:
+                    try:
+                        response = await client.get(url)
+                        if response.status_code == 200:
+                            return response.text
+                        logger.warning(f"下载页面失败 [{response.status_code}]: {url}")
+                    except Exception as e:
+                        logger.warning(f"下载页面失败: {url} {str(e)}")
+                    return None
+
+            return await asyncio.gather(*(one(url) for url in urls))
+
+    def save_temp_article(self, title, content, platform, original_url, images=None):
         """保存临时文章"""
         try:
             # 生成唯一文件名
             url_hash = hashlib.md5(original_url.encode()).hexdigest()[:8]
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{url_hash}_{timestamp}.json"
+            filename = f"{url_hash}_{timestamp}{serialization.BINARY_SUFFIX}"
             
             article_data = {
                 "title": title,
                 "content": content,
                 "platform": platform,
                 "original_url": original_url,
+                "images": images or [],
                 "created_at": datetime.now().isoformat(),
                 "status": "raw"  # raw, processed, published
             }
             
             filepath = self.temp_dir / filename
-            with open(filepath, "w", encoding="utf-8") as f:
-                json.dump(article_data, f, ensure_ascii=False, indent=2)
+            serialization.write_file(filepath, article_data)
                 
             return filepath
             
         except Exception as e:
             logger.error(f"保存临时文章失败: {str(e)}")
             return None
+
+    def load_temp_article(self, filepath):
+        """读取临时文章（兼容旧版本保存的 JSON 文件）"""
+        try:
+            return serialization.read_file(Path(filepath))
+        except Exception as e:
+            logger.error(f"读取临时文章失败: {str(e)}")
+            return None
+            
+    def _collect_images(self, page, selector):
+        """正文中的图片地址，发布时由图片处理下载并上传"""
+        try:
+            return page.evaluate(COLLECT_IMAGES, selector)
+        except Exception as e:
+            logger.error(f"收集图片失败: {str(e)}")
+            return []
             
     def _extract_toutiao(self, page):
         """提取今日头条文章"""
         title = page.evaluate('() => document.querySelector(".article-title").innerText')
+        images = self._collect_images(page, ".article-content")
         content = page.evaluate('''() => {
             const article = document.querySelector(".article-content");
             if (!article) return "";
@@ -79,11 +290,12 @@ class ArticleProcessor:
             // 获取纯文本
             return article.innerText.trim();
         }''')
-        return {"title": title, "content": content}
+        return {"title": title, "content": content, "images": images}
         
     def _extract_wechat(self, page):
         """提取微信公众号文章"""
         title = page.evaluate('() => document.querySelector("#activity-name").innerText')
+        images = self._collect_images(page, "#js_content")
         content = page.evaluate('''() => {
             const article = document.querySelector("#js_content");
             if (!article) return "";
@@ -94,11 +306,12 @@ class ArticleProcessor:
             // 获取纯文本
             return article.innerText.trim();
         }''')
-        return {"title": title, "content": content}
+        return {"title": title, "content": content, "images": images}
         
     def _extract_zhihu(self, page):
         """提取知乎文章"""
         title = page.evaluate('() => document.querySelector(".Post-Title").innerText')
+        images = self._collect_images(page, ".Post-RichText")
         content = page.evaluate('''() => {
             const article = document.querySelector(".Post-RichText");
             if (!article) return "";
@@ -109,11 +322,12 @@ class ArticleProcessor:
             // 获取纯文本
             return article.innerText.trim();
         }''')
-        return {"title": title, "content": content}
+        return {"title": title, "content": content, "images": images}
         
     def _extract_general(self, page):
         """通用文章提取"""
         title = page.evaluate('() => document.title')
+        images = self._collect_images(page, "article, .article, .post, main")
         content = page.evaluate('''() => {
             // 移除常见的无关元素
             document.querySelectorAll("nav, header, footer, aside, script, style, iframe, img, video").forEach(el => el.remove());
@@ -123,4 +337,22 @@ class ArticleProcessor:
                           document.querySelector(".article") || 
                           document.querySelector(".post") || 
                           document.querySelector("main") || 
-                          document.body;
\ No newline at end of file
+                          document.body;
+            
+            return article.innerText.trim();
+        }''')
+        return {"title": title, "content": content, "images": images}
+        
+    def _extract_weibo(self, page):
+        """提取微博内容"""
+        title = page.evaluate('() => document.title')
+        images = self._collect_images(page, ".detail_wbtext_4CRf9, .WB_text")
+        content = page.evaluate('''() => {
+            const article = document.querySelector(".detail_wbtext_4CRf9") ||
+                          document.querySelector(".WB_text");
+            if (!article) return "";
+            
+            // 获取纯文本
+            return article.innerText.trim();
+        }''')
+        return {"title": title, "content": content, "images": images}
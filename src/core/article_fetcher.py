@@ -1,8 +1,8 @@
-import httpx
 from loguru import logger
 import time
-from typing import Dict
-import json
+from typing import Dict, List
+from src.core.session_manager import get_session_manager
+from src.utils.log_setup import log_http
 
 class ArticleFetcher:
     def __init__(self, account_data: Dict):
@@ -30,32 +30,39 @@ class ArticleFetcher:
                 "_signature": ""
             }
             
-            logger.debug(f"Fetching articles with params: {params}")
+            # 使用账号的共享会话，cookie由会话管理器维护
+            sessions = get_session_manager()
+            client = await sessions.client(self.account_data)
+            url = f"{self.base_url}/api/article/article_list"
+            response = await client.get(url, params=params, headers=self.headers)
+            sessions.persist(sessions.session_for(self.account_data))
             
-            # 添加cookie到headers
-            cookies = self.account_data.get("cookies", {})
-            cookie_str = "; ".join([f"{k}={v}" for k, v in cookies.items()])
+            log_http("文章列表响应", status=response.status_code, body=lambda: response.text,
+                     page=page, page_size=page_size)
             
-            async with httpx.AsyncClient(headers={**self.headers, "Cookie": cookie_str}) as client:
-                url = f"{self.base_url}/api/article/article_list"
-                response = await client.get(url, params=params)
-                
-                logger.debug(f"Response status: {response.status_code}")
-                logger.debug(f"Response text: {response.text}")
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    if result.get("message") == "success":
-                        return {
-                            "articles": result["data"]["articles"],
-                            "total": result["data"]["total"],
-                            "has_more": result["data"]["has_more"]
-                        }
-                    else:
-                        raise Exception(f"API返回错误: {result.get('message')}")
+            if response.status_code == 200:
+                result = response.json()
+                if result.get("message") == "success":
+                    return {
+                        "articles": result["data"]["articles"],
+                        "total": result["data"]["total"],
+                        "has_more": result["data"]["has_more"]
+                    }
                 else:
-                    raise Exception(f"请求失败: {response.status_code}")
-                    
+                    raise Exception(f"API返回错误: {result.get('message')}")
+            else:
+                raise Exception(f"请求失败: {response.status_code}")
+                
         except Exception as e:
             logger.error(f"获取文章列表失败: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+
+    async def fetch_history(self, max_pages: int = 50, page_size: int = 20) -> List[Dict]:
+        """翻页拉取已发布文章，直到没有更多或达到页数上限"""
+        articles: List[Dict] = []
+        for page in range(1, max_pages + 1):
+            result = await self.fetch_articles(page, page_size)
+            articles.extend(result.get("articles", []))
+            if not result.get("has_more"):
+                break
+        return articles
@@ -0,0 +1,249 @@
+"""文章版本库：保存原文、改写稿和发布稿的每一个版本
+
+每篇文章一个目录 data/versions/<key>/:
+    index.bin   版本元数据（版本号、类型、时间、在 blob 中的位置等）
+    blob.bin    只追加的数据文件，存放压缩后的关键帧或增量
+
+存储方式类似视频编码的关键帧：
+- 关键帧保存全文（zlib 压缩）
+- 其余版本只保存相对上一版本的增量：按句子比较，相同的句子记为对上一版本的区间引用，
+  只有新增/改写的句子以文本保存，并以上一版本的文本作为 zlib 预置字典压缩
+- 每隔 keyframe_interval 个版本、或增量不比全文小多少时写一个关键帧，
+  因此还原任意版本最多回放 keyframe_interval - 1 个增量
+反复改写时每个版本只增加改动部分的大小，存储随版本数亚线性增长。
+"""
+import hashlib
+import json
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from loguru import logger
+
+from src.utils import serialization
+
+# 版本类型
+RAW, REWRITTEN, PUBLISHED = "raw", "rewritten", "published"
+
+# 按句末标点或换行切分，保留分隔符，拼接后与原文完全一致
+_SENTENCE_RE = re.compile(r"[^。！？!?；;\n]*(?:[。！？!?；;]+[”」』）)]*|\n|$)")
+_KEY_RE = re.compile(r"[^\w\-.]")
+_ZDICT_SIZE = 32768
+
+
+def split_sentences(text: str) -> List[str]:
+    return [s for s in _SENTENCE_RE.findall(text) if s]
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def encode_delta(old: str, new: str) -> bytes:
+    """计算 old -> new 的增量并压缩
+
+    增量为 JSON 数组，每项是 [起, 止]（复制上一版本第 起..止 句）或字符串（新文本）。
+    """
+    old_parts, new_parts = split_sentences(old), split_sentences(new)
+    ops = []
+    matcher = SequenceMatcher(None, old_parts, new_parts, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append([i1, i2])
+        elif tag in ("replace", "insert"):
+            ops.append("".join(new_parts[j1:j2]))
+    payload = json.dumps(ops, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    compressor = zlib.compressobj(9, zdict=old.encode("utf-8")[-_ZDICT_SIZE:] or b"\0")
+    return compressor.compress(payload) + compressor.flush()
+
+
+def apply_delta(old: str, delta: bytes) -> str:
+    decompressor = zlib.decompressobj(zdict=old.encode("utf-8")[-_ZDICT_SIZE:] or b"\0")
+    ops = json.loads(decompressor.decompress(delta) + decompressor.flush())
+    old_parts = split_sentences(old)
+    return "".join("".join(old_parts[op[0]:op[1]]) if isinstance(op, list) else op for op in ops)
+
+
+def encode_keyframe(text: str) -> bytes:
+    return zlib.compress(text.encode("utf-8"), 9)
+
+
+def decode_keyframe(data: bytes) -> str:
+    return zlib.decompress(data).decode("utf-8")
+
+
+class VersionStore:
+    """按文章保存版本（线程安全）"""
+
+    def __init__(self, root: Path = Path("data/versions"), keyframe_interval: int = 16,
+                 cache_size: int = 64):
+        self.root = Path(root)
+        self.keyframe_interval = keyframe_interval
+        self.cache_size = cache_size
+        self._lock = threading.RLock()
+        self._indexes: Dict[str, Dict] = {}
+        # (key, 版本号) -> 全文，最近还原/写入的版本，顺序读取和连续写入时免去回放
+        self._texts: "OrderedDict[tuple, str]" = OrderedDict()
+
+    # ---------- 存储 ----------
+
+    def _dir(self, key: str) -> Path:
+        return self.root / _KEY_RE.sub("_", key)[:120]
+
+    def _index(self, key: str) -> Dict:
+        index = self._indexes.get(key)
+        if index is None:
+            directory = self._dir(key)
+            index = serialization.load_migrating(directory / "index.bin", directory / "index.json")
+            if index is None:
+                index = {"key": key, "versions": []}
+            self._indexes[key] = index
+        return index
+
+    def _read(self, key: str, version: Dict) -> bytes:
+        with open(self._dir(key) / "blob.bin", "rb") as f:
+            f.seek(version["offset"])
+            return f.read(version["length"])
+
+    def _remember(self, key: str, rev: int, text: str):
+        self._texts[(key, rev)] = text
+        self._texts.move_to_end((key, rev))
+        while len(self._texts) > self.cache_size:
+            self._texts.popitem(last=False)
+
+    # ---------- 写入 ----------
+
+    def add(self, key: str, content: str, kind: str = REWRITTEN, **meta) -> int:
+        """保存新版本，返回版本号（从 1 开始）；与最新版本内容相同时不重复保存"""
+        content = content or ""
+        try:
+            with self._lock:
+                index = self._index(key)
+                versions = index["versions"]
+                digest = _digest(content)
+                if versions and versions[-1]["sha1"] == digest and versions[-1]["kind"] == kind:
+                    return versions[-1]["rev"]
+
+                rev = len(versions) + 1
+                keyframe = encode_keyframe(content)
+                data, is_keyframe = keyframe, True
+                if versions and (rev - 1) % self.keyframe_interval:
+                    delta = encode_delta(self._get(key, rev - 1), content)
+                    # 改动太大时增量不划算，直接写关键帧
+                    if len(delta) < len(keyframe) * 0.7:
+                        data, is_keyframe = delta, False
+
+                directory = self._dir(key)
+                directory.mkdir(parents=True, exist_ok=True)
+                with open(directory / "blob.bin", "ab") as f:
+                    offset = f.tell()
+                    f.write(data)
+                    f.flush()
+                versions.append({
+                    "rev": rev,
+                    "kind": kind,
+                    "keyframe": is_keyframe,
+                    "offset": offset,
+                    "length": len(data),
+                    "size": len(content.encode("utf-8")),
+                    "sha1": digest,
+                    "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+                    "meta": meta,
+                })
+                serialization.write_file(directory / "index.bin", index)
+                self._remember(key, rev, content)
+                return rev
+        except Exception as e:
+            logger.error(f"保存文章版本失败: {str(e)}")
+            return 0
+
+    # ---------- 读取 ----------
+
+    def _get(self, key: str, rev: int) -> str:
+        cached = self._texts.get((key, rev))
+        if cached is not None:
+            self._texts.move_to_end((key, rev))
+            return cached
+        versions = self._index(key)["versions"]
+        # 向前找到最近的关键帧（或缓存中的版本），再依次回放增量
+        start = rev
+        text = None
+        while start >= 1:
+            cached = self._texts.get((key, start))
+            if cached is not None:
+                text = cached
+                break
+            if versions[start - 1]["keyframe"]:
+                text = decode_keyframe(self._read(key, versions[start - 1]))
+                break
+            start -= 1
+        for current in range(start + 1, rev + 1):
+            text = apply_delta(text, self._read(key, versions[current - 1]))
+        self._remember(key, rev, text)
+        return text
+
+    def get(self, key: str, rev: Optional[int] = None) -> Optional[str]:
+        """还原指定版本（默认最新版本）的全文"""
+        try:
+            with self._lock:
+                versions = self._index(key)["versions"]
+                if not versions:
+                    return None
+                rev = rev or len(versions)
+                if not 1 <= rev <= len(versions):
+                    return None
+                return self._get(key, rev)
+        except Exception as e:
+            logger.error(f"读取文章版本失败: {str(e)}")
+            return None
+
+    def latest(self, key: str, kind: Optional[str] = None) -> Optional[int]:
+        """最新版本号（可按类型筛选）"""
+        with self._lock:
+            for version in reversed(self._index(key)["versions"]):
+                if kind is None or version["kind"] == kind:
+                    return version["rev"]
+        return None
+
+    def find(self, key: str, content: str) -> Optional[int]:
+        """内容与某个已保存版本相同时返回其版本号（只比较摘要，不还原全文）"""
+        digest = _digest(content or "")
+        with self._lock:
+            for version in reversed(self._index(key)["versions"]):
+                if version["sha1"] == digest:
+                    return version["rev"]
+        return None
+
+    def history(self, key: str) -> List[Dict]:
+        """全部版本的元数据"""
+        with self._lock:
+            return [dict(v) for v in self._index(key)["versions"]]
+
+    def stats(self, key: str) -> Dict:
+        """版本数、实际占用与全文累计大小"""
+        with self._lock:
+            versions = self._index(key)["versions"]
+            return {
+                "versions": len(versions),
+                "keyframes": sum(1 for v in versions if v["keyframe"]),
+                "stored_bytes": sum(v["length"] for v in versions),
+                "content_bytes": sum(v["size"] for v in versions),
+            }
+
+
+_store: Optional[VersionStore] = None
+_store_lock = threading.Lock()
+
+
+def get_version_store() -> VersionStore:
+    """进程内共享的版本库"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = VersionStore()
+        return _store
@@ -0,0 +1,108 @@
+from loguru import logger
+import asyncio
+import atexit
+import concurrent.futures
+import threading
+from typing import Awaitable, Callable, List, Optional
+from src.core.cancel import Cancelled, CancelToken
+
+class AsyncRuntime:
+    """后台常驻事件循环
+
+    工作线程通过 run_sync 把协程提交到同一个循环上执行，
+    这样连接池、会话等与事件循环绑定的对象可以在多次调用之间复用。
+    """
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._shutdown_hooks: List[Callable[[], Awaitable]] = []
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """获取（必要时启动）后台事件循环"""
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                ready = threading.Event()
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._run, args=(self._loop, ready),
+                    name="async-runtime", daemon=True
+                )
+                self._thread.start()
+                ready.wait()
+            return self._loop
+
+    @staticmethod
+    def _run(loop: asyncio.AbstractEventLoop, ready: threading.Event):
+        asyncio.set_event_loop(loop)
+        loop.call_soon(ready.set)
+        loop.run_forever()
+
+    def in_runtime(self) -> bool:
+        """当前线程是否就是后台循环线程"""
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def run_sync(self, coro, timeout: Optional[float] = None, token: Optional[CancelToken] = None):
+        """在后台循环中执行协程并阻塞等待结果（供 QThread 等工作线程调用）
+
+        传入 token 时，取消令牌会立即取消循环中的任务，本调用抛出 Cancelled。
+        """
+        if self.in_runtime():
+            coro.close()
+            raise RuntimeError("不能在后台事件循环线程内同步等待协程")
+        if token is not None and token.cancelled:
+            coro.close()
+            raise Cancelled()
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        if token is None:
+            return future.result(timeout)
+        token.on_cancel(future.cancel)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.CancelledError:
+            raise Cancelled()
+        finally:
+            token.remove_callback(future.cancel)
+
+    def submit(self, coro):
+        """提交协程但不等待，返回 concurrent.futures.Future"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def add_shutdown_hook(self, hook: Callable[[], Awaitable]):
+        """注册退出时在后台循环中执行的清理协程（如关闭连接池）"""
+        self._shutdown_hooks.append(hook)
+
+    def shutdown(self, timeout: float = 5.0):
+        """执行清理钩子并停止循环"""
+        with self._lock:
+            loop = self._loop
+            self._loop = None
+        if loop is None or loop.is_closed():
+            return
+
+        async def _cleanup():
+            for hook in self._shutdown_hooks:
+                try:
+                    await hook()
+                except Exception as e:
+                    logger.error(f"执行退出清理失败: {str(e)}")
+
+        try:
+            asyncio.run_coroutine_threadsafe(_cleanup(), loop).result(timeout)
+        except Exception as e:
+            logger.error(f"关闭后台事件循环失败: {str(e)}")
+        loop.call_soon_threadsafe(loop.stop)
+        if self._thread:
+            self._thread.join(timeout)
+        if not loop.is_running():
+            loop.close()
+
+# 全局单例
+runtime = AsyncRuntime()
+atexit.register(runtime.shutdown)
+
+def run_sync(coro, timeout: Optional[float] = None, token: Optional[CancelToken] = None):
+    """在共享事件循环中执行协程"""
+    return runtime.run_sync(coro, timeout, token)
@@ -0,0 +1,78 @@
+"""协作式取消
+
+工作线程持有 CancelToken，界面线程调用 cancel() 后立即返回，不再 wait() 等待线程结束。
+真正中断进行中的操作靠注册的回调：取消后台事件循环中的任务（HTTP 请求、Playwright 页面加载等），
+任务在 finally 中关闭连接和浏览器，因此不会留下仍在运行的孤儿请求。
+"""
+import threading
+from typing import Callable, List, Optional
+
+from loguru import logger
+
+
+class Cancelled(Exception):
+    """任务已被取消"""
+
+
+class CancelToken:
+    """线程安全的取消令牌，可以派生子令牌（父令牌取消时子令牌一并取消）
+
+    子令牌用完后（任务结束或被取消）调用 detach() 从父令牌注销，
+    否则长期存在的父令牌会一直持有每个子令牌的回调。
+    """
+
+    def __init__(self, parent: Optional["CancelToken"] = None):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+        self._parent = parent
+        if parent is not None:
+            parent.on_cancel(self.cancel)
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def child(self) -> "CancelToken":
+        return CancelToken(self)
+
+    def cancel(self):
+        """取消并依次执行回调（只执行一次）"""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        self.detach()
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"执行取消回调失败: {str(e)}")
+
+    def on_cancel(self, callback: Callable[[], None]):
+        """注册取消回调；已经取消时立即执行"""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def detach(self):
+        """从父令牌注销（之后父令牌取消不再影响本令牌）"""
+        parent, self._parent = self._parent, None
+        if parent is not None:
+            parent.remove_callback(self.cancel)
+
+    def remove_callback(self, callback: Callable[[], None]):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise Cancelled()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """可被取消打断的等待，返回是否已取消"""
+        return self._event.wait(timeout)
@@ -0,0 +1,285 @@
+"""HTTP 录制/回放（cassette）：在 httpx 传输层记录真实响应及耗时，离线回放用于性能分析
+
+所有通过 create_client 创建的客户端（热榜、AI、发布、登录、文章列表、Token 校验等）都会经过这里。
+模式：
+    off      直接访问网络（默认）
+    record   访问网络并记录每个请求的响应、首字节时间和总耗时
+    replay   只从记录中回放，找不到匹配的请求时报错
+    auto     有记录的回放，没有的访问网络并补录
+
+请求按 方法 + URL（去掉 _signature、end_time 等每次都变的参数，其余参数排序）+ 请求体摘要 匹配，
+JSON 请求体按键排序后计算摘要；同一请求被记录多次时按顺序依次回放，回放完后重复最后一条。
+回放耗时按 speed 缩放：1 为原始耗时，10 为快 10 倍，0 为不等待。
+
+开关在 config/config.json 的 "cassette" 节中，也可以用环境变量覆盖：
+    TOUTIAO_CASSETTE_MODE=replay TOUTIAO_CASSETTE_PATH=data/cassettes/hot.cas TOUTIAO_CASSETTE_SPEED=0
+记录文件用 msgpack+zstd 保存（不可用时响应体转为 base64），只保存响应，不保存请求头和 Cookie。
+"""
+import asyncio
+import atexit
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from loguru import logger
+
+from src.utils import serialization
+
+CONFIG_FILE = Path("config/config.json")
+DEFAULT_PATH = Path("data/cassettes/session.cas")
+
+OFF = "off"
+RECORD = "record"
+REPLAY = "replay"
+AUTO = "auto"
+MODES = (OFF, RECORD, REPLAY, AUTO)
+
+# 每次请求都会变化、不参与匹配的查询参数
+IGNORED_PARAMS = {"_signature", "end_time", "_", "t", "ts", "timestamp", "nonce"}
+
+
+class CassetteMiss(Exception):
+    """回放模式下没有找到匹配的记录"""
+
+
+def _body_digest(content: bytes) -> str:
+    if not content:
+        return ""
+    try:
+        content = json.dumps(json.loads(content), sort_keys=True, ensure_ascii=False).encode("utf-8")
+    except (ValueError, UnicodeDecodeError):
+        pass
+    return hashlib.sha1(content).hexdigest()
+
+
+class Cassette:
+    """一组记录的请求/响应"""
+
+    def __init__(self, path: Optional[Path] = DEFAULT_PATH, mode: str = REPLAY, speed: float = 1.0,
+                 ignored_params=IGNORED_PARAMS):
+        if mode not in MODES:
+            raise ValueError(f"未知的录制模式: {mode}")
+        self.path = Path(path) if path is not None else None
+        self.mode = mode
+        self.speed = speed
+        self.ignored_params = set(ignored_params)
+        self.interactions: List[Dict] = []
+        self.dirty = False
+        self._index: Dict[str, List[int]] = {}
+        self._cursor: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        if self.path is not None and self.path.exists() and mode != RECORD:
+            self.load()
+
+    # ---------- 匹配 ----------
+
+    def key(self, method: str, url: str, content: bytes = b"") -> str:
+        parts = urlsplit(str(url))
+        query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                       if k not in self.ignored_params)
+        url = urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ""))
+        return f"{method.upper()} {url} {_body_digest(content)}"
+
+    def take(self, key: str) -> Optional[Dict]:
+        """按记录顺序取下一条匹配的响应"""
+        with self._lock:
+            positions = self._index.get(key)
+            if not positions:
+                return None
+            cursor = self._cursor.get(key, 0)
+            self._cursor[key] = cursor + 1
+            return self.interactions[positions[min(cursor, len(positions) - 1)]]
+
+    def add(self, key: str, status: int, headers: List, body: bytes, ttfb: float, elapsed: float):
+        with self._lock:
+            self._index.setdefault(key, []).append(len(self.interactions))
+            self.interactions.append({"key": key, "status": status, "headers": headers, "body": body,
+                                      "ttfb": ttfb, "elapsed": elapsed, "recorded_at": time.time()})
+            self.dirty = True
+
+    def rewind(self):
+        """回放位置回到开头"""
+        with self._lock:
+            self._cursor.clear()
+
+    def delay(self, seconds: float) -> float:
+        return seconds / self.speed if self.speed > 0 else 0.0
+
+    # ---------- 持久化 ----------
+
+    @staticmethod
+    def _codec() -> Optional[str]:
+        # msgpack 可以直接保存字节串
+        return "msgpack+zstd" if "msgpack+zstd" in serialization.available_codecs() else None
+
+    def save(self, path: Optional[Path] = None):
+        path = Path(path or self.path)
+        codec = self._codec()
+        with self._lock:
+            interactions = [dict(i, body=i["body"] if codec else base64.b64encode(i["body"]).decode("ascii"))
+                            for i in self.interactions]
+            self.dirty = False
+        serialization.write_file(path, {"version": 1, "base64": codec is None,
+                                        "interactions": interactions}, codec)
+        logger.info(f"已保存 {len(interactions)} 条 HTTP 记录到 {path}")
+
+    def load(self, path: Optional[Path] = None):
+        data = serialization.read_file(path or self.path, default={}) or {}
+        encoded = data.get("base64", False)
+        with self._lock:
+            self.interactions = []
+            self._index = {}
+            self._cursor = {}
+            for item in data.get("interactions", []):
+                if encoded:
+                    item["body"] = base64.b64decode(item["body"])
+                self._index.setdefault(item["key"], []).append(len(self.interactions))
+                self.interactions.append(item)
+
+    def flush(self):
+        if self.path is not None and self.dirty:
+            try:
+                self.save()
+            except Exception as e:
+                logger.error(f"保存 HTTP 记录失败: {str(e)}")
+
+    # ---------- 传输层 ----------
+
+    def transport(self, inner=None):
+        """httpx 传输层，包装真实传输层；inner 为空时按需创建默认的 httpx.AsyncHTTPTransport"""
+        global _transport_class
+        if _transport_class is None:
+            _transport_class = _define_transport()
+        return _transport_class(self, inner)
+
+
+_transport_class = None
+
+
+def _define_transport():
+    """定义传输层类（httpx 按需导入）"""
+    import httpx
+
+    class DelayedStream(httpx.AsyncByteStream):
+        """回放的响应体：先等待首字节之后的传输时间，再一次性给出内容"""
+
+        def __init__(self, body: bytes, delay: float):
+            self.body = body
+            self.delay = delay
+
+        async def __aiter__(self):
+            if self.delay > 0:
+                await asyncio.sleep(self.delay)
+            yield self.body
+
+    class Transport(httpx.AsyncBaseTransport):
+        def __init__(self, cassette: Cassette, inner=None):
+            self.cassette = cassette
+            self.inner = inner
+
+        async def handle_async_request(self, request):
+            cassette = self.cassette
+            content = await request.aread()
+            key = cassette.key(request.method, request.url, content)
+            if cassette.mode in (REPLAY, AUTO):
+                hit = cassette.take(key)
+                if hit is not None:
+                    ttfb = cassette.delay(hit["ttfb"])
+                    if ttfb > 0:
+                        await asyncio.sleep(ttfb)
+                    stream = DelayedStream(hit["body"], cassette.delay(hit["elapsed"] - hit["ttfb"]))
+                    return httpx.Response(hit["status"], headers=hit["headers"], stream=stream,
+                                          request=request, extensions={"cassette": "replay"})
+                if cassette.mode == REPLAY:
+                    raise CassetteMiss(f"回放记录中没有匹配的请求: {request.method} {request.url}")
+
+            if self.inner is None:
+                self.inner = httpx.AsyncHTTPTransport()
+            start = time.perf_counter()
+            response = await self.inner.handle_async_request(request)
+            ttfb = time.perf_counter() - start
+            try:
+                # 读取原始字节（不解压），回放时由客户端按 Content-Encoding 解码
+                body = b"".join([chunk async for chunk in response.stream])
+            finally:
+                await response.aclose()
+            elapsed = time.perf_counter() - start
+            headers = list(response.headers.raw)
+            cassette.add(key, response.status_code, headers, body, ttfb, elapsed)
+            return httpx.Response(response.status_code, headers=headers, content=body,
+                                  request=request, extensions=response.extensions)
+
+        async def aclose(self):
+            if self.inner is not None:
+                await self.inner.aclose()
+
+    return Transport
+
+
+# ---------- 全局开关 ----------
+
+_cassette: Optional[Cassette] = None
+_configured = False
+_cassette_lock = threading.Lock()
+
+
+def _load_config() -> Dict:
+    config = {}
+    try:
+        if CONFIG_FILE.exists():
+            config = dict(json.loads(CONFIG_FILE.read_text(encoding="utf-8")).get("cassette", {}))
+    except Exception as e:
+        logger.error(f"读取录制配置失败: {str(e)}")
+    for key, env in (("mode", "TOUTIAO_CASSETTE_MODE"), ("path", "TOUTIAO_CASSETTE_PATH"),
+                     ("speed", "TOUTIAO_CASSETTE_SPEED")):
+        if os.environ.get(env):
+            config[key] = os.environ[env]
+    return config
+
+
+def get_cassette() -> Optional[Cassette]:
+    """按配置创建的全局记录；模式为 off 时返回 None"""
+    global _cassette, _configured
+    with _cassette_lock:
+        if not _configured:
+            _configured = True
+            config = _load_config()
+            mode = config.get("mode", OFF)
+            if mode != OFF:
+                try:
+                    _cassette = Cassette(config.get("path") or DEFAULT_PATH, mode, float(config.get("speed", 1.0)))
+                    if mode in (RECORD, AUTO):
+                        atexit.register(_cassette.flush)
+                    logger.info(f"HTTP 录制模式: {mode}，记录文件 {_cassette.path}")
+                except Exception as e:
+                    logger.error(f"初始化 HTTP 录制失败: {str(e)}")
+        return _cassette
+
+
+def set_cassette(cassette: Optional[Cassette]):
+    """替换全局记录（None 表示关闭），之后创建的客户端生效"""
+    global _cassette, _configured
+    with _cassette_lock:
+        _cassette = cassette
+        _configured = True
+
+
+@contextmanager
+def use_cassette(path: Optional[Path], mode: str = REPLAY, speed: float = 1.0):
+    """在 with 块内启用录制/回放，退出时保存新记录并恢复原来的设置"""
+    previous = get_cassette()
+    cassette = Cassette(path, mode, speed)
+    set_cassette(cassette)
+    try:
+        yield cassette
+    finally:
+        set_cassette(previous)
+        if mode in (RECORD, AUTO):
+            cassette.flush()
@@ -0,0 +1,198 @@
+"""CPU 密集任务的进程池：HTML 解析、正文清理、关键词提取、相似度哈希、图片转码
+
+这些步骤在 QThread 或共享事件循环里执行时与界面线程争用 GIL，单次正则替换处理大页面时
+整个调用期间都不会释放 GIL，界面会明显卡顿。放到子进程后只有传参和取结果占用本进程。
+
+    pool = get_cpu_pool()
+    pool.call(clean_content, text)               # 工作线程中同步调用
+    await pool.run(extract_keywords, text, 8)    # 协程中调用
+    pool.map_texts(extract_document, pages)      # 批量处理文本
+
+map_texts 在文本总量超过 SHARED_THRESHOLD 时把所有文本编码后写入一块共享内存，
+任务只携带 (起点, 终点) 偏移，子进程直接从共享内存解码，不再逐篇序列化；
+数据量小时按批 pickle 传递。任务函数必须是模块级函数（子进程按名称导入）。
+
+进程数默认为可用核心数减一（至少 1 个），给界面线程留出一个核心；workers=0 时在调用线程中直接执行。
+子进程用 forkserver/spawn 启动，不 fork 已经运行 Qt 和事件循环线程的主进程。
+"""
+import asyncio
+import atexit
+import os
+import threading
+from typing import Callable, List, Optional, Sequence
+
+from loguru import logger
+
+SHARED_THRESHOLD = 256 * 1024   # 文本总字节数超过此值时经共享内存传递
+MAX_WORKERS = 8
+
+
+def available_cores() -> int:
+    """当前进程可用的核心数（考虑 CPU 亲和性限制）"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _run_batch(func: Callable, items: Sequence, extras: Optional[Sequence]) -> List:
+    if extras is None:
+        return [func(item) for item in items]
+    return [func(item, extra) for item, extra in zip(items, extras)]
+
+
+def _run_shared(func: Callable, name: str, spans: Sequence, extras: Optional[Sequence]) -> List:
+    """子进程中：从共享内存按偏移解码文本后处理"""
+    from multiprocessing import shared_memory
+
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        buffer = block.buf
+        texts = [bytes(buffer[start:end]).decode("utf-8") for start, end in spans]
+        del buffer  # 关闭前必须释放对共享内存的引用
+    finally:
+        block.close()
+    return _run_batch(func, texts, extras)
+
+
+def _chunks(count: int, sizes: Sequence[int], parts: int) -> List[range]:
+    """按数据量把 count 个元素切成约 parts 段连续区间"""
+    total = sum(sizes) or 1
+    target = total / parts
+    chunks, start, acc = [], 0, 0
+    for index, size in enumerate(sizes):
+        acc += size
+        if acc >= target and index + 1 < count:
+            chunks.append(range(start, index + 1))
+            start, acc = index + 1, 0
+    chunks.append(range(start, count))
+    return [c for c in chunks if len(c)]
+
+
+class CpuPool:
+    """按需启动的进程池"""
+
+    def __init__(self, workers: Optional[int] = None):
+        if workers is None:
+            workers = min(MAX_WORKERS, max(1, available_cores() - 1))
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self):
+        with self._lock:
+            if self._executor is None and self.workers > 0:
+                import multiprocessing
+                from concurrent.futures import ProcessPoolExecutor
+
+                method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+                self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                     mp_context=multiprocessing.get_context(method))
+            return self._executor
+
+    def _reset(self, error: Exception):
+        """子进程异常退出后丢弃进程池，下次调用时重建"""
+        logger.error(f"进程池失效，将重新创建: {str(error)}")
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def call(self, func: Callable, *args):
+        """在子进程中执行并等待结果（供工作线程调用）"""
+        from concurrent.futures.process import BrokenProcessPool
+
+        executor = self.executor
+        if executor is None:
+            return func(*args)
+        try:
+            return executor.submit(func, *args).result()
+        except BrokenProcessPool as e:
+            self._reset(e)
+            raise
+
+    async def run(self, func: Callable, *args):
+        """在子进程中执行，不阻塞事件循环"""
+        from concurrent.futures.process import BrokenProcessPool
+
+        loop = asyncio.get_running_loop()
+        executor = self.executor
+        if executor is None:
+            return await loop.run_in_executor(None, lambda: func(*args))
+        try:
+            return await loop.run_in_executor(executor, func, *args)
+        except BrokenProcessPool as e:
+            self._reset(e)
+            raise
+
+    def map(self, func: Callable, items: Sequence, extras: Optional[Sequence] = None) -> List:
+        """批量处理：func(item) 或 func(item, extra)，按数据量分成若干批 pickle 传给子进程"""
+        items = list(items)
+        executor = self.executor
+        if executor is None or len(items) <= 1:
+            return _run_batch(func, items, extras)
+        sizes = [len(item) if isinstance(item, (str, bytes)) else 1 for item in items]
+        futures = [executor.submit(_run_batch, func, [items[i] for i in chunk],
+                                   None if extras is None else [extras[i] for i in chunk])
+                   for chunk in _chunks(len(items), sizes, self.workers * 4)]
+        return self._gather(futures)
+
+    def map_texts(self, func: Callable, texts: Sequence[str], extras: Optional[Sequence] = None) -> List:
+        """批量处理文本；总量较大时经共享内存传递，结果按原顺序返回"""
+        texts = list(texts)
+        executor = self.executor
+        encoded = [text.encode("utf-8") for text in texts]
+        total = sum(len(data) for data in encoded)
+        if executor is None or len(texts) <= 1 or total < SHARED_THRESHOLD:
+            return self.map(func, texts, extras)
+
+        from multiprocessing import shared_memory
+
+        block = shared_memory.SharedMemory(create=True, size=total)
+        try:
+            spans, offset = [], 0
+            for data in encoded:
+                block.buf[offset:offset + len(data)] = data
+                spans.append((offset, offset + len(data)))
+                offset += len(data)
+            del encoded
+            futures = [executor.submit(_run_shared, func, block.name, [spans[i] for i in chunk],
+                                       None if extras is None else [extras[i] for i in chunk])
+                       for chunk in _chunks(len(texts), [end - start for start, end in spans], self.workers * 4)]
+            return self._gather(futures)
+        finally:
+            block.close()
+            block.unlink()
+
+    def _gather(self, futures) -> List:
+        from concurrent.futures.process import BrokenProcessPool
+
+        results = []
+        try:
+            for future in futures:
+                results.extend(future.result())
+        except BrokenProcessPool as e:
+            self._reset(e)
+            raise
+        return results
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+_pool: Optional[CpuPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_cpu_pool() -> CpuPool:
+    """进程内共享的进程池"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = CpuPool()
+            atexit.register(_pool.shutdown)
+        return _pool
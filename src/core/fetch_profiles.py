@@ -0,0 +1,264 @@
+"""Playwright 页面加载配置
+
+只需要正文文本时，图片、视频、字体和第三方统计脚本都是无用的流量，
+而 wait_until='networkidle' 还要等这些请求（以及长轮询、广告）全部结束。
+每个站点对应一个加载配置，新增站点只需在 FETCH_PROFILES 中添加一项:
+
+    domains         适用的域名（含子域名）
+    script_domains  允许加载脚本的域名（站点自身及其静态资源 CDN），其余第三方脚本拦截；
+                    None 表示不限制脚本
+    block_trackers  是否拦截统计/广告域名（默认是）
+    block_types     拦截的资源类型（Playwright resource_type）
+    ready           正文就绪的选择器，出现即可开始提取，不再等待网络空闲
+    wait_until      goto 的等待事件
+    goto_timeout    页面导航超时（毫秒）
+    ready_timeout   等待就绪选择器的超时（毫秒），超时后仍尝试提取
+"""
+import inspect
+import time
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlparse
+
+from loguru import logger
+
+from src.utils.metrics import metrics
+
+# 只做文本提取时可以丢弃的资源类型
+LEAN_BLOCK_TYPES = ["image", "media", "font", "texttrack", "manifest"]
+
+# 统计/广告域名，任何类型的请求都拦截
+TRACKER_DOMAINS = [
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net", "googlesyndication.com",
+    "hm.baidu.com", "cnzz.com", "umeng.com", "mmstat.com", "growingio.com", "sensorsdata.cn",
+]
+
+FETCH_PROFILES: Dict[str, Dict] = {
+    "toutiao": {
+        "domains": ["toutiao.com"],
+        "script_domains": ["toutiao.com", "toutiaostatic.com", "pstatp.com", "bytescm.com",
+                           "byteimg.com", "snssdk.com"],
+        "block_types": LEAN_BLOCK_TYPES,
+        "ready": [".article-content", ".article-title"],
+        "wait_until": "domcontentloaded",
+        "goto_timeout": 15000,
+        "ready_timeout": 8000,
+    },
+    "weibo": {
+        "domains": ["weibo.com", "weibo.cn"],
+        "script_domains": ["weibo.com", "weibo.cn", "sinaimg.cn", "sina.com.cn"],
+        "block_types": LEAN_BLOCK_TYPES,
+        "ready": [".detail_wbtext_4CRf9", ".WB_text"],
+        "wait_until": "domcontentloaded",
+        "goto_timeout": 15000,
+        "ready_timeout": 8000,
+    },
+    "zhihu": {
+        "domains": ["zhihu.com"],
+        "script_domains": ["zhihu.com", "zhimg.com"],
+        "block_types": LEAN_BLOCK_TYPES,
+        "ready": [".RichText", ".Post-RichText"],
+        "wait_until": "domcontentloaded",
+        "goto_timeout": 15000,
+        "ready_timeout": 8000,
+    },
+    "bilibili": {
+        "domains": ["bilibili.com"],
+        "script_domains": ["bilibili.com", "hdslb.com", "biliapi.net", "biliapi.com"],
+        "block_types": LEAN_BLOCK_TYPES,
+        "ready": [".video-description", ".video-info-container"],
+        "wait_until": "domcontentloaded",
+        "goto_timeout": 15000,
+        "ready_timeout": 8000,
+    },
+    "wechat": {
+        "domains": ["mp.weixin.qq.com"],
+        "script_domains": ["qq.com", "qpic.cn", "gtimg.cn"],
+        "block_types": LEAN_BLOCK_TYPES,
+        "ready": ["#js_content"],
+        "wait_until": "domcontentloaded",
+        "goto_timeout": 15000,
+        "ready_timeout": 8000,
+    },
+    # 未知站点：同样丢弃媒体和第三方脚本，等到出现常见正文容器为止
+    "general": {
+        "domains": [],
+        "script_domains": [],
+        "block_types": LEAN_BLOCK_TYPES,
+        "ready": ["article", "main", ".article", ".content", "#content"],
+        "wait_until": "domcontentloaded",
+        "goto_timeout": 20000,
+        "ready_timeout": 5000,
+    },
+    # 原来的加载方式：不拦截任何请求并等待网络空闲，用于对比和排查提取问题
+    "full": {
+        "domains": [],
+        "script_domains": None,
+        "block_trackers": False,
+        "block_types": [],
+        "ready": [],
+        "wait_until": "networkidle",
+        "goto_timeout": 30000,
+        "ready_timeout": 0,
+    },
+}
+
+
+def _host_matches(host: str, domains: Iterable[str]) -> bool:
+    return any(host == d or host.endswith("." + d) for d in domains)
+
+
+def profile_for(url: str, name: Optional[str] = None) -> Dict:
+    """按链接的域名（或指定的名称）选择加载配置，返回的字典带有 name 字段"""
+    if name in FETCH_PROFILES:
+        return {"name": name, **FETCH_PROFILES[name]}
+    host = (urlparse(url).hostname or "").lower()
+    for name, profile in FETCH_PROFILES.items():
+        if profile["domains"] and _host_matches(host, profile["domains"]):
+            return {"name": name, **profile}
+    return {"name": "general", **FETCH_PROFILES["general"]}
+
+
+def should_block(profile: Dict, page_url: str, request_url: str, resource_type: str) -> bool:
+    """判断一个子请求是否应当拦截"""
+    if resource_type == "document":
+        return False
+    host = (urlparse(request_url).hostname or "").lower()
+    if profile.get("block_trackers", True) and _host_matches(host, TRACKER_DOMAINS):
+        return True
+    if resource_type in profile.get("block_types", ()):
+        return True
+    if resource_type == "script" and profile.get("script_domains") is not None:
+        page_host = (urlparse(page_url).hostname or "").lower()
+        if host == page_host:
+            return False
+        return not _host_matches(host, profile["script_domains"])
+    return False
+
+
+class FetchStats:
+    """一次页面加载的统计：请求数、拦截数、传输字节数、耗时"""
+
+    def __init__(self, profile: str, site: str):
+        self.profile = profile
+        self.site = site
+        self.requests = 0
+        self.blocked = 0
+        self.bytes = 0
+        self.load_ms = 0.0
+        self.ready = False
+
+    def as_dict(self) -> Dict:
+        return {
+            "profile": self.profile,
+            "site": self.site,
+            "requests": self.requests,
+            "blocked": self.blocked,
+            "bytes": self.bytes,
+            "load_ms": self.load_ms,
+            "ready": self.ready,
+        }
+
+    def record(self):
+        """写入全局指标（按站点和配置区分）"""
+        labels = {"site": self.site, "profile": self.profile}
+        metrics.inc("fetch.pages", **labels)
+        metrics.inc("fetch.requests", self.requests, **labels)
+        metrics.inc("fetch.blocked", self.blocked, **labels)
+        metrics.inc("fetch.bytes", self.bytes, **labels)
+        metrics.inc("fetch.load_ms", self.load_ms, **labels)
+        logger.debug(f"页面加载 {self.site} [{self.profile}]: {self.requests} 个请求，拦截 {self.blocked} 个，"
+                     f"{self.bytes / 1024:.1f} KB，{self.load_ms:.0f} ms")
+
+
+def intercepts(profile: Dict) -> bool:
+    """该配置是否需要拦截请求（不拦截时不安装路由，省去每个请求的往返）"""
+    return bool(profile.get("block_types")) or profile.get("script_domains") is not None \
+        or profile.get("block_trackers", True)
+
+
+def _route_handler(profile: Dict, url: str, stats: FetchStats):
+    """同步、异步 API 共用的路由回调：异步 API 下 abort()/continue_() 返回的协程由 Playwright 等待"""
+    def handle(route, request):
+        stats.requests += 1
+        if should_block(profile, url, request.url, request.resource_type):
+            stats.blocked += 1
+            return route.abort()
+        return route.continue_()
+    return handle
+
+
+def _count_bytes(stats: FetchStats):
+    """CDP Network.loadingFinished 回调：累计实际传输的字节数"""
+    def handle(event):
+        stats.bytes += int(event.get("encodedDataLength", 0))
+    return handle
+
+
+def _load_steps(context, page, url: str, profile: Optional[Dict]):
+    """页面加载流程（同步、异步 API 共用一份）
+
+    每个 Playwright 调用都通过 yield 交给驱动函数：同步 API 下 yield 出的是调用结果，原样送回；
+    异步 API 下是协程，由 _drive_async 等待后送回，出错时把异常抛回生成器。
+    """
+    profile = profile or profile_for(url)
+    stats = FetchStats(profile.get("name", ""), urlparse(url).hostname or "")
+    start = time.perf_counter()
+    if intercepts(profile):
+        yield page.route("**/*", _route_handler(profile, url, stats))
+    else:
+        page.on("request", lambda request: setattr(stats, "requests", stats.requests + 1))
+    try:
+        # 传输字节数只能通过 CDP 获取（仅 Chromium），失败时不影响加载
+        session = yield context.new_cdp_session(page)
+        session.on("Network.loadingFinished", _count_bytes(stats))
+        yield session.send("Network.enable")
+    except Exception as e:
+        logger.debug(f"无法统计传输字节数: {str(e)}")
+
+    response = yield page.goto(url, wait_until=profile["wait_until"], timeout=profile["goto_timeout"])
+    if profile.get("ready"):
+        try:
+            yield page.wait_for_selector(", ".join(profile["ready"]), timeout=profile["ready_timeout"])
+            stats.ready = True
+        except Exception:
+            logger.warning(f"等待正文就绪超时 {url}，直接提取")
+    else:
+        stats.ready = True
+    stats.load_ms = (time.perf_counter() - start) * 1000
+    stats.record()
+    return response, stats
+
+
+def _drive_sync(steps):
+    try:
+        result = next(steps)
+        while True:
+            result = steps.send(result)
+    except StopIteration as stop:
+        return stop.value
+
+
+async def _drive_async(steps):
+    try:
+        step = next(steps)
+        while True:
+            try:
+                result = await step if inspect.isawaitable(step) else step
+            except Exception as e:
+                step = steps.throw(e)
+                continue
+            step = steps.send(result)
+    except StopIteration as stop:
+        return stop.value
+    finally:
+        steps.close()
+
+
+def load_page(context, page, url: str, profile: Optional[Dict] = None):
+    """按配置加载页面（同步 API），返回 (response, FetchStats)"""
+    return _drive_sync(_load_steps(context, page, url, profile))
+
+
+async def load_page_async(context, page, url: str, profile: Optional[Dict] = None):
+    """按配置加载页面（异步 API，可被任务取消打断），返回 (response, FetchStats)"""
+    return await _drive_async(_load_steps(context, page, url, profile))
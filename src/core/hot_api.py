@@ -1,134 +1,222 @@
-import httpx
 from loguru import logger
 import asyncio
 from typing import List, Dict
-import json
 from pathlib import Path
+import threading
 import time
-import urllib.parse
+from src.core.http_client import create_client
+from src.core.hot_rank import normalize_hot_list, rank_cross_platform
+from src.core.hot_sources import HOT_SOURCES, PLATFORM_CACHE_NAMES, StreamParser, sources_for
+from src.utils import serialization
 
 class HotAPI:
+    # 综合榜默认合并的平台
+    MERGE_PLATFORMS = ["头条", "微博", "知乎", "B站"]
+
     def __init__(self):
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
             "Accept": "application/json, text/plain, */*",
             "Accept-Language": "zh-CN,zh;q=0.9",
         }
+        # 按数据源名称覆盖接口地址（基准测试时可指向本地桩服务）
+        self.source_urls: Dict[str, str] = {}
         self.cache_dir = Path("data/cache/hot")
         self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # 各平台上一次的快照，用于计算增量
+        self._snapshots: Dict[str, List[Dict]] = {}
+        self._new_entry_listeners = []
+        self._snapshot_lock = threading.Lock()
         
-    async def _request(self, url: str, headers: Dict = None, params: Dict = None) -> Dict:
-        """统一的请求方法"""
+    async def _request(self, url: str, headers: Dict = None, params: Dict = None,
+                       max_attempts: int = 3) -> Dict:
+        """统一的请求方法（按站点限速，被限流时等待后重试）"""
         try:
             _headers = self.headers.copy()
             if headers:
                 _headers.update(headers)
                 
-            async with httpx.AsyncClient(headers=_headers, timeout=30.0) as client:
-                response = await client.get(url, params=params, follow_redirects=True)
-                response.raise_for_status()
-                return response.json()
+            async with create_client(headers=_headers, timeout=30.0) as client:
+                for attempt in range(1, max_attempts + 1):
+                    response = await client.get(url, params=params, follow_redirects=True)
+                    if response.status_code in (429, 503) and attempt < max_attempts:
+                        # 限速器已根据 Retry-After 降速，下一次请求会自动等待
+                        logger.warning(f"请求被限流 {url}，第{attempt}次重试")
+                        continue
+                    response.raise_for_status()
+                    return response.json()
         except Exception as e:
             logger.error(f"请求失败 {url}: {str(e)}")
             return None
 
-    async def get_toutiao_hot(self, api_source: str = '自动切换') -> List[Dict]:
-        """获取头条热榜"""
-        try:
-            url = "https://www.toutiao.com/hot-event/hot-board/"
-            headers = {
-                "Referer": "https://www.toutiao.com/",
-                "Cookie": "tt_webid=123456789"  # 随机Cookie
-            }
-            params = {"origin": "toutiao_pc"}
-            
-            data = await self._request(url, headers=headers, params=params)
-            if data and "data" in data:
-                hot_list = []
-                for item in data["data"]:
-                    hot_list.append({
-                        "title": item.get("Title", ""),
-                        "url": item.get("Url", ""),
-                        "hot": item.get("HotValue", ""),
-                        "rank": len(hot_list) + 1,
-                        "tag": item.get("Label", ""),
-                        "time": time.strftime("%Y-%m-%d %H:%M:%S")
-                    })
-                
-                if hot_list:
-                    self.cache_hot_list("toutiao", hot_list)
-                    return hot_list
-                    
-            logger.error("获取头条热榜数据为空")
-            return self.get_cached_hot_list("toutiao")
-                    
-        except Exception as e:
-            logger.error(f"获取头条热榜异常: {str(e)}")
-            return self.get_cached_hot_list("toutiao")
+    @property
+    def toutiao_hot_url(self) -> str:
+        return self.source_urls.get("toutiao", HOT_SOURCES["头条"][0]["url"])
 
-    # 其他平台的方法保持不变...
-    async def get_weibo_hot(self, api_source: str = '自动切换') -> List[Dict]:
-        """获取微博热搜"""
-        apis = {
-            'vvhan': {
-                "url": "https://api.vvhan.com/api/hotlist",
-                "params": {"type": "wbhot"},
-                "parser": self._parse_vvhan
-            },
-            'oioweb': {
-                "url": "https://api.oioweb.cn/api/common/HotList",
-                "params": {"type": "weibo"},
-                "parser": self._parse_oioweb
-            }
-        }
-        
-        if api_source == '自动切换':
-            sources = list(apis.values())
-        else:
-            sources = [apis.get(api_source.lower(), apis['vvhan'])]
+    @toutiao_hot_url.setter
+    def toutiao_hot_url(self, url: str):
+        self.source_urls["toutiao"] = url
+
+    async def _fetch_source(self, spec: Dict, limit: int = 50, max_attempts: int = 3) -> List[Dict]:
+        """请求一个数据源并流式解析条目，收到足够条目后不再读取剩余响应"""
+        url = self.source_urls.get(spec["name"], spec["url"])
+        _headers = self.headers.copy()
+        _headers.update(spec.get("headers", {}))
+        async with create_client(headers=_headers, timeout=30.0) as client:
+            for attempt in range(1, max_attempts + 1):
+                async with client.stream("GET", url, params=spec.get("params"),
+                                         follow_redirects=True) as response:
+                    if response.status_code in (429, 503) and attempt < max_attempts:
+                        logger.warning(f"请求被限流 {url}，第{attempt}次重试")
+                        continue
+                    response.raise_for_status()
+                    parser = StreamParser(spec, limit)
+                    async for chunk in response.aiter_bytes():
+                        if parser.feed(chunk):
+                            break
+                    return parser.close()
+        return []
+
+    async def fetch_platform(self, platform: str, api_source: str = '自动切换') -> List[Dict]:
+        """按声明的数据源顺序获取平台热榜，全部失败时返回缓存"""
+        cache_name = PLATFORM_CACHE_NAMES.get(platform.lower(), platform)
+        sources = sources_for(platform, api_source)
+        if not sources:
+            logger.error(f"不支持的平台: {platform}")
+            return []
             
-        for api in sources:
+        for spec in sources:
             try:
-                data = await self._request(api["url"], params=api["params"])
-                if data:
-                    hot_list = api["parser"](data)
-                    if hot_list:
-                        self.cache_hot_list("weibo", hot_list)
-                        return hot_list
+                hot_list = await self._fetch_source(spec)
+                if hot_list:
+                    self.cache_hot_list(cache_name, hot_list)
+                    return hot_list
+                logger.error(f"{platform}热榜数据为空 ({spec['name']})")
             except Exception as e:
-                logger.error(f"微博热搜 API 失败: {str(e)}")
+                logger.error(f"{platform}热榜 {spec['name']} API 失败: {str(e)}")
                 continue
                 
-        return self.get_cached_hot_list("weibo")
+        return self.get_cached_hot_list(cache_name)
 
-    # ... 其他方法保持不变 ...
+    async def get_toutiao_hot(self, api_source: str = '自动切换') -> List[Dict]:
+        """获取头条热榜"""
+        return await self.fetch_platform("头条", api_source)
+
+    async def get_weibo_hot(self, api_source: str = '自动切换') -> List[Dict]:
+        """获取微博热搜"""
+        return await self.fetch_platform("微博", api_source)
+
+    async def get_zhihu_hot(self, api_source: str = '自动切换') -> List[Dict]:
+        """获取知乎热榜"""
+        return await self.fetch_platform("知乎", api_source)
+
+    async def get_bilibili_hot(self, api_source: str = '自动切换') -> List[Dict]:
+        """获取B站热门"""
+        return await self.fetch_platform("B站", api_source)
 
     async def get_hot_list(self, platform: str, api_source: str = '自动切换') -> List[Dict]:
-        """获取指定平台的热榜"""
-        platform = platform.lower()
-        if platform == "头条":
-            return await self.get_toutiao_hot(api_source)
-        elif platform == "微博":
-            return await self.get_weibo_hot(api_source)
-        elif platform == "知乎":
-            return await self.get_zhihu_hot(api_source)
-        elif platform == "b站":
-            return await self.get_bilibili_hot(api_source)
-        else:
-            logger.error(f"不支持的平台: {platform}")
-            return []
+        """获取指定平台的热榜（每条都带数值热度 heat）"""
+        if platform == "综合":
+            return await self.get_merged_hot(api_source=api_source)
+        hot_list = await self.fetch_platform(platform, api_source)
+        return normalize_hot_list(hot_list or [])
+
+    async def get_merged_hot(self, platforms: List[str] = None, api_source: str = '自动切换',
+                             limit: int = None) -> List[Dict]:
+        """并发获取多个平台的热榜，按各平台内标准化后的热度合并排序"""
+        platforms = platforms or self.MERGE_PLATFORMS
+        results = await asyncio.gather(
+            *(self.get_hot_list(p, api_source) for p in platforms),
+            return_exceptions=True
+        )
+        boards = {}
+        for platform, result in zip(platforms, results):
+            if isinstance(result, Exception):
+                logger.error(f"获取{platform}热榜失败: {str(result)}")
+            elif result:
+                boards[platform] = result
+        return rank_cross_platform(boards, limit)
             
+    @staticmethod
+    def entry_key(item: Dict) -> str:
+        """热榜条目的标识：优先使用链接，没有链接时使用标题"""
+        return item.get("url") or f"title:{item.get('title', '')}"
+
+    @classmethod
+    def diff_hot_lists(cls, old: List[Dict], new: List[Dict]) -> Dict:
+        """比较两次快照，返回增量:
+        inserted: 新出现的条目
+        removed:  消失的条目标识
+        moved:    排名变化 [(标识, 旧排名, 新排名)]
+        updated:  排名不变但热度/标签变化的条目
+        """
+        old_index = {}
+        for position, item in enumerate(old):
+            old_index.setdefault(cls.entry_key(item), (item.get("rank", position + 1), item))
+
+        inserted, moved, updated = [], [], []
+        seen = set()
+        for position, item in enumerate(new):
+            key = cls.entry_key(item)
+            if key in seen:
+                continue
+            seen.add(key)
+            previous = old_index.get(key)
+            if previous is None:
+                inserted.append(item)
+                continue
+            old_rank, old_item = previous
+            new_rank = item.get("rank", position + 1)
+            if old_rank != new_rank:
+                moved.append((key, old_rank, new_rank))
+            elif (old_item.get("hot") != item.get("hot") or old_item.get("tag") != item.get("tag")):
+                updated.append(item)
+
+        removed = [key for key in old_index if key not in seen]
+        return {"inserted": inserted, "removed": removed, "moved": moved, "updated": updated}
+
+    def diff(self, platform: str, hot_list: List[Dict]) -> Dict:
+        """与该平台上一次快照比较并保存新快照，有新条目时通知订阅者
+
+        该平台还没有快照时（启动后第一次加载、刚切换到的平台）只静默保存快照，
+        不把整张榜单当作新条目通知出去。
+        """
+        with self._snapshot_lock:
+            previous = self._snapshots.get(platform)
+            delta = self.diff_hot_lists(previous or [], hot_list)
+            self._snapshots[platform] = list(hot_list)
+            listeners = list(self._new_entry_listeners)
+        delta.update({"platform": platform, "initial": previous is None, "snapshot": hot_list})
+
+        if delta["inserted"] and not delta["initial"]:
+            for callback in listeners:
+                try:
+                    callback(platform, delta["inserted"])
+                except Exception as e:
+                    logger.error(f"新热点通知处理失败: {str(e)}")
+        return delta
+
+    def subscribe_new_entries(self, callback):
+        """订阅新出现的热榜条目: callback(platform, entries)，只会收到相对上次快照新增的条目（首次快照不通知）"""
+        with self._snapshot_lock:
+            self._new_entry_listeners.append(callback)
+
+    def unsubscribe_new_entries(self, callback):
+        with self._snapshot_lock:
+            if callback in self._new_entry_listeners:
+                self._new_entry_listeners.remove(callback)
+
     def cache_hot_list(self, platform: str, hot_list: List[Dict]):
         """缓存热榜数据"""
         try:
-            cache_file = self.cache_dir / f"{platform}.json"
+            cache_file = self.cache_dir / f"{platform}{serialization.BINARY_SUFFIX}"
             cache_data = {
                 "timestamp": int(time.time()),
                 "data": hot_list
             }
             
-            with open(cache_file, "w", encoding="utf-8") as f:
-                json.dump(cache_data, f, ensure_ascii=False, indent=2)
+            # 并发刷新多个平台时，原子替换保证读到的缓存总是完整的
+            serialization.write_file(cache_file, cache_data)
                 
         except Exception as e:
             logger.error(f"缓存热榜数据失败: {str(e)}")
@@ -136,13 +224,12 @@ class HotAPI:
     def get_cached_hot_list(self, platform: str) -> List[Dict]:
         """获取缓存的热榜数据"""
         try:
-            cache_file = self.cache_dir / f"{platform}.json"
-            if not cache_file.exists():
+            cache_file = self.cache_dir / f"{platform}{serialization.BINARY_SUFFIX}"
+            # 旧版本留下的 JSON 缓存读取后转换为二进制格式
+            cache_data = serialization.load_migrating(cache_file, self.cache_dir / f"{platform}.json")
+            if not cache_data:
                 return []
                 
-            with open(cache_file, "r", encoding="utf-8") as f:
-                cache_data = json.load(f)
-                
             # 检查缓存是否过期（5分钟）
             if int(time.time()) - cache_data.get("timestamp", 0) > 300:
                 return []
@@ -0,0 +1,141 @@
+"""热度值归一化与跨平台排序"""
+import math
+import re
+from typing import Dict, List, Sequence
+
+from loguru import logger
+
+# 中文/英文数量单位
+_UNITS = {
+    "万": 1e4,
+    "w": 1e4,
+    "W": 1e4,
+    "亿": 1e8,
+    "k": 1e3,
+    "K": 1e3,
+    "m": 1e6,
+    "M": 1e6,
+}
+_HEAT_RE = re.compile(r"(\d+(?:\.\d+)?)\s*([万亿wWkKmM]?)")
+
+
+def parse_heat(value) -> float:
+    """把热度字符串解析为数值，如 "1.2万" -> 12000、"3亿" -> 3e8、"4,560,000" -> 4560000
+
+    无法解析时返回 0。
+    """
+    if value is None or isinstance(value, bool):
+        return 0.0
+    if isinstance(value, (int, float)):
+        return float(value) if math.isfinite(value) else 0.0
+    text = str(value).replace(",", "").replace("，", "")
+    match = _HEAT_RE.search(text)
+    if not match:
+        return 0.0
+    number = float(match.group(1))
+    unit = match.group(2)
+    if unit:
+        number *= _UNITS[unit]
+    return number
+
+
+def format_heat(heat: float) -> str:
+    """数值热度的展示形式"""
+    if heat >= 1e8:
+        return f"{heat / 1e8:.2f}亿"
+    if heat >= 1e4:
+        return f"{heat / 1e4:.1f}万"
+    return str(int(heat))
+
+
+def normalize_hot_list(hot_list: List[Dict]) -> List[Dict]:
+    """为每条热榜补充数值热度字段 heat（原始 hot 字段保留用于展示）"""
+    for item in hot_list:
+        if not isinstance(item.get("heat"), (int, float)):
+            item["heat"] = parse_heat(item.get("hot"))
+    return hot_list
+
+
+class HotBoard:
+    """紧凑的热榜列存储：热度为 float64 数组，平台为 int16 编号"""
+
+    def __init__(self):
+        import numpy as np
+
+        self.platforms: List[str] = []
+        self.items: List[Dict] = []
+        self.heat = np.empty(0, dtype=np.float64)
+        self.platform_ids = np.empty(0, dtype=np.int16)
+
+    def add(self, platform: str, hot_list: Sequence[Dict]):
+        """追加一个平台的热榜"""
+        import numpy as np
+
+        if platform not in self.platforms:
+            self.platforms.append(platform)
+        pid = self.platforms.index(platform)
+        heat = np.fromiter(
+            (item["heat"] if isinstance(item.get("heat"), (int, float)) else parse_heat(item.get("hot"))
+             for item in hot_list),
+            dtype=np.float64, count=len(hot_list)
+        )
+        self.items.extend(hot_list)
+        self.heat = np.concatenate([self.heat, heat])
+        self.platform_ids = np.concatenate(
+            [self.platform_ids, np.full(len(hot_list), pid, dtype=np.int16)]
+        )
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def zscores(self):
+        """按平台计算对数热度的 z 分数（热度是长尾分布，取对数后再标准化）"""
+        import numpy as np
+
+        if not len(self.items):
+            return np.empty(0, dtype=np.float64)
+        values = np.log1p(np.maximum(self.heat, 0.0))
+        ids = self.platform_ids.astype(np.intp)
+        counts = np.bincount(ids, minlength=len(self.platforms)).astype(np.float64)
+        counts[counts == 0] = 1.0
+        means = np.bincount(ids, weights=values, minlength=len(self.platforms)) / counts
+        squares = np.bincount(ids, weights=values * values, minlength=len(self.platforms)) / counts
+        stds = np.sqrt(np.maximum(squares - means * means, 0.0))
+        stds[stds == 0] = 1.0
+        return (values - means[ids]) / stds[ids]
+
+    def order(self, limit: int = None):
+        """按 z 分数降序的下标数组（重新排序只需这一步）"""
+        import numpy as np
+
+        scores = self.zscores()
+        order = np.argsort(-scores, kind="stable")
+        if limit is not None:
+            order = order[:limit]
+        return order, scores
+
+    def ranked(self, limit: int = None) -> List[Dict]:
+        """按 z 分数降序返回合并后的热榜，rank 为综合排名"""
+        order, scores = self.order(limit)
+        items = self.items
+        platforms = self.platforms
+        return [
+            {**items[index], "platform": platforms[pid], "score": score, "rank": rank}
+            for rank, (index, pid, score) in enumerate(
+                zip(order.tolist(), self.platform_ids[order].tolist(), scores[order].tolist()),
+                start=1
+            )
+        ]
+
+
+def rank_cross_platform(boards: Dict[str, List[Dict]], limit: int = None) -> List[Dict]:
+    """合并多个平台的热榜并按标准化热度排序"""
+    try:
+        board = HotBoard()
+        for platform, hot_list in boards.items():
+            if hot_list:
+                board.add(platform, hot_list)
+        return board.ranked(limit)
+    except Exception as e:
+        logger.error(f"合并热榜排序失败: {str(e)}")
+        return []
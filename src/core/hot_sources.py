@@ -0,0 +1,194 @@
+"""热榜数据源声明与流式解析
+
+每个平台对应一组按优先级排列的数据源，新增平台或备用接口只需在 HOT_SOURCES 中添加一项:
+
+    name    数据源名称（与界面中的“API源”对应）
+    url     接口地址
+    params  查询参数
+    items   条目数组在 JSON 中的 ijson 前缀，如 "data.item"、"data.list.item"
+    fields  输出字段 -> 取值方式：点分路径（"target.title"），
+            或包含 {路径} 的模板（"https://www.bilibili.com/video/{bvid}"）
+    headers 额外请求头（可选）
+
+解析函数都是无状态的纯函数，可以在多个协程/线程中并发调用。
+"""
+import re
+import time
+from typing import Dict, Iterable, List, Optional
+
+from src.core.hot_rank import parse_heat
+
+_VVHAN = "https://api.vvhan.com/api/hotlist"
+_OIOWEB = "https://api.oioweb.cn/api/common/HotList"
+_VVHAN_FIELDS = {"title": "title", "url": "url", "hot": "hot"}
+_OIOWEB_FIELDS = {"title": "title", "url": "href", "hot": "hot"}
+
+HOT_SOURCES: Dict[str, List[Dict]] = {
+    "头条": [
+        {
+            "name": "toutiao",
+            "url": "https://www.toutiao.com/hot-event/hot-board/",
+            "params": {"origin": "toutiao_pc"},
+            "headers": {"Referer": "https://www.toutiao.com/", "Cookie": "tt_webid=123456789"},
+            "items": "data.item",
+            "fields": {"title": "Title", "url": "Url", "hot": "HotValue", "tag": "Label"},
+        },
+    ],
+    "微博": [
+        {"name": "vvhan", "url": _VVHAN, "params": {"type": "wbhot"},
+         "items": "data.item", "fields": _VVHAN_FIELDS},
+        {"name": "oioweb", "url": _OIOWEB, "params": {"type": "weibo"},
+         "items": "result.item", "fields": _OIOWEB_FIELDS},
+    ],
+    "知乎": [
+        {
+            "name": "zhihu",
+            "url": "https://www.zhihu.com/api/v3/feed/topstory/hot-lists/total",
+            "params": {"limit": 50},
+            "headers": {"Referer": "https://www.zhihu.com/hot"},
+            "items": "data.item",
+            "fields": {
+                "title": "target.title",
+                "url": "https://www.zhihu.com/question/{target.id}",
+                "hot": "detail_text",
+            },
+        },
+        {"name": "vvhan", "url": _VVHAN, "params": {"type": "zhihuHot"},
+         "items": "data.item", "fields": _VVHAN_FIELDS},
+        {"name": "oioweb", "url": _OIOWEB, "params": {"type": "zhihu"},
+         "items": "result.item", "fields": _OIOWEB_FIELDS},
+    ],
+    "b站": [
+        {
+            "name": "bilibili",
+            "url": "https://api.bilibili.com/x/web-interface/popular",
+            "params": {"ps": 50, "pn": 1},
+            "headers": {"Referer": "https://www.bilibili.com/"},
+            "items": "data.list.item",
+            "fields": {
+                "title": "title",
+                "url": "https://www.bilibili.com/video/{bvid}",
+                "hot": "stat.view",
+                "tag": "tname",
+            },
+        },
+        {"name": "vvhan", "url": _VVHAN, "params": {"type": "bili"},
+         "items": "data.item", "fields": _VVHAN_FIELDS},
+        {"name": "oioweb", "url": _OIOWEB, "params": {"type": "bilibili"},
+         "items": "result.item", "fields": _OIOWEB_FIELDS},
+    ],
+}
+
+# 各平台的缓存文件名
+PLATFORM_CACHE_NAMES = {"头条": "toutiao", "微博": "weibo", "知乎": "zhihu", "b站": "bilibili"}
+
+_TEMPLATE_RE = re.compile(r"\{([^{}]+)\}")
+
+
+def sources_for(platform: str, api_source: str = "自动切换") -> List[Dict]:
+    """按界面选择的 API 源筛选数据源；选择的源在该平台不可用时退回全部"""
+    sources = HOT_SOURCES.get(platform.lower(), [])
+    if api_source and api_source != "自动切换":
+        chosen = [s for s in sources if s["name"] == api_source.lower()]
+        if chosen:
+            return chosen
+    return sources
+
+
+def _get_path(item, path: str):
+    value = item
+    for key in path.split("."):
+        if isinstance(value, dict):
+            value = value.get(key)
+        elif isinstance(value, list) and key.isdigit() and int(key) < len(value):
+            value = value[int(key)]
+        else:
+            return None
+        if value is None:
+            return None
+    return value
+
+
+def _extract(item: Dict, rule: str):
+    if "{" not in rule:
+        return _get_path(item, rule)
+    missing = False
+
+    def replace(match):
+        nonlocal missing
+        value = _get_path(item, match.group(1))
+        if value is None:
+            missing = True
+            return ""
+        return str(value)
+
+    result = _TEMPLATE_RE.sub(replace, rule)
+    return None if missing else result
+
+
+def parse_items(spec: Dict, items: Iterable[Dict], limit: Optional[int] = None) -> List[Dict]:
+    """把原始条目转换为统一的热榜格式"""
+    fields = spec["fields"]
+    now = time.strftime("%Y-%m-%d %H:%M:%S")
+    hot_list = []
+    for raw in items:
+        title = _extract(raw, fields["title"])
+        if not title:
+            continue
+        hot = _extract(raw, fields["hot"]) if "hot" in fields else None
+        tag = _extract(raw, fields["tag"]) if "tag" in fields else None
+        hot_list.append({
+            "title": str(title).strip(),
+            "url": _extract(raw, fields["url"]) or "",
+            "hot": hot if hot is not None else "",
+            "heat": parse_heat(hot),
+            "rank": len(hot_list) + 1,
+            "tag": tag or "",
+            "time": now,
+            "source": spec["name"],
+        })
+        if limit is not None and len(hot_list) >= limit:
+            break
+    return hot_list
+
+
+def parse_bytes(spec: Dict, data: bytes, limit: Optional[int] = None) -> List[Dict]:
+    """从完整的响应体流式解析（只遍历条目数组，不构建整个 JSON 树）"""
+    import ijson
+
+    return parse_items(spec, ijson.items(data, spec["items"], use_float=True), limit)
+
+
+class StreamParser:
+    """边接收边解析：把响应分块喂给 ijson，条目数量够了即可停止读取"""
+
+    def __init__(self, spec: Dict, limit: Optional[int] = None):
+        import ijson
+
+        self.spec = spec
+        self.limit = limit
+        self._raw: List[Dict] = []
+        self._coro = ijson.items_coro(_Collector(self._raw), spec["items"], use_float=True)
+
+    def feed(self, chunk: bytes) -> bool:
+        """喂入一块数据，返回是否已经收集到足够的条目"""
+        self._coro.send(chunk)
+        return self.limit is not None and len(self._raw) >= self.limit
+
+    def close(self) -> List[Dict]:
+        try:
+            self._coro.close()
+        except Exception:
+            # 提前停止读取时 JSON 不完整，已解析的条目仍然有效
+            pass
+        return parse_items(self.spec, self._raw, self.limit)
+
+
+class _Collector:
+    """ijson 协程的接收端"""
+
+    def __init__(self, target: List[Dict]):
+        self._target = target
+
+    def send(self, value):
+        self._target.append(value)
@@ -0,0 +1,44 @@
+import threading
+from typing import Dict
+from src.core.rate_limiter import get_rate_limiter
+from src.core.cassette import get_cassette
+
+_ssl_context = None
+_ssl_lock = threading.Lock()
+
+def _shared_ssl_context():
+    """所有客户端共用一个 SSL 上下文（每个账号一个客户端时，逐个加载证书库要几十毫秒）"""
+    global _ssl_context
+    import httpx
+
+    with _ssl_lock:
+        if _ssl_context is None:
+            _ssl_context = httpx.create_ssl_context()
+        return _ssl_context
+
+def create_client(headers: Dict = None, timeout: float = 30.0, rate_limited: bool = True, **kwargs):
+    """创建 httpx 异步客户端，默认挂上按站点的自适应限速；启用录制/回放时使用记录的传输层"""
+    import httpx
+
+    kwargs.setdefault("verify", _shared_ssl_context())
+    event_hooks = kwargs.pop("event_hooks", {})
+    if rate_limited:
+        hooks = get_rate_limiter().event_hooks()
+        event_hooks = {
+            "request": hooks["request"] + list(event_hooks.get("request", [])),
+            "response": hooks["response"] + list(event_hooks.get("response", [])),
+        }
+    cassette = get_cassette()
+    if cassette is not None:
+        # 录制/回放：在真实传输层外包一层，连接池参数交给真实传输层
+        inner = None
+        if cassette.mode != "replay":
+            limits = kwargs.pop("limits", None)
+            transport_kwargs = {"verify": kwargs["verify"]}
+            if limits:
+                transport_kwargs["limits"] = limits
+            inner = httpx.AsyncHTTPTransport(**transport_kwargs)
+        kwargs.pop("limits", None)
+        kwargs.pop("verify", None)
+        kwargs["transport"] = cassette.transport(inner)
+    return httpx.AsyncClient(headers=headers, timeout=timeout, event_hooks=event_hooks, **kwargs)
@@ -0,0 +1,339 @@
+"""文章图片：并发下载、去重、转码缩放，以及上传结果缓存
+
+发布带图文章时（article_data["images"] 为提取时收集的图片地址）：
+    1. 去掉重复地址后并发下载，Content-Length 或实际大小超过 max_bytes 的图片放弃
+    2. 按原始内容的 sha1 查上传缓存，命中则直接使用已上传的地址，不再解码和上传
+    3. 未命中的在共享进程池（cpu_pool）中解码、缩放到 max_side 以内并转为 JPEG，同时计算 dHash（感知哈希）
+    4. dHash 与缓存或本篇中已有图片相差不超过 HAMMING 位的视为同一张图（不同尺寸/压缩质量的同一张图）
+    5. 其余图片上传到头条号图片接口，结果按 sha1 与 dHash 记入缓存（data/images/uploads.bin）
+
+同一张图片在所有文章、所有账号中只上传一次。过小的图片（图标、统计像素）直接丢弃。
+"""
+import asyncio
+import atexit
+import hashlib
+import html
+import io
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from src.core.cpu_pool import CpuPool, get_cpu_pool
+from src.core.http_client import create_client
+from src.utils import serialization
+
+UPLOAD_URL = "https://mp.toutiao.com/mp/agw/article_material/photo/upload_picture"
+CACHE_FILE = Path("data/images/uploads.bin")
+
+MAX_BYTES = 8 * 1024 * 1024   # 单张图片下载上限
+MAX_IMAGES = 20               # 每篇文章最多处理的图片数
+MAX_SIDE = 1920               # 转码后长边上限
+MIN_SIDE = 80                 # 短边小于此值的视为图标或统计像素
+QUALITY = 85
+HAMMING = 4                   # dHash 相差不超过此位数视为同一张图
+
+_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+
+def dhash(image, size: int = 8) -> int:
+    """差值哈希：缩成 (size+1)×size 灰度图，比较相邻像素明暗，得到 size*size 位整数"""
+    from PIL import Image
+
+    gray = image.convert("L").resize((size + 1, size), Image.BILINEAR)
+    pixels = gray.tobytes()
+    bits = 0
+    for row in range(size):
+        offset = row * (size + 1)
+        for col in range(size):
+            bits = (bits << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return bits
+
+
+def process_image(data: bytes, max_side: int = MAX_SIDE, quality: int = QUALITY) -> Dict:
+    """解码、缩放并转为 JPEG（在进程池中执行，参数和结果都是可序列化的字节与数值）
+
+    动图保持原样；转码后反而变大且无需缩放的 JPEG 保留原文件。
+    """
+    from PIL import Image
+
+    image = Image.open(io.BytesIO(data))
+    source_format = image.format
+    original_size = image.size
+    # JPEG 可以直接按缩小后的尺寸解码，大图省去大部分解码时间
+    image.draft("RGB", (max_side, max_side))
+    phash = dhash(image)
+    if getattr(image, "is_animated", False):
+        return {"data": data, "mime": Image.MIME.get(source_format, "image/gif"), "phash": phash,
+                "width": original_size[0], "height": original_size[1]}
+
+    if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+        # 透明背景铺白后再转 JPEG
+        rgba = image.convert("RGBA")
+        image = Image.new("RGB", rgba.size, (255, 255, 255))
+        image.paste(rgba, mask=rgba.split()[-1])
+    elif image.mode != "RGB":
+        image = image.convert("RGB")
+    if max(image.size) > max_side:
+        image.thumbnail((max_side, max_side), Image.LANCZOS)
+    out = io.BytesIO()
+    image.save(out, "JPEG", quality=quality, optimize=True, progressive=True)
+    encoded = out.getvalue()
+    if source_format == "JPEG" and image.size == original_size and len(encoded) >= len(data):
+        encoded = data
+    return {"data": encoded, "mime": "image/jpeg", "phash": phash,
+            "width": image.size[0], "height": image.size[1]}
+
+
+def _html_paragraphs(content: str) -> List[str]:
+    """按 </p> 切分 HTML 正文：只给原本带结束标签的段落补回 </p>
+
+    最后一个 </p> 之后的文字包成 <p> 段落；只有标签（如外层的 </div>）时接在最后一段后面。
+    """
+    pieces = re.split(r"(</p>)", content, flags=re.IGNORECASE)
+    paragraphs = [text + closing for text, closing in zip(pieces[0::2], pieces[1::2]) if text.strip()]
+    tail = pieces[-1].strip()
+    if not tail:
+        return paragraphs
+    if paragraphs and not re.sub(r"<[^>]*>", "", tail).strip():
+        paragraphs[-1] += tail
+    elif re.match(r"<p[\s>]", tail, re.IGNORECASE):
+        paragraphs.append(tail + "</p>")
+    else:
+        paragraphs.append(f"<p>{tail}</p>")
+    return paragraphs
+
+
+def place_images(content: str, images: List[Dict]) -> str:
+    """把上传后的图片均匀插入正文段落之间；纯文本正文按行转为 <p> 段落"""
+    if not images:
+        return content
+    if re.search(r"<p[\s>]", content or "", re.IGNORECASE):
+        paragraphs = _html_paragraphs(content)
+    else:
+        paragraphs = [f"<p>{html.escape(line.strip())}</p>" for line in (content or "").splitlines() if line.strip()]
+    tags = [f'<p><img src="{html.escape(image["url"])}" width="{image.get("width", "")}" '
+            f'height="{image.get("height", "")}"></p>' for image in images]
+    count = len(paragraphs)
+    slots: Dict[int, List[str]] = {}
+    for index, tag in enumerate(tags):
+        slots.setdefault(round((index + 1) * count / (len(tags) + 1)), []).append(tag)
+    parts = slots.get(0, [])
+    for position, paragraph in enumerate(paragraphs, 1):
+        parts.append(paragraph)
+        parts.extend(slots.get(position, []))
+    return "".join(parts)
+
+
+class ImagePipeline:
+    """下载、去重、转码并上传文章图片，上传结果按内容哈希缓存"""
+
+    def __init__(self, cache_path: Optional[Path] = CACHE_FILE, upload_url: str = UPLOAD_URL,
+                 max_bytes: int = MAX_BYTES, max_images: int = MAX_IMAGES, max_side: int = MAX_SIDE,
+                 quality: int = QUALITY, concurrency: int = 6, pool: Optional[CpuPool] = None):
+        self.cache_path = cache_path
+        self.upload_url = upload_url
+        self.max_bytes = max_bytes
+        self.max_images = max_images
+        self.max_side = max_side
+        self.quality = quality
+        self.concurrency = concurrency
+        self.pool = pool
+        self.stats = {"downloaded": 0, "skipped": 0, "cache_hits": 0, "duplicates": 0, "uploaded": 0}
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, asyncio.Future] = {}        # 按 sha1：同一内容正在处理
+        self._uploading: List[Tuple[int, asyncio.Future]] = []  # 按 dHash：相近的图片正在上传
+        self._dirty = False
+        # sha1（原始内容）-> {"url", "phash", "width", "height", "uploaded_at"}
+        self.cache: Dict[str, Dict] = {}
+        if cache_path is not None:
+            try:
+                self.cache = serialization.read_file(cache_path, default={}) or {}
+            except Exception as e:
+                logger.error(f"加载图片上传缓存失败: {str(e)}")
+        self._phashes: List[Tuple[int, str]] = [(e["phash"], key) for key, e in self.cache.items()]
+
+    # ---------- 缓存 ----------
+
+    def _similar(self, phash: int) -> Optional[Dict]:
+        """缓存中感知哈希相近的图片"""
+        with self._lock:
+            for known, key in self._phashes:
+                if (known ^ phash).bit_count() <= HAMMING:
+                    return self.cache[key]
+        return None
+
+    def _remember(self, sha1: str, entry: Dict):
+        with self._lock:
+            self.cache[sha1] = entry
+            self._phashes.append((entry["phash"], sha1))
+            self._dirty = True
+
+    def flush(self):
+        if self.cache_path is None or not self._dirty:
+            return
+        try:
+            with self._lock:
+                snapshot = dict(self.cache)
+                self._dirty = False
+            serialization.write_file(self.cache_path, snapshot)
+        except Exception as e:
+            logger.error(f"保存图片上传缓存失败: {str(e)}")
+
+    # ---------- 下载 ----------
+
+    async def _download(self, client, url: str) -> Optional[bytes]:
+        try:
+            async with client.stream("GET", url) as response:
+                if response.status_code != 200:
+                    logger.warning(f"下载图片失败 [{response.status_code}]: {url}")
+                    return None
+                content_type = response.headers.get("content-type", "")
+                length = int(response.headers.get("content-length") or 0)
+                if (content_type and not content_type.startswith("image/")) or length > self.max_bytes:
+                    self.stats["skipped"] += 1
+                    return None
+                chunks, size = [], 0
+                async for chunk in response.aiter_bytes():
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        self.stats["skipped"] += 1
+                        return None
+                    chunks.append(chunk)
+            self.stats["downloaded"] += 1
+            return b"".join(chunks)
+        except Exception as e:
+            logger.warning(f"下载图片失败: {url} {str(e)}")
+            return None
+
+    # ---------- 转码 ----------
+
+    async def _process(self, data: bytes) -> Dict:
+        return await (self.pool or get_cpu_pool()).run(process_image, data, self.max_side, self.quality)
+
+    def close(self):
+        self.flush()
+
+    # ---------- 上传 ----------
+
+    async def _upload(self, client, token: str, processed: Dict) -> str:
+        files = {"upfile": (f"image.{processed['mime'].split('/')[-1]}", processed["data"], processed["mime"])}
+        response = await client.post(self.upload_url, files=files, headers={"X-CSRFToken": token},
+                                     cookies={"MONITOR_WEB_ID": token, "toutiao_sso_user": token,
+                                              "passport_csrf_token": token})
+        if response.status_code != 200:
+            raise Exception(f"HTTP错误: {response.status_code}")
+        result = response.json()
+        url = result.get("url") or (result.get("data") or {}).get("url")
+        if not url:
+            raise Exception(result.get("message") or result.get("state") or "未返回图片地址")
+        self.stats["uploaded"] += 1
+        return url
+
+    async def _upload_once(self, client, token: str, processed: Dict) -> Optional[Dict]:
+        """缓存或正在上传的图片中有相近的就复用，否则上传"""
+        phash = processed["phash"]
+        entry = self._similar(phash)
+        if entry is not None:
+            self.stats["cache_hits"] += 1
+            return entry
+        for known, pending in self._uploading:
+            if (known ^ phash).bit_count() <= HAMMING:
+                self.stats["cache_hits"] += 1
+                return await asyncio.shield(pending)
+        pending = asyncio.get_running_loop().create_future()
+        item = (phash, pending)
+        self._uploading.append(item)
+        entry = None
+        try:
+            url = await self._upload(client, token, processed)
+            entry = {"url": url, "phash": phash, "width": processed["width"],
+                     "height": processed["height"], "uploaded_at": time.time()}
+            return entry
+        finally:
+            pending.set_result(entry)
+            self._uploading.remove(item)
+
+    async def _resolve(self, client, token: str, data: bytes) -> Optional[Dict]:
+        """返回 {"url", "phash", "width", "height"}，同一内容并发请求时只处理一次"""
+        sha1 = hashlib.sha1(data).hexdigest()
+        cached = self.cache.get(sha1)
+        if cached is not None:
+            self.stats["cache_hits"] += 1
+            return cached
+        future = self._inflight.get(sha1)
+        if future is not None:
+            return await asyncio.shield(future)
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[sha1] = future
+        try:
+            processed = await self._process(data)
+            if min(processed["width"], processed["height"]) < MIN_SIDE:
+                self.stats["skipped"] += 1
+                entry = None
+            else:
+                entry = await self._upload_once(client, token, processed)
+                if entry is not None:
+                    self._remember(sha1, entry)
+            future.set_result(entry)
+            return entry
+        except Exception as e:
+            logger.warning(f"处理图片失败: {str(e)}")
+            future.set_result(None)
+            return None
+        finally:
+            if not future.done():
+                future.set_result(None)
+            self._inflight.pop(sha1, None)
+
+    async def prepare(self, token: str, urls: List[str], referer: Optional[str] = None) -> List[Dict]:
+        """下载并上传文章图片，按原文顺序返回去重后的 [{"source", "url", "width", "height"}]"""
+        unique = list(dict.fromkeys(u for u in urls if u and u.startswith(("http://", "https://"))))
+        unique = unique[:self.max_images]
+        if not unique:
+            return []
+        semaphore = asyncio.Semaphore(self.concurrency)
+        headers = {"User-Agent": _USER_AGENT}
+        if referer:
+            headers["Referer"] = referer
+
+        async with create_client(headers=headers, timeout=30.0, follow_redirects=True) as downloads, \
+                create_client(headers={"User-Agent": _USER_AGENT}, timeout=60.0, rate_limited=False) as uploads:
+            async def one(url: str) -> Optional[Dict]:
+                async with semaphore:
+                    data = await self._download(downloads, url)
+                if data is None:
+                    return None
+                return await self._resolve(uploads, token, data)
+
+            entries = await asyncio.gather(*(one(url) for url in unique))
+
+        images, seen = [], set()
+        for url, entry in zip(unique, entries):
+            if entry is None:
+                continue
+            if entry["url"] in seen:
+                self.stats["duplicates"] += 1
+                continue
+            seen.add(entry["url"])
+            images.append({"source": url, "url": entry["url"], "width": entry["width"], "height": entry["height"]})
+        self.flush()
+        logger.info(f"文章图片：{len(unique)} 张，可用 {len(images)} 张")
+        return images
+
+
+_pipeline: Optional[ImagePipeline] = None
+_pipeline_lock = threading.Lock()
+
+
+def get_image_pipeline() -> ImagePipeline:
+    """进程内共享的图片处理（共用上传缓存）"""
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is None:
+            _pipeline = ImagePipeline()
+            atexit.register(_pipeline.close)
+        return _pipeline
@@ -0,0 +1,271 @@
+"""本地关键词提取：TF-IDF + TextRank
+
+不依赖分词库：中文按 2~4 字的 n-gram 生成候选词，英文按单词；
+- 被更长候选词完全覆盖（出现次数相同）的子串不单独作为候选；
+  达到最大长度的候选词如果每次出现都接着同一个字，向后延长（如 "新能源汽" -> "新能源汽车"）
+- TF-IDF 使用预先统计的语料文档频率表 data/keywords/idf.bin，没有词表时退化为词频
+- 取 TF-IDF 最高的一批候选词，按句内共现建图做 TextRank，两项得分加权合并
+- 输出时跳过与已选关键词互相包含的词
+
+构建词表: python -m src.core.keywords build data/temp [更多目录...]
+"""
+import math
+import re
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from loguru import logger
+
+from src.utils import serialization
+
+_CJK_RE = re.compile(r"[\u4e00-\u9fff]+")
+_WORD_RE = re.compile(r"[A-Za-z][A-Za-z0-9+#\-]*[A-Za-z0-9+#]|[A-Za-z]{2,}")
+_CLAUSE_RE = re.compile(r"[。！？!?；;，,、：:\n]+")
+MAX_GRAM = 4
+
+# 不作为候选词首尾的虚词
+_EDGE_CHARS = set("的了是在和与及也都就而被把对将从向于为之其这那有个些着过吗呢吧啊")
+_EN_STOPWORDS = {
+    "the", "and", "for", "with", "that", "this", "from", "are", "was", "were", "has", "have",
+    "will", "can", "not", "but", "you", "your", "its", "our", "they", "their", "into", "than",
+}
+
+
+def candidate_terms(text: str) -> Counter:
+    """候选词及出现次数"""
+    counts: Counter = Counter()
+    for run in _CJK_RE.findall(text):
+        for n in range(2, MAX_GRAM + 1):
+            counts.update([run[i:i + n] for i in range(len(run) - n + 1)])
+    for word in _WORD_RE.findall(text):
+        word = word.lower()
+        if word not in _EN_STOPWORDS:
+            counts[word] += 1
+    # 先计数再过滤，每个不同的 n-gram 只检查一次
+    for term in [t for t in counts if t[0] in _EDGE_CHARS or t[-1] in _EDGE_CHARS]:
+        del counts[term]
+    return counts
+
+
+def _reduce_substrings(counts: Counter) -> Counter:
+    """去掉总是作为更长候选词一部分出现的子串（如 "人工智能" 中的 "人工智"）"""
+    covered = set()
+    for term, count in counts.items():
+        if len(term) < 3 or not _CJK_RE.fullmatch(term):
+            continue
+        for sub in (term[:-1], term[1:]):
+            if counts.get(sub) == count:
+                covered.add(sub)
+    return Counter({t: c for t, c in counts.items() if t not in covered})
+
+
+def _extend(term: str, text: str, max_len: int = 8) -> str:
+    """每次出现后面都跟着同一个汉字时把词向后延长"""
+    positions = []
+    index = text.find(term)
+    while index >= 0:
+        positions.append(index)
+        index = text.find(term, index + 1)
+    while positions and len(term) < max_len:
+        following = {text[p + len(term):p + len(term) + 1] for p in positions}
+        if len(following) != 1:
+            break
+        char = following.pop()
+        if not char or not _CJK_RE.fullmatch(char) or char in _EDGE_CHARS:
+            break
+        term += char
+    return term
+
+
+class IdfTable:
+    """语料文档频率表"""
+
+    def __init__(self, docs: int = 0, df: Optional[Dict[str, int]] = None):
+        self.docs = docs
+        self.df = df or {}
+
+    def get(self, term: str) -> float:
+        """平滑 IDF；没有词表时所有词权重相同"""
+        if not self.docs:
+            return 1.0
+        return math.log((self.docs + 1) / (self.df.get(term, 0) + 1)) + 1.0
+
+    @classmethod
+    def fit(cls, texts: Iterable[str], min_df: int = 2, max_terms: int = 300000) -> "IdfTable":
+        """统计文档频率；只保留出现在至少 min_df 篇文档中的词，最多 max_terms 个"""
+        df: Counter = Counter()
+        docs = 0
+        for text in texts:
+            docs += 1
+            df.update(set(candidate_terms(text)))
+        kept = {t: c for t, c in df.most_common(max_terms) if c >= min_df}
+        return cls(docs, kept)
+
+    def save(self, path: Path):
+        serialization.write_file(path, {"docs": self.docs, "df": self.df})
+
+    @classmethod
+    def load(cls, path: Path) -> "IdfTable":
+        data = serialization.read_file(path)
+        if not data:
+            return cls()
+        return cls(data.get("docs", 0), data.get("df", {}))
+
+
+class KeywordExtractor:
+    """TF-IDF 与 TextRank 合并打分的关键词提取"""
+
+    def __init__(self, idf: Optional[IdfTable] = None, candidates: int = 40,
+                 textrank_weight: float = 0.4, iterations: int = 20, damping: float = 0.85):
+        self.idf = idf or IdfTable()
+        self.candidates = candidates          # 参与 TextRank 的候选词数量
+        self.textrank_weight = textrank_weight
+        self.iterations = iterations
+        self.damping = damping
+
+    def _tfidf(self, text: str) -> Dict[str, float]:
+        counts = candidate_terms(text)
+        if not counts:
+            return {}
+        total = sum(counts.values())
+        # 长文本中只出现一次的 n-gram 多为跨词片段，不作为候选
+        if len(text) > 300:
+            counts = Counter({t: c for t, c in counts.items() if c >= 2})
+        return {
+            term: count / total * self.idf.get(term) * math.sqrt(len(term))
+            for term, count in _reduce_substrings(counts).items()
+        }
+
+    def _textrank(self, terms: List[str], text: str) -> Dict[str, float]:
+        """按分句共现建无向图，做 PageRank 迭代"""
+        import numpy as np
+
+        size = len(terms)
+        weights = np.zeros((size, size))
+        for clause in _CLAUSE_RE.split(text.lower()):
+            present = [i for i, t in enumerate(terms) if t in clause]
+            for i in present:
+                weights[i, present] += 1
+        np.fill_diagonal(weights, 0)
+        # 按列归一化为转移矩阵，孤立节点的列保持为 0
+        degree = weights.sum(axis=0)
+        transition = np.divide(weights, degree, out=np.zeros_like(weights), where=degree > 0)
+        rank = np.ones(size)
+        for _ in range(self.iterations):
+            rank = (1 - self.damping) + self.damping * transition @ rank
+        return dict(zip(terms, rank.tolist()))
+
+    def extract(self, text: str, top_k: int = 8) -> List[Tuple[str, float]]:
+        """提取关键词，返回 [(词, 得分)]，得分在 0~1 之间"""
+        if not text:
+            return []
+        tfidf = self._tfidf(text)
+        if not tfidf:
+            return []
+        top: Dict[str, float] = {}
+        for term in sorted(tfidf, key=tfidf.get, reverse=True)[:self.candidates]:
+            score = tfidf[term]
+            if len(term) == MAX_GRAM and _CJK_RE.fullmatch(term):
+                term = _extend(term, text)
+            top[term] = max(score, top.get(term, 0.0))
+        tfidf = top
+        terms = sorted(tfidf, key=tfidf.get, reverse=True)
+        rank = self._textrank(terms, text)
+        max_tfidf = tfidf[terms[0]]
+        max_rank = max(rank.values()) or 1.0
+        scores = {
+            t: (1 - self.textrank_weight) * tfidf[t] / max_tfidf + self.textrank_weight * rank[t] / max_rank
+            for t in terms
+        }
+        result: List[Tuple[str, float]] = []
+        for term in sorted(scores, key=scores.get, reverse=True):
+            if any(term in kept or kept in term for kept, _ in result):
+                continue
+            result.append((term, scores[term]))
+            if len(result) >= top_k:
+                break
+        return result
+
+    def keywords(self, text: str, top_k: int = 8) -> List[str]:
+        return [term for term, _ in self.extract(text, top_k)]
+
+
+def simhash(text: str, bits: int = 64) -> int:
+    """相似度哈希：按候选词出现次数加权，内容相近的文章汉明距离小（转载、洗稿判重用）"""
+    import hashlib
+
+    import numpy as np
+
+    counts = candidate_terms(text or "")
+    if not counts:
+        return 0
+    digest_size = bits // 8
+    hashes = np.frombuffer(b"".join(hashlib.blake2b(term.encode("utf-8"), digest_size=digest_size).digest()
+                                    for term in counts), dtype=np.uint8).reshape(len(counts), digest_size)
+    signs = np.unpackbits(hashes, axis=1).astype(np.int8) * 2 - 1
+    weights = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+    vector = weights @ signs
+    return int.from_bytes(np.packbits(vector > 0).tobytes(), "big")
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def missing_keywords(keywords: Iterable[str], text: str) -> List[str]:
+    """text 中没有出现的关键词（英文不区分大小写）"""
+    lowered = (text or "").lower()
+    return [k for k in keywords if k.lower() not in lowered]
+
+
+IDF_FILE = Path("data/keywords/idf.bin")
+
+_extractor: Optional[KeywordExtractor] = None
+_extractor_lock = threading.Lock()
+
+
+def get_keyword_extractor() -> KeywordExtractor:
+    """进程内共享的提取器，首次使用时加载词表"""
+    global _extractor
+    with _extractor_lock:
+        if _extractor is None:
+            idf = IdfTable()
+            try:
+                if IDF_FILE.exists():
+                    idf = IdfTable.load(IDF_FILE)
+            except Exception as e:
+                logger.error(f"加载关键词词表失败: {str(e)}")
+            _extractor = KeywordExtractor(idf)
+        return _extractor
+
+
+def extract_keywords(text: str, top_k: int = 8) -> List[str]:
+    """用共享提取器提取关键词（模块级函数，可以交给进程池执行）"""
+    return get_keyword_extractor().keywords(text, top_k)
+
+
+def _corpus(directories: Iterable[Path]) -> Iterable[str]:
+    """读取临时文章（.bin / .json）的标题和正文"""
+    for directory in directories:
+        for path in sorted(Path(directory).rglob("*")):
+            if path.suffix not in (serialization.BINARY_SUFFIX, ".json"):
+                continue
+            try:
+                article = serialization.read_file(path)
+            except Exception:
+                continue
+            if isinstance(article, dict) and article.get("content"):
+                yield f"{article.get('title', '')}\n{article['content']}"
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2 or sys.argv[1] != "build":
+        print("用法: python -m src.core.keywords build <文章目录>...")
+        sys.exit(1)
+    table = IdfTable.fit(_corpus(Path(d) for d in sys.argv[2:] or ["data/temp"]))
+    table.save(IDF_FILE)
+    print(f"已统计 {table.docs} 篇文档，保留 {len(table.df)} 个词 -> {IDF_FILE}")
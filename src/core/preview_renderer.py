@@ -0,0 +1,147 @@
+"""文章预览渲染：转义正文、分页，并按 (链接, 内容摘要) 缓存渲染结果
+
+渲染在内容获取线程中完成，界面线程只需 setHtml 一页（长度有上限）。
+"""
+import hashlib
+import html
+import re
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from loguru import logger
+
+# 除换行/制表符外的控制字符，QTextBrowser 会把它们显示成乱码
+_CONTROL_RE = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]")
+_BLANK_LINES_RE = re.compile(r"\n\s*\n")
+
+_PAGE_TEMPLATE = (
+    "<h2 style='color: #333;'>{title}</h2>"
+    "<hr>"
+    "<div style='font-size: 14px; line-height: 1.6; color: #444;'>{body}</div>"
+)
+
+
+def escape_text(text: str) -> str:
+    """转义 HTML 特殊字符并去除控制字符"""
+    return html.escape(_CONTROL_RE.sub("", text or ""), quote=True)
+
+
+def message_html(message: str, color: str = None) -> str:
+    """状态/错误提示的 HTML（提示文本同样转义）"""
+    style = f" style='color: {color};'" if color else ""
+    return f"<div{style}><h3>{escape_text(message)}</h3></div>"
+
+
+def split_pages(content: str, page_chars: int) -> List[str]:
+    """按段落把正文切成不超过 page_chars 字符的页；单个超长段落按长度硬切"""
+    paragraphs = [p.strip() for p in _BLANK_LINES_RE.split(content.strip())]
+    pages: List[str] = []
+    current: List[str] = []
+    size = 0
+    for paragraph in paragraphs:
+        if not paragraph:
+            continue
+        while len(paragraph) > page_chars:
+            if current:
+                pages.append("\n\n".join(current))
+                current, size = [], 0
+            pages.append(paragraph[:page_chars])
+            paragraph = paragraph[page_chars:]
+        if current and size + len(paragraph) > page_chars:
+            pages.append("\n\n".join(current))
+            current, size = [], 0
+        current.append(paragraph)
+        size += len(paragraph) + 2
+    if current:
+        pages.append("\n\n".join(current))
+    return pages or [""]
+
+
+def render_pages(title: str, content: str, page_chars: int = 8000) -> List[str]:
+    """把标题和纯文本正文渲染为分页的 HTML"""
+    title_html = escape_text(title)
+    pages = []
+    for page in split_pages(content or "", page_chars):
+        body = "".join(f"<p>{escape_text(p).replace(chr(10), '<br>')}</p>" for p in page.split("\n\n"))
+        pages.append(_PAGE_TEMPLATE.format(title=title_html, body=body))
+    return pages
+
+
+class PreviewRenderer:
+    """带 LRU 缓存的预览渲染器（线程安全）
+
+    缓存键为 (链接, 标题+正文的摘要)：同一链接内容不变时直接复用，内容变化时重新渲染。
+    另外记录每个链接最近一次的摘要，界面再次选中同一行时无需重新获取页面。
+    """
+
+    def __init__(self, max_entries: int = 64, page_chars: int = 8000):
+        self.max_entries = max_entries
+        self.page_chars = page_chars
+        self._cache: "OrderedDict[Tuple[str, str], List[str]]" = OrderedDict()
+        self._latest: dict = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def digest(title: str, content: str) -> str:
+        return hashlib.blake2b(f"{title}\x00{content}".encode("utf-8"), digest_size=16).hexdigest()
+
+    def render(self, url: str, title: str, content: str) -> List[str]:
+        """渲染并缓存，返回各页 HTML"""
+        key = (url, self.digest(title, content))
+        with self._lock:
+            pages = self._cache.get(key)
+            if pages is not None:
+                self._cache.move_to_end(key)
+                self._latest[url] = key[1]
+                self.hits += 1
+                return pages
+            self.misses += 1
+
+        try:
+            pages = render_pages(title, content, self.page_chars)
+        except Exception as e:
+            logger.error(f"渲染预览失败: {str(e)}")
+            pages = [message_html(f"渲染预览失败: {str(e)}", "red")]
+
+        with self._lock:
+            self._cache[key] = pages
+            self._latest[url] = key[1]
+            while len(self._cache) > self.max_entries:
+                (old_url, old_digest), _ = self._cache.popitem(last=False)
+                if self._latest.get(old_url) == old_digest:
+                    del self._latest[old_url]
+        return pages
+
+    def cached(self, url: str) -> Optional[List[str]]:
+        """该链接最近一次渲染的结果，没有时返回 None"""
+        with self._lock:
+            digest = self._latest.get(url)
+            if digest is None:
+                return None
+            key = (url, digest)
+            pages = self._cache.get(key)
+            if pages is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+            return pages
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self._latest.clear()
+
+
+_renderer: Optional[PreviewRenderer] = None
+_renderer_lock = threading.Lock()
+
+
+def get_preview_renderer() -> PreviewRenderer:
+    """进程内共享的预览渲染器"""
+    global _renderer
+    with _renderer_lock:
+        if _renderer is None:
+            _renderer = PreviewRenderer()
+        return _renderer
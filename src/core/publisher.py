@@ -1,16 +1,108 @@
-import aiohttp
 from loguru import logger
 from datetime import datetime
+from typing import Dict, List
+from src.core.token_validator import TokenValidator
+from src.core.article_versions import PUBLISHED, get_version_store
+from src.core.analytics import get_analytics, parse_time
+from src.core.http_client import create_client
+from src.utils.log_setup import log_http, truncate
 import json
 import asyncio
 
 class Publisher:
     def __init__(self):
         self.base_url = "https://mp.toutiao.com/mp/agw/article/publish"
+        self.token_validator = TokenValidator()
+        self.autoflush_analytics = True  # 批量发布时由调用方在结束后统一写盘
+        
+    def _check_token(self, token: str):
+        """根据本地校验缓存跳过已失效的账号，不发起网络请求"""
+        if self.token_validator.is_known_invalid(token):
+            logger.warning("账号Token已失效，跳过发布")
+            raise Exception("账号Token已失效，请重新登录或更新Token")
+            
+    def _save_version(self, article_id: str, article_data: dict):
+        """把发布/更新的正文记为发布版本（article_data 中的 version_key 为草稿的版本键）"""
+        key = article_data.get("version_key") or f"article-{article_id}"
+        get_version_store().add(key, article_data.get("content", ""), PUBLISHED,
+                                article_id=article_id, title=article_data.get("title", ""))
+            
+    def _timer(self, token: str, article_data: dict):
+        """定时发布时间：article_data 中的 publish_at 为时间或 "auto"（按账号历史数据推荐的发布时段）
+
+        返回 datetime，立即发布时返回 None
+        """
+        publish_at = article_data.get("publish_at")
+        if not publish_at:
+            return None
+        if publish_at == "auto":
+            analytics = get_analytics()
+            category = article_data.get("category") or None
+            when = (analytics.next_publish_time(account=token, category=category)
+                    or analytics.next_publish_time(account=token)
+                    or analytics.next_publish_time())
+            if when is None:
+                logger.info("历史数据不足，无法推荐发布时段，改为立即发布")
+            return when
+        timestamp = parse_time(publish_at)
+        if timestamp is None:
+            raise Exception(f"定时发布时间格式错误: {publish_at}")
+        when = datetime.fromtimestamp(timestamp)
+        return when if when > datetime.now() else None
+        
+    async def _content(self, token: str, article_data: dict) -> str:
+        """正文；带 images（提取时收集的图片地址）时下载、上传图片并插入正文，失败时只发文字"""
+        content = article_data.get("content", "")
+        if not article_data.get("images"):
+            return content
+        try:
+            from src.core.image_pipeline import get_image_pipeline, place_images
+            images = await get_image_pipeline().prepare(token, article_data["images"],
+                                                        referer=article_data.get("original_url"))
+            return place_images(content, images)
+        except Exception as e:
+            logger.error(f"处理文章图片失败: {str(e)}")
+            return content
+            
+    def _record_publish(self, token: str, article_id: str, article_data: dict, when):
+        """把分类、标签和来源平台记入文章统计，供按分类/来源分析阅读量"""
+        try:
+            analytics = get_analytics()
+            analytics.record_publish(token, article_id, article_data,
+                                     published=when.timestamp() if when else None)
+            if self.autoflush_analytics:
+                analytics.flush()
+        except Exception as e:
+            logger.error(f"记录发布统计失败: {str(e)}")
+            
+    async def publish_to_accounts(self, tokens: List[str], article_data: dict) -> Dict[str, dict]:
+        """同一篇文章发布到多个账号，已失效的账号直接跳过"""
+        results = {}
+        valid_tokens = []
+        for token in tokens:
+            if self.token_validator.is_known_invalid(token):
+                results[token] = {"status": "skipped", "message": "Token已失效"}
+            else:
+                valid_tokens.append(token)
+                
+        outcomes = await asyncio.gather(
+            *(self.publish_toutiao(token, article_data) for token in valid_tokens),
+            return_exceptions=True
+        )
+        for token, outcome in zip(valid_tokens, outcomes):
+            if isinstance(outcome, Exception):
+                results[token] = {"status": "failed", "message": str(outcome)}
+            else:
+                results[token] = outcome
+        return results
         
     async def publish_toutiao(self, token: str, article_data: dict) -> dict:
         """发布文章到头条号"""
+        import httpx
+        
+        self._check_token(token)
         try:
+            when = self._timer(token, article_data)
             session_cookies = {
                 "MONITOR_WEB_ID": token,
                 "toutiao_sso_user": token,
@@ -29,53 +121,57 @@ class Publisher:
             # 构建发布数据
             data = {
                 "title": article_data.get("title", ""),
-                "content": article_data.get("content", ""),
+                "content": await self._content(token, article_data),
                 "category": article_data.get("category", ""),
                 "tags": article_data.get("tags", []),
                 "article_type": 0,  # 0表示普通图文
                 "save_status": 1,  # 1表示发布
-                "timer_status": 0,  # 0表示立即发布
+                "timer_status": 1 if when else 0,  # 0表示立即发布，1表示定时发布
             }
+            if when:
+                data["timer_time"] = when.strftime("%Y-%m-%d %H:%M")
             
-            logger.debug(f"Publishing article with data: {json.dumps(data, ensure_ascii=False)}")
+            log_http("发布文章请求", body=data, url=self.base_url)
             
-            async with aiohttp.ClientSession(cookies=session_cookies) as session:
-                async with session.post(
+            async with create_client(cookies=session_cookies, timeout=30.0, rate_limited=False) as session:
+                response = await session.post(
                     self.base_url,
                     headers=headers,
-                    json=data,
-                    timeout=30
-                ) as response:
-                    logger.debug(f"Response status: {response.status}")
-                    response_text = await response.text()
-                    logger.debug(f"Response text: {response_text}")
+                    json=data
+                )
+                response_text = response.text
+                log_http("发布接口响应", status=response.status_code, body=response_text)
+                
+                if response.status_code == 200:
+                    try:
+                        result = json.loads(response_text)
+                    except json.JSONDecodeError as e:
+                        logger.error(f"JSON解析失败: {str(e)}, 原始响应: {truncate(response_text)}")
+                        raise Exception("服务器返回数据格式错误")
                     
-                    if response.status == 200:
-                        try:
-                            result = json.loads(response_text)
-                        except json.JSONDecodeError as e:
-                            logger.error(f"JSON解析失败: {str(e)}, 原始响应: {response_text}")
-                            raise Exception("服务器返回数据格式错误")
-                        
-                        if result.get("message") == "success":
-                            logger.info("文章发布成功")
-                            return {
-                                "article_id": result.get("data", {}).get("article_id", ""),
-                                "status": "success",
-                                "message": "发布成功"
-                            }
-                        else:
-                            error_msg = result.get("message", "未知错误")
-                            logger.error(f"API返回错误: {error_msg}")
-                            raise Exception(f"API返回错误: {error_msg}")
+                    if result.get("message") == "success":
+                        logger.info("文章发布成功")
+                        article_id = result.get("data", {}).get("article_id", "")
+                        self._save_version(article_id, article_data)
+                        self._record_publish(token, article_id, article_data, when)
+                        return {
+                            "article_id": article_id,
+                            "status": "success",
+                            "message": f"已定时于 {data['timer_time']} 发布" if when else "发布成功",
+                            "publish_at": data.get("timer_time", "")
+                        }
                     else:
-                        logger.error(f"HTTP错误: {response.status}, 响应: {response_text}")
-                        raise Exception(f"HTTP错误: {response.status}")
-                        
-        except asyncio.TimeoutError:
+                        error_msg = result.get("message", "未知错误")
+                        logger.error(f"API返回错误: {error_msg}")
+                        raise Exception(f"API返回错误: {error_msg}")
+                else:
+                    logger.error(f"HTTP错误: {response.status_code}, 响应: {truncate(response_text)}")
+                    raise Exception(f"HTTP错误: {response.status_code}")
+                    
+        except (asyncio.TimeoutError, httpx.TimeoutException):
             logger.error("请求超时")
             raise Exception("请求超时，请检查网络连接")
-        except aiohttp.ClientError as e:
+        except httpx.HTTPError as e:
             logger.error(f"网络请求错误: {str(e)}")
             raise Exception(f"网络请求错误: {str(e)}")
         except Exception as e:
@@ -84,6 +180,9 @@ class Publisher:
             
     async def update_article(self, token: str, article_id: str, article_data: dict) -> dict:
         """更新已发布的文章"""
+        import httpx
+        
+        self._check_token(token)
         try:
             session_cookies = {
                 "MONITOR_WEB_ID": token,
@@ -104,52 +203,51 @@ class Publisher:
             data = {
                 "article_id": article_id,
                 "title": article_data.get("title", ""),
-                "content": article_data.get("content", ""),
+                "content": await self._content(token, article_data),
                 "category": article_data.get("category", ""),
                 "tags": article_data.get("tags", []),
                 "save_status": 1  # 1表示更新并发布
             }
             
             url = f"https://mp.toutiao.com/mp/agw/article/update"
-            logger.debug(f"Updating article with data: {json.dumps(data, ensure_ascii=False)}")
+            log_http("更新文章请求", body=data, url=url, article_id=article_id)
             
-            async with aiohttp.ClientSession(cookies=session_cookies) as session:
-                async with session.post(
+            async with create_client(cookies=session_cookies, timeout=30.0, rate_limited=False) as session:
+                response = await session.post(
                     url,
                     headers=headers,
-                    json=data,
-                    timeout=30
-                ) as response:
-                    logger.debug(f"Response status: {response.status}")
-                    response_text = await response.text()
-                    logger.debug(f"Response text: {response_text}")
+                    json=data
+                )
+                response_text = response.text
+                log_http("发布接口响应", status=response.status_code, body=response_text)
+                
+                if response.status_code == 200:
+                    try:
+                        result = json.loads(response_text)
+                    except json.JSONDecodeError as e:
+                        logger.error(f"JSON解析失败: {str(e)}, 原始响应: {truncate(response_text)}")
+                        raise Exception("服务器返回数据格式错误")
                     
-                    if response.status == 200:
-                        try:
-                            result = json.loads(response_text)
-                        except json.JSONDecodeError as e:
-                            logger.error(f"JSON解析失败: {str(e)}, 原始响应: {response_text}")
-                            raise Exception("服务器返回数据格式错误")
-                        
-                        if result.get("message") == "success":
-                            logger.info("文章更新成功")
-                            return {
-                                "article_id": article_id,
-                                "status": "success",
-                                "message": "更新成功"
-                            }
-                        else:
-                            error_msg = result.get("message", "未知错误")
-                            logger.error(f"API返回错误: {error_msg}")
-                            raise Exception(f"API返回错误: {error_msg}")
+                    if result.get("message") == "success":
+                        logger.info("文章更新成功")
+                        self._save_version(article_id, article_data)
+                        return {
+                            "article_id": article_id,
+                            "status": "success",
+                            "message": "更新成功"
+                        }
                     else:
-                        logger.error(f"HTTP错误: {response.status}, 响应: {response_text}")
-                        raise Exception(f"HTTP错误: {response.status}")
-                        
-        except asyncio.TimeoutError:
+                        error_msg = result.get("message", "未知错误")
+                        logger.error(f"API返回错误: {error_msg}")
+                        raise Exception(f"API返回错误: {error_msg}")
+                else:
+                    logger.error(f"HTTP错误: {response.status_code}, 响应: {truncate(response_text)}")
+                    raise Exception(f"HTTP错误: {response.status_code}")
+                    
+        except (asyncio.TimeoutError, httpx.TimeoutException):
             logger.error("请求超时")
             raise Exception("请求超时，请检查网络连接")
-        except aiohttp.ClientError as e:
+        except httpx.HTTPError as e:
             logger.error(f"网络请求错误: {str(e)}")
             raise Exception(f"网络请求错误: {str(e)}")
         except Exception as e:
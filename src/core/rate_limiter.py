@@ -0,0 +1,182 @@
+from loguru import logger
+import asyncio
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlparse
+from src.utils.metrics import metrics
+
+# 各站点的初始限速（请求/秒）与突发量，未列出的站点使用默认值
+DEFAULT_HOST_LIMITS = {
+    "www.toutiao.com": {"rate": 2.0, "burst": 4},
+    "mp.toutiao.com": {"rate": 2.0, "burst": 4},
+    "api.vvhan.com": {"rate": 1.0, "burst": 2},
+    "api.oioweb.cn": {"rate": 1.0, "burst": 2},
+}
+
+THROTTLE_STATUS = {429, 500, 502, 503, 504}
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """解析 Retry-After 头（秒数或 HTTP 日期）"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except Exception:
+        return None
+
+class HostLimiter:
+    """单个站点的令牌桶，速率按 AIMD 自适应
+
+    - 成功时速率线性增加 additive_increase，不超过 max_rate
+    - 429/5xx 时速率乘以 backoff_factor，不低于 min_rate；同一冷却期内只降一次
+    - 收到 Retry-After 时在指定时间之前不再放行请求
+    令牌可以被预支为负数，表示排队中的请求，这样同步与异步调用方可以共用同一个桶。
+    """
+
+    def __init__(self, host: str, rate: float = 5.0, burst: int = 5,
+                 min_rate: float = 0.2, max_rate: float = 50.0,
+                 additive_increase: float = 0.2, backoff_factor: float = 0.5):
+        self.host = host
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.additive_increase = additive_increase
+        self.backoff_factor = backoff_factor
+        self.tokens = float(burst)
+        self.blocked_until = 0.0
+        self._last = time.monotonic()
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+        self._publish()
+
+    def _refill(self, now: float):
+        elapsed = now - self._last
+        if elapsed > 0:
+            self.tokens = min(float(self.burst), self.tokens + elapsed * self.rate)
+            self._last = now
+
+    def reserve(self) -> float:
+        """预定一个令牌，返回需要等待的秒数"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1
+            wait = 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+            wait = max(wait, self.blocked_until - now)
+        if wait > 0:
+            metrics.inc("http.rate_limit_wait_seconds", wait, host=self.host)
+        metrics.inc("http.requests", host=self.host)
+        return wait
+
+    def on_success(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.additive_increase)
+        self._publish()
+
+    def on_throttle(self, retry_after: Optional[float] = None):
+        with self._lock:
+            now = time.monotonic()
+            # 并发请求可能同时收到 429，冷却期内只降速一次
+            if now - self._last_decrease >= 1.0 / self.rate:
+                self.rate = max(self.min_rate, self.rate * self.backoff_factor)
+                self._last_decrease = now
+            if retry_after:
+                self.blocked_until = max(self.blocked_until, now + retry_after)
+                # 封禁期间不累积令牌
+                self.tokens = min(self.tokens, 0.0)
+                self._last = max(self._last, self.blocked_until)
+        metrics.inc("http.throttled", host=self.host)
+        logger.warning(f"{self.host} 触发限流，速率降至 {self.rate:.2f}/s"
+                       + (f"，{retry_after:.1f}s 后重试" if retry_after else ""))
+        self._publish()
+
+    def _publish(self):
+        metrics.set_gauge("http.host_rate", round(self.rate, 3), host=self.host)
+
+class RateLimiter:
+    """按站点限速，供 httpx 客户端（事件钩子）和浏览器抓取（同步调用）共用"""
+
+    def __init__(self, host_limits: Dict[str, Dict] = None, default_limit: Dict = None):
+        self.host_limits = dict(DEFAULT_HOST_LIMITS if host_limits is None else host_limits)
+        self.default_limit = default_limit or {"rate": 5.0, "burst": 5}
+        self.enabled = True
+        self._hosts: Dict[str, HostLimiter] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def host_of(url) -> str:
+        return urlparse(str(url)).netloc.lower()
+
+    def limiter_for(self, host: str) -> HostLimiter:
+        with self._lock:
+            limiter = self._hosts.get(host)
+            if limiter is None:
+                limiter = HostLimiter(host, **self.host_limits.get(host, self.default_limit))
+                self._hosts[host] = limiter
+            return limiter
+
+    async def acquire(self, url):
+        """异步等待放行"""
+        if not self.enabled:
+            return
+        wait = self.limiter_for(self.host_of(url)).reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def acquire_sync(self, url):
+        """同步等待放行（浏览器抓取等运行在普通线程中的调用方）"""
+        if not self.enabled:
+            return
+        wait = self.limiter_for(self.host_of(url)).reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    def feedback(self, url, status: Optional[int], retry_after: Optional[str] = None):
+        """根据响应状态调整速率"""
+        if not self.enabled or status is None:
+            return
+        limiter = self.limiter_for(self.host_of(url))
+        if status in THROTTLE_STATUS:
+            limiter.on_throttle(parse_retry_after(retry_after))
+        elif status < 400:
+            limiter.on_success()
+
+    # ---------- httpx 事件钩子 ----------
+
+    async def on_request(self, request):
+        await self.acquire(request.url)
+
+    async def on_response(self, response):
+        self.feedback(response.request.url, response.status_code,
+                      response.headers.get("Retry-After"))
+
+    def event_hooks(self) -> Dict:
+        return {"request": [self.on_request], "response": [self.on_response]}
+
+    def reset(self):
+        """丢弃所有站点的限速状态"""
+        with self._lock:
+            self._hosts.clear()
+
+    def rates(self) -> Dict[str, float]:
+        """当前各站点速率"""
+        with self._lock:
+            return {host: limiter.rate for host, limiter in self._hosts.items()}
+
+_limiter: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+
+def get_rate_limiter() -> RateLimiter:
+    """进程内共享的限速器"""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter()
+        return _limiter
@@ -0,0 +1,294 @@
+"""定时发布排期：把一天的文章一次性提交为头条号服务端定时发布，之后只做对账
+
+提交时每篇文章带上 timer_status=1 与 timer_time，由服务端到点发布，本地不为每篇文章保留定时器或连接。
+排期记录保存在 data/schedule/schedule.bin，状态：
+    scheduled  已提交，等待上线
+    live       已在文章列表中出现
+    missing    过了定时时间 grace_minutes 仍未出现（审核中或被拒），之后继续复查
+    failed     提交失败，或超过 give_up_hours 仍未上线
+
+对账 reconcile() 只为有到期记录的账号拉取文章列表，找到全部到期文章或翻过定时时间之前的文章即停止。
+next_check_at() 给出下一次需要对账的时间，调用方只需一个一次性定时器（界面中为 QTimer.singleShot）。
+
+命令行：
+    python -m src.core.scheduler submit plan.json   # {"token": "...", "articles": [{title, content, ...}]}
+    python -m src.core.scheduler reconcile
+    python -m src.core.scheduler status
+"""
+import asyncio
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from loguru import logger
+
+from src.core.analytics import get_analytics, parse_time
+from src.utils import serialization
+
+SCHEDULE_FILE = Path("data/schedule/schedule.bin")
+
+SCHEDULED = "scheduled"
+LIVE = "live"
+MISSING = "missing"
+FAILED = "failed"
+
+
+class PublishScheduler:
+    """服务端定时发布的排期与对账"""
+
+    def __init__(self, publisher=None, path: Optional[Path] = SCHEDULE_FILE, check_delay_minutes: int = 5,
+                 grace_minutes: int = 30, recheck_minutes: int = 30, give_up_hours: int = 24,
+                 concurrency: int = 4):
+        if publisher is None:
+            from src.core.publisher import Publisher
+            publisher = Publisher()
+        self.publisher = publisher
+        self.publisher.autoflush_analytics = False
+        self.path = path
+        self.check_delay = check_delay_minutes * 60   # 定时时间过后多久第一次对账
+        self.grace = grace_minutes * 60
+        self.recheck = recheck_minutes * 60
+        self.give_up = give_up_hours * 3600
+        self.concurrency = concurrency
+        self._lock = threading.RLock()
+        self.entries: Dict[str, Dict] = {}
+        if path is not None:
+            try:
+                self.entries = serialization.read_file(path, default={}) or {}
+            except Exception as e:
+                logger.error(f"加载发布排期失败: {str(e)}")
+                # 先把读不出的文件移开，否则第一次 _save() 就会清空排期；移不开时不再写回
+                if not serialization.set_aside(path):
+                    self.path = None
+
+    def _save(self):
+        if self.path is None:
+            return
+        try:
+            with self._lock:
+                serialization.write_file(self.path, self.entries)
+        except Exception as e:
+            logger.error(f"保存发布排期失败: {str(e)}")
+
+    # ---------- 排期 ----------
+
+    def plan(self, count: int, token: Optional[str] = None, day: Optional[datetime] = None,
+             start_hour: int = 8, end_hour: int = 22, min_lead_minutes: int = 30) -> List[datetime]:
+        """为 count 篇文章安排当天（默认今天，已过的时段顺延到明天）的发布时间
+
+        优先使用文章统计推荐的时段（每小时最多一篇），不足时在 start_hour~end_hour 之间均匀补齐。
+        """
+        now = datetime.now()
+        earliest = now + timedelta(minutes=min_lead_minutes)
+        day = (day or now).replace(hour=0, minute=0, second=0, microsecond=0)
+        if day + timedelta(hours=end_hour) <= earliest:
+            day += timedelta(days=1)
+        start = max(day + timedelta(hours=start_hour), earliest)
+        end = day + timedelta(hours=end_hour)
+
+        chosen: List[datetime] = []
+        windows = get_analytics().recommend_windows(24, account=token) or get_analytics().recommend_windows(24)
+        for window in windows:
+            if window["weekday"] != day.weekday():
+                continue
+            slot = day + timedelta(hours=window["hour"])
+            if start <= slot <= end and slot not in chosen:
+                chosen.append(slot)
+            if len(chosen) >= count:
+                break
+        missing = count - len(chosen)
+        if missing > 0:
+            step = (end - start) / (missing + 1) if end > start else timedelta(minutes=10)
+            for index in range(1, missing + 1):
+                slot = (start + step * index).replace(second=0, microsecond=0)
+                while slot in chosen:
+                    slot += timedelta(minutes=1)
+                chosen.append(slot)
+        return sorted(chosen)
+
+    async def submit(self, token: str, articles: List[Dict], times: Optional[List[datetime]] = None,
+                     account_name: str = "") -> List[Dict]:
+        """一次性提交一批定时发布；文章中自带 publish_at 时间的按其时间，其余按 plan() 安排"""
+        if times is None:
+            # publish_at 为空或 "auto" 的文章按 plan() 安排
+            explicit = [parse_time(a.get("publish_at")) if a.get("publish_at") != "auto" else None for a in articles]
+            planned = iter(self.plan(explicit.count(None), token))
+            times = [datetime.fromtimestamp(t) if t is not None else next(planned) for t in explicit]
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def one(article: Dict, when: datetime) -> Dict:
+            entry = {
+                "id": uuid.uuid4().hex,
+                "token": token,
+                "account": account_name,
+                "title": article.get("title", ""),
+                "publish_at": when.timestamp(),
+                "article_id": "",
+                "status": SCHEDULED,
+                "submitted_at": time.time(),
+                "checked_at": 0.0,
+                "message": "",
+            }
+            async with semaphore:
+                try:
+                    result = await self.publisher.publish_toutiao(token, dict(article, publish_at=when))
+                    entry["article_id"] = result.get("article_id", "")
+                    if not result.get("publish_at"):
+                        # 定时时间已过，服务端按立即发布处理
+                        entry["publish_at"] = time.time()
+                except Exception as e:
+                    entry["status"] = FAILED
+                    entry["message"] = str(e)
+            with self._lock:
+                self.entries[entry["id"]] = entry
+            return entry
+
+        entries = await asyncio.gather(*(one(a, w) for a, w in zip(articles, times)))
+        self._save()
+        get_analytics().flush()
+        logger.info(f"已提交 {sum(e['status'] == SCHEDULED for e in entries)}/{len(entries)} 篇定时发布")
+        return list(entries)
+
+    # ---------- 对账 ----------
+
+    def _due_at(self, entry: Dict) -> Optional[float]:
+        """记录下一次需要对账的时间，不再需要时返回 None"""
+        if entry["status"] == SCHEDULED:
+            return max(entry["publish_at"] + self.check_delay, entry["checked_at"] + self.recheck)
+        if entry["status"] == MISSING:
+            return entry["checked_at"] + self.recheck
+        return None
+
+    def pending(self, now: Optional[float] = None) -> List[Dict]:
+        """已到对账时间的记录"""
+        now = now or time.time()
+        with self._lock:
+            return [dict(e) for e in self.entries.values()
+                    if self._due_at(e) is not None and self._due_at(e) <= now]
+
+    def next_check_at(self) -> Optional[float]:
+        """下一次需要对账的时间戳；没有待确认的记录时返回 None"""
+        with self._lock:
+            times = [t for t in (self._due_at(e) for e in self.entries.values()) if t is not None]
+        return min(times) if times else None
+
+    async def _find(self, account: Dict, entries: List[Dict], max_pages: int, page_size: int) -> Dict[str, Dict]:
+        """翻页查找排期中的文章，全部找到或翻到最早定时时间之前的文章时停止"""
+        from src.core.account_store import AccountStore
+        from src.core.article_fetcher import ArticleFetcher
+
+        fetcher = ArticleFetcher(account)
+        wanted = {e["article_id"] for e in entries if e["article_id"]}
+        oldest = min(e["publish_at"] for e in entries) - 3600
+        found: Dict[str, Dict] = {}
+        for page in range(1, max_pages + 1):
+            result = await fetcher.fetch_articles(page, page_size)
+            articles = result.get("articles", [])
+            for article in articles:
+                if str(article.get("article_id")) in wanted:
+                    found[str(article["article_id"])] = article
+            get_analytics().ingest(AccountStore.key_of(account), articles)
+            times = [parse_time(a.get("publish_time")) for a in articles]
+            if len(found) == len(wanted) or not result.get("has_more") \
+                    or any(t is not None and t < oldest for t in times):
+                break
+        return found
+
+    async def reconcile(self, accounts: Optional[List[Dict]] = None, now: Optional[float] = None,
+                        max_pages: int = 5, page_size: int = 20) -> Dict[str, int]:
+        """核对到期的定时发布是否已上线，返回各状态的变化数量"""
+        from src.core.account_store import get_account_store
+
+        now = now or time.time()
+        due = self.pending(now)
+        summary = {LIVE: 0, MISSING: 0, FAILED: 0, "checked": len(due)}
+        if not due:
+            return summary
+        known = {a.get("token"): a for a in (accounts if accounts is not None else get_account_store().all())}
+        by_token: Dict[str, List[Dict]] = {}
+        for entry in due:
+            by_token.setdefault(entry["token"], []).append(entry)
+
+        async def one(token: str, entries: List[Dict]):
+            account = known.get(token) or {"token": token}
+            error = ""
+            try:
+                found = await self._find(account, entries, max_pages, page_size)
+            except Exception as e:
+                # 拉取失败（离线、Token 失效）也记下检查时间，按 recheck 间隔重试而不是立即再次对账；
+                # 宽限与放弃规则照常生效
+                logger.error(f"定时发布对账失败: {str(e)}")
+                found, error = {}, str(e)
+            with self._lock:
+                for entry in entries:
+                    stored = self.entries.get(entry["id"])
+                    if stored is None:
+                        continue
+                    stored["checked_at"] = now
+                    article = found.get(entry["article_id"])
+                    if article:
+                        status = LIVE
+                        stored["live_at"] = parse_time(article.get("publish_time")) or now
+                    elif now >= stored["publish_at"] + self.give_up:
+                        status = FAILED
+                        stored["message"] = f"超过定时时间仍无法确认上线: {error}" if error else "超过定时时间仍未上线"
+                    elif now >= stored["publish_at"] + self.grace:
+                        status = MISSING
+                    else:
+                        continue
+                    if stored["status"] != status:
+                        stored["status"] = status
+                        summary[status] += 1
+
+        await asyncio.gather(*(one(token, entries) for token, entries in by_token.items()))
+        self._save()
+        get_analytics().flush()
+        if summary[MISSING] or summary[FAILED]:
+            logger.warning(f"定时发布对账：{summary[MISSING]} 篇未按时上线，{summary[FAILED]} 篇放弃")
+        return summary
+
+    def status(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        with self._lock:
+            for entry in self.entries.values():
+                counts[entry["status"]] = counts.get(entry["status"], 0) + 1
+        return counts
+
+
+_scheduler: Optional[PublishScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> PublishScheduler:
+    """进程内共享的排期"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = PublishScheduler()
+        return _scheduler
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+
+    from src.core.async_runtime import run_sync
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "status"
+    scheduler = get_scheduler()
+    if command == "submit":
+        plan = json.loads(Path(sys.argv[2]).read_text(encoding="utf-8"))
+        entries = run_sync(scheduler.submit(plan["token"], plan["articles"], account_name=plan.get("account", "")))
+        for entry in entries:
+            when = datetime.fromtimestamp(entry["publish_at"]).strftime("%Y-%m-%d %H:%M")
+            print(f"{when}  {entry['status']:<9}  {entry['title']}")
+    elif command == "reconcile":
+        print(run_sync(scheduler.reconcile()))
+    else:
+        print(scheduler.status())
+        next_check = scheduler.next_check_at()
+        if next_check:
+            print(f"下一次对账：{datetime.fromtimestamp(next_check):%Y-%m-%d %H:%M}")
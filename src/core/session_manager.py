@@ -0,0 +1,316 @@
+from loguru import logger
+import asyncio
+import threading
+import time
+from http.cookiejar import Cookie, CookieJar
+from pathlib import Path
+from typing import Dict, List, Optional
+from src.core.account_store import AccountStore
+from src.core.async_runtime import runtime
+from src.core.http_client import create_client
+from src.utils import serialization
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+    "Accept": "application/json, text/plain, */*",
+    "Accept-Language": "zh-CN,zh;q=0.9",
+    "Origin": "https://mp.toutiao.com",
+    "Referer": "https://mp.toutiao.com/",
+}
+
+def _cookie_to_dict(cookie: Cookie) -> Dict:
+    return {
+        "name": cookie.name,
+        "value": cookie.value,
+        "domain": cookie.domain,
+        "path": cookie.path,
+        "expires": cookie.expires,
+        "secure": cookie.secure,
+    }
+
+def _make_cookie(name: str, value: str, domain: str, path: str = "/",
+                 expires: Optional[int] = None, secure: bool = False) -> Cookie:
+    return Cookie(
+        version=0, name=name, value=value,
+        port=None, port_specified=False,
+        domain=domain, domain_specified=True, domain_initial_dot=domain.startswith("."),
+        path=path, path_specified=True,
+        secure=secure, expires=expires, discard=expires is None,
+        comment=None, comment_url=None, rest={}, rfc2109=False,
+    )
+
+class Session:
+    """单个账号的会话：持久化的 Cookie 与复用的连接池"""
+
+    def __init__(self, key: str, cookies: List[Dict], saved_at: float, username: str = ""):
+        self.key = key
+        self.username = username
+        self.cookies = cookies
+        self.saved_at = saved_at
+        self.client = None
+        self.loop = None
+        self.lock: Optional[asyncio.Lock] = None
+        self.fingerprint = self._fingerprint(cookies)
+
+    @staticmethod
+    def _fingerprint(cookies: List[Dict]) -> tuple:
+        return tuple(sorted((c["name"], c["value"], c.get("expires")) for c in cookies))
+
+    def expires_at(self, default_ttl: float) -> float:
+        """会话过期时间：取有过期时间的 Cookie 中最早的一个，否则按默认有效期估算"""
+        expiries = [c["expires"] for c in self.cookies if c.get("expires")]
+        return min(expiries) if expiries else self.saved_at + default_ttl
+
+    def to_dict(self) -> Dict:
+        return {
+            "key": self.key,
+            "username": self.username,
+            "saved_at": self.saved_at,
+            "cookies": self.cookies,
+        }
+
+class SessionManager:
+    """账号会话管理
+
+    - 每个账号的 Cookie 保存在 data/cookies/<账号>.bin，启动后直接恢复，无需重新登录
+    - 每个账号在共享事件循环上只创建一个 httpx 客户端，连接池在多次请求之间复用
+    - 会话临近过期时访问后台首页让服务端续期 Cookie，而不是重新登录
+    """
+
+    def __init__(self, cookie_dir: Path = Path("data/cookies"), domain: str = ".toutiao.com",
+                 default_ttl: float = 24 * 3600, refresh_margin: float = 3600):
+        self.cookie_dir = Path(cookie_dir)
+        self.domain = domain
+        self.base_url = "https://mp.toutiao.com"
+        self.refresh_path = "/profile_v4/index"
+        self.default_ttl = default_ttl        # Cookie 未声明过期时间时的估计有效期（秒）
+        self.refresh_margin = refresh_margin  # 过期前多久开始续期（秒）
+        self.headers = dict(DEFAULT_HEADERS)
+        self._sessions: Dict[str, Session] = {}
+        # 用户名 -> 会话键，第一次按用户名查找时扫描一遍 Cookie 目录，之后随保存更新
+        self._by_username: Optional[Dict[str, str]] = None
+        self._lock = threading.Lock()
+
+    # ---------- 持久化 ----------
+
+    def _path_for(self, key: str) -> Path:
+        safe = "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in key)
+        return self.cookie_dir / f"{safe}{serialization.BINARY_SUFFIX}"
+
+    def _load(self, key: str) -> Optional[Session]:
+        path = self._path_for(key)
+        try:
+            # 兼容旧版本保存的 <账号>.json，读取后转换为二进制格式
+            data = serialization.load_migrating(path, path.with_suffix(".json"))
+            if data is None:
+                return None
+            return Session(key, data.get("cookies", []), data.get("saved_at", 0), data.get("username", ""))
+        except Exception as e:
+            logger.error(f"加载会话Cookie失败: {str(e)}")
+            return None
+
+    def _save(self, session: Session):
+        try:
+            serialization.write_file(self._path_for(session.key), session.to_dict())
+        except Exception as e:
+            logger.error(f"保存会话Cookie失败: {str(e)}")
+            return
+        if session.username:
+            with self._lock:
+                if self._by_username is not None:
+                    self._by_username[session.username] = session.key
+
+    def _username_index(self) -> Dict[str, str]:
+        """用户名 -> 会话键（同一用户名有多个会话时取最近保存的）"""
+        with self._lock:
+            if self._by_username is not None:
+                return self._by_username
+        index, saved = {}, {}
+        if self.cookie_dir.exists():
+            paths = list(self.cookie_dir.glob(f"*{serialization.BINARY_SUFFIX}"))
+            paths += self.cookie_dir.glob("*.json")
+            for path in paths:
+                try:
+                    data = serialization.read_file(path)
+                except Exception:
+                    continue
+                username = data.get("username") if isinstance(data, dict) else None
+                if username and data.get("key") and data.get("saved_at", 0) >= saved.get(username, -1):
+                    index[username] = data["key"]
+                    saved[username] = data.get("saved_at", 0)
+        with self._lock:
+            if self._by_username is None:
+                # 扫描期间内存中新建的会话以内存为准
+                for session in self._sessions.values():
+                    if session.username:
+                        index[session.username] = session.key
+                self._by_username = index
+            return self._by_username
+
+    def _seed_cookies(self, account: Dict) -> List[Dict]:
+        """根据账号中保存的 cookies 或 Token 构造初始 Cookie"""
+        cookies = account.get("cookies")
+        if not cookies:
+            token = account.get("token", "")
+            cookies = {
+                "MONITOR_WEB_ID": token,
+                "toutiao_sso_user": token,
+                "passport_csrf_token": token
+            }
+        return [
+            {"name": k, "value": v, "domain": self.domain, "path": "/", "expires": None, "secure": False}
+            for k, v in cookies.items()
+        ]
+
+    # ---------- 会话获取 ----------
+
+    def session_for(self, account: Dict) -> Session:
+        """获取账号会话，优先从内存和磁盘恢复"""
+        key = AccountStore.key_of(account)
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = self._load(key) or Session(
+                    key, self._seed_cookies(account), time.time(), account.get("username", "")
+                )
+                self._sessions[key] = session
+            return session
+
+    def find_by_username(self, username: str) -> Optional[Session]:
+        """按登录用户名查找仍然有效的会话（经用户名索引，只读取命中的一个 Cookie 文件）"""
+        key = self._username_index().get(username)
+        if key is None:
+            return None
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = self._load(key)
+                if session is None:
+                    return None
+                self._sessions[key] = session
+        if session.username == username and self.is_valid(session):
+            return session
+        return None
+
+    def is_valid(self, session: Session) -> bool:
+        return session.expires_at(self.default_ttl) > time.time()
+
+    def needs_refresh(self, session: Session) -> bool:
+        return session.expires_at(self.default_ttl) - self.refresh_margin <= time.time()
+
+    def remember(self, account: Dict, jar: CookieJar, username: str = ""):
+        """登录成功后保存整个 Cookie 罐"""
+        key = AccountStore.key_of(account)
+        cookies = [_cookie_to_dict(c) for c in jar]
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = Session(key, cookies, time.time(), username)
+                self._sessions[key] = session
+            else:
+                session.cookies = cookies
+                session.saved_at = time.time()
+                session.username = username or session.username
+        session.fingerprint = Session._fingerprint(cookies)
+        if session.client is not None:
+            self._load_jar(session.client, session)
+        self._save(session)
+        return session
+
+    async def client(self, account: Dict):
+        """获取账号的共享客户端（应在共享事件循环中调用），临近过期时先续期"""
+        session = self.session_for(account)
+        loop = asyncio.get_running_loop()
+        if session.loop is not loop:
+            # 客户端与事件循环绑定，换了循环（如独立脚本）时关闭旧客户端后重新创建
+            stale, stale_loop = session.client, session.loop
+            if stale is not None:
+                self.persist(session)
+            session.loop = loop
+            session.lock = asyncio.Lock()
+            session.client = None
+            if stale is not None:
+                await self._close_stale(stale, stale_loop)
+        async with session.lock:
+            if session.client is None or session.client.is_closed:
+                session.client = self._create_client(session)
+            if self.needs_refresh(session):
+                await self._refresh(session)
+        return session.client
+
+    @staticmethod
+    async def _close_stale(client, loop):
+        """关闭绑定在其他事件循环上的客户端：原循环仍在运行时交给它关闭，否则在当前循环关闭"""
+        try:
+            if loop is not None and loop.is_running() and not loop.is_closed():
+                asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+            elif not client.is_closed:
+                await client.aclose()
+        except Exception as e:
+            logger.warning(f"关闭旧会话客户端失败: {str(e)}")
+
+    def _create_client(self, session: Session):
+        import httpx
+
+        client = create_client(
+            headers=self.headers,
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
+        )
+        self._load_jar(client, session)
+        return client
+
+    def _load_jar(self, client, session: Session):
+        client.cookies.jar.clear()
+        for c in session.cookies:
+            client.cookies.jar.set_cookie(_make_cookie(
+                c["name"], c["value"], c.get("domain") or self.domain,
+                c.get("path") or "/", c.get("expires"), c.get("secure", False)
+            ))
+
+    async def _refresh(self, session: Session):
+        """访问后台首页，由服务端下发续期后的 Cookie"""
+        try:
+            response = await session.client.get(f"{self.base_url}{self.refresh_path}")
+            if response.status_code in (401, 403):
+                logger.warning(f"会话已失效，需要重新登录: {session.username or session.key[:8]}")
+                return
+            session.saved_at = time.time()
+            self.persist(session)
+            logger.info(f"会话已续期: {session.username or session.key[:8]}")
+        except Exception as e:
+            logger.error(f"会话续期失败: {str(e)}")
+
+    def persist(self, session: Session):
+        """客户端收到新 Cookie 后写回磁盘（没有变化时跳过）"""
+        if session.client is None:
+            return
+        cookies = [_cookie_to_dict(c) for c in session.client.cookies.jar]
+        fingerprint = Session._fingerprint(cookies)
+        if fingerprint == session.fingerprint:
+            return
+        session.cookies = cookies
+        session.fingerprint = fingerprint
+        self._save(session)
+
+    async def close_all(self):
+        """关闭所有客户端并保存 Cookie"""
+        with self._lock:
+            sessions = list(self._sessions.values())
+        for session in sessions:
+            if session.client is not None:
+                self.persist(session)
+                await session.client.aclose()
+                session.client = None
+
+_manager: Optional[SessionManager] = None
+_manager_lock = threading.Lock()
+
+def get_session_manager() -> SessionManager:
+    """进程内共享的会话管理器"""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = SessionManager()
+            runtime.add_shutdown_hook(_manager.close_all)
+        return _manager
@@ -0,0 +1,134 @@
+"""中文正文规范化：全角/半角折叠、零宽与控制字符、空白、套话行和标点
+
+规则在构造时一次编译：
+    1. 字符映射：全角字母数字与全角空格转半角，不换行空格转普通空格，
+       删除零宽字符、BOM 与控制字符；中文标点保持全角
+    2. <br> 转换行，行内连续空白合并为一个空格，去掉汉字之间的空格和行首尾空白
+    3. 删除短套话行：责任编辑、来源、原标题、点击关注、扫码、阅读原文、免责声明等
+    4. 标点：紧跟汉字的半角 , ; : ! ? 转为全角；连续的 ！/？ 合并；... 和 。。。 统一为 ……
+    5. 多个空行合并为一个空行
+
+normalize_many() 把一批文档用分隔行拼成一个字符串，每条规则对整批只执行一次，
+标题、评论这类短文本批量处理时省去了逐篇调用的开销。
+"""
+import re
+import threading
+from typing import Dict, Iterable, List, Optional
+
+_CJK = r"\u4e00-\u9fff\u3400-\u4dbf"
+_SEPARATOR = "\ue000"   # 私用区字符，拼接批量文档时作为分隔行
+_BATCH_JOIN = f"\n{_SEPARATOR}\n"
+
+# 套话行：以这些词开头并带冒号的短行，或包含这些词的短行
+BOILERPLATE_PREFIXES = ["责任编辑", "编辑", "责编", "来源", "原标题", "作者", "校对", "审核", "图片来源", "文章来源"]
+BOILERPLATE_PHRASES = ["点击关注", "关注我们", "欢迎关注", "扫码关注", "扫描二维码", "长按识别", "阅读原文", "返回搜狐",
+                       "查看更多", "转载请注明", "未经授权", "禁止转载", "免责声明", "版权声明", "版权归原作者",
+                       "点个在看", "点赞关注", "点个赞", "分享到朋友圈", "本文来自", "如有侵权"]
+
+
+def _translation_table() -> Dict[str, str]:
+    """需要替换或删除的字符 -> 替换结果（删除为空串）"""
+    table = {}
+    # 全角 ASCII 字母与数字 -> 半角
+    for start, end in ((0xFF10, 0xFF19), (0xFF21, 0xFF3A), (0xFF41, 0xFF5A)):
+        for code in range(start, end + 1):
+            table[chr(code)] = chr(code - 0xFEE0)
+    for code in (0xFF0B, 0xFF0D, 0xFF0F, 0xFF1D, 0xFF20, 0xFF3F, 0xFF05, 0xFF06, 0xFF03):
+        table[chr(code)] = chr(code - 0xFEE0)   # ＋ － ／ ＝ ＠ ＿ ％ ＆ ＃
+    for code in (0x3000, 0x00A0, 0x2002, 0x2003, 0x2009, 0x202F, 0x205F):
+        table[chr(code)] = " "
+    for code in (0x200B, 0x200C, 0x200D, 0x2060, 0xFEFF, 0x00AD, 0x180E):
+        table[chr(code)] = ""
+    for code in list(range(0x00, 0x20)) + [0x7F]:
+        if chr(code) != "\n":
+            table[chr(code)] = ""
+    table["\r"] = "\n"
+    table["\t"] = " "
+    return table
+
+
+class TextNormalizer:
+    """预编译的正文规范化规则
+
+    每条规则的模式都以字面字符或字符集开头（前后文条件放在后面的断言里），
+    正则引擎可以快速跳过不相关的位置；正文中需要折叠的字符很少，
+    先用字符集正则找出出现过的字符再逐个 str.replace，比 str.translate 逐字符查表快得多。
+    """
+
+    def __init__(self, fold_width: bool = True, punctuation: bool = True, boilerplate: bool = True,
+                 extra_boilerplate: Iterable[str] = ()):
+        self.table = _translation_table()
+        if not fold_width:
+            self.table = {k: v for k, v in self.table.items() if not v or k in "\r\t"}
+        self.punctuation = punctuation
+        self._fold = re.compile("[" + "".join(map(re.escape, self.table)) + "]")
+        self._br = re.compile(r"<br\s*/?>", re.IGNORECASE)
+        self._spaces = re.compile(r"  +")
+        punct = "，。！？；：、“”‘’（）《》"
+        self._cjk_space = re.compile(rf" (?<=[{_CJK}{punct}] )(?=[{_CJK}{punct}])")
+        self._blank_lines = re.compile(r"\n\n\n+")
+        self._boilerplate = None
+        if boilerplate:
+            prefixes = "|".join(map(re.escape, BOILERPLATE_PREFIXES))
+            phrases = "|".join(map(re.escape, list(BOILERPLATE_PHRASES) + list(extra_boilerplate)))
+            # 连同行首的换行一起删除
+            self._boilerplate = re.compile(
+                rf"\n(?:(?:{prefixes}) ?[:：][^\n]{{0,40}}|[^\n]{{0,20}}(?:{phrases})[^\n]{{0,30}})(?=\n)")
+        # 紧跟汉字的半角标点转全角；! ? 连用时整串换成一个全角符号
+        self._half_punct = [(re.compile(rf"{re.escape(half)}(?<=[{_CJK}]{re.escape(half)})"), full)
+                            for half, full in ((",", "，"), (";", "；"), (":", "："))]
+        self._half_punct += [(re.compile(rf"{re.escape(half)}(?<=[{_CJK}！？]{re.escape(half)})[!?]*"), full)
+                             for half, full in (("!", "！"), ("?", "？"))]
+        self._repeated = [(re.compile("！！+"), "！"), (re.compile("？？+"), "？")]
+        self._ellipsis = re.compile(r"[.。…](?:(?<=\.)\.\.+|(?<=。)。。+|(?<=…)…*)")
+
+    def _apply(self, text: str) -> str:
+        # 首尾各补一个换行，首行末行与其他行一样处理
+        text = f"\n{text}\n".replace("\r\n", "\n")
+        for char in set(self._fold.findall(text)):
+            text = text.replace(char, self.table[char])
+        text = self._br.sub("\n", text)
+        text = self._spaces.sub(" ", text)
+        # 连续空格已经合并，行首尾最多只剩一个空格
+        text = text.replace(" \n", "\n").replace("\n ", "\n")
+        if self._boilerplate is not None:
+            text = self._boilerplate.sub("", text)
+        if self.punctuation:
+            for pattern, full in self._half_punct + self._repeated:
+                text = pattern.sub(full, text)
+            text = self._ellipsis.sub("……", text)
+        text = self._cjk_space.sub("", text)
+        return self._blank_lines.sub("\n\n", text)
+
+    def normalize(self, text: str) -> str:
+        if not text:
+            return ""
+        return self._apply(text.replace(_SEPARATOR, "")).strip()
+
+    def normalize_many(self, texts: Iterable[Optional[str]]) -> List[str]:
+        """批量规范化：拼成一个字符串执行一遍规则后再拆开，结果与逐篇 normalize 相同"""
+        texts = [text or "" for text in texts]
+        if not texts:
+            return []
+        # 先去掉原文中的分隔字符，再拼接
+        joined = _BATCH_JOIN.join(text.replace(_SEPARATOR, "") for text in texts)
+        parts = self._apply(joined).split(_SEPARATOR)
+        return [part.strip() for part in parts]
+
+
+_normalizer: Optional[TextNormalizer] = None
+_normalizer_lock = threading.Lock()
+
+
+def get_text_normalizer() -> TextNormalizer:
+    """进程内共享的规范化规则"""
+    global _normalizer
+    with _normalizer_lock:
+        if _normalizer is None:
+            _normalizer = TextNormalizer()
+        return _normalizer
+
+
+def normalize_texts(texts: List[str]) -> List[str]:
+    """批量规范化（模块级函数，可以交给进程池执行）"""
+    return get_text_normalizer().normalize_many(texts)
@@ -0,0 +1,197 @@
+"""标题打分：用账号历史文章的阅读量训练的轻量模型，对候选标题排序
+
+特征为标题的字 1~3-gram（哈希到固定维度）加几个结构特征（长度、数字、问句、引号等），
+目标为 log(1 + 阅读量) 减去均值，用岭回归求解：
+    w = (XᵀX + λI)⁻¹ Xᵀy
+XᵀX 按批累加，训练内存只与特征维度有关；打分是稀疏点积，几个候选标题不到 1 毫秒。
+模型保存在 data/models/title_scorer.bin，没有训练过时所有标题得分相同（保持原顺序）。
+"""
+import math
+import re
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from loguru import logger
+
+from src.utils import serialization
+
+MODEL_FILE = Path("data/models/title_scorer.bin")
+
+_DIGIT_RE = re.compile(r"\d")
+_EXTRA_FEATURES = 6
+
+
+def _extra(title: str) -> List[float]:
+    """结构特征：长度（分段）、含数字、问句、感叹、引号/书名号"""
+    length = len(title)
+    return [
+        min(length, 40) / 40,
+        1.0 if length < 12 or length > 30 else 0.0,
+        1.0 if _DIGIT_RE.search(title) else 0.0,
+        1.0 if "?" in title or "？" in title else 0.0,
+        1.0 if "!" in title or "！" in title else 0.0,
+        1.0 if any(ch in title for ch in "“”\"《》「」") else 0.0,
+    ]
+
+
+class TitleScorer:
+    """哈希 n-gram 特征上的岭回归"""
+
+    def __init__(self, dim: int = 2048, alpha: float = 1.0, max_n: int = 3):
+        self.dim = dim
+        self.alpha = alpha
+        self.max_n = max_n
+        self.weights = None   # numpy 数组，长度 dim + _EXTRA_FEATURES
+        self.bias = 0.0
+        self.trained_on = 0
+        self.trained_at = 0.0
+        self._hash_cache: Dict[str, int] = {}
+
+    @property
+    def trained(self) -> bool:
+        return self.weights is not None
+
+    def _index(self, gram: str) -> int:
+        # 内置 hash() 每个进程加盐不同，模型保存后需要稳定的哈希
+        index = self._hash_cache.get(gram)
+        if index is None:
+            index = zlib.crc32(gram.encode("utf-8")) % self.dim
+            if len(self._hash_cache) < 200000:
+                self._hash_cache[gram] = index
+        return index
+
+    def _sparse(self, titles: List[str]):
+        """标题 -> (行号, 列号, 归一化后的值, 结构特征矩阵)，n-gram 部分按行做 L2 归一化"""
+        import numpy as np
+
+        keys, extra = [], []
+        for row, title in enumerate(titles):
+            title = (title or "").strip().lower()
+            base = row * self.dim
+            keys.extend(base + self._index(title[i:i + n])
+                        for n in range(1, self.max_n + 1) for i in range(len(title) - n + 1))
+            extra.append(_extra(title))
+        unique, counts = np.unique(np.asarray(keys, dtype=np.int64), return_counts=True)
+        rows, cols = unique // self.dim, unique % self.dim
+        counts = counts.astype(np.float32)
+        norms = np.sqrt(np.bincount(rows, weights=counts * counts, minlength=len(titles)))
+        values = counts / np.maximum(norms[rows], 1.0)
+        return rows, cols, values, np.asarray(extra, dtype=np.float32).reshape(len(titles), _EXTRA_FEATURES)
+
+    def transform(self, titles: List[str]):
+        """标题 -> 稠密特征矩阵（训练时按批使用）"""
+        import numpy as np
+
+        rows, cols, values, extra = self._sparse(titles)
+        matrix = np.zeros((len(titles), self.dim + _EXTRA_FEATURES), dtype=np.float32)
+        matrix[rows, cols] = values
+        matrix[:, self.dim:] = extra
+        return matrix
+
+    def fit(self, titles: List[str], read_counts: List[float], batch_size: int = 2000) -> "TitleScorer":
+        """用历史标题和阅读量训练"""
+        import numpy as np
+
+        targets = np.log1p(np.maximum(np.asarray(read_counts, dtype=np.float64), 0))
+        self.bias = float(targets.mean()) if len(targets) else 0.0
+        size = self.dim + _EXTRA_FEATURES
+        gram = np.zeros((size, size))
+        moment = np.zeros(size)
+        for start in range(0, len(titles), batch_size):
+            features = self.transform(titles[start:start + batch_size]).astype(np.float64)
+            gram += features.T @ features
+            moment += features.T @ (targets[start:start + batch_size] - self.bias)
+        gram[np.diag_indices(size)] += self.alpha
+        self.weights = np.linalg.solve(gram, moment).astype(np.float32)
+        self.trained_on = len(titles)
+        self.trained_at = time.time()
+        return self
+
+    def score(self, titles: List[str]):
+        """预测 log(1 + 阅读量)；未训练时返回全 0"""
+        import numpy as np
+
+        if not self.trained or not titles:
+            return np.zeros(len(titles), dtype=np.float32)
+        # 稀疏计算，不构造稠密矩阵
+        rows, cols, values, extra = self._sparse(titles)
+        scores = np.bincount(rows, weights=values * self.weights[cols], minlength=len(titles))
+        return scores + extra @ self.weights[self.dim:] + self.bias
+
+    def rank(self, titles: List[str]) -> List[Tuple[str, float]]:
+        """按得分从高到低排序，返回 [(标题, 预估阅读量)]；得分相同时保持原顺序"""
+        scores = self.score(titles)
+        order = sorted(range(len(titles)), key=lambda i: -float(scores[i]))
+        return [(titles[i], math.expm1(float(scores[i])) if self.trained else 0.0) for i in order]
+
+    # ---------- 持久化 ----------
+
+    def save(self, path: Path = MODEL_FILE):
+        serialization.write_file(path, {
+            "dim": self.dim,
+            "alpha": self.alpha,
+            "max_n": self.max_n,
+            "bias": self.bias,
+            "weights": self.weights.tolist() if self.trained else None,
+            "trained_on": self.trained_on,
+            "trained_at": self.trained_at,
+        })
+
+    @classmethod
+    def load(cls, path: Path = MODEL_FILE) -> "TitleScorer":
+        import numpy as np
+
+        data = serialization.read_file(path)
+        if not data:
+            return cls()
+        scorer = cls(data["dim"], data["alpha"], data["max_n"])
+        scorer.bias = data["bias"]
+        if data.get("weights") is not None:
+            scorer.weights = np.asarray(data["weights"], dtype=np.float32)
+        scorer.trained_on = data.get("trained_on", 0)
+        scorer.trained_at = data.get("trained_at", 0.0)
+        return scorer
+
+
+async def fetch_history(account: Dict, max_pages: int = 50, page_size: int = 20) -> List[Dict]:
+    """通过 ArticleFetcher 翻页拉取账号已发布文章（标题与阅读量）"""
+    from src.core.article_fetcher import ArticleFetcher
+
+    return await ArticleFetcher(account).fetch_history(max_pages, page_size)
+
+
+def train_from_articles(articles: Iterable[Dict], path: Optional[Path] = MODEL_FILE) -> TitleScorer:
+    """用文章列表训练并保存模型，同时替换进程内共享的打分器"""
+    global _scorer
+    articles = [a for a in articles if a.get("title")]
+    scorer = TitleScorer().fit([a["title"] for a in articles],
+                               [float(a.get("read_count") or 0) for a in articles])
+    if path is not None:
+        try:
+            scorer.save(path)
+        except Exception as e:
+            logger.error(f"保存标题打分模型失败: {str(e)}")
+    with _scorer_lock:
+        _scorer = scorer
+    logger.info(f"标题打分模型已用 {len(articles)} 篇历史文章训练")
+    return scorer
+
+
+_scorer: Optional[TitleScorer] = None
+_scorer_lock = threading.Lock()
+
+
+def get_title_scorer() -> TitleScorer:
+    """进程内共享的打分器，首次使用时加载已保存的模型"""
+    global _scorer
+    with _scorer_lock:
+        if _scorer is None:
+            try:
+                _scorer = TitleScorer.load(MODEL_FILE) if MODEL_FILE.exists() else TitleScorer()
+            except Exception as e:
+                logger.error(f"加载标题打分模型失败: {str(e)}")
+                _scorer = TitleScorer()
+        return _scorer
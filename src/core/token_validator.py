@@ -0,0 +1,169 @@
+from loguru import logger
+import asyncio
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+from src.core.account_store import get_account_store
+from src.core.session_manager import get_session_manager
+from src.utils import serialization
+
+class TokenValidator:
+    """账号Token批量校验，结果带有效期缓存在本地"""
+
+    # 进程内共享的缓存，避免多个实例重复读文件
+    _cache: Dict[str, Dict] = {}
+    _cache_mtime = 0.0
+    _lock = threading.Lock()
+
+    def __init__(self, concurrency: int = 8, ttl: int = 1800, refresh_margin: int = 300):
+        self.base_url = "https://mp.toutiao.com"
+        self.probe_path = "/mp/agw/media/get_media_info"
+        self.concurrency = concurrency
+        self.ttl = ttl  # 校验结果有效期（秒）
+        self.refresh_margin = refresh_margin  # 到期前多久开始后台刷新（秒）
+        self.cache_file = Path("data/cache/token_status.bin")
+        self.legacy_cache_file = Path("data/cache/token_status.json")
+        self.headers = {
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+            "Accept": "application/json, text/plain, */*",
+            "Accept-Language": "zh-CN,zh;q=0.9",
+            "Origin": "https://mp.toutiao.com",
+            "Referer": "https://mp.toutiao.com/profile_v4/index",
+        }
+
+    def _load_cache(self):
+        """文件有更新时重新加载缓存"""
+        try:
+            if not self.cache_file.exists():
+                if self.legacy_cache_file.exists():
+                    serialization.load_migrating(self.cache_file, self.legacy_cache_file)
+                else:
+                    return
+            mtime = self.cache_file.stat().st_mtime
+            if mtime == TokenValidator._cache_mtime:
+                return
+            TokenValidator._cache = serialization.read_file(self.cache_file, {})
+            TokenValidator._cache_mtime = mtime
+        except Exception as e:
+            logger.error(f"加载Token校验缓存失败: {str(e)}")
+
+    def _save_cache(self):
+        try:
+            serialization.write_file(self.cache_file, TokenValidator._cache)
+            TokenValidator._cache_mtime = self.cache_file.stat().st_mtime
+        except Exception as e:
+            logger.error(f"保存Token校验缓存失败: {str(e)}")
+
+    def get_cached(self, token: str) -> Optional[Dict]:
+        """获取未过期的校验结果"""
+        with TokenValidator._lock:
+            self._load_cache()
+            entry = TokenValidator._cache.get(token)
+        if entry and entry.get("expires_at", 0) > time.time():
+            return entry
+        return None
+
+    def is_known_invalid(self, token: str) -> bool:
+        """缓存中明确无效的Token（不发起网络请求）"""
+        entry = self.get_cached(token)
+        return bool(entry) and entry.get("valid") is False
+
+    def expiring(self, tokens: List[str]) -> List[str]:
+        """返回没有缓存或即将过期、需要重新校验的Token"""
+        deadline = time.time() + self.refresh_margin
+        with TokenValidator._lock:
+            self._load_cache()
+            return [
+                t for t in tokens
+                if TokenValidator._cache.get(t, {}).get("expires_at", 0) <= deadline
+            ]
+
+    async def check_token(self, account: Dict) -> Dict:
+        """校验单个账号（使用账号的共享会话，cookie由会话管理器维护）"""
+        token = account.get("token", "")
+        now = time.time()
+        try:
+            sessions = get_session_manager()
+            client = await sessions.client(account)
+            response = await client.get(
+                f"{self.base_url}{self.probe_path}",
+                headers=dict(self.headers, **{"X-CSRFToken": token})
+            )
+            sessions.persist(sessions.session_for(account))
+            if response.status_code in (401, 403):
+                valid = False
+            elif response.status_code == 200:
+                result = response.json()
+                valid = result.get("message") == "success"
+            else:
+                raise Exception(f"HTTP错误: {response.status_code}")
+
+            return {
+                "valid": valid,
+                "status": "有效" if valid else "无效",
+                "checked_at": now,
+                "expires_at": now + self.ttl
+            }
+
+        except Exception as e:
+            # 网络异常不代表Token失效，不写入缓存
+            logger.warning(f"校验Token失败 {account.get('name', '')}: {str(e)}")
+            return {"valid": None, "status": "检查失败", "checked_at": now, "expires_at": 0}
+
+    async def validate_all(self, accounts: List[Dict], force: bool = False) -> Dict[str, Dict]:
+        """并发校验全部账号，返回 {token: 结果}"""
+        results = {}
+        pending = []
+        for account in accounts:
+            token = account.get("token")
+            if not token:
+                continue
+            cached = None if force else self.get_cached(token)
+            if cached:
+                results[token] = cached
+            else:
+                pending.append(account)
+
+        if not pending:
+            return results
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run(account):
+            async with semaphore:
+                return account["token"], await self.check_token(account)
+
+        for token, result in await asyncio.gather(*(run(a) for a in pending)):
+            results[token] = result
+
+        with TokenValidator._lock:
+            self._load_cache()
+            for token, result in results.items():
+                if result.get("valid") is not None:
+                    TokenValidator._cache[token] = result
+            self._save_cache()
+
+        valid_count = sum(1 for r in results.values() if r.get("valid"))
+        logger.info(f"Token校验完成: {valid_count}/{len(results)} 有效")
+        return results
+
+    def write_back(self, results: Dict[str, Dict], store=None):
+        """将校验状态写回账号仓库"""
+        try:
+            store = store or get_account_store()
+            check_time = time.strftime("%Y-%m-%d %H:%M:%S")
+            changes = {
+                token: {
+                    "status": result["status"],
+                    "valid": result["valid"],
+                    "check_time": check_time
+                }
+                for token, result in results.items()
+                if result.get("valid") is not None
+            }
+            if changes:
+                store.update_many(changes)
+                
+        except Exception as e:
+            logger.error(f"写回Token状态失败: {str(e)}")
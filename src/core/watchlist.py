@@ -0,0 +1,264 @@
+from loguru import logger
+import json
+import re
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from src.utils import serialization
+
+class AhoCorasick:
+    """多模式串匹配自动机：一次扫描文本即可找出所有出现的关键词，耗时与关键词数量无关"""
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        self._built = False
+
+    def add(self, word: str, value: int):
+        """添加关键词，匹配时输出 value"""
+        node = 0
+        for ch in word:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append(value)
+        self._built = False
+
+    def build(self):
+        """按层遍历建立失败指针，并把失败链上的输出合并到节点上"""
+        queue = deque()
+        for nxt in self._goto[0].values():
+            self._fail[nxt] = 0
+            queue.append(nxt)
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                if self._out[self._fail[nxt]]:
+                    self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+        self._built = True
+
+    def search(self, text: str) -> set:
+        """返回文本中出现的所有关键词对应的 value"""
+        if not self._built:
+            self.build()
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set()
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                found.update(out[node])
+        return found
+
+    def __len__(self) -> int:
+        return len(self._goto)
+
+class Watchlist:
+    """关注词监控
+
+    配置保存在 data/watchlist.json:
+    {
+        "desktop": true,
+        "webhook_url": "",
+        "rules": [
+            {"name": "AI", "keywords": ["人工智能", "大模型"], "patterns": ["GPT-?\\\\d"], "exclude": ["广告"]}
+        ]
+    }
+    一条规则在任一关键词或正则命中、且没有排除词命中时触发。匹配不区分大小写。
+    所有规则的关键词和排除词编译进同一个 Aho-Corasick 自动机，正则合并为一个表达式做预筛，
+    因此每条热点只需扫描一遍，与规则数量无关。
+    """
+
+    # 自动机输出值的编码：规则序号 * 2 + (0 关键词 / 1 排除词)
+    _KEYWORD, _EXCLUDE = 0, 1
+
+    def __init__(self, config_file: Path = Path("data/watchlist.json")):
+        self.config_file = Path(config_file)
+        self.rules: List[Dict] = []
+        self.desktop = True
+        self.webhook_url = ""
+        self._automaton = AhoCorasick()
+        self._combined: Optional[re.Pattern] = None
+        # (规则序号, 正则, 是否参与合并预筛)
+        self._patterns: List[Tuple[int, re.Pattern, bool]] = []
+        self._listeners: List[Callable[[List[Dict]], None]] = []
+        self._lock = threading.Lock()
+        self.load()
+
+    # ---------- 配置 ----------
+
+    def load(self):
+        """读取配置并编译"""
+        try:
+            if self.config_file.exists():
+                with open(self.config_file, "r", encoding="utf-8") as f:
+                    config = json.load(f)
+                self.desktop = config.get("desktop", True)
+                self.webhook_url = config.get("webhook_url", "")
+                self.set_rules(config.get("rules", []))
+        except Exception as e:
+            logger.error(f"加载关注词配置失败: {str(e)}")
+
+    def save(self):
+        try:
+            data = {
+                "desktop": self.desktop,
+                "webhook_url": self.webhook_url,
+                "rules": self.rules,
+            }
+            # 配置文件保持可手工编辑的 JSON
+            serialization.atomic_write_bytes(
+                self.config_file, json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+            )
+        except Exception as e:
+            logger.error(f"保存关注词配置失败: {str(e)}")
+
+    def set_rules(self, rules: List[Dict]):
+        """替换全部规则并重新编译"""
+        automaton = AhoCorasick()
+        patterns = []
+        for index, rule in enumerate(rules):
+            for word in rule.get("keywords", []):
+                if word:
+                    automaton.add(word.lower(), index * 2 + self._KEYWORD)
+            for word in rule.get("exclude", []):
+                if word:
+                    automaton.add(word.lower(), index * 2 + self._EXCLUDE)
+            for pattern in rule.get("patterns", []):
+                try:
+                    compiled = re.compile(pattern, re.IGNORECASE)
+                except re.error as e:
+                    logger.error(f"关注规则 {rule.get('name', index)} 的正则无效: {str(e)}")
+                    continue
+                patterns.append((index, compiled, self._combinable(pattern, compiled)))
+        automaton.build()
+
+        # 只把不含分组和内联全局标志的正则合并成一个预筛正则（拼接后分组名会冲突、编号引用会错位）；
+        # 其余正则每次单独匹配
+        combined = None
+        grouped = [p.pattern for _, p, combinable in patterns if combinable]
+        if grouped:
+            try:
+                combined = re.compile("|".join(f"(?:{p})" for p in grouped), re.IGNORECASE)
+            except re.error as e:
+                logger.warning(f"合并关注正则失败，改为逐条匹配: {str(e)}")
+                patterns = [(index, compiled, False) for index, compiled, _ in patterns]
+
+        with self._lock:
+            self.rules = list(rules)
+            self._automaton = automaton
+            self._patterns = patterns
+            self._combined = combined
+
+    @staticmethod
+    def _combinable(pattern: str, compiled: re.Pattern) -> bool:
+        """正则能否放进合并预筛：没有捕获/命名分组（也就没有反向引用），包进非捕获组后仍能编译"""
+        if compiled.groups:
+            return False
+        try:
+            re.compile(f"(?:{pattern})", re.IGNORECASE)
+        except re.error:
+            return False
+        return True
+
+    # ---------- 匹配 ----------
+
+    def match(self, text: str) -> List[Dict]:
+        """返回文本命中的规则"""
+        with self._lock:
+            automaton, patterns, combined, rules = self._automaton, self._patterns, self._combined, self.rules
+        hits = automaton.search(text.lower())
+        matched = {value >> 1 for value in hits if value & 1 == self._KEYWORD}
+        excluded = {value >> 1 for value in hits if value & 1 == self._EXCLUDE}
+        # 合并正则只用于预筛，命中后再确定是哪些规则；不能合并的正则逐条匹配
+        if patterns:
+            prefiltered = combined is not None and combined.search(text) is not None
+            matched.update(index for index, pattern, combinable in patterns
+                           if (prefiltered or not combinable) and pattern.search(text))
+        return [rules[index] for index in sorted(matched - excluded)]
+
+    def match_entries(self, entries: List[Dict]) -> List[Dict]:
+        """匹配一批热榜条目，返回命中记录 {entry, rules}"""
+        hits = []
+        for entry in entries:
+            rules = self.match(entry.get("title", ""))
+            if rules:
+                hits.append({"entry": entry, "rules": [r.get("name", "") for r in rules]})
+        return hits
+
+    # ---------- 通知 ----------
+
+    def subscribe(self, callback: Callable[[List[Dict]], None]):
+        """注册命中回调: callback(hits)"""
+        with self._lock:
+            self._listeners.append(callback)
+
+    def on_new_entries(self, platform: str, entries: List[Dict]):
+        """HotAPI 新条目回调：匹配并发出通知"""
+        if not self.rules:
+            return
+        hits = self.match_entries(entries)
+        if not hits:
+            return
+        for hit in hits:
+            hit["platform"] = platform
+            hit["matched_at"] = time.strftime("%Y-%m-%d %H:%M:%S")
+        logger.info(f"{platform}热榜命中关注词 {len(hits)} 条")
+
+        with self._lock:
+            listeners = list(self._listeners)
+        for callback in listeners:
+            try:
+                callback(hits)
+            except Exception as e:
+                logger.error(f"关注词通知处理失败: {str(e)}")
+        if self.webhook_url:
+            self._post_webhook(hits)
+
+    def _post_webhook(self, hits: List[Dict]):
+        """在共享事件循环中异步推送，不阻塞刷新线程"""
+        from src.core.async_runtime import runtime
+
+        runtime.submit(post_webhook(self.webhook_url, hits))
+
+async def post_webhook(url: str, hits: List[Dict]) -> bool:
+    """把命中记录以 JSON 推送到 webhook"""
+    from src.core.http_client import create_client
+
+    try:
+        payload = {
+            "event": "watchlist_hit",
+            "hits": [
+                {
+                    "platform": hit.get("platform", ""),
+                    "title": hit["entry"].get("title", ""),
+                    "url": hit["entry"].get("url", ""),
+                    "hot": hit["entry"].get("hot", ""),
+                    "rules": hit["rules"],
+                    "matched_at": hit.get("matched_at", ""),
+                }
+                for hit in hits
+            ],
+        }
+        async with create_client(timeout=10.0) as client:
+            response = await client.post(url, json=payload)
+            response.raise_for_status()
+        return True
+    except Exception as e:
+        logger.error(f"推送关注词通知失败: {str(e)}")
+        return False
@@ -1,18 +1,27 @@
 from PyQt5.QtWidgets import (QMainWindow, QTabWidget, QMessageBox, 
-                           QMenuBar, QMenu, QAction, QStatusBar)
+                           QMenuBar, QMenu, QAction, QStatusBar, QWidget,
+                           QVBoxLayout)
 from PyQt5.QtCore import Qt
 from loguru import logger
-from .tabs.main_tab import MainTab
-from .tabs.account_tab import AccountTab
-from .tabs.ai_tab import AITab
-from .tabs.article_tab import ArticleTab
-from .tabs.hot_tab import HotTab
-from .tabs.settings_tab import SettingsTab
+from src.utils.startup_profiler import profiler
+import importlib
 import webbrowser
 
+# 标签页定义: (标题, 模块, 类名, 属性名)
+# 标签页在首次切换到时才导入模块并创建，避免启动时加载 playwright、openai 等重型依赖
+TAB_SPECS = [
+    ("主页", ".tabs.main_tab", "MainTab", "main_tab"),
+    ("账号管理", ".tabs.account_tab", "AccountTab", "account_tab"),
+    ("AI改写", ".tabs.ai_tab", "AITab", "ai_tab"),
+    ("文章管理", ".tabs.article_tab", "ArticleTab", "article_tab"),
+    ("热点获取", ".tabs.hot_tab", "HotTab", "hot_tab"),
+    ("设置", ".tabs.settings_tab", "SettingsTab", "settings_tab"),
+]
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
+        self.tab_pages = []
         self.init_ui()
         
     def init_ui(self):
@@ -29,28 +38,41 @@ class MainWindow(QMainWindow):
         self.setStatusBar(self.statusBar)
         self.statusBar.showMessage('就绪')
         
-        # 创建标签页
+        # 创建标签页（先放置空容器，实际内容延迟创建）
         self.tabs = QTabWidget()
-        self.main_tab = MainTab()
-        self.account_tab = AccountTab()
-        self.ai_tab = AITab()
-        self.article_tab = ArticleTab()
-        self.hot_tab = HotTab()
-        self.settings_tab = SettingsTab()
-        
-        # 添加标签页
-        self.tabs.addTab(self.main_tab, "主页")
-        self.tabs.addTab(self.account_tab, "账号管理")
-        self.tabs.addTab(self.ai_tab, "AI改写")
-        self.tabs.addTab(self.article_tab, "文章管理")
-        self.tabs.addTab(self.hot_tab, "热点获取")
-        self.tabs.addTab(self.settings_tab, "设置")
+        for title, _, _, attr in TAB_SPECS:
+            page = QWidget()
+            page_layout = QVBoxLayout(page)
+            page_layout.setContentsMargins(0, 0, 0, 0)
+            self.tabs.addTab(page, title)
+            self.tab_pages.append(page)
+            setattr(self, attr, None)
+        
+        # 只创建当前显示的标签页
+        self.ensure_tab(self.tabs.currentIndex())
         
         # 监听标签页切换
         self.tabs.currentChanged.connect(self.on_tab_changed)
         
         self.setCentralWidget(self.tabs)
         
+    def ensure_tab(self, index):
+        """确保标签页已创建，返回 (标签页, 是否本次新建)"""
+        title, module_name, class_name, attr = TAB_SPECS[index]
+        tab = getattr(self, attr)
+        if tab is not None:
+            return tab, False
+            
+        with profiler.section(f"import {module_name}"):
+            module = importlib.import_module(module_name, __package__)
+        with profiler.section(f"build {class_name}"):
+            tab = getattr(module, class_name)()
+            
+        self.tab_pages[index].layout().addWidget(tab)
+        setattr(self, attr, tab)
+        logger.debug(f"已创建标签页: {title}")
+        return tab, True
+        
     def create_menu_bar(self):
         """创建菜单栏"""
         menubar = self.menuBar()
@@ -96,10 +118,12 @@ class MainWindow(QMainWindow):
     def on_tab_changed(self, index):
         """标签页切换时刷新数据"""
         try:
-            current_tab = self.tabs.widget(index)
+            if index < 0:
+                return
+            current_tab, created = self.ensure_tab(index)
             
-            # 如果切换到 AI 改写标签页，刷新账号状态
-            if isinstance(current_tab, AITab):
+            # 如果切换到 AI 改写标签页，刷新账号状态（新建时会自行加载）
+            if not created and TAB_SPECS[index][2] == "AITab":
                 logger.info("切换到 AI 改写标签页，刷新账号状态")
                 current_tab.load_current_account()
                 
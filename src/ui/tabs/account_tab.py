@@ -1,12 +1,34 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTableWidget, 
                            QPushButton, QLabel, QTableWidgetItem, QHeaderView,
                            QMessageBox, QDialog, QLineEdit, QFormLayout)
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QThread, QTimer, pyqtSignal
 from loguru import logger
-import json
-from pathlib import Path
+from src.core.account_store import get_account_store
+from src.core.async_runtime import run_sync
+from src.core.token_validator import TokenValidator
 from datetime import datetime
 
+class TokenCheckWorker(QThread):
+    """Token批量校验线程"""
+    finished = pyqtSignal(dict)
+    error = pyqtSignal(str)
+    
+    def __init__(self, validator: TokenValidator, accounts: list, force: bool = False):
+        super().__init__()
+        self.validator = validator
+        self.accounts = accounts
+        self.force = force
+        
+    def run(self):
+        try:
+            # 在共享事件循环中执行，校验器的客户端和连接可以在多次校验之间复用
+            results = run_sync(self.validator.validate_all(self.accounts, force=self.force))
+            self.validator.write_back(results)
+            self.finished.emit(results)
+        except Exception as e:
+            logger.error(f"校验Token失败: {str(e)}")
+            self.error.emit(str(e))
+
 class AddAccountDialog(QDialog):
     """添加账号对话框"""
     def __init__(self, parent=None):
@@ -58,14 +80,39 @@ class AddAccountDialog(QDialog):
         }
 
 class AccountTab(QWidget):
+    # 账号仓库变更通知（可能来自工作线程，经信号转到界面线程处理）
+    store_changed = pyqtSignal(str, object)
+    
     def __init__(self):
         super().__init__()
-        self.accounts_file = Path("data/accounts.json")
-        self.last_account_file = Path("data/last_account.json")
+        self.store = get_account_store()
         self.current_account = self.load_last_account()  # 加载上次使用的账号
+        self.token_validator = TokenValidator()
+        self.check_worker = None
+        self.row_by_token = {}
+        # 表格中各行显示的账号内容，其他进程修改后比对差异
+        self.shown = {}
+        # 当前以高亮显示的账号 Token
+        self.highlighted = None
         self.init_ui()
         self.load_accounts()
         
+        self.store_changed.connect(self.handle_store_changed)
+        store, listener = self.store, self.store_changed.emit
+        store.subscribe(listener)
+        self.destroyed.connect(lambda: store.unsubscribe(listener))
+        
+        # 定时检查其他进程对账号文件的修改
+        self.store_poll_timer = QTimer(self)
+        self.store_poll_timer.timeout.connect(self.store.poll)
+        self.store_poll_timer.start(5 * 1000)
+        
+        # 后台定时刷新即将过期的Token校验结果
+        self.token_refresh_timer = QTimer(self)
+        self.token_refresh_timer.timeout.connect(self.refresh_expiring_tokens)
+        self.token_refresh_timer.start(60 * 1000)
+        QTimer.singleShot(0, self.refresh_expiring_tokens)
+        
     def init_ui(self):
         """初始化UI"""
         layout = QVBoxLayout()
@@ -123,67 +170,139 @@ class AccountTab(QWidget):
     def load_accounts(self):
         """加载账号列表"""
         try:
+            accounts = self.store.all()
+            
             self.account_table.setRowCount(0)
+            self.account_table.setRowCount(len(accounts))
+            self.row_by_token = {}
+            self.shown = {}
             
-            if not self.accounts_file.exists():
-                return
-                
-            with open(self.accounts_file, "r", encoding="utf-8") as f:
-                accounts = json.load(f)
-                
-            for account in accounts:
-                row = self.account_table.rowCount()
-                self.account_table.insertRow(row)
-                
-                # 账号名称
-                name_item = QTableWidgetItem(account.get("name", ""))
-                self.account_table.setItem(row, 0, name_item)
-                
-                # Token
-                self.account_table.setItem(row, 1, QTableWidgetItem(account.get("token", "")))
-                
-                # 状态
-                status = account.get("status", "未验证")
-                status_item = QTableWidgetItem(status)
-                if status == "有效":
-                    status_item.setForeground(Qt.green)
-                elif status == "无效":
-                    status_item.setForeground(Qt.red)
-                self.account_table.setItem(row, 2, status_item)
-                
-                # 备注
-                self.account_table.setItem(row, 3, QTableWidgetItem(account.get("note", "")))
-                
-                # 操作按钮
-                btn_widget = QWidget()
-                btn_layout = QHBoxLayout(btn_widget)
-                btn_layout.setContentsMargins(2, 2, 2, 2)
-                
-                # 激活按钮
-                activate_btn = QPushButton("激活")
-                activate_btn.setFixedWidth(60)
-                activate_btn.clicked.connect(lambda checked, a=account: self.activate_account(a))
-                
-                # 如果是当前账号，禁用激活按钮
-                if self.current_account and account.get("token") == self.current_account.get("token"):
-                    activate_btn.setEnabled(False)
-                    name_item.setBackground(Qt.lightGray)
-                
-                btn_layout.addWidget(activate_btn)
-                btn_layout.addStretch()
-                
-                self.account_table.setCellWidget(row, 4, btn_widget)
+            for row, account in enumerate(accounts):
+                self.fill_row(row, account)
+                self.row_by_token[account.get("token")] = row
+                self.shown[account.get("token")] = account
                 
             self.status_label.setText(f"共 {len(accounts)} 个账号")
             
             # 更新当前账号显示
-            if self.current_account:
-                self.current_account_label.setText(f"当前账号：{self.current_account.get('name', '未知')}")
+            self.update_current_label()
             
         except Exception as e:
             logger.error(f"加载账号列表失败: {str(e)}")
             QMessageBox.critical(self, "错误", f"加载账号列表失败：{str(e)}")
             
+    def fill_row(self, row: int, account: dict):
+        """填充一行账号信息"""
+        # 账号名称
+        name_item = QTableWidgetItem(account.get("name", ""))
+        self.account_table.setItem(row, 0, name_item)
+        
+        # Token
+        self.account_table.setItem(row, 1, QTableWidgetItem(account.get("token", "")))
+        
+        # 状态
+        status = account.get("status", "未验证")
+        status_item = QTableWidgetItem(status)
+        if status == "有效":
+            status_item.setForeground(Qt.green)
+        elif status == "无效":
+            status_item.setForeground(Qt.red)
+        self.account_table.setItem(row, 2, status_item)
+        
+        # 备注
+        self.account_table.setItem(row, 3, QTableWidgetItem(account.get("note", "")))
+        
+        # 操作按钮
+        btn_widget = QWidget()
+        btn_layout = QHBoxLayout(btn_widget)
+        btn_layout.setContentsMargins(2, 2, 2, 2)
+        
+        # 激活按钮
+        activate_btn = QPushButton("激活")
+        activate_btn.setFixedWidth(60)
+        activate_btn.clicked.connect(lambda checked, a=account: self.activate_account(a))
+        
+        # 如果是当前账号，禁用激活按钮
+        if self.current_account and account.get("token") == self.current_account.get("token"):
+            activate_btn.setEnabled(False)
+            name_item.setBackground(Qt.lightGray)
+            self.highlighted = account.get("token")
+        elif self.highlighted == account.get("token"):
+            self.highlighted = None
+        
+        btn_layout.addWidget(activate_btn)
+        btn_layout.addStretch()
+        
+        self.account_table.setCellWidget(row, 4, btn_widget)
+        
+    def handle_store_changed(self, event: str, account):
+        """账号仓库变更：只插入、删除或刷新受影响的行"""
+        try:
+            if event == "current":
+                previous = self.current_account
+                self.current_account = self.store.current()
+                # 取消旧当前账号的高亮，高亮新的当前账号
+                for changed in (previous, self.current_account):
+                    if changed:
+                        self.refresh_row(self.store.get(changed.get("token")))
+                self.update_current_label()
+            elif event == "remove":
+                self.remove_row(account.get("token"))
+                self.current_account = self.store.current()
+                self.update_current_label()
+            elif event == "reload":
+                # 其他进程的修改：与仓库逐行比对，只改动有差异的行
+                self.current_account = self.store.current()
+                self.sync_rows(self.store.all())
+                self.update_current_label()
+            else:
+                self.refresh_row(account)
+            self.status_label.setText(f"共 {self.account_table.rowCount()} 个账号")
+                
+        except Exception as e:
+            logger.error(f"刷新账号列表失败: {str(e)}")
+            
+    def refresh_row(self, account):
+        """刷新账号所在行，表格中还没有该账号时追加到末尾"""
+        if not account:
+            return
+        token = account.get("token")
+        row = self.row_by_token.get(token)
+        if row is None:
+            row = self.account_table.rowCount()
+            self.account_table.insertRow(row)
+            self.row_by_token[token] = row
+        self.fill_row(row, account)
+        self.shown[token] = dict(account)
+        
+    def remove_row(self, token):
+        """删除账号所在行，后面各行的行号前移"""
+        row = self.row_by_token.pop(token, None)
+        self.shown.pop(token, None)
+        if row is None:
+            return
+        self.account_table.removeRow(row)
+        for key, index in self.row_by_token.items():
+            if index > row:
+                self.row_by_token[key] = index - 1
+                
+    def sync_rows(self, accounts: list):
+        """按仓库内容增删改表格行"""
+        current = self.current_account.get("token") if self.current_account else None
+        tokens = {a.get("token") for a in accounts}
+        for token in [t for t in self.row_by_token if t not in tokens]:
+            self.remove_row(token)
+        for account in accounts:
+            token = account.get("token")
+            if self.shown.get(token) != account or token == current or token == self.highlighted:
+                self.refresh_row(account)
+                
+    def update_current_label(self):
+        if self.current_account:
+            self.current_account_label.setText(f"当前账号：{self.current_account.get('name', '未知')}")
+        else:
+            self.current_account_label.setText("当前账号：未选择")
+            
     def add_account(self):
         """添加账号"""
         try:
@@ -196,19 +315,12 @@ class AccountTab(QWidget):
                     QMessageBox.warning(self, "警告", "账号名称和Token不能为空")
                     return
                     
-                # 保存账号
-                accounts = []
-                if self.accounts_file.exists():
-                    with open(self.accounts_file, "r", encoding="utf-8") as f:
-                        accounts = json.load(f)
-                        
-                accounts.append(account)
-                
-                with open(self.accounts_file, "w", encoding="utf-8") as f:
-                    json.dump(accounts, f, ensure_ascii=False, indent=2)
+                if self.store.get(account["token"]):
+                    QMessageBox.warning(self, "警告", "该Token对应的账号已存在")
+                    return
                     
-                # 刷新列表
-                self.load_accounts()
+                # 保存账号（列表通过变更通知刷新）
+                self.store.upsert(account)
                 
                 QMessageBox.information(self, "成功", "添加账号成功")
                 
@@ -237,25 +349,8 @@ class AccountTab(QWidget):
             )
             
             if reply == QMessageBox.Yes:
-                # 读取账号列表
-                with open(self.accounts_file, "r", encoding="utf-8") as f:
-                    accounts = json.load(f)
-                    
-                # 删除账号
-                accounts = [a for a in accounts if a.get("token") != token]
-                
-                # 保存更新后的账号列表
-                with open(self.accounts_file, "w", encoding="utf-8") as f:
-                    json.dump(accounts, f, ensure_ascii=False, indent=2)
-                    
-                # 如果删除的是当前账号，清除当前账号
-                if self.current_account and self.current_account.get("token") == token:
-                    self.current_account = None
-                    if self.last_account_file.exists():
-                        self.last_account_file.unlink()
-                    
-                # 刷新列表
-                self.load_accounts()
+                # 删除账号（若为当前账号，仓库会一并清除当前账号）
+                self.store.remove(token)
                 
                 QMessageBox.information(self, "成功", "删除账号成功")
                 
@@ -263,38 +358,85 @@ class AccountTab(QWidget):
             logger.error(f"删除账号失败: {str(e)}")
             QMessageBox.critical(self, "错误", f"删除账号失败：{str(e)}")
             
+    def read_accounts(self) -> list:
+        """读取全部账号"""
+        return self.store.all()
+            
     def check_token(self):
-        """检查Token有效性"""
+        """批量检查全部账号的Token有效性"""
         try:
-            current_row = self.account_table.currentRow()
-            if current_row < 0:
-                QMessageBox.warning(self, "警告", "请先选择要检查的账号")
+            accounts = self.read_accounts()
+            if not accounts:
+                QMessageBox.warning(self, "警告", "没有可检查的账号")
                 return
                 
-            # 获取Token
-            token = self.account_table.item(current_row, 1).text()
-            
-            # TODO: 实现Token检查逻辑
-            # 这里需要调用API检查Token是否有效
-            
-            QMessageBox.information(self, "提示", "Token检查功能开发中...")
+            if self.check_worker and self.check_worker.isRunning():
+                QMessageBox.information(self, "提示", "Token检查正在进行中...")
+                return
+                
+            self.check_btn.setEnabled(False)
+            self.status_label.setText(f"正在检查 {len(accounts)} 个账号...")
+            self.start_token_check(accounts, force=True, silent=False)
             
         except Exception as e:
             logger.error(f"检查Token失败: {str(e)}")
             QMessageBox.critical(self, "错误", f"检查Token失败：{str(e)}")
+            self.check_btn.setEnabled(True)
             
-    def activate_account(self, account: dict):
-        """激活账号"""
+    def refresh_expiring_tokens(self):
+        """后台刷新没有校验结果或即将过期的账号"""
         try:
-            # 更新当前账号
-            self.current_account = account.copy()
+            if self.check_worker and self.check_worker.isRunning():
+                return
+            accounts = self.read_accounts()
+            expiring = set(self.token_validator.expiring([a.get("token", "") for a in accounts]))
+            pending = [a for a in accounts if a.get("token") in expiring]
+            if pending:
+                logger.info(f"后台刷新 {len(pending)} 个账号的Token状态")
+                self.start_token_check(pending, force=True, silent=True)
+                
+        except Exception as e:
+            logger.error(f"后台刷新Token状态失败: {str(e)}")
             
-            # 保存最后使用的账号
-            with open(self.last_account_file, "w", encoding="utf-8") as f:
-                json.dump(self.current_account, f, ensure_ascii=False, indent=2)
+    def start_token_check(self, accounts: list, force: bool, silent: bool):
+        """启动校验线程"""
+        self.check_worker = TokenCheckWorker(self.token_validator, accounts, force)
+        self.check_worker.finished.connect(
+            lambda results: self.handle_check_finished(results, silent)
+        )
+        self.check_worker.error.connect(
+            lambda error: self.handle_check_error(error, silent)
+        )
+        self.check_worker.start()
+        
+    def handle_check_finished(self, results: dict, silent: bool):
+        """校验完成"""
+        self.check_btn.setEnabled(True)
+        
+        # 状态已写回仓库，表格通过变更通知逐行刷新；这里同步当前账号
+        self.current_account = self.store.current()
+        
+        if not silent:
+            valid = sum(1 for r in results.values() if r.get("valid") is True)
+            invalid = sum(1 for r in results.values() if r.get("valid") is False)
+            failed = len(results) - valid - invalid
+            QMessageBox.information(
+                self, "检查完成",
+                f"有效：{valid} 个\n无效：{invalid} 个\n检查失败：{failed} 个"
+            )
             
-            # 刷新列表
-            self.load_accounts()
+    def handle_check_error(self, error: str, silent: bool):
+        """校验出错"""
+        self.check_btn.setEnabled(True)
+        if not silent:
+            QMessageBox.critical(self, "错误", f"检查Token失败：{error}")
+            
+    def activate_account(self, account: dict):
+        """激活账号"""
+        try:
+            # 保存最后使用的账号（列表通过变更通知刷新）
+            self.store.set_current(account)
+            self.current_account = self.store.current()
             
             QMessageBox.information(self, "成功", f"已激活账号：{account['name']}")
             
@@ -305,10 +447,7 @@ class AccountTab(QWidget):
     def load_last_account(self) -> dict:
         """加载上次使用的账号"""
         try:
-            if self.last_account_file.exists():
-                with open(self.last_account_file, "r", encoding="utf-8") as f:
-                    return json.load(f)
-            return None
+            return self.store.current()
         except Exception as e:
             logger.error(f"加载上次使用的账号失败: {str(e)}")
             return None
\ No newline at end of file
@@ -2,18 +2,24 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                            QPushButton, QTextEdit, QComboBox, QSpinBox,
                            QProgressBar, QMessageBox, QSplitter, QTableWidget,
                            QTableWidgetItem, QHeaderView, QDialog, QFormLayout, 
-                           QLineEdit, QDialogButtonBox)
+                           QLineEdit, QDialogButtonBox, QCheckBox)
 from PyQt5.QtCore import Qt, QThread, pyqtSignal, QUrl, QTimer
 from PyQt5.QtGui import QDesktopServices
 from loguru import logger
 from src.core.ai_api import AIAPI
+from src.core.ai_batcher import get_ai_batcher
 from src.core.article_fetcher import ArticleFetcher
 from src.core.publisher import Publisher
 from src.core.account_api import AccountAPI
-import asyncio
-import json
-from pathlib import Path
+from src.core.async_runtime import run_sync
+from src.core.article_versions import get_version_store
+from src.core.title_scorer import fetch_history, train_from_articles
+from src.core.analytics import get_analytics, ingest_accounts
+from src.core.account_store import AccountStore
+from src.core.scheduler import FAILED, get_scheduler
+import hashlib
 from datetime import datetime
+from typing import Optional
 
 class LoginWorker(QThread):
     """登录工作线程"""
@@ -28,12 +34,8 @@ class LoginWorker(QThread):
         
     def run(self):
         try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            result = loop.run_until_complete(
-                self.account_api.login(self.username, self.password)
-            )
-            loop.close()
+            # 在共享事件循环中执行，登录后的会话和连接池可以被后续请求复用
+            result = run_sync(self.account_api.login(self.username, self.password))
             self.finished.emit(result)
         except Exception as e:
             logger.error(f"登录失败: {str(e)}")
@@ -45,27 +47,38 @@ class AIWorker(QThread):
     error = pyqtSignal(str)
     progress = pyqtSignal(int)
     
-    def __init__(self, text: str, task: str, style: str = None, temperature: float = 0.7):
+    def __init__(self, text: str, task: str, style: str = None, temperature: float = 0.7,
+                 version_key: str = None, title_candidates: int = 1):
         super().__init__()
         self.text = text
         self.task = task
         self.style = style
         self.temperature = temperature
+        self.version_key = version_key
+        self.title_candidates = title_candidates
         self.ai_api = AIAPI()
         
     def run(self):
         try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            result = loop.run_until_complete(
+            batcher = get_ai_batcher()
+            if self.title_candidates <= 1 and batcher.accepts(self.text, self.task):
+                # 短任务交给共享事件循环上的批处理器，与同时提交的其他短任务合并成一次请求
+                result = run_sync(batcher.submit(self.text, self.task, self.style or '', self.temperature))
+                if self.version_key:
+                    self.ai_api.save_versions(self.version_key, self.text, result, task=self.task,
+                                              style=self.style, temperature=self.temperature)
+                self.finished.emit(result)
+                return
+            result = run_sync(
                 self.ai_api.process(
                     self.text,
                     self.task,
                     style=self.style,
-                    temperature=self.temperature
+                    temperature=self.temperature,
+                    version_key=self.version_key,
+                    title_candidates=self.title_candidates
                 )
             )
-            loop.close()
             self.finished.emit(result)
         except Exception as e:
             logger.error(f"AI处理失败: {str(e)}")
@@ -86,40 +99,94 @@ class ArticleLoadWorker(QThread):
     def run(self):
         """加载文章列表"""
         try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            result = loop.run_until_complete(
-                self.fetcher.fetch_articles(self.page, self.page_size)
-            )
-            loop.close()
+            result = run_sync(self.fetcher.fetch_articles(self.page, self.page_size))
+            # 当前页的阅读量顺便记入文章统计
+            analytics = get_analytics()
+            analytics.ingest(AccountStore.key_of(self.account_data), result.get("articles", []))
+            analytics.flush()
             self.finished.emit(result)
         except Exception as e:
             logger.error(f"加载文章列表失败: {str(e)}")
             self.error.emit(str(e))
 
+class TitleModelWorker(QThread):
+    """拉取账号历史文章并训练标题打分模型"""
+    finished = pyqtSignal(int)
+    error = pyqtSignal(str)
+    
+    def __init__(self, account_data: dict):
+        super().__init__()
+        self.account_data = account_data
+        
+    def run(self):
+        try:
+            articles = run_sync(fetch_history(self.account_data))
+            if not articles:
+                raise Exception("没有可用于训练的历史文章")
+            train_from_articles(articles)
+            self.finished.emit(len(articles))
+        except Exception as e:
+            logger.error(f"训练标题模型失败: {str(e)}")
+            self.error.emit(str(e))
+
+class AnalyticsWorker(QThread):
+    """拉取所有账号的历史文章，汇总发布时段、分类和来源的阅读表现"""
+    finished = pyqtSignal(dict)
+    error = pyqtSignal(str)
+    
+    def run(self):
+        try:
+            counts = run_sync(ingest_accounts())
+            analytics = get_analytics()
+            self.finished.emit({
+                "articles": sum(counts.values()),
+                "accounts": len(counts),
+                "windows": analytics.recommend_windows(5),
+                "categories": analytics.by_category(min_count=5)[:5],
+                "platforms": analytics.by_platform(min_count=5)[:5],
+            })
+        except Exception as e:
+            logger.error(f"发布分析失败: {str(e)}")
+            self.error.emit(str(e))
+
+class ReconcileWorker(QThread):
+    """核对到期的定时发布是否已上线"""
+    finished = pyqtSignal(dict)
+    error = pyqtSignal(str)
+    
+    def run(self):
+        try:
+            self.finished.emit(run_sync(get_scheduler().reconcile()))
+        except Exception as e:
+            logger.error(f"定时发布对账失败: {str(e)}")
+            self.error.emit(str(e))
+
 class PublishWorker(QThread):
     """文章发布工作线程"""
     finished = pyqtSignal(dict)
     error = pyqtSignal(str)
     progress = pyqtSignal(int)
     
-    def __init__(self, token: str, article_data: dict):
+    def __init__(self, token: str, article_data: dict, account_name: str = ""):
         super().__init__()
         self.token = token
         self.article_data = article_data
+        self.account_name = account_name
         self.publisher = Publisher()
         
     def run(self):
         try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            result = loop.run_until_complete(
-                self.publisher.publish_toutiao(
-                    self.token,
-                    self.article_data
-                )
-            )
-            loop.close()
+            if self.article_data.get("publish_at"):
+                # 定时发布交给服务端，记入排期等待对账
+                entry = run_sync(get_scheduler().submit(self.token, [self.article_data],
+                                                        account_name=self.account_name))[0]
+                if entry["status"] == FAILED:
+                    raise Exception(entry["message"])
+                publish_at = datetime.fromtimestamp(entry["publish_at"]).strftime("%Y-%m-%d %H:%M")
+                self.finished.emit({"article_id": entry["article_id"], "status": "success",
+                                    "publish_at": publish_at})
+                return
+            result = run_sync(self.publisher.publish_toutiao(self.token, self.article_data))
             self.finished.emit(result)
         except Exception as e:
             logger.error(f"发布失败: {str(e)}")
@@ -153,6 +220,71 @@ class LoginDialog(QDialog):
         
         self.setLayout(layout)
 
+class PublishDialog(QDialog):
+    """发布对话框：确认标题、正文、分类和标签；schedule 不为 None 时显示"智能定时"选项"""
+    def __init__(self, content: str, parent=None, schedule: Optional[bool] = None):
+        super().__init__(parent)
+        self.setWindowTitle("发布文章")
+        self.setMinimumWidth(500)
+        
+        layout = QFormLayout()
+        
+        # 标题默认取正文第一行
+        self.title_input = QLineEdit(content.split("\n", 1)[0].strip()[:30] if content else "")
+        layout.addRow("标题:", self.title_input)
+        
+        self.content_edit = QTextEdit()
+        self.content_edit.setPlainText(content)
+        layout.addRow("正文:", self.content_edit)
+        
+        self.category_combo = QComboBox()
+        self.category_combo.setEditable(True)
+        self.category_combo.addItems(['', '科技', '财经', '娱乐', '体育', '社会', '国际', '汽车', '健康', '教育', '文化'])
+        layout.addRow("分类:", self.category_combo)
+        
+        # 标签用逗号分隔
+        self.tags_input = QLineEdit()
+        self.tags_input.setPlaceholderText("多个标签用逗号分隔")
+        layout.addRow("标签:", self.tags_input)
+        
+        # 勾选后按历史数据推荐的发布时段定时发布；编辑已发布文章时不显示
+        self.schedule_check = None
+        if schedule is not None:
+            self.schedule_check = QCheckBox("智能定时")
+            self.schedule_check.setChecked(schedule)
+            layout.addRow("定时:", self.schedule_check)
+        
+        btn_box = QDialogButtonBox(
+            QDialogButtonBox.Ok | QDialogButtonBox.Cancel
+        )
+        btn_box.accepted.connect(self.accept)
+        btn_box.rejected.connect(self.reject)
+        layout.addRow(btn_box)
+        
+        self.setLayout(layout)
+        
+    def accept(self):
+        if not self.title_input.text().strip():
+            QMessageBox.warning(self, "警告", "请输入标题")
+            return
+        if not self.content_edit.toPlainText().strip():
+            QMessageBox.warning(self, "警告", "正文不能为空")
+            return
+        super().accept()
+        
+    def get_article_data(self) -> dict:
+        tags = self.tags_input.text().replace("，", ",").split(",")
+        data = {
+            "title": self.title_input.text().strip(),
+            "content": self.content_edit.toPlainText().strip(),
+            "category": self.category_combo.currentText().strip(),
+            "tags": [tag.strip() for tag in tags if tag.strip()],
+        }
+        if self.schedule_check is not None and self.schedule_check.isChecked():
+            # 具体时间由排期按推荐时段安排
+            data["publish_at"] = "auto"
+        return data
+
 class AITab(QWidget):
     def __init__(self):
         super().__init__()
@@ -162,6 +294,8 @@ class AITab(QWidget):
         self.total_articles = 0
         self.current_account = None
         self.account_api = AccountAPI()
+        # 当前草稿在版本库中的键，每次改写的原文和结果都保存为一个版本
+        self.draft_key = None
         
         # 先初始化UI
         self.init_ui()
@@ -169,6 +303,13 @@ class AITab(QWidget):
         # UI初始化完成后，再加载账号
         QTimer.singleShot(0, self.load_current_account)
         
+        # 定时发布对账：只保留一个一次性定时器，指向下一条排期的对账时间
+        self.reconcile_worker = None
+        self.reconcile_timer = QTimer(self)
+        self.reconcile_timer.setSingleShot(True)
+        self.reconcile_timer.timeout.connect(self.run_reconcile)
+        self.arm_reconcile()
+        
     def init_ui(self):
         """初始化UI"""
         layout = QVBoxLayout()
@@ -182,8 +323,19 @@ class AITab(QWidget):
         self.refresh_btn.clicked.connect(self.load_articles)
         self.refresh_btn.setEnabled(False)  # 默认禁用
         
+        # 用历史文章的阅读量训练标题打分模型，标题优化时给候选标题排序
+        self.train_btn = QPushButton("训练标题模型")
+        self.train_btn.clicked.connect(self.train_title_model)
+        self.train_btn.setEnabled(False)
+        
         account_layout.addWidget(self.account_label)
         account_layout.addWidget(self.refresh_btn)
+        account_layout.addWidget(self.train_btn)
+        
+        # 汇总所有账号的历史阅读量，给出推荐发布时段
+        self.analytics_btn = QPushButton("发布分析")
+        self.analytics_btn.clicked.connect(self.run_analytics)
+        account_layout.addWidget(self.analytics_btn)
         account_layout.addStretch()
         
         layout.addLayout(account_layout)
@@ -201,7 +353,7 @@ class AITab(QWidget):
         # 任务选择
         task_label = QLabel("任务:")
         self.task_combo = QComboBox()
-        self.task_combo.addItems(['文章改写', '风格转换', '标题优化', '扩写内容', '生成摘要', '润色优化'])
+        self.task_combo.addItems(['文章改写', '风格转换', '标题优化', '扩写内容', '生成摘要', '润色优化', '标签建议'])
         control_layout.addWidget(task_label)
         control_layout.addWidget(self.task_combo)
         
@@ -220,6 +372,14 @@ class AITab(QWidget):
         control_layout.addWidget(temp_label)
         control_layout.addWidget(self.temp_spin)
         
+        # 标题候选数（仅标题优化）
+        title_label = QLabel("标题候选:")
+        self.title_spin = QSpinBox()
+        self.title_spin.setRange(1, 10)
+        self.title_spin.setValue(5)
+        control_layout.addWidget(title_label)
+        control_layout.addWidget(self.title_spin)
+        
         left_layout.addLayout(control_layout)
         
         # 原文输入区
@@ -239,6 +399,10 @@ class AITab(QWidget):
         self.publish_btn.setEnabled(False)  # 默认禁用
         btn_layout.addWidget(self.publish_btn)
         
+        # 按历史数据推荐的发布时段定时发布
+        self.schedule_check = QCheckBox("智能定时")
+        btn_layout.addWidget(self.schedule_check)
+        
         left_layout.addLayout(btn_layout)
         
         # 进度条
@@ -321,6 +485,7 @@ class AITab(QWidget):
             else:
                 self.update_account_label()
                 self.refresh_btn.setEnabled(True)
+                self.train_btn.setEnabled(True)
                 self.publish_btn.setEnabled(True)
                 
         except Exception as e:
@@ -334,6 +499,7 @@ class AITab(QWidget):
         self.current_account = account_data
         self.update_account_label()
         self.refresh_btn.setEnabled(True)
+        self.train_btn.setEnabled(True)
         self.publish_btn.setEnabled(True)
         self.load_articles()
         
@@ -352,12 +518,14 @@ class AITab(QWidget):
                 self.account_label.setText(f"当前账号：{name} ({status})")
                 self.account_label.setStyleSheet("color: green; font-size: 14px; font-weight: bold;")
                 self.refresh_btn.setEnabled(True)
+                self.train_btn.setEnabled(True)
                 if hasattr(self, 'publish_btn'):
                     self.publish_btn.setEnabled(True)
             else:
                 self.account_label.setText("当前账号：未登录")
                 self.account_label.setStyleSheet("color: red; font-size: 14px; font-weight: bold;")
                 self.refresh_btn.setEnabled(False)
+                self.train_btn.setEnabled(False)
                 if hasattr(self, 'publish_btn'):
                     self.publish_btn.setEnabled(False)
                 
@@ -382,8 +550,14 @@ class AITab(QWidget):
             self.progress_bar.setValue(0)
             self.process_btn.setEnabled(False)
             
+            # 输入不是当前草稿的任何版本（换了一篇文章）时开始新的草稿
+            if not self.draft_key or get_version_store().find(self.draft_key, text) is None:
+                digest = hashlib.sha1(text.encode("utf-8")).hexdigest()[:8]
+                self.draft_key = f"draft-{datetime.now().strftime('%Y%m%d%H%M%S')}-{digest}"
+            
             # 创建处理线程
-            self.worker = AIWorker(text, task, style, temperature)
+            title_candidates = self.title_spin.value() if task == '标题优化' else 1
+            self.worker = AIWorker(text, task, style, temperature, self.draft_key, title_candidates)
             self.worker.finished.connect(self.handle_process_finished)
             self.worker.error.connect(self.handle_process_error)
             self.worker.progress.connect(self.progress_bar.setValue)
@@ -395,6 +569,79 @@ class AITab(QWidget):
             self.process_btn.setEnabled(True)
             self.progress_bar.setVisible(False)
             
+    def train_title_model(self):
+        """后台拉取历史文章并训练标题打分模型"""
+        if not self.current_account:
+            QMessageBox.warning(self, "警告", "请先登录账号")
+            return
+        self.train_btn.setEnabled(False)
+        self.train_btn.setText("训练中...")
+        self.title_worker = TitleModelWorker(self.current_account)
+        self.title_worker.finished.connect(self.handle_title_model_trained)
+        self.title_worker.error.connect(self.handle_title_model_error)
+        self.title_worker.start()
+        
+    def handle_title_model_trained(self, count: int):
+        self.train_btn.setText("训练标题模型")
+        self.train_btn.setEnabled(True)
+        QMessageBox.information(self, "成功", f"标题打分模型已用 {count} 篇历史文章训练")
+        
+    def handle_title_model_error(self, error: str):
+        self.train_btn.setText("训练标题模型")
+        self.train_btn.setEnabled(True)
+        QMessageBox.warning(self, "警告", f"训练标题模型失败：{error}")
+        
+    def run_analytics(self):
+        """后台拉取所有账号的文章统计"""
+        self.analytics_btn.setEnabled(False)
+        self.analytics_btn.setText("分析中...")
+        self.analytics_worker = AnalyticsWorker()
+        self.analytics_worker.finished.connect(self.handle_analytics_finished)
+        self.analytics_worker.error.connect(self.handle_analytics_error)
+        self.analytics_worker.start()
+        
+    def handle_analytics_finished(self, report: dict):
+        self.analytics_btn.setText("发布分析")
+        self.analytics_btn.setEnabled(True)
+        weekdays = "一二三四五六日"
+        lines = [f"共 {report['accounts']} 个账号、{report['articles']} 篇文章", "", "推荐发布时段："]
+        lines += [f"  周{weekdays[w['weekday']]} {w['hour']:02d}:00  预估阅读 {w['expected_reads']:.0f}"
+                  for w in report["windows"]] or ["  数据不足"]
+        for title, rows in (("分类", report["categories"]), ("来源平台", report["platforms"])):
+            if rows:
+                lines += ["", f"{title}（典型阅读量）："]
+                lines += [f"  {r['name']}：{r['typical']:.0f}（{r['count']} 篇）" for r in rows]
+        QMessageBox.information(self, "发布分析", "\n".join(lines))
+        
+    def handle_analytics_error(self, error: str):
+        self.analytics_btn.setText("发布分析")
+        self.analytics_btn.setEnabled(True)
+        QMessageBox.warning(self, "警告", f"发布分析失败：{error}")
+        
+    def arm_reconcile(self):
+        """按排期中最早的对账时间设置定时器，没有待确认的排期时不设置"""
+        next_check = get_scheduler().next_check_at()
+        self.reconcile_timer.stop()
+        if next_check is not None:
+            delay = min(max(next_check - datetime.now().timestamp(), 0), 24 * 3600)
+            self.reconcile_timer.start(int(delay * 1000))
+            
+    def run_reconcile(self):
+        if self.reconcile_worker is not None and self.reconcile_worker.isRunning():
+            return
+        self.reconcile_worker = ReconcileWorker()
+        self.reconcile_worker.finished.connect(self.handle_reconcile_finished)
+        self.reconcile_worker.error.connect(lambda error: self.arm_reconcile())
+        self.reconcile_worker.start()
+        
+    def handle_reconcile_finished(self, summary: dict):
+        self.arm_reconcile()
+        if summary.get("missing") or summary.get("failed"):
+            QMessageBox.warning(
+                self, "定时发布",
+                f"有 {summary.get('missing', 0)} 篇定时文章未按时上线，{summary.get('failed', 0)} 篇已放弃，请到后台查看"
+            )
+        
     def handle_process_finished(self, result: str):
         """处理完成"""
         self.output_text.setPlainText(result)
@@ -408,7 +655,7 @@ class AITab(QWidget):
         self.process_btn.setEnabled(True)
         self.progress_bar.setVisible(False)
         
-            def load_articles(self):
+    def load_articles(self):
         """加载文章列表"""
         try:
             if not self.current_account:
@@ -555,14 +802,17 @@ class AITab(QWidget):
                 return
                 
             # 显示发布对话框
-            dialog = PublishDialog(content, self)
+            dialog = PublishDialog(content, self, schedule=self.schedule_check.isChecked())
             if dialog.exec_() == QDialog.Accepted:
+                self.schedule_check.setChecked(dialog.schedule_check.isChecked())
                 article_data = dialog.get_article_data()
+                article_data["version_key"] = self.draft_key
                 
                 # 创建发布线程
                 self.publish_worker = PublishWorker(
                     self.current_account.get("token", ""),
-                    article_data
+                    article_data,
+                    self.current_account.get("name", "")
                 )
                 self.publish_worker.finished.connect(self.handle_publish_finished)
                 self.publish_worker.error.connect(self.handle_publish_error)
@@ -585,9 +835,12 @@ class AITab(QWidget):
             self, 
             "成功", 
             f"文章发布成功！\n文章ID：{result.get('article_id', '')}"
+            + (f"\n定时发布：{result['publish_at']}" if result.get("publish_at") else "")
         )
         # 刷新文章列表
         self.load_articles()
+        if result.get("publish_at"):
+            self.arm_reconcile()
         
     def handle_publish_error(self, error: str):
         """发布错误"""
@@ -1,183 +1,202 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                            QPushButton, QTableWidget, QTableWidgetItem,
                            QHeaderView, QComboBox, QMessageBox, QTextEdit,
-                           QSplitter, QTextBrowser)
+                           QSplitter, QTextBrowser, QSystemTrayIcon)
 from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer
 from loguru import logger
 from src.core.hot_api import HotAPI
-import asyncio
+from src.core.article import clean_content
+from src.core.async_runtime import runtime
+from src.core.cancel import Cancelled, CancelToken
+from src.core.cpu_pool import get_cpu_pool
+from src.core.fetch_profiles import load_page_async
+from src.core.hot_rank import format_heat, parse_heat
+from src.core.preview_renderer import escape_text, get_preview_renderer, message_html
+from src.core.rate_limiter import get_rate_limiter
+from src.core.watchlist import Watchlist
 import webbrowser
 import time
-from playwright.sync_api import sync_playwright
-from bs4 import BeautifulSoup
-import re
 from urllib.parse import urlparse
 
+class NumericItem(QTableWidgetItem):
+    """按 UserRole 中的数值排序的单元格（显示文本可以是“1.2万”等格式）"""
+
+    def __init__(self, text: str, value: float):
+        super().__init__(text)
+        self.setData(Qt.UserRole, value)
+
+    def __lt__(self, other):
+        try:
+            return float(self.data(Qt.UserRole)) < float(other.data(Qt.UserRole))
+        except (TypeError, ValueError):
+            return super().__lt__(other)
+
 class HotWorker(QThread):
-    """热榜获取工作线程"""
-    finished = pyqtSignal(list)
+    """热榜获取工作线程，结果为与上次快照比较后的增量"""
+    finished = pyqtSignal(dict)
     error = pyqtSignal(str)
     status = pyqtSignal(str)
     
-    def __init__(self, platform, api_source='自动切换'):
+    def __init__(self, api: HotAPI, platform, api_source='自动切换', token: CancelToken = None):
         super().__init__()
-        self.api = HotAPI()
+        self.api = api
         self.platform = platform
         self.api_source = api_source
-        self.is_running = True
+        self.token = token or CancelToken()
         
     def run(self):
         try:
             self.status.emit(f"正在获取{self.platform}热榜...")
             
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            
-            if self.is_running:
-                result = loop.run_until_complete(
-                    self.api.get_hot_list(self.platform, self.api_source)
-                )
-                if result and self.is_running:
-                    self.finished.emit(result)
-                elif self.is_running:
-                    self.error.emit("获取数据为空")
-            
-            loop.close()
+            # 请求在共享事件循环中执行，取消令牌会直接取消进行中的请求
+            result = runtime.run_sync(
+                self.api.get_hot_list(self.platform, self.api_source), token=self.token
+            )
+            if self.token.cancelled:
+                return
+            if result:
+                self.finished.emit(self.api.diff(self.platform, result))
+            else:
+                self.error.emit("获取数据为空")
             
+        except Cancelled:
+            logger.debug(f"已取消获取{self.platform}热榜")
         except Exception as e:
-            if self.is_running:
+            if not self.token.cancelled:
                 self.error.emit(str(e))
         finally:
-            self.is_running = False
+            # 任务结束（或被取消后退出），令牌从标签页的父令牌上注销
+            self.token.detach()
             
     def stop(self):
-        """中断任务"""
-        self.is_running = False
-        self.status.emit("已中断获取")
+        """中断任务（立即返回，不等待线程结束）"""
+        if not self.token.cancelled:
+            self.token.cancel()
+            self.status.emit("已中断获取")
 
 class ContentFetcher(QThread):
-    """文章内容获取线程"""
+    """文章内容获取线程（正文的转义、分页也在此线程完成）"""
     content_ready = pyqtSignal(str)
+    # 渲染完成的预览 (链接, 各页 HTML)
+    pages_ready = pyqtSignal(str, list)
     error = pyqtSignal(str)
     
-    def __init__(self, url: str, title: str = ""):
+    def __init__(self, url: str, title: str = "", token: CancelToken = None):
         super().__init__()
         self.url = url
         self.title = title
-        self.is_running = True
+        self.token = token or CancelToken()
         
     def run(self):
         try:
-            with sync_playwright() as p:
-                browser = p.chromium.launch(
-                    headless=True,
-                    args=['--disable-gpu']
-                )
+            # 浏览器操作在共享事件循环中执行，取消时任务被中断并关闭浏览器
+            title, content = runtime.run_sync(self._fetch(), token=self.token)
+            # 正则清理大页面时不释放 GIL，放到子进程中执行，避免界面卡顿；
+            # 子进程中的任务无法中断，提交前和返回后各检查一次是否已取消
+            self.token.raise_if_cancelled()
+            content = get_cpu_pool().call(clean_content, content)
+            self.token.raise_if_cancelled()
+            
+            # 在后台线程转义、分页并缓存，界面线程只显示一页
+            pages = get_preview_renderer().render(self.url, title, content)
+            if not self.token.cancelled:
+                self.pages_ready.emit(self.url, pages)
                 
-                context = browser.new_context(
+        except Cancelled:
+            logger.debug(f"已取消获取文章内容 {self.url}")
+        except Exception as e:
+            if not self.token.cancelled:
+                logger.error(f"获取文章内容失败: {str(e)}")
+                self.error.emit(f"获取文章内容失败: {str(e)}")
+        finally:
+            self.token.detach()
+            
+    async def _fetch(self):
+        """加载页面并提取标题和正文"""
+        # 延迟导入 playwright，避免拖慢程序启动
+        from playwright.async_api import async_playwright
+        
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(
+                headless=True,
+                args=['--disable-gpu']
+            )
+            try:
+                context = await browser.new_context(
                     viewport={'width': 1280, 'height': 800},
                     user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
                 )
                 
-                page = context.new_page()
+                page = await context.new_page()
                 page.set_default_timeout(20000)
                 
-                self.content_ready.emit("<h3>正在加载页面...</h3>")
-                page.goto(self.url, wait_until='networkidle')
+                self.content_ready.emit(message_html("正在加载页面..."))
+                limiter = get_rate_limiter()
+                await limiter.acquire(self.url)
+                # 拦截图片/字体/第三方脚本，正文容器出现即开始提取
+                response, _ = await load_page_async(context, page, self.url)
+                if response is not None:
+                    limiter.feedback(self.url, response.status, response.headers.get("retry-after"))
                 
                 domain = urlparse(self.url).netloc
-                content = ""
-                title = self.title
-                
                 if "toutiao.com" in domain:
-                    content = self._extract_toutiao(page)
+                    content = await self._extract_toutiao(page)
                 elif "weibo.com" in domain:
-                    content = self._extract_weibo(page)
+                    content = await self._extract_weibo(page)
                 elif "zhihu.com" in domain:
-                    content = self._extract_zhihu(page)
+                    content = await self._extract_zhihu(page)
                 elif "bilibili.com" in domain:
-                    content = self._extract_bilibili(page)
+                    content = await self._extract_bilibili(page)
                 else:
-                    content = self._extract_general(page)
-                
-                if not title:
-                    title = page.title()
-                
-                content = self._clean_content(content)
-                
-                preview_html = f"""
-                <h2 style='color: #333;'>{title}</h2>
-                <hr>
-                <div style='font-size: 14px; line-height: 1.6; color: #444; white-space: pre-wrap;'>
-                    {content}
-                </div>
-                """
+                    content = await self._extract_general(page)
                 
-                self.content_ready.emit(preview_html)
-                
-                context.close()
-                browser.close()
-                
-        except Exception as e:
-            logger.error(f"获取文章内容失败: {str(e)}")
-            self.error.emit(f"获取文章内容失败: {str(e)}")
+                title = self.title or await page.title()
+                return title, content
+            finally:
+                # 正常结束和被取消时都关闭浏览器（页面随之关闭）
+                await browser.close()
             
-    def _extract_toutiao(self, page):
-        """提取今日头条文章内容"""
+    async def _extract_selector(self, page, selector: str, script: str, site: str):
+        """等待站点正文容器出现后提取，失败时退回通用提取"""
         try:
-            page.wait_for_selector('.article-content', timeout=5000)
-            content = page.evaluate('''() => {
-                const article = document.querySelector('.article-content');
-                return article ? article.innerText : '';
-            }''')
-            return content
+            await page.wait_for_selector(selector, timeout=5000)
+            return await page.evaluate(script)
         except Exception as e:
-            logger.error(f"提取今日头条内容失败: {str(e)}")
-            return self._extract_general(page)
+            logger.error(f"提取{site}内容失败: {str(e)}")
+            return await self._extract_general(page)
             
-    def _extract_weibo(self, page):
+    async def _extract_toutiao(self, page):
+        """提取今日头条文章内容"""
+        return await self._extract_selector(page, '.article-content', '''() => {
+            const article = document.querySelector('.article-content');
+            return article ? article.innerText : '';
+        }''', "今日头条")
+            
+    async def _extract_weibo(self, page):
         """提取微博内容"""
-        try:
-            page.wait_for_selector('.detail_wbtext_4CRf9', timeout=5000)
-            content = page.evaluate('''() => {
-                const content = document.querySelector('.detail_wbtext_4CRf9');
-                return content ? content.innerText : '';
-            }''')
-            return content
-        except Exception as e:
-            logger.error(f"提取微博内容失败: {str(e)}")
-            return self._extract_general(page)
+        return await self._extract_selector(page, '.detail_wbtext_4CRf9', '''() => {
+            const content = document.querySelector('.detail_wbtext_4CRf9');
+            return content ? content.innerText : '';
+        }''', "微博")
             
-    def _extract_zhihu(self, page):
+    async def _extract_zhihu(self, page):
         """提取知乎内容"""
-        try:
-            page.wait_for_selector('.RichText', timeout=5000)
-            content = page.evaluate('''() => {
-                const contents = document.querySelectorAll('.RichText');
-                return Array.from(contents).map(el => el.innerText).join('\\n\\n');
-            }''')
-            return content
-        except Exception as e:
-            logger.error(f"提取知乎内容失败: {str(e)}")
-            return self._extract_general(page)
+        return await self._extract_selector(page, '.RichText', '''() => {
+            const contents = document.querySelectorAll('.RichText');
+            return Array.from(contents).map(el => el.innerText).join('\\n\\n');
+        }''', "知乎")
             
-    def _extract_bilibili(self, page):
+    async def _extract_bilibili(self, page):
         """提取B站内容"""
-        try:
-            page.wait_for_selector('.video-description', timeout=5000)
-            content = page.evaluate('''() => {
-                const desc = document.querySelector('.video-description');
-                return desc ? desc.innerText : '';
-            }''')
-            return content
-        except Exception as e:
-            logger.error(f"提取B站内容失败: {str(e)}")
-            return self._extract_general(page)
+        return await self._extract_selector(page, '.video-description', '''() => {
+            const desc = document.querySelector('.video-description');
+            return desc ? desc.innerText : '';
+        }''', "B站")
             
-    def _extract_general(self, page):
+    async def _extract_general(self, page):
         """通用内容提取"""
         try:
-            content = page.evaluate('''() => {
+            return await page.evaluate('''() => {
                 const selectors = [
                     'article',
                     'main',
@@ -197,33 +216,43 @@ class ContentFetcher(QThread):
                 
                 return document.body.innerText;
             }''')
-            return content
         except Exception as e:
             logger.error(f"通用内容提取失败: {str(e)}")
             return ""
             
-    def _clean_content(self, content: str) -> str:
-        """清理内容"""
-        try:
-            content = re.sub(r'\n\s*\n', '\n\n', content)
-            content = content.strip()
-            content = content.replace('\n', '<br>')
-            return content
-        except Exception as e:
-            logger.error(f"清理内容失败: {str(e)}")
-            return content
-            
     def stop(self):
-        """停止任务"""
-        self.is_running = False
+        """停止任务（立即返回，不等待线程结束）"""
+        self.token.cancel()
 
 class HotTab(QWidget):
+    # 新出现的热榜条目 (平台, 条目列表)，供自动化流程订阅
+    new_entries = pyqtSignal(str, list)
+    # 关注词命中记录（在刷新线程中匹配，经信号回到界面线程）
+    watch_hits = pyqtSignal(list)
+    
     def __init__(self):
         super().__init__()
+        # 整个标签页共用一个 HotAPI，保存各平台的上一次快照
+        self.api = HotAPI()
+        self.api.subscribe_new_entries(self.new_entries.emit)
+        # 新条目到达时立即匹配关注词，命中后推送桌面通知/webhook
+        self.watchlist = Watchlist()
+        self.api.subscribe_new_entries(self.watchlist.on_new_entries)
+        self.watchlist.subscribe(self.watch_hits.emit)
+        self.watch_hits.connect(self.handle_watch_hits)
+        self.tray_icon = None
+        self.displayed_platform = None
+        self.row_items = {}  # 条目标识 -> 标题单元格（行号会随排序变化，通过 item.row() 获取）
+        self.marked_keys = set()  # 带有“新”或升降标记的条目
         self.worker = None
         self.content_fetcher = None
+        # 标签页级取消令牌，每个工作线程使用其子令牌；关闭标签页时一并取消
+        self.cancel_token = CancelToken()
+        self._retired = []  # 已取消但尚未退出的线程，保留引用直到线程结束
         self.refresh_timer = None
         self.current_url = None
+        self.preview_pages = []
+        self.preview_page = 0
         self.init_ui()
     def init_ui(self):
         """初始化UI"""
@@ -235,7 +264,7 @@ class HotTab(QWidget):
         # 平台选择
         platform_label = QLabel("平台:")
         self.platform_combo = QComboBox()
-        self.platform_combo.addItems(['头条', '微博', '知乎', 'B站'])
+        self.platform_combo.addItems(['头条', '微博', '知乎', 'B站', '综合'])
         self.platform_combo.currentTextChanged.connect(self.on_platform_changed)
         control_layout.addWidget(platform_label)
         control_layout.addWidget(self.platform_combo)
@@ -300,6 +329,10 @@ class HotTab(QWidget):
         header.setSectionResizeMode(3, QHeaderView.ResizeToContents)
         header.setSectionResizeMode(4, QHeaderView.ResizeToContents)
         
+        # 点击表头排序，排名与热度按数值比较
+        self.hot_table.setSortingEnabled(True)
+        self.hot_table.sortByColumn(0, Qt.AscendingOrder)
+        
         # 单击预览，双击打开
         self.hot_table.cellClicked.connect(self.on_cell_clicked)
         self.hot_table.cellDoubleClicked.connect(self.on_cell_double_clicked)
@@ -320,6 +353,17 @@ class HotTab(QWidget):
         self.preview_btn.setEnabled(False)
         preview_header.addWidget(self.preview_btn)
         
+        # 长文章分页
+        self.prev_page_btn = QPushButton("上一页")
+        self.prev_page_btn.clicked.connect(lambda: self.show_preview_page(self.preview_page - 1))
+        preview_header.addWidget(self.prev_page_btn)
+        self.page_label = QLabel("")
+        preview_header.addWidget(self.page_label)
+        self.next_page_btn = QPushButton("下一页")
+        self.next_page_btn.clicked.connect(lambda: self.show_preview_page(self.preview_page + 1))
+        preview_header.addWidget(self.next_page_btn)
+        self.set_preview_pages([])
+        
         right_layout.addLayout(preview_header)
         
         # 预览区域
@@ -349,6 +393,23 @@ class HotTab(QWidget):
             self.log_text.verticalScrollBar().maximum()
         )
         
+    def handle_watch_hits(self, hits):
+        """关注词命中：写入日志并弹出桌面通知"""
+        for hit in hits:
+            self.log(f"关注词命中 [{'、'.join(hit['rules'])}] {hit['platform']}: {hit['entry'].get('title', '')}")
+        if not self.watchlist.desktop or not QSystemTrayIcon.isSystemTrayAvailable():
+            return
+        try:
+            if self.tray_icon is None:
+                self.tray_icon = QSystemTrayIcon(self.windowIcon(), self)
+                self.tray_icon.show()
+            titles = "\n".join(hit["entry"].get("title", "") for hit in hits[:5])
+            if len(hits) > 5:
+                titles += f"\n…等{len(hits)}条"
+            self.tray_icon.showMessage("热榜关注词命中", titles, QSystemTrayIcon.Information, 10000)
+        except Exception as e:
+            logger.error(f"显示桌面通知失败: {str(e)}")
+        
     def refresh_hot_list(self):
         """刷新热榜"""
         try:
@@ -361,13 +422,11 @@ class HotTab(QWidget):
             platform = self.platform_combo.currentText()
             api_source = self.api_combo.currentText()
             
-            self.worker = HotWorker(platform, api_source)
+            self.worker = HotWorker(self.api, platform, api_source, self.cancel_token.child())
             self.worker.finished.connect(self.handle_result)
             self.worker.error.connect(self.handle_error)
             self.worker.status.connect(self.handle_status)
             
-            self.hot_table.setRowCount(0)
-            
             self.worker.start()
             self.log(f"开始获取{platform}热榜 (使用 {api_source} API)...")
             
@@ -377,11 +436,18 @@ class HotTab(QWidget):
             self.refresh_btn.setText("刷新")
             self.stop_btn.setEnabled(False)
             
+    def _retire(self, thread):
+        """取消线程中的任务但不等待，线程在任务中断后自行退出"""
+        self._retired = [t for t in self._retired if t.isRunning()]
+        if thread and thread.isRunning():
+            thread.stop()
+            self._retired.append(thread)
+            
     def stop_refresh(self):
         """中断刷新"""
         if self.worker and self.worker.isRunning():
-            self.worker.stop()
-            self.worker.wait()
+            self._retire(self.worker)
+            self.worker = None
             self.refresh_btn.setText("刷新")
             self.stop_btn.setEnabled(False)
             self.log("已中断获取")
@@ -391,37 +457,36 @@ class HotTab(QWidget):
         self.status_label.setText(status)
         self.log(status)
         
-    def handle_result(self, hot_list):
-        """处理获取到的热榜数据"""
+    def handle_result(self, delta):
+        """应用热榜增量：只改动新增、消失和排名变化的行"""
+        # 已取消的线程在取消前刚好拿到的结果：只接受当前显示平台的（快照已更新，需保持一致）
+        if self.sender() is not self.worker and delta["platform"] != self.displayed_platform:
+            return
         try:
-            for item in hot_list:
-                row = self.hot_table.rowCount()
-                self.hot_table.insertRow(row)
-                
-                rank_item = QTableWidgetItem(str(item.get("rank", row + 1)))
-                rank_item.setTextAlignment(Qt.AlignCenter)
-                self.hot_table.setItem(row, 0, rank_item)
-                
-                title_item = QTableWidgetItem(item.get("title", ""))
-                title_item.setData(Qt.UserRole, item.get("url", ""))
-                self.hot_table.setItem(row, 1, title_item)
-                
-                hot_item = QTableWidgetItem(str(item.get("hot", 0)))
-                hot_item.setTextAlignment(Qt.AlignCenter)
-                self.hot_table.setItem(row, 2, hot_item)
-                
-                tag_item = QTableWidgetItem(item.get("tag", ""))
-                tag_item.setTextAlignment(Qt.AlignCenter)
-                self.hot_table.setItem(row, 3, tag_item)
-                
-                time_item = QTableWidgetItem(item.get("time", ""))
-                time_item.setTextAlignment(Qt.AlignCenter)
-                self.hot_table.setItem(row, 4, time_item)
+            # 修改期间关闭排序，否则每改一行都会重新排序；结束后统一排序一次
+            self.hot_table.setSortingEnabled(False)
+            platform = delta["platform"]
+            hot_list = delta["snapshot"]
+            rebuild = platform != self.displayed_platform
+            
+            if rebuild:
+                # 切换了平台，整表重建
+                self.hot_table.setRowCount(0)
+                self.row_items.clear()
+                self.marked_keys.clear()
+                for item in hot_list:
+                    self._append_row(item)
+                self.displayed_platform = platform
+            else:
+                self._apply_delta(delta)
                 
-            platform = self.platform_combo.currentText()
             status = f"{platform}热榜: {len(hot_list)} 条"
             self.status_label.setText(status)
-            self.log(f"获取成功: {status}")
+            if rebuild or delta["initial"]:
+                self.log(f"获取成功: {status}")
+            else:
+                self.log(f"获取成功: {status}，新增 {len(delta['inserted'])}，"
+                         f"移除 {len(delta['removed'])}，排名变化 {len(delta['moved'])}")
                 
         except Exception as e:
             logger.error(f"处理热榜数据失败: {str(e)}")
@@ -429,11 +494,84 @@ class HotTab(QWidget):
             QMessageBox.critical(self, "错误", f"处理热榜数据失败：{str(e)}")
             
         finally:
+            self.hot_table.setSortingEnabled(True)
             self.refresh_btn.setText("刷新")
             self.stop_btn.setEnabled(False)
             
+    def _apply_delta(self, delta):
+        """在现有表格上应用增量"""
+        # 清除上一次刷新留下的“新”和升降标记
+        for key in self.marked_keys:
+            title_item = self.row_items.get(key)
+            if title_item is not None:
+                rank_item = self.hot_table.item(title_item.row(), 0)
+                rank_item.setText(str(rank_item.data(Qt.UserRole)))
+        self.marked_keys.clear()
+        
+        rows = sorted(
+            (self.row_items.pop(key).row() for key in delta["removed"] if key in self.row_items),
+            reverse=True
+        )
+        for row in rows:
+            self.hot_table.removeRow(row)
+            
+        by_key = {HotAPI.entry_key(item): item for item in delta["snapshot"]}
+        for key, old_rank, new_rank in delta["moved"]:
+            title_item = self.row_items.get(key)
+            if title_item is None:
+                continue
+            arrow = "↑" if new_rank < old_rank else "↓"
+            self.marked_keys.add(key)
+            self._set_row(title_item.row(), by_key[key], rank_text=f"{new_rank} {arrow}{abs(old_rank - new_rank)}")
+            
+        for item in delta["updated"]:
+            title_item = self.row_items.get(HotAPI.entry_key(item))
+            if title_item is not None:
+                self._set_row(title_item.row(), item)
+                
+        for item in delta["inserted"]:
+            self.marked_keys.add(HotAPI.entry_key(item))
+            self._append_row(item, rank_text=f"{item.get('rank', '')} 新")
+            
+    def _append_row(self, item, rank_text: str = None):
+        row = self.hot_table.rowCount()
+        self.hot_table.insertRow(row)
+        
+        title_item = QTableWidgetItem(item.get("title", ""))
+        title_item.setData(Qt.UserRole, item.get("url", ""))
+        self.hot_table.setItem(row, 1, title_item)
+        self.row_items[HotAPI.entry_key(item)] = title_item
+        self._set_row(row, item, rank_text)
+        
+    def _set_row(self, row, item, rank_text: str = None):
+        """写入排名、热度、标签与时间列"""
+        rank = item.get("rank", row + 1)
+        rank_item = NumericItem(rank_text or str(rank), rank)
+        rank_item.setTextAlignment(Qt.AlignCenter)
+        self.hot_table.setItem(row, 0, rank_item)
+        
+        heat = item.get("heat")
+        if not isinstance(heat, (int, float)):
+            heat = parse_heat(item.get("hot"))
+        hot_item = NumericItem(format_heat(heat) if heat else str(item.get("hot", "")), heat)
+        hot_item.setTextAlignment(Qt.AlignCenter)
+        self.hot_table.setItem(row, 2, hot_item)
+        
+        tag = item.get("tag", "")
+        if item.get("platform"):
+            tag = f"{item['platform']} {tag}".strip()
+        tag_item = QTableWidgetItem(tag)
+        tag_item.setTextAlignment(Qt.AlignCenter)
+        self.hot_table.setItem(row, 3, tag_item)
+        
+        time_item = QTableWidgetItem(item.get("time", ""))
+        time_item.setTextAlignment(Qt.AlignCenter)
+        self.hot_table.setItem(row, 4, time_item)
+            
     def handle_error(self, error):
         """处理错误"""
+        if self.sender() is not self.worker:
+            return
         platform = self.platform_combo.currentText()
         error_msg = f"获取{platform}热榜失败：{error}"
         self.status_label.setText("获取失败")
@@ -452,17 +590,24 @@ class HotTab(QWidget):
                 if url:
                     self.current_url = url
                     self.preview_btn.setEnabled(True)
+                    
+                    # 已渲染过的文章直接显示缓存
+                    pages = get_preview_renderer().cached(url)
+                    if pages:
+                        self.show_pages(url, pages)
+                        return
+                    
                     self.preview_label.setText("正在加载预览...")
-                    self.preview_text.setHtml("<h3>正在加载文章内容，请稍候...</h3>")
+                    self.set_preview_pages([])
+                    self.preview_text.setHtml(message_html("正在加载文章内容，请稍候..."))
                     
-                    # 如果有正在进行的获取，先停止
-                    if self.content_fetcher and self.content_fetcher.isRunning():
-                        self.content_fetcher.stop()
-                        self.content_fetcher.wait()
+                    # 如果有正在进行的获取，先取消（不阻塞界面）
+                    self._retire(self.content_fetcher)
                     
                     # 开始新的获取
-                    self.content_fetcher = ContentFetcher(url, title)
+                    self.content_fetcher = ContentFetcher(url, title, self.cancel_token.child())
                     self.content_fetcher.content_ready.connect(self.update_preview)
+                    self.content_fetcher.pages_ready.connect(self.show_pages)
                     self.content_fetcher.error.connect(self.handle_preview_error)
                     self.content_fetcher.start()
                     
@@ -470,18 +615,55 @@ class HotTab(QWidget):
             logger.error(f"预览文章失败: {str(e)}")
             self.handle_preview_error(str(e))
             
+    def _stale_fetcher(self) -> bool:
+        """信号是否来自已被取消的内容获取线程"""
+        sender = self.sender()
+        return isinstance(sender, ContentFetcher) and sender is not self.content_fetcher
+        
     def update_preview(self, content: str):
         """更新预览内容"""
+        if self._stale_fetcher():
+            return
         self.preview_label.setText("文章预览")
         self.preview_text.setHtml(content)
         
+    def show_pages(self, url: str, pages: list):
+        """显示渲染好的预览（忽略已切换走的文章）"""
+        if url != self.current_url:
+            return
+        self.preview_label.setText("文章预览")
+        self.set_preview_pages(pages)
+        self.show_preview_page(0)
+        
+    def set_preview_pages(self, pages: list):
+        self.preview_pages = pages
+        self.preview_page = 0
+        multi = len(pages) > 1
+        self.prev_page_btn.setVisible(multi)
+        self.next_page_btn.setVisible(multi)
+        self.page_label.setVisible(multi)
+        
+    def show_preview_page(self, index: int):
+        """显示第 index 页"""
+        if not self.preview_pages:
+            return
+        index = max(0, min(index, len(self.preview_pages) - 1))
+        self.preview_page = index
+        self.preview_text.setHtml(self.preview_pages[index])
+        self.page_label.setText(f"{index + 1}/{len(self.preview_pages)}")
+        self.prev_page_btn.setEnabled(index > 0)
+        self.next_page_btn.setEnabled(index < len(self.preview_pages) - 1)
+        
     def handle_preview_error(self, error: str):
         """处理预览错误"""
+        if self._stale_fetcher():
+            return
         self.preview_label.setText("预览失败")
+        self.set_preview_pages([])
         self.preview_text.setHtml(f"""
         <div style='color: red;'>
             <h3>加载预览失败</h3>
-            <p>{error}</p>
+            <p>{escape_text(error)}</p>
             <p>您可以点击"打开原网页"按钮在浏览器中查看</p>
         </div>
         """)
@@ -504,13 +686,18 @@ class HotTab(QWidget):
         if self.current_url:
             webbrowser.open(self.current_url)
             
+    def restart_refresh(self):
+        """取消进行中的获取并重新获取"""
+        self.stop_refresh()
+        self.refresh_hot_list()
+        
     def on_platform_changed(self, platform):
         """平台切换处理"""
-        self.refresh_hot_list()
+        self.restart_refresh()
         
     def on_api_changed(self, api_source):
         """API源切换处理"""
-        self.refresh_hot_list()
+        self.restart_refresh()
         self.log(f"已切换到 {api_source} API")
         
     def on_auto_refresh_changed(self, interval):
@@ -538,12 +725,11 @@ class HotTab(QWidget):
             
     def closeEvent(self, event):
         """窗口关闭时清理线程"""
-        if self.worker and self.worker.isRunning():
-            self.worker.stop()
-            self.worker.wait()
-        if self.content_fetcher and self.content_fetcher.isRunning():
-            self.content_fetcher.stop()
-            self.content_fetcher.wait()
+        # 取消全部任务后线程会很快退出，这里只做有上限的等待
+        self.cancel_token.cancel()
+        for thread in [self.worker, self.content_fetcher] + self._retired:
+            if thread and thread.isRunning():
+                thread.wait(2000)
         if self.refresh_timer:
             self.refresh_timer.stop()
         event.accept()                
\ No newline at end of file
@@ -5,9 +5,7 @@ from PyQt5.QtCore import Qt, QThread, pyqtSignal
 from loguru import logger
 import json
 import os
-import openai
-import aiohttp
-import asyncio
+from src.core.async_runtime import run_sync
 
 class APITestWorker(QThread):
     """API测试工作线程"""
@@ -47,6 +45,8 @@ class APITestWorker(QThread):
     def test_openai(self) -> dict:
         """测试 OpenAI API"""
         try:
+            import openai
+            
             openai.api_key = self.openai_key
             if self.openai_base:
                 openai.api_base = self.openai_base
@@ -72,6 +72,8 @@ class APITestWorker(QThread):
     def test_moonshot(self) -> dict:
         """测试 Moonshot API"""
         try:
+            from src.core.http_client import create_client
+            
             async def test_request():
                 headers = {
                     "Content-Type": "application/json",
@@ -80,8 +82,8 @@ class APITestWorker(QThread):
                 
                 base_url = self.moonshot_base or "https://api.moonshot.cn/v1"
                 
-                async with aiohttp.ClientSession() as session:
-                    async with session.post(
+                async with create_client(rate_limited=False) as session:
+                    response = await session.post(
                         f"{base_url}/chat/completions",
                         headers=headers,
                         json={
@@ -90,14 +92,10 @@ class APITestWorker(QThread):
                                 {"role": "user", "content": "Hello, this is a test message."}
                             ]
                         }
-                    ) as response:
-                        result = await response.json()
-                        return result
+                    )
+                    return response.json()
                         
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            result = loop.run_until_complete(test_request())
-            loop.close()
+            result = run_sync(test_request())
             
             return {
                 'model': result['model'],
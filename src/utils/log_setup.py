@@ -0,0 +1,172 @@
+"""日志配置：异步写入、按大小轮转压缩，以及请求/响应正文的截断与采样
+
+setup_logging() 在启动时调用一次：
+    - 文件为每行一个 JSON 对象（时间、级别、位置、消息及 bind 的字段），调用方只把格式化好的行放入队列，
+      由后台线程写盘、按大小轮转并压缩为 .gz（压缩不会卡住正好触发轮转的那次请求）
+    - 队列是进程内的 queue.SimpleQueue；loguru 的 enqueue=True 走 multiprocessing 队列（pickle + 管道），
+      调用方开销反而比直接写文件更大，见 benchmarks/bench_logging.py
+    - 默认两者都是 INFO，可用环境变量 TOUTIAO_LOG_LEVEL（控制台）和 TOUTIAO_LOG_FILE_LEVEL（文件）覆盖
+
+log_http() 记录一次请求或响应：
+    - 参数在没有 sink 接收该级别时不会被计算（不会 json.dumps 整篇文章，也不会读取 response.text）
+    - 正文超过 BODY_LIMIT 字时截断并附上总长度；对象先截断其中的长字段再序列化
+    - 每个 label 每 SAMPLE_EVERY 次保留一次完整正文，便于排查时仍能看到原始数据
+"""
+import atexit
+import gzip
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import sys
+import threading
+import traceback
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Union
+
+from loguru import logger
+
+LOG_DIR = Path("logs")
+BODY_LIMIT = 300
+SAMPLE_EVERY = 100
+
+_samples: Dict[str, int] = {}
+_samples_lock = threading.Lock()
+_listener: Optional[logging.handlers.QueueListener] = None
+_atexit_registered = False
+
+
+def _json_record(record) -> str:
+    """文件 sink 的格式：把记录序列化为一行 JSON（放进 extra 里由格式串引用，避免花括号被再次解析）"""
+    entry = {
+        "time": record["time"].strftime("%Y-%m-%d %H:%M:%S.%f")[:-3],
+        "level": record["level"].name,
+        "where": f"{record['name']}:{record['function']}:{record['line']}",
+        "message": record["message"],
+    }
+    entry.update({k: v for k, v in record["extra"].items() if not k.startswith("_")})
+    if record["exception"] is not None:
+        entry["exception"] = "".join(traceback.format_exception(*record["exception"]))
+    record["extra"]["_json"] = json.dumps(entry, ensure_ascii=False, default=str)
+    return "{extra[_json]}\n"
+
+
+class _QueueSink(logging.handlers.QueueHandler):
+    """loguru 已经格式化好消息，入队时不再复制和重新格式化记录"""
+
+    def prepare(self, record):
+        return record
+
+
+class _LineFormatter(logging.Formatter):
+    """原样写出 loguru 格式化好的行（已带换行和异常信息）"""
+
+    def format(self, record):
+        return record.getMessage()
+
+
+def _gzip_rotator(source: str, dest: str):
+    with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+
+def _file_handler(path: Path, max_bytes: int, backups: int) -> logging.Handler:
+    handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups,
+                                                   encoding="utf-8", delay=True)
+    handler.namer = lambda name: f"{name}.gz"
+    handler.rotator = _gzip_rotator
+    handler.setFormatter(_LineFormatter())
+    handler.terminator = ""
+    return handler
+
+
+def setup_logging(log_dir: Optional[Path] = LOG_DIR, level: str = "INFO", file_level: str = "INFO",
+                  max_bytes: int = 20 * 1024 * 1024, backups: int = 10):
+    """替换 loguru 默认的 DEBUG 级别控制台输出"""
+    global _listener, _atexit_registered
+    level = os.environ.get("TOUTIAO_LOG_LEVEL", level).upper()
+    file_level = os.environ.get("TOUTIAO_LOG_FILE_LEVEL", file_level).upper()
+    logger.remove()
+    _stop_listener()
+    if sys.stderr is not None:
+        # 打包为无控制台程序时 sys.stderr 为 None
+        logger.add(sys.stderr, level=level, backtrace=False, diagnose=False)
+    if log_dir is not None:
+        Path(log_dir).mkdir(parents=True, exist_ok=True)
+        records = queue.SimpleQueue()
+        _listener = logging.handlers.QueueListener(records, _file_handler(Path(log_dir) / "toutiao.log",
+                                                                          max_bytes, backups))
+        _listener.start()
+        logger.add(_QueueSink(records), level=file_level, format=_json_record, backtrace=False, diagnose=False)
+        if not _atexit_registered:
+            atexit.register(shutdown)
+            _atexit_registered = True
+
+
+def _stop_listener():
+    global _listener
+    if _listener is not None:
+        listener, _listener = _listener, None
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
+def shutdown():
+    """等待队列中的日志写完并关闭文件（退出前调用）"""
+    logger.complete()
+    _stop_listener()
+
+
+def truncate(text: str, limit: int = BODY_LIMIT) -> str:
+    if text is None:
+        return ""
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}…（共 {len(text)} 字）"
+
+
+def _sampled(label: str) -> bool:
+    with _samples_lock:
+        count = _samples.get(label, 0)
+        _samples[label] = count + 1
+    return SAMPLE_EVERY > 0 and count % SAMPLE_EVERY == 0
+
+
+def _shrink(value, limit: int):
+    """截断对象中的长字符串和长列表，避免为了写一行日志序列化整篇文章"""
+    if isinstance(value, str):
+        return truncate(value, limit)
+    if isinstance(value, dict):
+        return {k: _shrink(v, limit) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        items = [_shrink(v, limit) for v in value[:20]]
+        return items + [f"…（共 {len(value)} 项）"] if len(value) > 20 else items
+    return value
+
+
+def _render(label: str, status: Optional[int], body: Union[None, str, Callable[[], Any], Any]) -> str:
+    if callable(body):
+        body = body()
+    full = _sampled(label)
+    if body is not None and not isinstance(body, str):
+        body = json.dumps(body if full else _shrink(body, BODY_LIMIT // 3), ensure_ascii=False, default=str)
+    parts = [label]
+    if status is not None:
+        parts.append(f"[{status}]")
+    if body:
+        parts.append(body if full else truncate(body))
+    return " ".join(parts)
+
+
+def log_http(label: str, status: Optional[int] = None, body: Any = None, level: str = "DEBUG", **fields):
+    """记录请求/响应
+
+    body 可以是字符串、可序列化的对象，或返回它们的函数（例如 lambda: response.text），
+    只有在有 sink 接收该级别时才会计算和序列化。fields 作为结构化字段写入文件日志。
+    """
+    target = logger.bind(**fields) if fields else logger
+    target.opt(lazy=True, depth=1).log(level, "{}", lambda: _render(label, status, body))
@@ -0,0 +1,72 @@
+"""进程内运行指标：计数器与仪表值，供界面展示和基准报告读取"""
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from loguru import logger
+
+_Key = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def _key(name: str, labels: Dict[str, str]) -> _Key:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class Metrics:
+    """线程安全的指标注册表"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[_Key, float] = {}
+        self._gauges: Dict[_Key, float] = {}
+
+    def inc(self, name: str, value: float = 1.0, **labels):
+        """计数器累加"""
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def set_gauge(self, name: str, value: float, **labels):
+        """设置仪表当前值"""
+        with self._lock:
+            self._gauges[_key(name, labels)] = value
+
+    def get(self, name: str, **labels) -> Optional[float]:
+        key = _key(name, labels)
+        with self._lock:
+            if key in self._gauges:
+                return self._gauges[key]
+            return self._counters.get(key)
+
+    def snapshot(self, prefix: str = "") -> Dict[str, Dict[str, float]]:
+        """按指标名分组的快照: {名称: {标签: 值}}"""
+        result: Dict[str, Dict[str, float]] = {}
+        with self._lock:
+            items = list(self._counters.items()) + list(self._gauges.items())
+        for (name, labels), value in items:
+            if not name.startswith(prefix):
+                continue
+            label = ",".join(f"{k}={v}" for k, v in labels) or "_"
+            result.setdefault(name, {})[label] = value
+        return result
+
+    def dump(self, path: Path = Path("data/metrics.json")):
+        """写出快照文件"""
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"timestamp": time.time(), "metrics": self.snapshot()},
+                          f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            logger.error(f"保存运行指标失败: {str(e)}")
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+
+
+# 全局单例
+metrics = Metrics()
@@ -0,0 +1,229 @@
+"""缓存与归档文件的序列化
+
+缓存、临时文章、账号快照等由程序读写的文件使用二进制格式（默认 orjson + zstd），
+只有需要手工编辑的配置文件（config/*.json、data/watchlist.json 等）继续使用带缩进的 JSON。
+
+二进制文件以 4 字节头开始: b"TTB" + 编码编号，读取时按文件头自动识别；
+没有文件头的文件按 JSON 读取，因此旧文件无需转换也能读，写入时再迁移为新格式。
+
+可用编码（依赖缺失时自动退回）:
+    orjson+zstd   orjson 序列化后 zstd 压缩（默认，读取最快）
+    msgpack+zstd  msgpack 打包后 zstd 压缩，大小相近
+    msgpack       仅 msgpack
+    orjson        仅 orjson，无文件头时与 JSON 兼容
+    json          标准库 JSON，带缩进，供人工编辑
+"""
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+MAGIC = b"TTB"
+BINARY_SUFFIX = ".bin"
+ZSTD_LEVEL = 3
+
+_local = threading.local()
+
+
+def _zstd():
+    """每个线程各自的压缩/解压对象（zstandard 的对象不能跨线程并发使用）"""
+    import zstandard
+
+    if not hasattr(_local, "compressor"):
+        _local.compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+        _local.decompressor = zstandard.ZstdDecompressor()
+    return _local.compressor, _local.decompressor
+
+
+def _json_dumps(obj) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def _json_loads(data: bytes):
+    return json.loads(data.decode("utf-8-sig"))
+
+
+def _orjson_dumps(obj) -> bytes:
+    import orjson
+
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+
+def _orjson_loads(data: bytes):
+    import orjson
+
+    return orjson.loads(data)
+
+
+def _msgpack_dumps(obj) -> bytes:
+    import msgpack
+
+    return msgpack.packb(obj, use_bin_type=True)
+
+
+def _msgpack_loads(data: bytes):
+    import msgpack
+
+    return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+def _compressed(dumps: Callable, loads: Callable) -> Tuple[Callable, Callable]:
+    def compressed_dumps(obj) -> bytes:
+        return _zstd()[0].compress(dumps(obj))
+
+    def compressed_loads(data: bytes):
+        return loads(_zstd()[1].decompress(data))
+
+    return compressed_dumps, compressed_loads
+
+
+# 名称 -> (文件头编号, 序列化, 反序列化, 依赖模块)
+CODECS: Dict[str, Tuple[int, Callable, Callable, Tuple[str, ...]]] = {
+    "json": (0, _json_dumps, _json_loads, ()),
+    "orjson": (1, _orjson_dumps, _orjson_loads, ("orjson",)),
+    "msgpack": (2, _msgpack_dumps, _msgpack_loads, ("msgpack",)),
+    "msgpack+zstd": (3, *_compressed(_msgpack_dumps, _msgpack_loads), ("msgpack", "zstandard")),
+    "orjson+zstd": (4, *_compressed(_orjson_dumps, _orjson_loads), ("orjson", "zstandard")),
+}
+_BY_ID = {spec[0]: name for name, spec in CODECS.items()}
+_PREFERENCE = ["orjson+zstd", "msgpack+zstd", "orjson", "msgpack", "json"]
+_available: Optional[List[str]] = None
+
+
+def available_codecs() -> List[str]:
+    """当前环境可用的编码（按优先级排列）"""
+    global _available
+    if _available is None:
+        import importlib.util
+
+        _available = [
+            name for name in _PREFERENCE
+            if all(importlib.util.find_spec(module) for module in CODECS[name][3])
+        ]
+    return _available
+
+
+def default_codec() -> str:
+    return available_codecs()[0]
+
+
+def dumps(obj, codec: Optional[str] = None) -> bytes:
+    """序列化为字节串；json 编码不加文件头，保持纯文本"""
+    codec = codec or default_codec()
+    codec_id, encode, _, _ = CODECS[codec]
+    if codec == "json":
+        return encode(obj)
+    return MAGIC + bytes([codec_id]) + encode(obj)
+
+
+def detect(data: bytes) -> str:
+    """根据文件头识别编码"""
+    if data[:3] == MAGIC and len(data) >= 4 and data[3] in _BY_ID:
+        return _BY_ID[data[3]]
+    return "json"
+
+
+def loads(data: bytes):
+    """按文件头自动识别编码并反序列化"""
+    codec = detect(data)
+    _, _, decode, _ = CODECS[codec]
+    if codec == "json":
+        return decode(data)
+    return decode(data[4:])
+
+
+def atomic_write_bytes(path: Path, data: bytes):
+    """先写临时文件再原子替换"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def write_file(path: Path, obj, codec: Optional[str] = None):
+    """序列化并原子写入文件"""
+    atomic_write_bytes(path, dumps(obj, codec))
+
+
+def read_file(path: Path, default: Any = None):
+    """读取文件（自动识别格式），文件不存在时返回 default"""
+    path = Path(path)
+    if not path.exists():
+        return default
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+
+def set_aside(path: Path) -> bool:
+    """把无法读取的文件改名为 <文件名>.corrupt 保留下来，返回之后写回 path 是否安全
+
+    读取失败后从空数据开始的调用方，在第一次写回前用它保住原文件；改名失败时返回 False，调用方不应再写回。
+    """
+    path = Path(path)
+    if not path.exists():
+        return True
+    target = path.with_name(f"{path.name}.corrupt")
+    if target.exists():
+        target = path.with_name(f"{path.name}.{int(time.time())}.corrupt")
+    try:
+        os.replace(path, target)
+    except OSError as e:
+        logger.error(f"移走无法读取的文件失败 {path}: {str(e)}")
+        return False
+    logger.warning(f"无法读取的文件已移到 {target}")
+    return True
+
+
+def binary_path(path: Path) -> Path:
+    """JSON 文件迁移后对应的二进制文件路径"""
+    path = Path(path)
+    return path.with_suffix(BINARY_SUFFIX)
+
+
+def load_migrating(path: Path, legacy: Optional[Path] = None, default: Any = None,
+                   codec: Optional[str] = None):
+    """读取 path；不存在但旧格式文件 legacy 存在时，读取旧文件、写成新格式并删除旧文件"""
+    path = Path(path)
+    if path.exists():
+        return read_file(path, default)
+    if legacy is None or not Path(legacy).exists():
+        return default
+    data = read_file(legacy, default)
+    try:
+        write_file(path, data, codec)
+        Path(legacy).unlink()
+        logger.info(f"已迁移 {legacy} -> {path}")
+    except Exception as e:
+        logger.error(f"迁移文件失败 {legacy}: {str(e)}")
+    return data
+
+
+def migrate_tree(root: Path, pattern: str = "*.json", codec: Optional[str] = None) -> int:
+    """把目录下匹配的 JSON 文件批量转换为二进制格式，返回转换的文件数"""
+    count = 0
+    for legacy in Path(root).rglob(pattern):
+        target = binary_path(legacy)
+        if target.exists():
+            continue
+        try:
+            load_migrating(target, legacy, codec=codec)
+            count += 1
+        except Exception as e:
+            logger.error(f"迁移文件失败 {legacy}: {str(e)}")
+    return count
+
+
+if __name__ == "__main__":
+    # python -m src.utils.serialization data/cache data/temp ...
+    import sys
+
+    for directory in sys.argv[1:] or ["data/cache", "data/temp", "data/cookies"]:
+        print(f"{directory}: 迁移 {migrate_tree(Path(directory))} 个文件")
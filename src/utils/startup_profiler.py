@@ -0,0 +1,214 @@
+"""启动性能分析：统计各模块导入耗时、界面构建耗时与首次绘制时间
+
+用法:
+    python main.py --profile-startup                       # 首次绘制后输出报告并退出
+    python main.py --profile-startup --startup-budget-ms 1500   # 超出预算时以退出码 1 结束
+"""
+import argparse
+import json
+import sys
+import time
+from contextlib import contextmanager
+from importlib.abc import MetaPathFinder
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from loguru import logger
+
+
+class _TimingLoader:
+    """包装原加载器，记录 create_module + exec_module 耗时（扩展模块主要耗时在前者）"""
+
+    def __init__(self, loader, profiler: "StartupProfiler"):
+        self._loader = loader
+        self._profiler = profiler
+        self._create_seconds = 0.0
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        start = time.perf_counter()
+        try:
+            return self._loader.create_module(spec)
+        finally:
+            self._create_seconds = time.perf_counter() - start
+
+    def exec_module(self, module):
+        self._profiler._enter_import(module.__name__, self._create_seconds)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._exit_import(module.__name__)
+
+
+class _TimingFinder(MetaPathFinder):
+    """位于 sys.meta_path 首位，为找到的模块套上计时加载器"""
+
+    def __init__(self, profiler: "StartupProfiler"):
+        self._profiler = profiler
+        self._resolving = set()
+
+    def find_spec(self, fullname, path=None, target=None):
+        if fullname in self._resolving:
+            return None
+        self._resolving.add(fullname)
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                        spec.loader = _TimingLoader(spec.loader, self._profiler)
+                    return spec
+            return None
+        finally:
+            self._resolving.discard(fullname)
+
+
+class StartupProfiler:
+    """启动分析器，未启用时所有调用均为空操作"""
+
+    def __init__(self):
+        self.enabled = False
+        self.budget_ms: Optional[float] = None
+        self.output = Path("data/startup_profile.json")
+        self.exit_after_paint = True
+        self._origin = time.perf_counter()
+        self._finder: Optional[_TimingFinder] = None
+        self._stack: List[list] = []  # [模块名, 开始时间, 子模块耗时]
+        self.imports: Dict[str, Dict[str, float]] = {}
+        self.sections: List[Dict] = []
+        self.marks: Dict[str, float] = {}
+
+    def configure(self, argv: List[str]) -> List[str]:
+        """从命令行参数读取分析选项，返回剩余参数"""
+        parser = argparse.ArgumentParser(add_help=False)
+        parser.add_argument("--profile-startup", action="store_true")
+        parser.add_argument("--startup-budget-ms", type=float)
+        parser.add_argument("--profile-output")
+        parser.add_argument("--profile-keep-open", action="store_true")
+        args, rest = parser.parse_known_args(argv[1:])
+
+        if args.profile_startup or args.startup_budget_ms is not None:
+            self.enable()
+            self.budget_ms = args.startup_budget_ms
+            self.exit_after_paint = not args.profile_keep_open
+            if args.profile_output:
+                self.output = Path(args.profile_output)
+        return argv[:1] + rest
+
+    def enable(self):
+        """启用分析并安装导入钩子"""
+        if self.enabled:
+            return
+        self.enabled = True
+        self._origin = time.perf_counter()
+        self._finder = _TimingFinder(self)
+        sys.meta_path.insert(0, self._finder)
+
+    def disable(self):
+        if self._finder in sys.meta_path:
+            sys.meta_path.remove(self._finder)
+        self._finder = None
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self._origin) * 1000
+
+    def _enter_import(self, name: str, already_elapsed: float = 0.0):
+        self._stack.append([name, time.perf_counter() - already_elapsed, 0.0])
+
+    def _exit_import(self, name: str):
+        entry_name, start, children = self._stack.pop()
+        total = time.perf_counter() - start
+        self.imports[entry_name] = {
+            "cumulative_ms": total * 1000,
+            "self_ms": (total - children) * 1000,
+        }
+        if self._stack:
+            self._stack[-1][2] += total
+
+    @contextmanager
+    def section(self, name: str):
+        """记录一段构建过程的耗时"""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.sections.append({
+                "name": name,
+                "start_ms": (start - self._origin) * 1000,
+                "duration_ms": (time.perf_counter() - start) * 1000,
+            })
+
+    def mark(self, name: str):
+        """记录一个时间点（如首次绘制）"""
+        if self.enabled and name not in self.marks:
+            self.marks[name] = self.elapsed_ms()
+
+    def watch_first_paint(self, widget, app):
+        """在窗口首次绘制时记录时间，并按需输出报告、退出"""
+        if not self.enabled:
+            return
+        from PyQt5.QtCore import QEvent, QObject, QTimer
+
+        profiler = self
+
+        class _PaintWatcher(QObject):
+            def eventFilter(self, obj, event):
+                if event.type() == QEvent.Paint and "first_paint" not in profiler.marks:
+                    profiler.mark("first_paint")
+                    widget.removeEventFilter(self)
+                    QTimer.singleShot(0, profiler._finish)
+                return False
+
+        profiler._app = app
+        profiler._paint_watcher = _PaintWatcher()
+        widget.installEventFilter(profiler._paint_watcher)
+
+    def report(self, top: int = 25) -> Dict:
+        modules = sorted(self.imports.items(), key=lambda kv: kv[1]["self_ms"], reverse=True)
+        return {
+            "first_paint_ms": self.marks.get("first_paint"),
+            "budget_ms": self.budget_ms,
+            "marks": self.marks,
+            "sections": self.sections,
+            "imports_total_ms": sum(v["self_ms"] for v in self.imports.values()),
+            "imports": [{"module": name, **timing} for name, timing in modules[:top]],
+            "modules_loaded": len(self.imports),
+        }
+
+    def over_budget(self) -> bool:
+        first_paint = self.marks.get("first_paint")
+        return (self.budget_ms is not None and first_paint is not None
+                and first_paint > self.budget_ms)
+
+    def _finish(self):
+        report = self.report()
+        try:
+            self.output.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.output, "w", encoding="utf-8") as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            logger.error(f"保存启动分析报告失败: {str(e)}")
+
+        logger.info(f"首次绘制: {report['first_paint_ms']:.1f}ms，"
+                    f"模块导入合计: {report['imports_total_ms']:.1f}ms")
+        for section in self.sections:
+            logger.info(f"  构建 {section['name']}: {section['duration_ms']:.1f}ms")
+        for item in report["imports"][:10]:
+            logger.info(f"  导入 {item['module']}: {item['self_ms']:.1f}ms "
+                        f"(累计 {item['cumulative_ms']:.1f}ms)")
+
+        if self.over_budget():
+            logger.error(f"启动耗时 {report['first_paint_ms']:.1f}ms 超出预算 {self.budget_ms:.0f}ms")
+        if self.exit_after_paint:
+            self._app.exit(1 if self.over_budget() else 0)
+
+
+# 全局单例
+profiler = StartupProfiler()
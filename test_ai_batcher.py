@@ -0,0 +1,81 @@
+"""短任务合批测试：三种回复格式的解析、越界/缺失编号的处理，以及只对缺失的任务单独补做"""
+import asyncio
+
+import pytest
+
+from src.core.ai_batcher import AIBatcher, parse_batch_reply
+
+REPLIES = [
+    # (回复, 任务数, 期望结果)
+    ('{"1": "标题一", "2": "标题二"}', 2, {1: "标题一", 2: "标题二"}),
+    ('好的，结果如下：\n```json\n{"1": "甲", "2": "乙"}\n```', 2, {1: "甲", 2: "乙"}),
+    ('{" 1 ": 42, "2": 3.5}', 2, {1: "42", 2: "3.5"}),
+    ('[{"id": 1, "result": "甲"}, {"id": "2", "result": "乙"}]', 2, {1: "甲", 2: "乙"}),
+    ('1: 甲\n2：乙\n任务 3、丙\n"4". 丁', 4, {1: "甲", 2: "乙", 3: "丙", 4: "丁"}),
+    # 部分编号缺失或为空
+    ('{"1": "甲", "3": ""}', 3, {1: "甲"}),
+    # 超出范围的编号、非数字键和非文本值被丢弃
+    ('{"0": "零", "1": "甲", "5": "戊", "x": "未知", "2": ["列表"]}', 2, {1: "甲"}),
+    ('[{"id": 9, "result": "越界"}, {"id": 2, "result": "乙"}, {"result": "无编号"}]', 2, {2: "乙"}),
+    ('1: 甲\n7: 越界', 2, {1: "甲"}),
+    # JSON 对象解析失败时回退到按行解析
+    ('{"1": "甲", "2": 未加引号}\n1: 甲\n2: 乙', 2, {1: "甲", 2: "乙"}),
+    ("", 3, {}),
+    (None, 3, {}),
+    ("无法完成这些任务", 2, {}),
+]
+
+
+@pytest.mark.parametrize("reply,count,expected", REPLIES)
+def test_parse_batch_reply(reply, count, expected):
+    assert parse_batch_reply(reply, count) == expected
+
+
+class _FakeAPI:
+    """合批回复只包含 answered 中编号的结果，单独调用的结果带 "单独:" 前缀"""
+
+    task_prompts = {"标题优化": "优化以下标题："}
+    style_prompts = {}
+
+    def __init__(self, answered):
+        self.answered = answered
+        self.chats = 0
+        self.singles = []
+
+    async def chat(self, system_prompt, user_prompt, temperature=0.7):
+        self.chats += 1
+        return "\n".join(f"{index}: 合批{index}" for index in self.answered)
+
+    async def process(self, text, task, **options):
+        self.singles.append(text)
+        return f"单独:{text}"
+
+
+def _run_batch(api, texts):
+    batcher = AIBatcher(api, window_ms=5)
+
+    async def run():
+        return await asyncio.gather(*(batcher.submit(text, "标题优化") for text in texts))
+
+    return asyncio.run(run())
+
+
+def test_missing_items_fall_back_individually():
+    api = _FakeAPI(answered=[1, 3])
+    results = _run_batch(api, ["a", "b", "c", "d"])
+
+    assert results == ["合批1", "单独:b", "合批3", "单独:d"]
+    assert api.chats == 1
+    assert api.singles == ["b", "d"]
+
+
+def test_unparsable_batch_falls_back_for_every_item():
+    api = _FakeAPI(answered=[])
+    assert _run_batch(api, ["a", "b"]) == ["单独:a", "单独:b"]
+    assert api.singles == ["a", "b"]
+
+
+def test_single_item_skips_batch_request():
+    api = _FakeAPI(answered=[1])
+    assert _run_batch(api, ["a"]) == ["单独:a"]
+    assert api.chats == 0
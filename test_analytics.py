@@ -0,0 +1,69 @@
+"""文章统计测试：推荐时段换算为下一个发布时间，以及统计文件损坏时不会被空库覆盖"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.core import analytics
+from src.core.analytics import ArticleAnalytics
+from src.utils import serialization
+
+# 2026-10-19 是星期一（weekday 0）
+MONDAY = datetime(2026, 10, 19, 10, 10)
+
+CASES = [
+    # (推荐时段 [(星期, 小时)], 当前时间, 最少提前分钟数, 期望的发布时间)
+    ([(0, 12)], MONDAY, 30, datetime(2026, 10, 19, 12)),
+    ([(0, 11)], MONDAY, 30, datetime(2026, 10, 19, 11)),
+    # 当天的时段已过，顺延到下周
+    ([(0, 9)], MONDAY, 30, datetime(2026, 10, 26, 9)),
+    # 提前量不足一小时的部分向后取整
+    ([(0, 11)], MONDAY, 60, datetime(2026, 10, 26, 11)),
+    ([(0, 10)], datetime(2026, 10, 19, 10), 0, datetime(2026, 10, 19, 10)),
+    # 多个时段取最早的一个
+    ([(1, 8), (0, 20), (6, 23)], MONDAY, 30, datetime(2026, 10, 19, 20)),
+    ([(6, 23)], MONDAY, 30, datetime(2026, 10, 25, 23)),
+    # 提前量跨过午夜
+    ([(1, 0)], datetime(2026, 10, 19, 23, 50), 30, datetime(2026, 10, 27, 0)),
+    ([(1, 1)], datetime(2026, 10, 19, 23, 50), 30, datetime(2026, 10, 20, 1)),
+]
+
+
+@pytest.mark.parametrize("windows,after,lead,expected", CASES)
+def test_next_publish_time(windows, after, lead, expected):
+    store = ArticleAnalytics(path=None)
+    store.recommend_windows = lambda top, account, category: [
+        {"weekday": weekday, "hour": hour} for weekday, hour in windows
+    ]
+    assert store.next_publish_time(after, min_lead_minutes=lead) == expected
+
+
+def test_next_publish_time_without_data():
+    assert ArticleAnalytics(path=None).next_publish_time(MONDAY) is None
+
+
+def test_next_publish_time_from_history():
+    """每周三 20 点发布的文章阅读量远高于其他时段"""
+    store = ArticleAnalytics(path=None)
+    start = datetime(2025, 1, 1)
+    articles = []
+    for i in range(60):
+        published = start + timedelta(days=7 * (i // 3), hours=(20, 8, 14)[i % 3])
+        articles.append({"article_id": str(i), "publish_time": published.strftime("%Y-%m-%d %H:%M:%S"),
+                         "read_count": 50000 if i % 3 == 0 else 100})
+    store.ingest("账号", articles)
+
+    assert store.next_publish_time(MONDAY, top=1) == datetime(2026, 10, 21, 20)
+
+
+def test_unreadable_store_is_set_aside(tmp_path, monkeypatch):
+    path = tmp_path / "articles.bin"
+    path.write_bytes(b"TTB\x03not a valid payload")
+    monkeypatch.setattr(analytics, "STORE_FILE", path)
+    monkeypatch.setattr(analytics, "_analytics", None)
+
+    store = analytics.get_analytics()
+    store.ingest("账号", [{"article_id": "1", "publish_time": "2026-10-01 08:00:00", "read_count": 5}])
+    store.flush()
+
+    assert (tmp_path / "articles.bin.corrupt").read_bytes() == b"TTB\x03not a valid payload"
+    assert serialization.read_file(path)["article_ids"] == ["1"]
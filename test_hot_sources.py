@@ -0,0 +1,53 @@
+"""热榜数据源解析测试：每个数据源的样例响应解析结果与 expected.json 一致，流式解析与整体解析结果相同"""
+import json
+from pathlib import Path
+
+import pytest
+
+from src.core.hot_sources import HOT_SOURCES, PLATFORM_CACHE_NAMES, StreamParser, parse_bytes
+
+FIXTURE_DIR = Path(__file__).resolve().parent / "benchmarks" / "fixtures" / "hot_sources"
+
+with open(FIXTURE_DIR / "expected.json", "r", encoding="utf-8") as f:
+    EXPECTED = json.load(f)
+
+SOURCES = [
+    (f"{PLATFORM_CACHE_NAMES[platform]}_{spec['name']}", platform, spec)
+    for platform, specs in HOT_SOURCES.items()
+    for spec in specs
+]
+
+
+def _stream(spec, data: bytes, chunk_size: int = 4096):
+    parser = StreamParser(spec)
+    for start in range(0, len(data), chunk_size):
+        parser.feed(data[start:start + chunk_size])
+    return parser.close()
+
+
+def test_every_source_has_fixture():
+    assert sorted(f"{name}.json" for name, _, _ in SOURCES) == sorted(EXPECTED)
+
+
+@pytest.mark.parametrize("name,platform,spec", SOURCES, ids=[name for name, _, _ in SOURCES])
+def test_parser_matches_fixture(name, platform, spec):
+    expected = EXPECTED[f"{name}.json"]
+    parsed = parse_bytes(spec, (FIXTURE_DIR / f"{name}.json").read_bytes())
+
+    assert expected["platform"] == platform
+    assert len(parsed) == expected["count"]
+    for got, want in zip(parsed, expected["first"]):
+        assert {key: got.get(key) for key in want} == want
+    assert all(entry.get("title") for entry in parsed)
+
+
+@pytest.mark.parametrize("name,platform,spec", SOURCES, ids=[name for name, _, _ in SOURCES])
+def test_stream_parser_matches_whole(name, platform, spec):
+    data = (FIXTURE_DIR / f"{name}.json").read_bytes()
+    assert _stream(spec, data, chunk_size=512) == parse_bytes(spec, data)
+
+
+@pytest.mark.parametrize("name,platform,spec", SOURCES[:1], ids=[SOURCES[0][0]])
+def test_limit(name, platform, spec):
+    data = (FIXTURE_DIR / f"{name}.json").read_bytes()
+    assert parse_bytes(spec, data, limit=5) == parse_bytes(spec, data)[:5]
@@ -0,0 +1,34 @@
+"""图片插入测试：图片均匀插入段落之间，HTML 正文的段落结构保持完整"""
+import pytest
+
+from src.core.image_pipeline import place_images
+
+IMG = '<p><img src="u{}" width="1" height="2"></p>'
+
+
+def _images(count: int):
+    return [{"url": f"u{i}", "width": 1, "height": 2} for i in range(count)]
+
+
+@pytest.mark.parametrize("content,count,expected", [
+    ("<p>a</p><p>b</p>", 1, "<p>a</p>" + IMG.format(0) + "<p>b</p>"),
+    # 最后一个 </p> 之后的文字包成段落，不再生成 "tail</p>"
+    ("<p>a</p>tail", 1, "<p>a</p>" + IMG.format(0) + "<p>tail</p>"),
+    ("<p>a</p><p>b", 1, "<p>a</p>" + IMG.format(0) + "<p>b</p>"),
+    ("<p>a</p>\n<p>b</p>\n", 1, "<p>a</p>" + IMG.format(0) + "\n<p>b</p>"),
+    ("<P>a</P><p>b</p><p>c</p><p>d</p>", 3,
+     "<P>a</P>" + IMG.format(0) + "<p>b</p>" + IMG.format(1) + "<p>c</p>" + IMG.format(2) + "<p>d</p>"),
+    # 纯文本按行转为段落并转义
+    ("第一行\n\n<第二行>", 1, "<p>第一行</p>" + IMG.format(0) + "<p>&lt;第二行&gt;</p>"),
+    # 末尾只有标签时接在最后一段后面
+    ("<div><p>a</p><p>b</p></div>", 1, "<div><p>a</p>" + IMG.format(0) + "<p>b</p></div>"),
+    ("<p>a</p>", 0, "<p>a</p>"),
+])
+def test_place_images(content, count, expected):
+    assert place_images(content, _images(count)) == expected
+
+
+@pytest.mark.parametrize("content", ["<p>a</p>tail", "<p>a</p> <p>b</p> c", "<div><p>a</p></div>"])
+def test_html_paragraphs_stay_balanced(content):
+    result = place_images(content, _images(2))
+    assert result.lower().count("<p") == result.lower().count("</p>")
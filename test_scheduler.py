@@ -0,0 +1,112 @@
+"""定时发布对账测试：拉取文章列表失败时下一次对账时间不会停在过去，宽限与放弃规则照常生效"""
+import asyncio
+
+import pytest
+
+from src.core import scheduler as scheduler_module
+from src.core.analytics import ArticleAnalytics
+from src.core.scheduler import FAILED, LIVE, MISSING, SCHEDULED, PublishScheduler
+from src.utils import serialization
+
+NOW = 1_800_000_000.0
+MINUTE = 60
+HOUR = 3600
+
+
+class _Publisher:
+    autoflush_analytics = True
+
+
+@pytest.fixture
+def scheduler(tmp_path, monkeypatch):
+    monkeypatch.setattr(scheduler_module, "get_analytics", lambda: ArticleAnalytics(path=None))
+    return PublishScheduler(_Publisher(), path=tmp_path / "schedule.bin")
+
+
+def _add(scheduler, entry_id: str, publish_at: float, status: str = SCHEDULED, checked_at: float = 0.0):
+    scheduler.entries[entry_id] = {
+        "id": entry_id, "token": "tok", "account": "账号", "title": entry_id, "publish_at": publish_at,
+        "article_id": f"a-{entry_id}", "status": status, "submitted_at": publish_at - HOUR,
+        "checked_at": checked_at, "message": "",
+    }
+
+
+def _fail_fetch(scheduler, monkeypatch):
+    calls = []
+
+    async def fail(account, entries, max_pages, page_size):
+        calls.append([e["id"] for e in entries])
+        raise Exception("网络不可用")
+
+    monkeypatch.setattr(scheduler, "_find", fail)
+    return calls
+
+
+def _reconcile(scheduler, now):
+    return asyncio.run(scheduler.reconcile(accounts=[], now=now))
+
+
+@pytest.mark.parametrize("published_ago,status", [
+    (10 * MINUTE, SCHEDULED),   # 已过首次对账时间，还在宽限期内
+    (2 * HOUR, MISSING),        # 超过宽限期
+    (30 * HOUR, FAILED),        # 超过放弃时间
+])
+def test_failed_fetch_still_applies_rules(scheduler, monkeypatch, published_ago, status):
+    _fail_fetch(scheduler, monkeypatch)
+    _add(scheduler, "e1", NOW - published_ago)
+
+    _reconcile(scheduler, NOW)
+
+    entry = scheduler.entries["e1"]
+    assert entry["status"] == status
+    assert entry["checked_at"] == NOW
+    if status == FAILED:
+        assert "网络不可用" in entry["message"]
+        assert scheduler.next_check_at() is None
+    else:
+        assert scheduler.next_check_at() == NOW + scheduler.recheck
+
+
+def test_repeated_failures_do_not_busy_loop(scheduler, monkeypatch):
+    calls = _fail_fetch(scheduler, monkeypatch)
+    _add(scheduler, "e1", NOW - HOUR)
+    _add(scheduler, "e2", NOW - 2 * HOUR, status=MISSING, checked_at=NOW - HOUR)
+
+    now = NOW
+    for _ in range(3):
+        _reconcile(scheduler, now)
+        assert scheduler.next_check_at() > now
+        # 定时器在 next_check_at 之前触发时不再拉取
+        assert _reconcile(scheduler, now + 1)["checked"] == 0
+        now = scheduler.next_check_at()
+
+    assert len(calls) == 3
+    assert scheduler.pending(now - 1) == []
+
+
+def test_found_article_goes_live(scheduler, monkeypatch):
+    async def find(account, entries, max_pages, page_size):
+        return {"a-e1": {"article_id": "a-e1", "publish_time": NOW - HOUR + 30}}
+
+    monkeypatch.setattr(scheduler, "_find", find)
+    _add(scheduler, "e1", NOW - HOUR)
+    _add(scheduler, "e2", NOW - HOUR)
+
+    summary = _reconcile(scheduler, NOW)
+
+    assert summary[LIVE] == 1 and summary[MISSING] == 1
+    assert scheduler.entries["e1"]["live_at"] == NOW - HOUR + 30
+    assert scheduler.next_check_at() == NOW + scheduler.recheck
+
+
+def test_unreadable_schedule_is_set_aside(tmp_path, monkeypatch):
+    monkeypatch.setattr(scheduler_module, "get_analytics", lambda: ArticleAnalytics(path=None))
+    path = tmp_path / "schedule.bin"
+    path.write_bytes(b"TTB\x03broken")
+
+    scheduler = PublishScheduler(_Publisher(), path=path)
+    _add(scheduler, "e1", NOW)
+    scheduler._save()
+
+    assert (tmp_path / "schedule.bin.corrupt").read_bytes() == b"TTB\x03broken"
+    assert list(serialization.read_file(path)) == ["e1"]
@@ -0,0 +1,37 @@
+"""改写分块测试：按段落分块、超长段落按句子切开，分隔符 + 块依次拼接后与原文一致"""
+import pytest
+
+from src.core.ai_api import split_chunks
+
+CASES = [
+    # (原文, 每块最大字数, 期望的 [(分隔符, 块)])
+    ("短文本", 100, [("", "短文本")]),
+    ("", 5, [("", "")]),
+    ("第一段。\n第二段。\n第三段。", 9, [("", "第一段。\n第二段。"), ("\n", "第三段。")]),
+    ("第一段。\n第二段。", 100, [("", "第一段。\n第二段。")]),
+    ("甲句子。乙句子。丙句子。丁句子。", 8, [("", "甲句子。乙句子。"), ("", "丙句子。丁句子。")]),
+    ("a\n\nb\n", 3, [("", "a\n"), ("\n", "b\n")]),
+    # 单个句子超过上限时不再切分
+    ("一二三四五六七八九十。", 4, [("", "一二三四五六七八九十。")]),
+]
+
+
+@pytest.mark.parametrize("text,max_chars,expected", CASES)
+def test_split_chunks(text, max_chars, expected):
+    assert split_chunks(text, max_chars) == expected
+
+
+@pytest.mark.parametrize("text,max_chars", [(text, max_chars) for text, max_chars, _ in CASES] + [
+    ("开头。\n" + "很长的段落。" * 50 + "\n\n结尾\n", 40),
+    ("\n\n\n", 1),
+])
+def test_chunks_rebuild_text(text, max_chars):
+    chunks = split_chunks(text, max_chars)
+    assert "".join(joiner + chunk for joiner, chunk in chunks) == text
+    assert all(joiner in ("", "\n") for joiner, _ in chunks)
+
+
+def test_chunks_respect_limit():
+    text = "\n".join(f"第{i}段。" + "句子内容。" * (i % 7) for i in range(60))
+    for _, chunk in split_chunks(text, 50):
+        assert len(chunk) <= 50
@@ -0,0 +1,65 @@
+"""正文规范化测试：各条规则的结果，以及批量接口与逐篇 normalize 结果一致（文档边界不互相影响）"""
+import random
+
+import pytest
+
+from src.core.text_normalizer import _SEPARATOR, TextNormalizer
+
+NORMALIZER = TextNormalizer()
+
+CASES = [
+    ("全角\uff21\uff22\uff23\uff11\uff12\uff13", "全角ABC123"),
+    ("中文 中文", "中文中文"),
+    ("空格\u3000\xa0两个", "空格两个"),
+    ("零\u200b宽\ufeff", "零宽"),
+    ("你好,世界!!!", "你好，世界！"),
+    ("问?!?", "问？"),
+    ("English, words!", "English, words!"),
+    ("等等...", "等等……"),
+    ("好。。。", "好……"),
+    ("原标题：测试\n正文", "正文"),
+    ("正文\n点击关注，获取更多", "正文"),
+    ("a\r\nb", "a\nb"),
+    ("第一段\n\n\n\n第二段", "第一段\n\n第二段"),
+    ("行<br/>换<BR>行", "行\n换\n行"),
+    ("", ""),
+    (None, ""),
+]
+
+
+@pytest.mark.parametrize("text,expected", CASES)
+def test_normalize(text, expected):
+    assert NORMALIZER.normalize(text) == expected
+
+
+# 相邻文档首尾拼在一起时可能被规则连成一片的内容
+BOUNDARY = [
+    ["结尾!", "!开头"],
+    ["结尾?", "?!开头"],
+    ["结尾..", ".开头"],
+    ["结尾。。", "。开头"],
+    ["汉字 ", " 汉字"],
+    ["换行<br", "/>开头"],
+    ["多个空行\n\n", "\n\n开头"],
+    ["正文\n责任编辑", "：张三\n正文"],
+    ["点击", "关注"],
+    [f"含分隔符{_SEPARATOR}的文本", _SEPARATOR, f"\n{_SEPARATOR}\n"],
+    ["", None, "   ", "\n"],
+    ["\r", "\n结尾"],
+]
+
+
+@pytest.mark.parametrize("texts", BOUNDARY)
+def test_normalize_many_matches_normalize(texts):
+    assert NORMALIZER.normalize_many(texts) == [NORMALIZER.normalize(t) for t in texts]
+
+
+def test_normalize_many_random_corpus():
+    rng = random.Random(50)
+    alphabet = list("中文新闻记者表示ABC123 ，。！？,.!?;:…\u3000\u200b\xa0\n\r\t") + ["<br>", "点击关注", "来源：", "..."]
+    texts = ["".join(rng.choices(alphabet, k=rng.randint(0, 60))) for _ in range(500)]
+    assert NORMALIZER.normalize_many(texts) == [NORMALIZER.normalize(t) for t in texts]
+
+
+def test_normalize_many_empty():
+    assert NORMALIZER.normalize_many([]) == []